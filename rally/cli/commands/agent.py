@@ -0,0 +1,64 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" Rally command: agent """
+
+from __future__ import print_function
+
+from rally.cli import cliutils
+from rally.common.i18n import _
+from rally.common import utils
+from rally import plugins
+from rally.task import agent
+
+
+class AgentCommands(object):
+    """Set of commands that allow you to manage agents.
+
+    Agents run the load of the distributed runner on several hosts.
+    """
+
+    @cliutils.args("--host", type=str, required=False,
+                   help="Host to listen at, all interfaces by default.")
+    @cliutils.args("--port", type=int, required=False,
+                   help="Port to listen at, any free port by default.")
+    @cliutils.args("--public-host", type=str, required=False,
+                   dest="public_host",
+                   help="Host which the distributed runner connects to, "
+                        "the FQDN of this host by default.")
+    @plugins.ensure_plugins_are_loaded
+    def start(self, host="0.0.0.0", port=0, public_host=None):
+        """Start an agent of the distributed runner.
+
+        The agent registers itself in the Rally DB and runs the load until
+        it is interrupted.
+        """
+        agent_obj = agent.Agent(host, port, public_host=public_host)
+        print(_("Agent %s is started.") % agent_obj.address)
+        try:
+            agent_obj.serve()
+        except KeyboardInterrupt:
+            print(_("Agent %s is stopped.") % agent_obj.address)
+
+    def list(self):
+        """List registered agents and their health."""
+        headers = ["address", "updated_at", "alive"]
+        agents = agent.list_agents()
+        if agents:
+            cliutils.print_list(
+                [utils.Struct(**dict((k, str(a[k])) for k in headers))
+                 for a in agents], headers)
+        else:
+            print(_("There are no agents. To start an agent, use:"
+                    "\nrally agent start"))
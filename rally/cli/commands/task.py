@@ -338,6 +338,19 @@ class TaskCommands(object):
             print(_("\nThe task %s marked as '%s'. Results "
                     "available when it is '%s'.") % (
                 task_id, task["status"], consts.TaskStatus.FINISHED))
+            progress = [
+                (result["key"]["name"], result["key"]["pos"],
+                 len(result["data"]["raw"]),
+                 _("in progress") if result["data"].get("partial")
+                 else _("finished"))
+                for result in api.Task.get(task_id).get_results()]
+            if progress:
+                print(_("\nIterations saved so far:"))
+                for name, pos, count, status in progress:
+                    print(_("  %(name)s (args position %(pos)s): %(count)d "
+                            "iterations, %(status)s")
+                          % {"name": name, "pos": pos, "count": count,
+                             "status": status})
             return 0
         for result in task["results"]:
             key = result["key"]
@@ -469,7 +482,7 @@ class TaskCommands(object):
                     "of %s.") % (task["status"], ", ".join(finished_statuses)))
             return 1
 
-        results = [{"key": x["key"], "result": x["data"]["raw"],
+        results = [{"key": x["key"], "result": list(x["data"]["raw"]),
                     "sla": x["data"]["sla"],
                     "load_duration": x["data"]["load_duration"],
                     "full_duration": x["data"]["full_duration"]}
@@ -582,7 +595,8 @@ class TaskCommands(object):
                                "sla": x["data"]["sla"],
                                "result": x["data"]["raw"],
                                "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
+                               "full_duration": x["data"]["full_duration"],
+                               "aggregate": x.get("aggregate")},
                     api.Task.get(task_id).get_results())
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s")
@@ -661,7 +675,8 @@ class TaskCommands(object):
                                "sla": x["data"]["sla"],
                                "result": x["data"]["raw"],
                                "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
+                               "full_duration": x["data"]["full_duration"],
+                               "aggregate": x.get("aggregate")},
                     api.Task.get(task_file_or_uuid).get_results())
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s"
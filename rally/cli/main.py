@@ -20,6 +20,7 @@ from __future__ import print_function
 import sys
 
 from rally.cli import cliutils
+from rally.cli.commands import agent
 from rally.cli.commands import deployment
 from rally.cli.commands import plugin
 from rally.cli.commands import show
@@ -28,6 +29,7 @@ from rally.cli.commands import verify
 
 
 categories = {
+    "agent": agent.AgentCommands,
     "deployment": deployment.DeploymentCommands,
     "plugin": plugin.PluginCommands,
     "show": show.ShowCommands,
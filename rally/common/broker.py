@@ -18,6 +18,7 @@ import threading
 
 from rally.common.i18n import _
 from rally.common import logging
+from rally.common import utils
 
 
 LOG = logging.getLogger(__name__)
@@ -84,3 +85,49 @@ def run(publish, consume, consumers_count=1):
 
     for consumer in consumers:
         consumer.join()
+
+
+def run_for_each(func, items, consumers_count=1):
+    """Call func for each of items concurrently.
+
+    Unlike run(), errors are not just logged: when all the items are
+    processed, the error of the first failed item is raised.
+
+    :param func: Function that processes a single item
+    :param items: Iterable of items
+    :param consumers_count: Max number of concurrent calls
+    :returns: List of results of func in order of items
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = []
+
+    def publish(queue):
+        queue.extend(enumerate(items))
+
+    def consume(cache, args):
+        i, item = args
+        try:
+            results[i] = func(item)
+        except Exception as e:
+            errors.append((i, e))
+
+    run(publish, consume, max(min(consumers_count, len(items)), 1))
+
+    if errors:
+        raise min(errors, key=lambda error: error[0])[1]
+    return results
+
+
+def run_per_tenants(func, users, consumers_count=1):
+    """Call func(user, tenant_id) for a single user of each tenant.
+
+    Tenants are processed concurrently, see run_for_each().
+
+    :param func: Function that processes a single tenant
+    :param users: List of users (see rally.common.utils.iterate_per_tenants)
+    :param consumers_count: Max number of tenants processed at once
+    :returns: List of results of func in order of tenants
+    """
+    return run_for_each(lambda args: func(*args),
+                        utils.iterate_per_tenants(users), consumers_count)
@@ -229,7 +229,9 @@ def task_result_get_all_by_uuid(task_uuid):
     """Get list of task results.
 
     :param task_uuid: string with UUID of Task instance.
-    :returns: list instances of TaskResult.
+    :returns: list instances of TaskResult. "raw" of their data is a lazy
+              sequence of iterations which are read from DB in batches,
+              "aggregate" is the stored WorkloadAggregate or None.
     """
     return get_impl().task_result_get_all_by_uuid(task_uuid)
 
@@ -239,12 +241,78 @@ def task_result_create(task_uuid, key, data):
 
     :param task_uuid: string with UUID of Task instance.
     :param key: key expected to update in task result.
-    :param data: data expected to update in task result.
+    :param data: data expected to update in task result. Iterations from
+                 its "raw" list are stored as separate records.
     :returns: TaskResult instance appended.
     """
     return get_impl().task_result_create(task_uuid, key, data)
 
 
+def task_result_update(task_result_id, data):
+    """Update data of task result record.
+
+    :param task_result_id: int ID of TaskResult instance.
+    :param data: new data of the task result.
+    :raises RallyException: if the task result does not exist.
+    :returns: TaskResult instance updated.
+    """
+    return get_impl().task_result_update(task_result_id, data)
+
+
+def workload_iterations_create(task_result_id, iterations):
+    """Store results of iterations of a workload.
+
+    :param task_result_id: int ID of TaskResult instance.
+    :param iterations: iterable with iterations results, they are written
+                       in batches.
+    """
+    return get_impl().workload_iterations_create(task_result_id, iterations)
+
+
+def workload_iterations_get(task_result_id):
+    """Get results of iterations of a workload ordered by timestamp.
+
+    :param task_result_id: int ID of TaskResult instance.
+    :returns: generator of iterations results, which are fetched in batches.
+    """
+    return get_impl().workload_iterations_get(task_result_id)
+
+
+def workload_iterations_count(task_result_id):
+    """Get count of iterations of a workload.
+
+    :param task_result_id: int ID of TaskResult instance.
+    :returns: int count of iterations results.
+    """
+    return get_impl().workload_iterations_count(task_result_id)
+
+
+def workload_aggregate_create(task_result_id, values):
+    """Store aggregated results of a finished workload.
+
+    Previously stored aggregates of the workload are replaced.
+
+    :param task_result_id: int ID of TaskResult instance.
+    :param values: dict with values of WorkloadAggregate: iterations_count,
+                   iterations_failed, min_duration, max_duration,
+                   tstamp_start, load_duration, full_duration, sla_success
+                   and data (dict with the rest of aggregated results).
+    """
+    return get_impl().workload_aggregate_create(task_result_id, values)
+
+
+def workload_aggregates_get(task_result_ids):
+    """Get stored aggregates of workloads.
+
+    :param task_result_ids: list of int IDs of TaskResult instances.
+    :returns: dict with IDs of TaskResult instances as keys and
+              WorkloadAggregate instances as values. Workloads which have
+              no aggregates (they are not finished or were finished before
+              aggregates were introduced) are absent.
+    """
+    return get_impl().workload_aggregates_get(task_result_ids)
+
+
 def deployment_create(values):
     """Create a deployment from the values dictionary.
 
@@ -430,6 +498,16 @@ def unregister_worker(hostname):
     get_impl().unregister_worker(hostname)
 
 
+def list_workers(updated_after=None):
+    """List registered worker services.
+
+    :param updated_after: datetime, if it is specified only workers which
+                          were marked as active after it are returned
+    :returns: A list of workers sorted by hostnames.
+    """
+    return get_impl().list_workers(updated_after=updated_after)
+
+
 def update_worker(hostname):
     """Mark a worker as active by updating its "updated_at" property.
 
@@ -16,6 +16,7 @@
 SQLAlchemy implementation for DB.API
 """
 
+import itertools
 import os
 
 import alembic
@@ -41,6 +42,9 @@ _FACADE = None
 
 INITIAL_REVISION_UUID = "ca3626f62937"
 
+# How many iterations are written by one INSERT or fetched by one round trip
+ITERATIONS_BATCH_SIZE = 1000
+
 
 def _create_facade_lazily():
     global _FACADE
@@ -103,6 +107,71 @@ def fix_deployment(fn):
     return wrapper
 
 
+class WorkloadIterations(object):
+    """Lazy sequence of iterations of one workload stored in DB.
+
+    Iterations are fetched in batches (via server-side cursor when the
+    database supports it) each time the object is iterated, so the memory
+    does not depend on the count of iterations.
+    """
+
+    def __init__(self, connection, task_result_id, inline=None):
+        self._connection = connection
+        self._task_result_id = task_result_id
+        # Results which were not migrated to the workload_iterations table
+        # keep iterations in the "raw" list
+        self._inline = inline or []
+
+    def __iter__(self):
+        for itr in sorted(self._inline, key=lambda i: i["timestamp"]):
+            yield itr
+        for itr in self._connection.workload_iterations_get(
+                self._task_result_id):
+            yield itr
+
+    def __len__(self):
+        return len(self._inline) + self._connection.workload_iterations_count(
+            self._task_result_id)
+
+    def __repr__(self):
+        return "<WorkloadIterations of task result %s>" % self._task_result_id
+
+
+def with_iterations(fn):
+    """Replace "raw" of task results with lazy sequences of iterations."""
+
+    def attach(result):
+        if result.get("id") is not None and "raw" in result["data"]:
+            result["data"]["raw"] = WorkloadIterations(
+                Connection(), result["id"], result["data"]["raw"])
+        return result
+
+    def wrapper(*args, **kwargs):
+        obj = fn(*args, **kwargs)
+        if isinstance(obj, list):
+            return [attach(result) for result in obj]
+        if obj:
+            obj["results"] = [attach(result) for result in obj["results"]]
+        return obj
+    return wrapper
+
+
+def with_aggregates(fn):
+    """Attach stored aggregates (or None) to task results as "aggregate"."""
+
+    def wrapper(*args, **kwargs):
+        obj = fn(*args, **kwargs)
+        results = obj if isinstance(obj, list) else (obj or {}).get(
+            "results", [])
+        ids = [result["id"] for result in results
+               if result.get("id") is not None]
+        aggregates = Connection().workload_aggregates_get(ids) if ids else {}
+        for result in results:
+            result["aggregate"] = aggregates.get(result.get("id"))
+        return obj
+    return wrapper
+
+
 class Connection(object):
 
     def engine_reset(self):
@@ -211,6 +280,8 @@ class Connection(object):
     def task_get(self, uuid):
         return self._task_get(uuid)
 
+    @with_aggregates
+    @with_iterations
     @db_api.serialize
     def task_get_detailed(self, uuid):
         return (self.model_query(models.Task).
@@ -221,6 +292,8 @@ class Connection(object):
     def task_get_status(self, uuid):
         return self._task_get(uuid, load_only="status").status
 
+    @with_aggregates
+    @with_iterations
     @db_api.serialize
     def task_get_detailed_last(self):
         return (self.model_query(models.Task).
@@ -282,6 +355,14 @@ class Connection(object):
             if status is not None:
                 query = base_query.filter_by(status=status)
 
+            results = (session.query(models.TaskResult.id).
+                       filter_by(task_uuid=uuid).subquery())
+            (self.model_query(models.WorkloadIteration, session=session).
+             filter(models.WorkloadIteration.task_result_id.in_(results)).
+             delete(synchronize_session=False))
+            (self.model_query(models.WorkloadAggregate, session=session).
+             filter(models.WorkloadAggregate.task_result_id.in_(results)).
+             delete(synchronize_session=False))
             (self.model_query(models.TaskResult).filter_by(task_uuid=uuid).
              delete(synchronize_session=False))
 
@@ -297,16 +378,89 @@ class Connection(object):
 
     @db_api.serialize
     def task_result_create(self, task_uuid, key, data):
-        result = models.TaskResult()
-        result.update({"task_uuid": task_uuid, "key": key, "data": data})
-        result.save()
+        raw = data.get("raw")
+        if raw:
+            data = dict(data, raw=[])
+        session = get_session()
+        with session.begin():
+            result = models.TaskResult()
+            result.update({"task_uuid": task_uuid, "key": key, "data": data})
+            result.save(session=session)
+            if raw:
+                self._workload_iterations_create(result.id, raw, session)
+        return result
+
+    @db_api.serialize
+    def task_result_update(self, task_result_id, data):
+        session = get_session()
+        with session.begin():
+            result = (self.model_query(models.TaskResult, session=session).
+                      filter_by(id=task_result_id).first())
+            if not result:
+                raise exceptions.RallyException(
+                    _("Task result with id='%s' not found.") % task_result_id)
+            result.update({"data": data})
         return result
 
+    @with_aggregates
+    @with_iterations
     @db_api.serialize
     def task_result_get_all_by_uuid(self, uuid):
         return (self.model_query(models.TaskResult).
                 filter_by(task_uuid=uuid).all())
 
+    def _workload_iterations_create(self, task_result_id, iterations,
+                                    session):
+        table = models.WorkloadIteration.__table__
+        iterations = iter(iterations)
+        while True:
+            batch = [{"task_result_id": task_result_id,
+                      "timestamp": itr.get("timestamp") or 0.0,
+                      "data": itr}
+                     for itr in itertools.islice(iterations,
+                                                 ITERATIONS_BATCH_SIZE)]
+            if not batch:
+                break
+            session.execute(table.insert(), batch)
+
+    def workload_iterations_create(self, task_result_id, iterations):
+        session = get_session()
+        with session.begin():
+            self._workload_iterations_create(task_result_id, iterations,
+                                             session)
+
+    def workload_iterations_get(self, task_result_id):
+        query = (get_session().query(models.WorkloadIteration.data).
+                 filter_by(task_result_id=task_result_id).
+                 order_by(models.WorkloadIteration.timestamp,
+                          models.WorkloadIteration.id).
+                 execution_options(stream_results=True).
+                 yield_per(ITERATIONS_BATCH_SIZE))
+        for (data,) in query:
+            yield data
+
+    def workload_iterations_count(self, task_result_id):
+        return (get_session().query(models.WorkloadIteration.id).
+                filter_by(task_result_id=task_result_id).count())
+
+    def workload_aggregate_create(self, task_result_id, values):
+        session = get_session()
+        with session.begin():
+            (self.model_query(models.WorkloadAggregate, session=session).
+             filter_by(task_result_id=task_result_id).
+             delete(synchronize_session=False))
+            aggregate = models.WorkloadAggregate()
+            aggregate.update(dict(values, task_result_id=task_result_id))
+            aggregate.save(session=session)
+
+    @db_api.serialize
+    def workload_aggregates_get(self, task_result_ids):
+        query = (self.model_query(models.WorkloadAggregate).
+                 filter(models.WorkloadAggregate.task_result_id.in_(
+                     task_result_ids)))
+        return dict((aggregate.task_result_id, aggregate)
+                    for aggregate in query)
+
     def _deployment_get(self, deployment, session=None):
         stored_deployment = self.model_query(
             models.Deployment,
@@ -494,6 +648,13 @@ class Connection(object):
         except NoResultFound:
             raise exceptions.WorkerNotFound(worker=hostname)
 
+    @db_api.serialize
+    def list_workers(self, updated_after=None):
+        query = self.model_query(models.Worker)
+        if updated_after is not None:
+            query = query.filter(models.Worker.updated_at > updated_after)
+        return query.order_by(models.Worker.hostname).all()
+
     def unregister_worker(self, hostname):
         count = (self.model_query(models.Worker).
                  filter_by(hostname=hostname).delete())
@@ -0,0 +1,65 @@
+# Copyright (c) 2016 Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add workload_aggregates table
+
+Aggregated results of a workload (stats of durations, SLA results, etc)
+are stored once it is finished. Aggregates of already existing workloads
+are not calculated, they are calculated from iterations on reading.
+
+Revision ID: a43700a813a5
+Revises: e654a0648db0
+Create Date: 2016-10-21 16:02:13.106713
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "a43700a813a5"
+down_revision = "e654a0648db0"
+branch_labels = None
+depends_on = None
+
+from alembic import op  # noqa
+import sqlalchemy as sa  # noqa
+
+from rally.common.db.sqlalchemy import types as sa_types
+from rally import exceptions
+
+
+def upgrade():
+    op.create_table(
+        "workload_aggregates",
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_result_id", sa.Integer(), nullable=False),
+        sa.Column("iterations_count", sa.Integer(), nullable=True),
+        sa.Column("iterations_failed", sa.Integer(), nullable=True),
+        sa.Column("min_duration", sa.Float(), nullable=True),
+        sa.Column("max_duration", sa.Float(), nullable=True),
+        sa.Column("tstamp_start", sa.Float(), nullable=True),
+        sa.Column("load_duration", sa.Float(), nullable=True),
+        sa.Column("full_duration", sa.Float(), nullable=True),
+        sa.Column("sla_success", sa.Boolean(), nullable=True),
+        sa.Column("data", sa_types.MutableJSONEncodedDict(), nullable=False),
+        sa.ForeignKeyConstraint(["task_result_id"], ["task_results.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("workload_aggregates_task_result_id",
+                    "workload_aggregates", ["task_result_id"], unique=True)
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -0,0 +1,97 @@
+# Copyright (c) 2016 Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add workload_iterations table
+
+Results of iterations are moved from the "raw" list of task_results.data
+to separate rows, so they can be written in batches and read as a stream.
+
+Revision ID: e654a0648db0
+Revises: 54e844ebfbc3
+Create Date: 2016-10-14 12:21:47.392317
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "e654a0648db0"
+down_revision = "54e844ebfbc3"
+branch_labels = None
+depends_on = None
+
+from alembic import op  # noqa
+import sqlalchemy as sa  # noqa
+
+from rally.common.db.sqlalchemy import types as sa_types
+from rally import exceptions
+
+
+task_results_helper = sa.Table(
+    "task_results",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("data", sa_types.BigMutableJSONEncodedDict(), nullable=False),
+)
+
+workload_iterations_helper = sa.Table(
+    "workload_iterations",
+    sa.MetaData(),
+    sa.Column("created_at", sa.DateTime()),
+    sa.Column("updated_at", sa.DateTime()),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("task_result_id", sa.Integer, nullable=False),
+    sa.Column("timestamp", sa.Float, nullable=False),
+    sa.Column("data", sa_types.BigMutableJSONEncodedDict(), nullable=False),
+)
+
+
+def upgrade():
+    op.create_table(
+        "workload_iterations",
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_result_id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.Float(), nullable=False),
+        sa.Column("data", sa_types.BigMutableJSONEncodedDict(),
+                  nullable=False),
+        sa.ForeignKeyConstraint(["task_result_id"], ["task_results.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("workload_iterations_task_result_id_timestamp",
+                    "workload_iterations", ["task_result_id", "timestamp"],
+                    unique=False)
+
+    connection = op.get_bind()
+    result_ids = [r.id for r in connection.execute(
+        sa.select([task_results_helper.c.id]))]
+    # Results are loaded one by one, since each of them may be huge
+    for result_id in result_ids:
+        result = connection.execute(task_results_helper.select().where(
+            task_results_helper.c.id == result_id)).first()
+        data = dict(result.data)
+        raw = data.get("raw") or []
+        if raw:
+            connection.execute(
+                workload_iterations_helper.insert(),
+                [{"task_result_id": result_id,
+                  "timestamp": itr.get("timestamp") or 0.0,
+                  "data": itr} for itr in raw])
+        data["raw"] = []
+        connection.execute(task_results_helper.update().where(
+            task_results_helper.c.id == result_id).values(data=data))
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
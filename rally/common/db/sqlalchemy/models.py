@@ -200,6 +200,49 @@ class TaskResult(BASE, RallyBase):
                                primaryjoin="TaskResult.task_uuid == Task.uuid")
 
 
+class WorkloadIteration(BASE, RallyBase):
+    """Represents a result of one iteration of a workload."""
+    __tablename__ = "workload_iterations"
+    __table_args__ = (
+        sa.Index("workload_iterations_task_result_id_timestamp",
+                 "task_result_id", "timestamp"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    task_result_id = sa.Column(sa.Integer, sa.ForeignKey("task_results.id"),
+                               nullable=False)
+    timestamp = sa.Column(sa.Float, nullable=False, default=0.0)
+    data = sa.Column(sa_types.BigMutableJSONEncodedDict, nullable=False)
+
+
+class WorkloadAggregate(BASE, RallyBase):
+    """Represents aggregated results of a finished workload.
+
+    Aggregates are calculated once when the workload is finished, so
+    reading them doesn't require to process all iterations.
+    """
+    __tablename__ = "workload_aggregates"
+    __table_args__ = (
+        sa.Index("workload_aggregates_task_result_id", "task_result_id",
+                 unique=True),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    task_result_id = sa.Column(sa.Integer, sa.ForeignKey("task_results.id"),
+                               nullable=False)
+    iterations_count = sa.Column(sa.Integer, default=0)
+    iterations_failed = sa.Column(sa.Integer, default=0)
+    min_duration = sa.Column(sa.Float, default=0.0)
+    max_duration = sa.Column(sa.Float, default=0.0)
+    tstamp_start = sa.Column(sa.Float, default=0.0)
+    load_duration = sa.Column(sa.Float, default=0.0)
+    full_duration = sa.Column(sa.Float, default=0.0)
+    sla_success = sa.Column(sa.Boolean, default=True)
+    data = sa.Column(sa_types.MutableJSONEncodedDict, nullable=False)
+
+
 class Verification(BASE, RallyBase):
     """Represents a verifier result."""
 
@@ -96,6 +96,30 @@ OUTPUT_SCHEMA = {
     "additionalProperties": False
 }
 
+CONTEXTS_DURATIONS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "setup": {"type": "number"},
+            "cleanup": {"type": "number"}
+        },
+        "required": ["name"],
+        "additionalProperties": False
+    }
+}
+
+SHARED_CONTEXT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "uuid": {"type": "string"},
+        "contexts": CONTEXTS_DURATIONS_SCHEMA
+    },
+    "required": ["uuid", "contexts"],
+    "additionalProperties": False
+}
+
 
 TASK_RESULT_SCHEMA = {
     "type": "object",
@@ -150,6 +174,18 @@ TASK_RESULT_SCHEMA = {
                     "idle_duration": {
                         "type": "number"
                     },
+                    "scheduled_at": {
+                        "type": "number"
+                    },
+                    "phase": {
+                        "type": "integer"
+                    },
+                    "atomic_actions_uncertainty": {
+                        "type": "object"
+                    },
+                    "termination_delay": {
+                        "type": "number"
+                    },
                     # NOTE(amaretskiy): "scenario_output" is deprecated
                     #                   in favor of "output"
                     "scenario_output": {
@@ -177,6 +213,8 @@ TASK_RESULT_SCHEMA = {
         "full_duration": {
             "type": "number",
         },
+        "contexts": CONTEXTS_DURATIONS_SCHEMA,
+        "shared_context": SHARED_CONTEXT_SCHEMA,
     },
     "required": ["key", "sla", "result", "load_duration",
                  "full_duration"],
@@ -240,6 +278,18 @@ TASK_EXTENDED_RESULT_SCHEMA = {
                     "idle_duration": {
                         "type": "number"
                     },
+                    "scheduled_at": {
+                        "type": "number"
+                    },
+                    "phase": {
+                        "type": "integer"
+                    },
+                    "atomic_actions_uncertainty": {
+                        "type": "object"
+                    },
+                    "termination_delay": {
+                        "type": "number"
+                    },
                     "output": OUTPUT_SCHEMA
                 },
                 "required": ["atomic_actions", "duration", "error",
@@ -269,7 +319,9 @@ TASK_EXTENDED_RESULT_SCHEMA = {
                 "max_duration": {"type": "number"},
                 "tstamp_start": {"type": "number"},
                 "full_duration": {"type": "number"},
-                "load_duration": {"type": "number"}
+                "load_duration": {"type": "number"},
+                "contexts": CONTEXTS_DURATIONS_SCHEMA,
+                "shared_context": SHARED_CONTEXT_SCHEMA
             }
         }
     },
@@ -278,6 +330,16 @@ TASK_EXTENDED_RESULT_SCHEMA = {
 }
 
 
+class _StoredIterations(object):
+    """Iterations of a workload which are read from DB on each iteration."""
+
+    def __init__(self, result_id):
+        self.result_id = result_id
+
+    def __iter__(self):
+        return iter(db.workload_iterations_get(self.result_id))
+
+
 class Task(object):
     """Represents a task object."""
 
@@ -395,52 +457,19 @@ class Task(object):
                       tstamp_start - float timestamp of the first iteration
                       full_duration - float full scenario duration
                       load_duration - float load scenario duration
+                      contexts - list of dicts with name of a context and
+                                 durations of its setup and cleanup (if the
+                                 results have them)
         """
         extended = []
         for scenario_result in results:
             scenario = dict(scenario_result)
-            tstamp_start = 0
-            min_duration = 0
-            max_duration = 0
-            iterations_failed = 0
-            atomic = collections.OrderedDict()
-
-            for itr in scenario["data"]["raw"]:
-                for atomic_name, duration in itr["atomic_actions"].items():
-                    duration = duration or 0
-                    if atomic_name not in atomic:
-                        atomic[atomic_name] = {"min_duration": duration,
-                                               "max_duration": duration}
-                    elif duration < atomic[atomic_name]["min_duration"]:
-                        atomic[atomic_name]["min_duration"] = duration
-                    elif duration > atomic[atomic_name]["max_duration"]:
-                        atomic[atomic_name]["max_duration"] = duration
-
-                if not tstamp_start or itr["timestamp"] < tstamp_start:
-                    tstamp_start = itr["timestamp"]
-
-                if "output" not in itr:
-                    itr["output"] = {"additive": [], "complete": []}
-
-                    # NOTE(amaretskiy): Deprecated "scenario_output"
-                    #     is supported for backward compatibility
-                    if ("scenario_output" in itr
-                            and itr["scenario_output"]["data"]):
-                        itr["output"]["additive"].append(
-                            {"items": itr["scenario_output"]["data"].items(),
-                             "title": "Scenario output",
-                             "description": "",
-                             "chart": "OutputStackedAreaChart"})
-                        del itr["scenario_output"]
-
-                if itr["error"]:
-                    iterations_failed += 1
-                else:
-                    duration = itr["duration"] or 0
-                    if not min_duration or duration < min_duration:
-                        min_duration = duration
-                    if not max_duration or duration > max_duration:
-                        max_duration = duration
+            aggregate = scenario.pop("aggregate", None)
+            raw = scenario["data"]["raw"]
+            if aggregate:
+                info = cls._load_aggregate(aggregate)
+            else:
+                info = cls._aggregate_iterations(raw)
 
             for k in "created_at", "updated_at":
                 if serializable:
@@ -451,29 +480,18 @@ class Task(object):
                 else:
                     del scenario[k]
 
-            durations_stat = charts.MainStatsTable(
-                {"iterations_count": len(scenario["data"]["raw"]),
-                 "atomic": atomic})
-
-            for itr in scenario["data"]["raw"]:
-                durations_stat.add_iteration(itr)
-
-            scenario["info"] = {
-                "stat": durations_stat.render(),
-                "atomic": atomic,
-                "iterations_count": len(scenario["data"]["raw"]),
-                "iterations_failed": iterations_failed,
-                "min_duration": min_duration,
-                "max_duration": max_duration,
-                "tstamp_start": tstamp_start,
-                "full_duration": scenario["data"]["full_duration"],
-                "load_duration": scenario["data"]["load_duration"]}
-            iterations = sorted(scenario["data"]["raw"],
-                                key=lambda itr: itr["timestamp"])
+            scenario["info"] = dict(
+                info,
+                full_duration=scenario["data"]["full_duration"],
+                load_duration=scenario["data"]["load_duration"])
+            for key in ("contexts", "shared_context"):
+                if key in scenario["data"]:
+                    scenario["info"][key] = scenario["data"][key]
+            iterations = cls._sorted_iterations(raw)
             if serializable:
                 scenario["iterations"] = list(iterations)
             else:
-                scenario["iterations"] = iter(iterations)
+                scenario["iterations"] = iterations
             scenario["sla"] = scenario["data"]["sla"]
             del scenario["data"]
             del scenario["task_uuid"]
@@ -481,8 +499,133 @@ class Task(object):
             extended.append(scenario)
         return extended
 
+    @staticmethod
+    def _aggregate_iterations(raw):
+        """Calculate aggregated data of iterations of a workload.
+
+        :param raw: list of iterations or lazy sequence of iterations
+        :returns: dict with atomic, iterations_count, iterations_failed,
+                  min_duration, max_duration, tstamp_start and stat
+                  (see extend_results)
+        """
+        tstamp_start = 0
+        min_duration = 0
+        max_duration = 0
+        iterations_count = 0
+        iterations_failed = 0
+        atomic = collections.OrderedDict()
+
+        # "raw" may be a lazy sequence which reads iterations from DB,
+        # so it is iterated several times instead of being loaded
+        # into memory
+        for itr in raw:
+            iterations_count += 1
+            for atomic_name, duration in itr["atomic_actions"].items():
+                duration = duration or 0
+                if atomic_name not in atomic:
+                    atomic[atomic_name] = {"min_duration": duration,
+                                           "max_duration": duration}
+                elif duration < atomic[atomic_name]["min_duration"]:
+                    atomic[atomic_name]["min_duration"] = duration
+                elif duration > atomic[atomic_name]["max_duration"]:
+                    atomic[atomic_name]["max_duration"] = duration
+
+            if not tstamp_start or itr["timestamp"] < tstamp_start:
+                tstamp_start = itr["timestamp"]
+
+            if itr["error"]:
+                iterations_failed += 1
+            else:
+                duration = itr["duration"] or 0
+                if not min_duration or duration < min_duration:
+                    min_duration = duration
+                if not max_duration or duration > max_duration:
+                    max_duration = duration
+
+        durations_stat = charts.MainStatsTable(
+            {"iterations_count": iterations_count,
+             "atomic": atomic})
+
+        for itr in raw:
+            durations_stat.add_iteration(itr)
+
+        return {"stat": durations_stat.render(),
+                "atomic": atomic,
+                "iterations_count": iterations_count,
+                "iterations_failed": iterations_failed,
+                "min_duration": min_duration,
+                "max_duration": max_duration,
+                "tstamp_start": tstamp_start}
+
+    @staticmethod
+    def _load_aggregate(aggregate):
+        """Transform stored WorkloadAggregate to aggregated data."""
+        return {"stat": aggregate["data"]["stat"],
+                # atomic actions are stored as a list to keep their order
+                "atomic": collections.OrderedDict(
+                    aggregate["data"]["atomic"]),
+                "iterations_count": aggregate["iterations_count"],
+                "iterations_failed": aggregate["iterations_failed"],
+                "min_duration": aggregate["min_duration"],
+                "max_duration": aggregate["max_duration"],
+                "tstamp_start": aggregate["tstamp_start"]}
+
+    @staticmethod
+    def _sorted_iterations(raw):
+        """Yield iterations ordered by timestamp with fixed output format.
+
+        :param raw: list of iterations or lazy sequence of iterations
+                    which are already ordered by timestamp
+        """
+        if isinstance(raw, list):
+            raw = sorted(raw, key=lambda itr: itr["timestamp"])
+        for itr in raw:
+            if "output" not in itr:
+                itr["output"] = {"additive": [], "complete": []}
+
+                # NOTE(amaretskiy): Deprecated "scenario_output"
+                #     is supported for backward compatibility
+                if ("scenario_output" in itr
+                        and itr["scenario_output"]["data"]):
+                    itr["output"]["additive"].append(
+                        {"items": itr["scenario_output"]["data"].items(),
+                         "title": "Scenario output",
+                         "description": "",
+                         "chart": "OutputStackedAreaChart"})
+                    del itr["scenario_output"]
+            yield itr
+
     def append_results(self, key, value):
-        db.task_result_create(self.task["uuid"], key, value)
+        return db.task_result_create(self.task["uuid"], key, value)
+
+    def update_results(self, result_id, value):
+        db.task_result_update(result_id, value)
+
+    def append_iterations(self, result_id, iterations):
+        db.workload_iterations_create(result_id, iterations)
+
+    def aggregate_results(self, result_id, data):
+        """Calculate and store aggregated results of a finished workload.
+
+        Iterations are read from DB once, after that the aggregates are
+        used by extend_results() instead of processing all iterations.
+
+        :param result_id: int ID of the task result
+        :param data: final data of the task result (without iterations)
+        """
+        info = self._aggregate_iterations(_StoredIterations(result_id))
+        db.workload_aggregate_create(result_id, {
+            "iterations_count": info["iterations_count"],
+            "iterations_failed": info["iterations_failed"],
+            "min_duration": info["min_duration"],
+            "max_duration": info["max_duration"],
+            "tstamp_start": info["tstamp_start"],
+            "load_duration": data["load_duration"],
+            "full_duration": data["full_duration"],
+            "sla_success": all(sla["success"] for sla in data["sla"]),
+            "data": {"atomic": list(info["atomic"].items()),
+                     "stat": info["stat"],
+                     "sla": data["sla"]}})
 
     def delete(self, status=None):
         db.task_delete(self.task["uuid"], status=status)
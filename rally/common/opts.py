@@ -15,7 +15,9 @@
 import itertools
 
 from rally.common import logging
+from rally.common import sshutils
 from rally import osclients
+from rally.plugins.common.scenarios.requests import utils as requests_utils
 from rally.plugins.openstack.cleanup import base as cleanup_base
 from rally.plugins.openstack.context.keystone import roles
 from rally.plugins.openstack.context.keystone import users
@@ -31,6 +33,10 @@ from rally.plugins.openstack.scenarios.sahara import utils as sahara_utils
 from rally.plugins.openstack.scenarios.vm import utils as vm_utils
 from rally.plugins.openstack.scenarios.watcher import utils as watcher_utils
 from rally.plugins.openstack.wrappers import glance as glance_utils
+from rally.task import agent
+from rally.task import context
+from rally.task import engine
+from rally.task import utils as task_utils
 from rally.verification.tempest import config as tempest_conf
 
 
@@ -38,7 +44,12 @@ def list_opts():
     return [
         ("DEFAULT",
          itertools.chain(logging.DEBUG_OPTS,
-                         osclients.OSCLIENTS_OPTS)),
+                         osclients.OSCLIENTS_OPTS,
+                         sshutils.SSH_OPTS,
+                         agent.AGENT_OPTS,
+                         context.CONTEXT_OPTS,
+                         engine.TASK_ENGINE_OPTS,
+                         task_utils.TASK_UTILS_OPTS)),
         ("benchmark",
          itertools.chain(cinder_utils.CINDER_BENCHMARK_OPTS,
                          ec2_utils.EC2_BENCHMARK_OPTS,
@@ -49,6 +60,7 @@ def list_opts():
                          monasca_utils.MONASCA_BENCHMARK_OPTS,
                          murano_utils.MURANO_BENCHMARK_OPTS,
                          nova_utils.NOVA_BENCHMARK_OPTS,
+                         requests_utils.REQUESTS_BENCHMARK_OPTS,
                          sahara_utils.SAHARA_BENCHMARK_OPTS,
                          vm_utils.VM_BENCHMARK_OPTS,
                          watcher_utils.WATCHER_BENCHMARK_OPTS)),
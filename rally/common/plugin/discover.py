@@ -13,9 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import imp
+import json
 import os
 import sys
+import threading
 
 from oslo_utils import importutils
 
@@ -25,6 +28,16 @@ from rally.common import logging
 
 LOG = logging.getLogger(__name__)
 
+# Modules with plugins which are known from the index but not imported yet
+_LAZY_MODULES = set()
+# Plugin names and plugin bases mapped to the modules which define them
+_LAZY_NAMES = {}
+_LAZY_BASES = {}
+_LAZY_LOCK = threading.RLock()
+# Base classes of classes which are not plugins (e.g. resource managers of
+# the cleanup), but modules with their subclasses are indexed as well
+_INDEXED_BASES = []
+
 
 def itersubclasses(cls, seen=None):
     """Generator over all subclasses of a given class in depth first order."""
@@ -42,22 +55,165 @@ def itersubclasses(cls, seen=None):
                 yield sub
 
 
-def import_modules_from_package(package):
-    """Import modules from package and append into sys.modules
-
-    :param package: Full package name. For example: rally.deployment.engines
-    """
+def _iter_package_modules(package):
+    """Yield names and paths of modules of package and its subpackages."""
     path = [os.path.dirname(rally.__file__), ".."] + package.split(".")
     path = os.path.join(*path)
     for root, dirs, files in os.walk(path):
-        for filename in files:
+        dirs.sort()
+        for filename in sorted(files):
             if filename.startswith("__") or not filename.endswith(".py"):
                 continue
             new_package = ".".join(root.split(os.sep)).split("....")[1]
-            module_name = "%s.%s" % (new_package, filename[:-3])
-            if module_name not in sys.modules:
-                sys.modules[module_name] = importutils.import_module(
-                    module_name)
+            yield ("%s.%s" % (new_package, filename[:-3]),
+                   os.path.join(root, filename))
+
+
+def import_modules_from_package(package):
+    """Import modules from package and append into sys.modules
+
+    :param package: Full package name. For example: rally.deployment.engines
+    """
+    for module_name, path in _iter_package_modules(package):
+        if module_name not in sys.modules:
+            sys.modules[module_name] = importutils.import_module(module_name)
+
+
+def _get_base_path(plugin_cls):
+    base = plugin_cls._get_base()
+    return "%s.%s" % (base.__module__, base.__name__)
+
+
+def index_subclasses(base):
+    """Class decorator which makes the index include its subclasses.
+
+    Modules with subclasses of the base class which is not a plugin are
+    registered by import_modules_lazily() like modules with plugins, so
+    call import_lazy_modules(base=base) before looking for subclasses.
+
+    :param base: base class
+    """
+    if base not in _INDEXED_BASES:
+        _INDEXED_BASES.append(base)
+    return base
+
+
+def _get_packages_signature(packages):
+    """Calculate the signature of modules by their paths and mtimes."""
+    signature = hashlib.md5()
+    for package in packages:
+        for module_name, path in _iter_package_modules(package):
+            stat = os.stat(path)
+            signature.update(("%s:%s:%s:%s;" % (
+                module_name, path, stat.st_mtime, stat.st_size)).encode())
+    return signature.hexdigest()
+
+
+def _make_index(packages, signature):
+    from rally.common.plugin import plugin
+
+    modules = {}
+    prefixes = tuple(package + "." for package in packages)
+    for plugin_cls in itersubclasses(plugin.Plugin):
+        if not (plugin_cls._meta_is_inited(raise_exc=False)
+                and plugin_cls.get_name()):
+            continue
+        # plugins made of functions are defined in modules of functions
+        module_name = getattr(plugin_cls, "func_ref", plugin_cls).__module__
+        if module_name.startswith(prefixes):
+            modules.setdefault(module_name, []).append(
+                [plugin_cls.get_name(), _get_base_path(plugin_cls)])
+    # subclasses of indexed bases don't have names, they are looked up by
+    # their bases only
+    for base in _INDEXED_BASES:
+        entry = [None, "%s.%s" % (base.__module__, base.__name__)]
+        for cls in itersubclasses(base):
+            if (cls.__module__.startswith(prefixes)
+                    and entry not in modules.get(cls.__module__, ())):
+                modules.setdefault(cls.__module__, []).append(entry)
+    return {"signature": signature, "modules": modules}
+
+
+def import_modules_lazily(packages, index_path):
+    """Register modules of packages to be imported on the first use.
+
+    Names and bases of plugins of each module are stored in the index file
+    (as well as bases of classes registered by index_subclasses()).
+    If the index is missing or modules are changed since it was made, all
+    modules are imported and the index is saved. Otherwise, the modules
+    are imported by import_lazy_modules() once their plugins are needed,
+    i.e. by Plugin.get() and Plugin.get_all().
+
+    :param packages: list of full names of packages
+    :param index_path: path to the index file
+    """
+    signature = _get_packages_signature(packages)
+    index = None
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (IOError, OSError, ValueError):
+        pass
+
+    if not index or index.get("signature") != signature:
+        for package in packages:
+            import_modules_from_package(package)
+        index = _make_index(packages, signature)
+        try:
+            index_dir = os.path.dirname(index_path)
+            if not os.path.exists(index_dir):
+                os.makedirs(index_dir)
+            with open(index_path, "w") as f:
+                json.dump(index, f)
+        except (IOError, OSError) as e:
+            LOG.debug("Failed to save index of plugins to %s: %s"
+                      % (index_path, e))
+        return
+
+    with _LAZY_LOCK:
+        for module_name, plugins in index["modules"].items():
+            if module_name in sys.modules:
+                continue
+            _LAZY_MODULES.add(module_name)
+            for name, base in plugins:
+                if name is not None:
+                    _LAZY_NAMES.setdefault(name, set()).add(module_name)
+                _LAZY_BASES.setdefault(base, set()).add(module_name)
+
+
+def import_lazy_modules(name=None, base=None):
+    """Import modules which are registered by import_modules_lazily().
+
+    :param name: import only modules with plugins with this name
+    :param base: import only modules with plugins with this base class
+    """
+    if name is not None:
+        lazy_map, key = _LAZY_NAMES, name
+    elif base is not None:
+        lazy_map = _LAZY_BASES
+        key = "%s.%s" % (base.__module__, base.__name__)
+    else:
+        lazy_map, key = None, None
+    if not _LAZY_MODULES or (lazy_map is not None and key not in lazy_map):
+        return
+
+    # importing modules registers plugins, which requires lookups of
+    # plugins, so the lock is reentrant
+    with _LAZY_LOCK:
+        if lazy_map is None:
+            modules = sorted(_LAZY_MODULES)
+        else:
+            modules = sorted(lazy_map.get(key, ()))
+        for module_name in modules:
+            if module_name in _LAZY_MODULES:
+                if module_name not in sys.modules:
+                    sys.modules[module_name] = importutils.import_module(
+                        module_name)
+                _LAZY_MODULES.discard(module_name)
+        if lazy_map is not None:
+            # the key is removed only after modules are imported, so other
+            # threads wait for them instead of missing their plugins
+            lazy_map.pop(key, None)
 
 
 def load_plugins(dir_or_file):
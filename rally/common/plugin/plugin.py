@@ -14,6 +14,7 @@
 #    under the License.
 
 import sys
+import weakref
 
 from rally.common.i18n import _LE
 from rally.common.plugin import discover
@@ -22,6 +23,11 @@ from rally.common.plugin import meta
 from rally import exceptions
 
 
+# Weak references to configured plugins by their names, so plugins are
+# found without iterating over all subclasses
+_PLUGINS_BY_NAME = {}
+
+
 def deprecated(reason, rally_version):
     """Mark plugin as deprecated.
 
@@ -164,6 +170,10 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
     @classmethod
     def unregister(cls):
         """Removes all plugin meta information and makes it undiscoverable."""
+        if cls._meta_is_inited(raise_exc=False):
+            name = cls.get_name()
+            _PLUGINS_BY_NAME[name] = [ref for ref in _PLUGINS_BY_NAME.get(
+                name, []) if ref() not in (None, cls)]
         cls._meta_clear()
 
     @classmethod
@@ -179,6 +189,8 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
         except exceptions.PluginNotFound:
             cls._meta_set("name", name)
             cls._meta_set("namespace", namespace)
+            _PLUGINS_BY_NAME[name] = [ref for ref in _PLUGINS_BY_NAME.get(
+                name, []) if ref() is not None] + [weakref.ref(cls)]
         else:
             raise exceptions.PluginWithSuchNameExists(
                 name=name, namespace=namespace,
@@ -205,8 +217,8 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
     def get(cls, name, namespace=None):
         """Return plugin by its name from specified namespace.
 
-        This method iterates over all subclasses of cls and returns plugin
-        by name from specified namespace.
+        This method looks for plugins with the name among subclasses of cls
+        and returns plugin from specified namespace.
 
         If namespace is not specified it will return first found plugin from
         any of namespaces.
@@ -214,11 +226,20 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
         :param name: Plugin's name
         :param namespace: Namespace where to search for plugins
         """
+        discover.import_lazy_modules(name=name)
         potential_result = []
 
-        for p in cls.get_all(namespace=namespace):
-            if p.get_name() == name:
-                potential_result.append(p)
+        candidates = [ref() for ref in _PLUGINS_BY_NAME.get(name, [])]
+        if not any(candidates):
+            # classes which are replaced after configuring (e.g. by
+            # six.add_metaclass) are not in the index
+            candidates = discover.itersubclasses(cls)
+        for p in candidates:
+            if (p is not None and p is not cls and issubclass(p, cls)
+                    and p._meta_is_inited(raise_exc=False)
+                    and p.get_name() == name
+                    and (not namespace or namespace == p.get_namespace())):
+                potential_result.append(getattr(p, "func_ref", p))
 
         if len(potential_result) == 1:
             return potential_result[0]
@@ -245,6 +266,11 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
 
         :param namespace: return only plugins from specified namespace.
         """
+        base = cls._get_base()
+        if base is Plugin:
+            discover.import_lazy_modules()
+        else:
+            discover.import_lazy_modules(base=base)
         plugins = []
 
         for p in discover.itersubclasses(cls):
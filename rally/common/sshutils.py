@@ -47,6 +47,13 @@ Upload file:
     ssh = sshclient.SSH("user", "example.com")
     ssh.run("cat > ~/upload/file.gz", stdin=open("/store/file.gz", "rb"))
 
+Execute command on many servers concurrently:
+
+    hosts = [sshclient.SSH("user", ip) for ip in ips]
+    for host, result in zip(hosts, sshclient.run_many(hosts, "uptime")):
+        if isinstance(result, Exception):
+            print "%s is unavailable: %s" % (host.host, result)
+
 Eventlet:
 
     eventlet.monkey_patch(select=True, time=True)
@@ -57,19 +64,204 @@ Eventlet:
 
 """
 
+import codecs
+import collections
 import os
 import select
 import socket
+import threading
 import time
 
+from oslo_config import cfg
 import paramiko
 import six
 
+from rally.common import broker
 from rally.common import logging
 from rally import exceptions
 
 LOG = logging.getLogger(__name__)
 
+SSH_OPTS = [
+    cfg.IntOpt("ssh_connection_pool_size", default=50,
+               help="How many ssh connections are kept open per process for "
+                    "reuse by commands run on the same server. The least "
+                    "recently used idle ones are closed. 0 disables pooling"),
+    cfg.IntOpt("ssh_connection_idle_timeout", default=60,
+               help="Time in seconds after which ssh connections which are "
+                    "not used are closed. 0 keeps them open until they are "
+                    "evicted")
+]
+CONF = cfg.CONF
+CONF.register_opts(SSH_OPTS)
+
+# OpenSSH accepts 10 sessions (channels) per connection by default
+MAX_CHANNELS_PER_CONNECTION = 10
+
+# Size of the buffers which data of a command is read and sent with. The
+# buffer grows while reads fill it up, so big outputs take fewer calls.
+MIN_BUFFER_SIZE = 32 * 1024
+MAX_BUFFER_SIZE = 1024 * 1024
+
+# Bounds of the time which the loop of a command waits for its events
+MIN_POLL_INTERVAL = 0.001
+MAX_POLL_INTERVAL = 1.0
+
+
+class _Channels(object):
+    """Semaphore of the channels of a connection which tracks its usage.
+
+    Connections which have active or waiting commands are not closed by the
+    pool.
+    """
+
+    def __init__(self):
+        self._semaphore = threading.BoundedSemaphore(
+            MAX_CHANNELS_PER_CONNECTION)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.last_used = time.time()
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+        self._semaphore.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self._semaphore.release()
+        with self._lock:
+            self.active -= 1
+            self.last_used = time.time()
+
+    def is_idle(self, timeout=0):
+        """Whether the connection is unused for longer than the timeout."""
+        return (not self.active and
+                time.time() - self.last_used >= timeout)
+
+
+class SSHConnectionsPool(object):
+    """Process-wide pool of ssh connections.
+
+    SSH objects which are created for the same user, server and credentials
+    share one connected paramiko client. Each command opens a new channel
+    over the transport of the client instead of a new connection, so the
+    TCP handshake, key exchange and authentication are made once per
+    server. The number of channels which are open at once is limited by
+    MAX_CHANNELS_PER_CONNECTION.
+
+    Connections which are not used for ssh_connection_idle_timeout seconds
+    are closed, as well as the least recently used idle ones when the pool
+    is full. Connections which are in use are never closed by the pool, so
+    it may hold more of them than ssh_connection_pool_size until they are
+    released.
+
+    Connections inherited by a forked process are dropped, since they can
+    not be shared between processes.
+    """
+
+    def __init__(self):
+        self._connections = collections.OrderedDict()
+        self._connect_locks = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def is_alive(client):
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _pop(self, key):
+        self._connect_locks.pop(key, None)
+        return self._connections.pop(key)
+
+    def _expire(self):
+        timeout = CONF.ssh_connection_idle_timeout
+        if not timeout:
+            return
+        for key, (client, channels) in list(self._connections.items()):
+            if channels.is_idle(timeout):
+                self._pop(key)
+                client.close()
+
+    def _evict(self, size):
+        for key, (client, channels) in list(self._connections.items()):
+            if len(self._connections) < size:
+                break
+            if channels.is_idle():
+                self._pop(key)
+                client.close()
+
+    def get(self, key, connect):
+        """Return connection of the key, connect if there is no alive one.
+
+        :param key: hashable key of the server and credentials, tuples
+                    which start with the host of the server are closed by
+                    close_host()
+        :param connect: function which returns a new connected client
+        :returns: tuple with paramiko client and semaphore of its channels
+        """
+        size = CONF.ssh_connection_pool_size
+        if not size:
+            return connect(), _Channels()
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._connections.clear()
+                self._connect_locks.clear()
+                self._pid = os.getpid()
+            self._expire()
+            connect_lock = self._connect_locks.setdefault(key,
+                                                          threading.Lock())
+
+        # Servers are connected concurrently, but only once each
+        with connect_lock:
+            with self._lock:
+                connection = self._connections.pop(key, None)
+                if connection is not None and self.is_alive(connection[0]):
+                    self._connections[key] = connection
+                    return connection
+            if connection is not None:
+                connection[0].close()
+
+            connection = (connect(), _Channels())
+            with self._lock:
+                self._evict(size)
+                self._connections[key] = connection
+            return connection
+
+    def remove(self, key, client):
+        """Drop the client of the key from the pool if it is there."""
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is not None and connection[0] is client:
+                del self._connections[key]
+
+    def close_host(self, host):
+        """Close all the connections to the host.
+
+        Connections of deleted servers are closed by this at once instead
+        of being kept until they expire.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for key in list(self._connections):
+                if isinstance(key, tuple) and key[0] == host:
+                    self._pop(key)[0].close()
+
+    def clear(self):
+        """Close all the connections of the process."""
+        with self._lock:
+            if self._pid == os.getpid():
+                for client, channels in self._connections.values():
+                    client.close()
+            self._connections.clear()
+            self._connect_locks.clear()
+
+
+CONNECTIONS_POOL = SSHConnectionsPool()
+
 
 class SSH(object):
     """Represent ssh connection."""
@@ -93,6 +285,7 @@ class SSH(object):
         self.password = password
         self.key_filename = key_filename
         self._client = False
+        self._channels = _Channels()
 
     def _get_pkey(self, key):
         if isinstance(key, six.string_types):
@@ -105,16 +298,28 @@ class SSH(object):
                 errors.append(e)
         raise exceptions.SSHError("Invalid pkey: %s" % (errors))
 
+    def _get_pool_key(self):
+        pkey = self.pkey
+        if hasattr(pkey, "get_base64"):
+            pkey = pkey.get_base64()
+        return (self.host, self.port, self.user, pkey, self.key_filename,
+                self.password)
+
+    def _connect(self):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(self.host, username=self.user,
+                       port=self.port, pkey=self.pkey,
+                       key_filename=self.key_filename,
+                       password=self.password, timeout=1)
+        return client
+
     def _get_client(self):
-        if self._client:
+        if self._client and CONNECTIONS_POOL.is_alive(self._client):
             return self._client
         try:
-            self._client = paramiko.SSHClient()
-            self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self._client.connect(self.host, username=self.user,
-                                 port=self.port, pkey=self.pkey,
-                                 key_filename=self.key_filename,
-                                 password=self.password, timeout=1)
+            self._client, self._channels = CONNECTIONS_POOL.get(
+                self._get_pool_key(), self._connect)
             return self._client
         except Exception as e:
             message = ("Exception %(exception_type)s was raised "
@@ -128,7 +333,10 @@ class SSH(object):
                                                  "exception_type": type(e)})
 
     def close(self):
-        self._client.close()
+        """Close the connection, even if other SSH objects share it."""
+        if self._client:
+            CONNECTIONS_POOL.remove(self._get_pool_key(), self._client)
+            self._client.close()
         self._client = False
 
     def run(self, cmd, stdin=None, stdout=None, stderr=None,
@@ -150,9 +358,10 @@ class SSH(object):
         if isinstance(stdin, six.string_types):
             stdin = six.moves.StringIO(stdin)
 
-        return self._run(client, cmd, stdin=stdin, stdout=stdout,
-                         stderr=stderr, raise_on_error=raise_on_error,
-                         timeout=timeout)
+        with self._channels:
+            return self._run(client, cmd, stdin=stdin, stdout=stdout,
+                             stderr=stderr, raise_on_error=raise_on_error,
+                             timeout=timeout)
 
     def _run(self, client, cmd, stdin=None, stdout=None, stderr=None,
              raise_on_error=True, timeout=3600):
@@ -167,6 +376,10 @@ class SSH(object):
 
         data_to_send = ""
         stderr_data = None
+        stdout_decoder = codecs.getincrementaldecoder("utf8")()
+        stderr_decoder = codecs.getincrementaldecoder("utf8")()
+        buffer_size = MIN_BUFFER_SIZE
+        poll_interval = MIN_POLL_INTERVAL
 
         # If we have data to be sent to stdin then `select' should also
         # check for stdin availability.
@@ -175,47 +388,71 @@ class SSH(object):
         else:
             writes = []
 
-        while True:
-            # Block until data can be read/write.
-            r, w, e = select.select([session], writes, [session], 1)
-
-            if session.recv_ready():
-                data = session.recv(4096)
-                LOG.debug("stdout: %r" % data)
-                if stdout is not None:
-                    stdout.write(data.decode("utf8"))
-                continue
-
-            if session.recv_stderr_ready():
-                stderr_data = session.recv_stderr(4096)
-                LOG.debug("stderr: %r" % stderr_data)
-                if stderr is not None:
-                    stderr.write(stderr_data.decode("utf8"))
-                continue
-
-            if session.send_ready():
-                if stdin is not None and not stdin.closed:
-                    if not data_to_send:
-                        data_to_send = stdin.read(4096)
+        try:
+            while True:
+                # Block until data can be read/write. The channel becomes
+                # readable on new data and on close, the timeout only
+                # bounds the delay of noticing the exit status.
+                r, w, e = select.select([session], writes, [session],
+                                        poll_interval)
+                # All the output is received before the exit status, so
+                # the output is complete once it is read after this check
+                exited = session.exit_status_ready()
+                active = False
+
+                while session.recv_ready():
+                    data = session.recv(buffer_size)
+                    LOG.debug("stdout: %r", data)
+                    if stdout is not None:
+                        text = stdout_decoder.decode(data)
+                        if text:
+                            stdout.write(text)
+                    if len(data) == buffer_size:
+                        buffer_size = min(buffer_size * 2, MAX_BUFFER_SIZE)
+                    active = True
+
+                while session.recv_stderr_ready():
+                    stderr_data = session.recv_stderr(buffer_size)
+                    LOG.debug("stderr: %r", stderr_data)
+                    if stderr is not None:
+                        text = stderr_decoder.decode(stderr_data)
+                        if text:
+                            stderr.write(text)
+                    active = True
+
+                if session.send_ready():
+                    if stdin is not None and not stdin.closed:
                         if not data_to_send:
-                            stdin.close()
-                            session.shutdown_write()
-                            writes = []
-                            continue
-                    sent_bytes = session.send(data_to_send)
-                    LOG.debug("sent: %s" % data_to_send[:sent_bytes])
-                    data_to_send = data_to_send[sent_bytes:]
-
-            if session.exit_status_ready():
-                break
-
-            if timeout and (time.time() - timeout) > start_time:
-                args = {"cmd": cmd, "host": self.host}
-                raise exceptions.SSHTimeout("Timeout executing command "
-                                            "'%(cmd)s' on host %(host)s"
-                                            % args)
-            if e:
-                raise exceptions.SSHError("Socket error.")
+                            data_to_send = stdin.read(buffer_size)
+                            if not data_to_send:
+                                stdin.close()
+                                session.shutdown_write()
+                                writes = []
+                        if data_to_send:
+                            sent_bytes = session.send(data_to_send)
+                            LOG.debug("sent: %s", data_to_send[:sent_bytes])
+                            data_to_send = data_to_send[sent_bytes:]
+                        active = True
+
+                if exited:
+                    break
+
+                if timeout and (time.time() - timeout) > start_time:
+                    args = {"cmd": cmd, "host": self.host}
+                    raise exceptions.SSHTimeout("Timeout executing command "
+                                                "'%(cmd)s' on host %(host)s"
+                                                % args)
+                if e:
+                    raise exceptions.SSHError("Socket error.")
+
+                if active:
+                    poll_interval = MIN_POLL_INTERVAL
+                else:
+                    poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL)
+        except Exception:
+            # The channel of the unfinished command is not reused
+            session.close()
+            raise
 
         exit_status = session.recv_exit_status()
         if 0 != exit_status and raise_on_error:
@@ -261,7 +498,7 @@ class SSH(object):
     def _put_file_sftp(self, localpath, remotepath, mode=None):
         client = self._get_client()
 
-        with client.open_sftp() as sftp:
+        with self._channels, client.open_sftp() as sftp:
             sftp.put(localpath, remotepath)
             if mode is None:
                 mode = 0o777 & os.stat(localpath).st_mode
@@ -288,3 +525,35 @@ class SSH(object):
             self._put_file_sftp(localpath, remotepath, mode=mode)
         except (paramiko.SSHException, socket.error):
             self._put_file_shell(localpath, remotepath, mode=mode)
+
+
+def run_many(hosts, cmd, stdin=None, timeout=3600, concurrency=100):
+    """Execute the command on many servers concurrently.
+
+    Commands of the servers which are connected already are run over the
+    pooled connections, the rest of the servers are connected at once.
+
+    :param hosts: list of SSH objects
+    :param cmd: command to be executed, can be a list
+    :param stdin: string to pass to stdin of each command
+    :param timeout: timeout for execution of the command on each server
+    :param concurrency: max number of servers processed at once
+    :returns: list of (exit_status, stdout, stderr) tuples in order of
+              hosts. Errors of the servers which could not run the
+              command (SSHError, SSHTimeout, socket.error) are returned
+              in place of the tuples.
+    """
+    def execute(host):
+        if isinstance(stdin, six.binary_type):
+            host_stdin = six.BytesIO(stdin)
+        else:
+            host_stdin = stdin
+        try:
+            return host.execute(cmd, stdin=host_stdin, timeout=timeout)
+        except (socket.error, exceptions.SSHError,
+                exceptions.SSHTimeout) as e:
+            LOG.debug("Failed to run %(cmd)r on %(host)s: %(error)r"
+                      % {"cmd": cmd, "host": host.host, "error": e})
+            return e
+
+    return broker.run_for_each(execute, hosts, concurrency)
@@ -14,16 +14,18 @@
 #    under the License.
 
 import bisect
-import collections
 import copy
 import ctypes
 import heapq
 import inspect
+import itertools
 import multiprocessing
+import os
 import random
 import re
 import string
 import sys
+import threading
 import time
 
 from six import moves
@@ -512,6 +514,19 @@ def terminate_thread(thread_ident, exc_type=exceptions.ThreadTimeoutException):
         ctypes.c_long(thread_ident), ctypes.py_object(exc_type))
 
 
+def cancel_thread_termination(thread_ident):
+    """Cancel the termination of a python thread by terminate_thread().
+
+    The exception is not raised in the thread if it is still pending, it
+    does nothing if the exception is already raised.
+
+    :param thread_ident: threading.Thread.ident value
+    """
+
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_long(thread_ident), None)
+
+
 def timeout_thread(queue):
     """Terminate threads by timeout.
 
@@ -524,29 +539,171 @@ def timeout_thread(queue):
     (None, None) should be put when all threads are exited and no more
     threads to watch.
 
+    Deadlines may come in any order. Consider TimeoutWatchdog which is
+    shared by all the threads of the process instead of a thread per
+    queue.
+
     :param queue: Queue object to communicate with parent thread.
     """
 
-    all_threads = collections.deque()
+    # heap of (deadline, number, thread), the number keeps the order of
+    # threads with equal deadlines and makes threads not to be compared
+    all_threads = []
+    counter = itertools.count()
     while True:
-        if not all_threads:
-            timeout = None
-        else:
-            thread, deadline = all_threads[0]
-            timeout = deadline - time.time()
+        timeout = all_threads[0][0] - time.time() if all_threads else None
         try:
             next_thread = queue.get(timeout=timeout)
-            all_threads.append(next_thread)
         except (moves.queue.Empty, ValueError):
             # NOTE(rvasilets) Empty means that timeout was occurred.
             # ValueError means that timeout lower than 0.
+            thread = heapq.heappop(all_threads)[2]
             if thread.isAlive():
                 LOG.info("Thread %s is timed out. Terminating." % thread.ident)
                 terminate_thread(thread.ident)
-            all_threads.popleft()
+            continue
 
         if next_thread == (None, None,):
             return
+        thread, deadline = next_thread
+        heapq.heappush(all_threads, (deadline, next(counter), thread))
+
+
+class TimeoutWatch(object):
+    """Deadline of a thread watched by TimeoutWatchdog."""
+
+    def __init__(self, thread_ident, deadline):
+        self.thread_ident = thread_ident
+        self.deadline = deadline
+        self.cancelled = False
+        self.fired = False
+        # how late the thread is terminated, in seconds
+        self.delay = None
+
+
+class TimeoutWatchdog(object):
+    """Terminates threads which run longer than their deadlines.
+
+    A single watchdog thread serves all the threads of the process, it
+    keeps deadlines in a min-heap, so deadlines may be set in any order and
+    each of them fires in time. A deadline is cancelled when the watched
+    work is finished; the check of the cancellation and the termination
+    are done under the same lock as the cancellation, so a deadline which
+    is cancelled in time never fires. A deadline may fire right before
+    the cancellation though (the exception is raised in the thread or is
+    about to be), so the thread cancels the pending exception while
+    cancelling its own deadline and it is never terminated after that
+    (e.g. while it runs the next iteration).
+
+    Cancelled deadlines are removed from the heap lazily, the heap is
+    rebuilt when most of it consists of cancelled ones.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._thread = None
+        self._pid = None
+        self.terminated = 0
+        self.total_delay = 0
+        self.max_delay = 0
+
+    def watch(self, timeout, thread_ident=None):
+        """Terminate the thread if it isn't cancelled in `timeout` seconds.
+
+        :param timeout: number of seconds
+        :param thread_ident: Thread.ident value of the thread to terminate,
+                             the current thread by default
+        :returns: TimeoutWatch object to pass to cancel()
+        """
+        if thread_ident is None:
+            thread_ident = threading.current_thread().ident
+        watch = TimeoutWatch(thread_ident, time.time() + timeout)
+        with self._cond:
+            if self._pid != os.getpid():
+                # the watchdog thread is not inherited by forked processes
+                self._heap = []
+                self._cancelled = 0
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            heapq.heappush(self._heap,
+                           (watch.deadline, next(self._counter), watch))
+            if self._heap[0][2] is watch:
+                self._cond.notify()
+        return watch
+
+    def cancel(self, watch):
+        """Cancel the deadline.
+
+        If the deadline of the current thread has already fired and the
+        exception is not raised yet, it is not raised at all.
+
+        :param watch: TimeoutWatch object returned by watch()
+        :returns: True if the thread was already terminated by timeout, so
+                  exceptions.ThreadTimeoutException is raised in the thread
+                  (or is about to be, if the thread is not the current one)
+        """
+        with self._cond:
+            if watch.fired:
+                if watch.thread_ident == threading.current_thread().ident:
+                    cancel_thread_termination(watch.thread_ident)
+            elif not watch.cancelled:
+                watch.cancelled = True
+                self._cancelled += 1
+                if self._cancelled > len(self._heap) // 2:
+                    self._heap = [item for item in self._heap
+                                  if not item[2].cancelled]
+                    heapq.heapify(self._heap)
+                    self._cancelled = 0
+            return watch.fired
+
+    def stats(self):
+        """Return the number of terminated threads and termination delays.
+
+        :returns: dict with "terminated" count, "avg_delay" and "max_delay"
+                  numbers of seconds the terminations were late by
+        """
+        with self._cond:
+            return {"terminated": self.terminated,
+                    "avg_delay": (self.total_delay / self.terminated
+                                  if self.terminated else 0),
+                    "max_delay": self.max_delay}
+
+    def _run(self):
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, watch = self._heap[0]
+                now = time.time()
+                if deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                watch.fired = True
+                watch.delay = now - deadline
+                self.terminated += 1
+                self.total_delay += watch.delay
+                self.max_delay = max(self.max_delay, watch.delay)
+                LOG.info("Thread %s is timed out. Terminating."
+                         % watch.thread_ident)
+                terminate_thread(watch.thread_ident)
+
+
+_timeout_watchdog = TimeoutWatchdog()
+
+
+def get_timeout_watchdog():
+    """Return TimeoutWatchdog shared by all the threads of the process."""
+    return _timeout_watchdog
 
 
 class LockedDict(dict):
@@ -585,6 +742,11 @@ class LockedDict(dict):
         self._is_ready_to_be_unlocked = True
         return self
 
+    def __reduce__(self):
+        # Default pickling restores items via __setitem__ before the
+        # lock attributes are set, which fails for a locked dict
+        return LockedDict, (dict(self),)
+
     def __deepcopy__(self, memo=None):
         def unlock(obj):
             if isinstance(obj, LockedDict):
@@ -215,6 +215,10 @@ class WorkerAlreadyRegistered(RallyException):
     msg_fmt = _("Worker %(worker)s already registered")
 
 
+class WorkersNotAvailable(RallyException):
+    msg_fmt = _("There are not enough alive workers: %(message)s")
+
+
 class SaharaClusterFailure(RallyException):
     msg_fmt = _("Sahara cluster %(name)s has failed to %(action)s. "
                 "Reason: '%(reason)s'")
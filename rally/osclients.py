@@ -14,6 +14,11 @@
 #    under the License.
 
 import abc
+import collections
+import json
+import multiprocessing
+import os
+import threading
 
 from oslo_config import cfg
 from six.moves.urllib import parse
@@ -31,7 +36,15 @@ CONF = cfg.CONF
 
 OSCLIENTS_OPTS = [
     cfg.FloatOpt("openstack_client_http_timeout", default=180.0,
-                 help="HTTP timeout for any of OpenStack service in seconds")
+                 help="HTTP timeout for any of OpenStack service in seconds"),
+    cfg.IntOpt("openstack_client_pool_size", default=1000,
+               help="How many credentials (with their keystone sessions and "
+                    "client handles) are kept per process for reuse between "
+                    "scenario iterations, contexts and cleanup. The least "
+                    "recently used ones are evicted. 0 disables pooling"),
+    cfg.IntOpt("openstack_client_token_stale_duration", default=30,
+               help="Cached keystone token is refreshed if it expires in "
+                    "less than this number of seconds")
 ]
 CONF.register_opts(OSCLIENTS_OPTS)
 
@@ -227,7 +240,11 @@ class Keystone(OSClient):
 
     @property
     def auth_ref(self):
-        if "keystone_auth_ref" not in self.cache:
+        auth_ref = self.cache.get("keystone_auth_ref")
+        if auth_ref is None or auth_ref.will_expire_soon(
+                CONF.openstack_client_token_stale_duration):
+            # keystoneauth plugin re-authenticates only if its own token
+            # is expired (or expires soon)
             sess, plugin = self.get_session()
             self.cache["keystone_auth_ref"] = plugin.get_access(sess)
         return self.cache["keystone_auth_ref"]
@@ -731,13 +748,88 @@ class Watcher(OSClient):
         return client
 
 
+class ClientsPool(object):
+    """Process-wide pool of clients caches.
+
+    Clients objects which are created for the same credential and api_info
+    share one cache, so keystone sessions, tokens and client handles are
+    reused by scenario iterations, contexts and cleanup instead of
+    authenticating again for each new Clients object. The least recently
+    used caches are evicted when the pool is full.
+
+    Caches inherited by a forked process are dropped, since connections
+    can not be shared between processes.
+    """
+
+    def __init__(self):
+        self._caches = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        # The counter is shared with forked runner processes
+        self._auth_requests_saved = multiprocessing.Value("i", 0)
+
+    @staticmethod
+    def _make_key(credential, api_info):
+        return (json.dumps(credential.to_dict(include_permission=True),
+                           sort_keys=True),
+                json.dumps(api_info, sort_keys=True))
+
+    def get(self, credential, api_info):
+        """Return cache for the credential and api_info.
+
+        :param credential: objects.Credential instance
+        :param api_info: dict with api versions and service types
+        :returns: dict which should be used as a cache of clients
+        """
+        size = CONF.openstack_client_pool_size
+        if not size or not isinstance(credential, objects.Credential):
+            return {}
+        key = self._make_key(credential, api_info)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._caches.clear()
+                self._pid = os.getpid()
+
+            cache = self._caches.pop(key, None)
+            if cache is None:
+                cache = {}
+                while len(self._caches) >= size:
+                    self._caches.popitem(last=False)
+            elif any(k.startswith("keystone_") for k in cache):
+                with self._auth_requests_saved.get_lock():
+                    self._auth_requests_saved.value += 1
+            self._caches[key] = cache
+        return cache
+
+    def remove(self, credential, api_info):
+        """Drop cache of the credential and api_info from the pool."""
+        if isinstance(credential, objects.Credential):
+            with self._lock:
+                self._caches.pop(self._make_key(credential, api_info), None)
+
+    def clear(self):
+        """Drop all the caches and reset the counter."""
+        with self._lock:
+            self._caches.clear()
+        self._auth_requests_saved.value = 0
+
+    @property
+    def auth_requests_saved(self):
+        """Number of times when a cache with keystone session was reused."""
+        return self._auth_requests_saved.value
+
+
+CLIENTS_POOL = ClientsPool()
+
+
 class Clients(object):
     """This class simplify and unify work with OpenStack python clients."""
 
     def __init__(self, credential, api_info=None):
         self.credential = credential
         self.api_info = api_info or {}
-        self.cache = {}
+        self.cache = CLIENTS_POOL.get(self.credential, self.api_info)
 
     def __getattr__(self, client_name):
         """Lazy load of clients."""
@@ -764,7 +856,8 @@ class Clients(object):
 
     def clear(self):
         """Remove all cached client handles."""
-        self.cache = {}
+        CLIENTS_POOL.remove(self.credential, self.api_info)
+        self.cache = CLIENTS_POOL.get(self.credential, self.api_info)
 
     def verified_keystone(self):
         """Ensure keystone endpoints are valid and then authenticate
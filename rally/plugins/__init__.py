@@ -22,14 +22,28 @@ from rally.common.plugin import discover
 
 PLUGINS_LOADED = False
 
+PACKAGES = ["rally.deployment.engines", "rally.deployment.serverprovider",
+            "rally.plugins"]
 
-def load():
+# Index of plugins of PACKAGES, see discover.import_modules_lazily()
+INDEX_PATH = os.path.expanduser("~/.rally/plugins_index.json")
+
+
+def load(lazy=True):
+    """Load all plugins.
+
+    :param lazy: whether modules of Rally plugins are imported only when
+                 their plugins are needed (see INDEX_PATH). Custom plugins
+                 are always imported.
+    """
     global PLUGINS_LOADED
 
     if not PLUGINS_LOADED:
-        discover.import_modules_from_package("rally.deployment.engines")
-        discover.import_modules_from_package("rally.deployment.serverprovider")
-        discover.import_modules_from_package("rally.plugins")
+        if lazy:
+            discover.import_modules_lazily(PACKAGES, INDEX_PATH)
+        else:
+            for package in PACKAGES:
+                discover.import_modules_from_package(package)
 
         discover.load_plugins("/opt/rally/plugins/")
         discover.load_plugins(os.path.expanduser("~/.rally/plugins/"))
@@ -67,7 +67,7 @@ class FileExporter(exporter.Exporter):
 
         LOG.debug("Got the task object by it's uuid %s. " % uuid)
 
-        task_results = [{"key": x["key"], "result": x["data"]["raw"],
+        task_results = [{"key": x["key"], "result": list(x["data"]["raw"]),
                          "sla": x["data"]["sla"],
                          "load_duration": x["data"]["load_duration"],
                          "full_duration": x["data"]["full_duration"]}
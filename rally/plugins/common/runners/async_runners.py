@@ -0,0 +1,215 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from oslo_utils import timeutils
+
+from rally.plugins.common.runners import constant
+from rally.plugins.common.runners import rps
+from rally.task import runner
+
+
+def _worker_process(queue, iteration_gen, timeout, concurrency, times,
+                    duration, context, cls, method_name, args, aborted, info):
+    """Start the coroutine scenario on the event loop of the process.
+
+    Keep `concurrency` iterations in progress: a new iteration is started
+    as soon as any of the running ones is finished.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param concurrency: number of concurrently running scenario iterations
+    :param times: total number of scenario iterations to be run
+    :param duration: unused, the signature is the one of
+                     constant._worker_process
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+
+    runner._log_worker_info(times=times, concurrency=concurrency,
+                            timeout=timeout, cls=cls,
+                            method_name=method_name, args=args)
+
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.AsyncIterationPool(sender, cls, method_name, context, args,
+                                     timeout)
+
+    def feed():
+        while pool.feeding and pool.running < concurrency:
+            iteration = next(iteration_gen)
+            if iteration >= times or aborted.is_set():
+                pool.stop_feeding()
+                return
+            pool.start(iteration)
+
+    pool.run(feed, aborted)
+    sender.close()
+
+
+def _rps_worker_process(queue, iteration_gen, timeout, rps_, times,
+                        max_concurrent, context, cls, method_name, args,
+                        aborted, info):
+    """Start the coroutine scenario N times per second on the event loop.
+
+    Iterations of the worker are started by its own schedule, where the
+    iteration I is intended to be started at `start + I / rps`. If
+    max_concurrent iterations are in progress, the next one is started
+    as soon as any of them is finished.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param rps_: number of scenario iterations to be run per one second
+    :param times: total number of scenario iterations to be run
+    :param max_concurrent: maximum worker concurrency
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of runned process
+    """
+
+    sleep = 1.0 / rps_
+
+    runner._log_worker_info(times=times, rps=rps_, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.AsyncIterationPool(sender, cls, method_name, context, args,
+                                     timeout)
+
+    time.sleep(
+        (sleep * info["processes_counter"]) / info["processes_to_start"])
+
+    start = timeutils.now()
+    state = {"started": 0, "wakeup": None}
+
+    def feed():
+        while pool.feeding and pool.running < max_concurrent:
+            if state["started"] >= times or aborted.is_set():
+                pool.stop_feeding()
+                return
+            delay = start + state["started"] * sleep - timeutils.now()
+            if delay > 0:
+                # only the latest wakeup is needed
+                if state["wakeup"]:
+                    state["wakeup"].cancel()
+                state["wakeup"] = pool.loop.call_later(delay, feed)
+                return
+            pool.start(next(iteration_gen))
+            state["started"] += 1
+
+    pool.run(feed, aborted)
+    sender.close()
+
+
+def _open_loop_rps_worker_process(queue, iteration_gen, timeout, rps_, times,
+                                  max_concurrent, start, context, cls,
+                                  method_name, args, aborted, info):
+    """Start the coroutine scenario by the schedule of the workload.
+
+    It is rps._open_loop_worker_process for coroutine scenarios: the
+    iteration N of the workload is intended to be started at
+    `start + N / rps` by any of the workers, the intended time is saved in
+    the result as `scheduled_at`.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator, shared by all
+                          the workers
+    :param timeout: operation's timeout
+    :param rps_: number of scenario iterations to be run per one second by
+                 all the workers
+    :param times: total number of scenario iterations to be run
+    :param max_concurrent: maximum worker concurrency
+    :param start: timestamp of the start of the schedule
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of runned process
+    """
+
+    runner._log_worker_info(times=times, rps=rps_, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.AsyncIterationPool(sender, cls, method_name, context, args,
+                                     timeout)
+
+    # see rps._open_loop_worker_process
+    monotonic_start = start + timeutils.now() - time.time()
+    state = {"iteration": None, "wakeup": None}
+
+    def feed():
+        while pool.feeding and pool.running < max_concurrent:
+            if state["iteration"] is None:
+                state["iteration"] = next(iteration_gen)
+            iteration = state["iteration"]
+            if iteration >= times or aborted.is_set():
+                pool.stop_feeding()
+                return
+            delay = monotonic_start + iteration / rps_ - timeutils.now()
+            if delay > 0:
+                if state["wakeup"]:
+                    state["wakeup"].cancel()
+                state["wakeup"] = pool.loop.call_later(delay, feed)
+                return
+            pool.start(iteration, scheduled_at=start + iteration / rps_)
+            state["iteration"] = None
+
+    pool.run(feed, aborted)
+    sender.close()
+
+
+@runner.configure(name="async_constant")
+class AsyncConstantScenarioRunner(constant.ConstantScenarioRunner):
+    """Creates constant load of a coroutine scenario.
+
+    It is the "constant" runner for scenarios with a coroutine `run`
+    method (or any method returning an awaitable). The concurrent iterations
+    of a worker process are coroutines of one event loop instead of
+    threads, so the concurrency of I/O bound scenarios can be much higher.
+    The timeout cancels the coroutine of the iteration.
+
+    Requires Python 3.4 or newer.
+    """
+
+    _worker = staticmethod(_worker_process)
+
+
+@runner.configure(name="async_rps")
+class AsyncRPSScenarioRunner(rps.RPSScenarioRunner):
+    """Starts a coroutine scenario with specified frequency.
+
+    It is the "rps" runner for scenarios with a coroutine `run` method (or
+    any method returning an awaitable), which are run on one event loop per
+    worker process instead of a pool of threads. It supports the same
+    options, including "open_loop".
+
+    Requires Python 3.4 or newer.
+    """
+
+    _worker = staticmethod(_rps_worker_process)
+    _open_loop_worker = staticmethod(_open_loop_rps_worker_process)
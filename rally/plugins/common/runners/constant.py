@@ -13,34 +13,33 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
 import multiprocessing
-import threading
 import time
 
-from six.moves import queue as Queue
-
 from rally.common import utils
 from rally import consts
 from rally.task import runner
-from rally.task import utils as butils
 
 
 def _worker_process(queue, iteration_gen, timeout, concurrency, times,
-                    context, cls, method_name, args, aborted, info):
+                    duration, context, cls, method_name, args, aborted, info):
     """Start the scenario within threads.
 
-    Spawn threads to support scenario execution for a fixed number of times.
-    This generates a constant load on the cloud under test by executing each
-    scenario iteration without pausing between iterations. Each thread runs
-    the scenario method once with passed scenario arguments and context.
+    Run iterations of the scenario in a pool of threads for a fixed number
+    of times or for a fixed period of time. This generates a constant load
+    on the cloud under test by executing each scenario iteration without
+    pausing between iterations. Each thread of the pool runs the scenario
+    method once per iteration with passed scenario arguments and context.
     After execution the result is appended to the queue.
 
     :param queue: queue object to append results
     :param iteration_gen: next iteration number generator
     :param timeout: operation's timeout
     :param concurrency: number of concurrently running scenario iterations
-    :param times: total number of scenario iterations to be run
+    :param times: total number of scenario iterations to be run, None means
+                  that number of iterations is limited by duration
+    :param duration: timestamp when load generation should be stopped,
+                     None means that number of iterations is limited by times
     :param context: scenario context object
     :param cls: scenario class
     :param method_name: scenario method name
@@ -50,66 +49,27 @@ def _worker_process(queue, iteration_gen, timeout, concurrency, times,
     :param info: info about all processes count and counter of launched process
     """
 
-    pool = collections.deque()
-    alive_threads_in_pool = 0
-    finished_threads_in_pool = 0
-
-    runner._log_worker_info(times=times, concurrency=concurrency,
-                            timeout=timeout, cls=cls, method_name=method_name,
-                            args=args)
+    runner._log_worker_info(times=times, duration=duration,
+                            concurrency=concurrency, timeout=timeout, cls=cls,
+                            method_name=method_name, args=args)
 
-    if timeout:
-        timeout_queue = Queue.Queue()
-        collector_thr_by_timeout = threading.Thread(
-            target=utils.timeout_thread,
-            args=(timeout_queue, )
-        )
-        collector_thr_by_timeout.start()
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.WorkerThreadPool(sender, cls, method_name, context, args,
+                                   concurrency, timeout)
 
     iteration = next(iteration_gen)
-    while iteration < times and not aborted.is_set():
-        scenario_context = runner._get_scenario_context(iteration, context)
-        worker_args = (queue, cls, method_name, scenario_context, args)
-
-        thread = threading.Thread(target=runner._worker_thread,
-                                  args=worker_args)
-
-        thread.start()
-        if timeout:
-            timeout_queue.put((thread, time.time() + timeout))
-        pool.append(thread)
-        alive_threads_in_pool += 1
-
-        while alive_threads_in_pool == concurrency:
-            prev_finished_threads_in_pool = finished_threads_in_pool
-            finished_threads_in_pool = 0
-            for t in pool:
-                if not t.isAlive():
-                    finished_threads_in_pool += 1
-
-            alive_threads_in_pool -= finished_threads_in_pool
-            alive_threads_in_pool += prev_finished_threads_in_pool
-
-            if alive_threads_in_pool < concurrency:
-                # NOTE(boris-42): cleanup pool array. This is required because
-                # in other case array length will be equal to times which
-                # is unlimited big
-                while pool and not pool[0].isAlive():
-                    pool.popleft().join()
-                    finished_threads_in_pool -= 1
-                break
-
-            # we should wait to not create big noise with these checks
-            time.sleep(0.001)
+    while not aborted.is_set():
+        if times is not None and iteration >= times:
+            break
+        # The very first iteration is started anyway, so even a zero
+        # duration produces one result
+        if duration is not None and iteration and time.time() > duration:
+            break
+        pool.submit(iteration)
         iteration = next(iteration_gen)
 
-    # Wait until all threads are done
-    while pool:
-        pool.popleft().join()
-
-    if timeout:
-        timeout_queue.put((None, None,))
-        collector_thr_by_timeout.join()
+    pool.join()
+    sender.close()
 
 
 @runner.configure(name="constant")
@@ -153,6 +113,9 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
         "additionalProperties": False
     }
 
+    # function which runs iterations in a worker process
+    _worker = staticmethod(_worker_process)
+
     def _run_scenario(self, cls, method_name, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
@@ -195,28 +158,17 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
             while True:
                 yield (result_queue, iteration_gen, timeout,
                        concurrency_per_worker + (concurrency_overhead and 1),
-                       times, context, cls, method_name, args, self.aborted)
+                       times, None, context, cls, method_name, args,
+                       self.aborted)
                 if concurrency_overhead:
                     concurrency_overhead -= 1
 
         process_pool = self._create_process_pool(
-            processes_to_start, _worker_process,
+            processes_to_start, self._worker,
             worker_args_gen(concurrency_overhead))
         self._join_processes(process_pool, result_queue)
 
 
-def _run_scenario_once_with_unpack_args(args):
-    # NOTE(andreykurilin): `pool.imap` is used in
-    #     ConstantForDurationScenarioRunner. It does not want to work with
-    #     instance-methods, class-methods and static-methods. Also, it can't
-    #     transmit positional or keyword arguments to destination function.
-    #     While original `rally.task.runner._run_scenario_once` accepts
-    #     multiple arguments instead of one big tuple with all arguments, we
-    #     need to hardcode unpacking here(all other runners are able to
-    #     transmit arguments in proper way).
-    return runner._run_scenario_once(*args)
-
-
 @runner.configure(name="constant_for_duration")
 class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
     """Creates constant load executing a scenario for an interval of time.
@@ -255,19 +207,11 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
         "additionalProperties": False
     }
 
-    @staticmethod
-    def _iter_scenario_args(cls, method, ctx, args, aborted):
-        def _scenario_args(i):
-            if aborted.is_set():
-                raise StopIteration()
-            return (cls, method, runner._get_scenario_context(i, ctx), args)
-        return _scenario_args
-
-    def _run_scenario(self, cls, method, context, args):
+    def _run_scenario(self, cls, method_name, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
         :param cls: The Scenario class where the scenario is implemented
-        :param method: Name of the method that implements the scenario
+        :param method_name: Name of the method that implements the scenario
         :param context: Benchmark context that contains users, admin & other
                         information, that was created before benchmark started.
         :param args: Arguments to call the scenario method with
@@ -278,30 +222,31 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
         timeout = self.config.get("timeout", 600)
         concurrency = self.config.get("concurrency", 1)
         duration = self.config.get("duration")
+        iteration_gen = utils.RAMInt()
 
-        # FIXME(andreykurilin): unify `_worker_process`, use it here and remove
-        #     usage of `multiprocessing.Pool`(usage of separate process for
-        #     each concurrent iteration is redundant).
-        pool = multiprocessing.Pool(concurrency)
-
-        run_args = butils.infinite_run_args_generator(
-            self._iter_scenario_args(cls, method, context, args, self.aborted))
-        iter_result = pool.imap(_run_scenario_once_with_unpack_args, run_args)
+        processes_to_start = min(multiprocessing.cpu_count(), concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            concurrency, processes_to_start)
 
-        start = time.time()
-        while True:
-            try:
-                result = iter_result.next(timeout)
-            except multiprocessing.TimeoutError as e:
-                result = runner.format_result_on_timeout(e, timeout)
-            except StopIteration:
-                break
+        self._log_debug_info(duration=duration, concurrency=concurrency,
+                             timeout=timeout,
+                             processes_to_start=processes_to_start,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
 
-            self._send_result(result)
+        result_queue = multiprocessing.Queue()
+        deadline = time.time() + duration
 
-            if time.time() - start > duration:
-                break
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       None, deadline, context, cls, method_name, args,
+                       self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
 
-        pool.terminate()
-        pool.join()
-        self._flush_results()
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
@@ -0,0 +1,198 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import threading
+
+from rally.common import logging
+from rally.common import objects
+from rally import consts
+from rally import exceptions
+from rally.task import agent
+from rally.task import runner
+
+
+LOG = logging.getLogger(__name__)
+
+# integer fields of configs of runners which are divided between agents,
+# the other fields are the same for all the agents
+SHARDED_INT_FIELDS = ("times", "concurrency", "max_concurrency")
+
+
+def _split_int(value, parts):
+    base, extra = divmod(value, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _split_rps(value, parts):
+    if isinstance(value, list):
+        return [[v / float(parts) for v in value]] * parts
+    return [value / float(parts)] * parts
+
+
+def split_config(config, parts):
+    """Divide the load of the runner config between the agents.
+
+    Integer fields (the number of iterations and the concurrency) are
+    divided as evenly as possible, the rates are divided equally. Phases
+    of the load_profile runner are divided the same way.
+
+    :param config: config of a runner
+    :param parts: number of agents
+    :returns: list of configs of the runner, one per agent
+    """
+    shards = [copy.deepcopy(config) for i in range(parts)]
+    for key in SHARDED_INT_FIELDS:
+        value = config.get(key)
+        if isinstance(value, int):
+            for shard, part in zip(shards, _split_int(value, parts)):
+                shard[key] = part
+        elif isinstance(value, list):
+            # a range of the concurrency of a phase
+            parts_of_values = [_split_int(v, parts) for v in value]
+            for shard, part in zip(shards, zip(*parts_of_values)):
+                shard[key] = list(part)
+    if "rps" in config:
+        for shard, value in zip(shards, _split_rps(config["rps"], parts)):
+            shard["rps"] = value
+    if "phases" in config:
+        for i, phase in enumerate(config["phases"]):
+            for shard, phase_shard in zip(shards,
+                                          split_config(phase, parts)):
+                shard["phases"][i] = phase_shard
+    return shards
+
+
+def _get_max_parts(config):
+    """Return the max number of agents which the load can be divided to."""
+    # phases allow zero concurrency, so they don't limit the number
+    limits = [config[key] for key in SHARDED_INT_FIELDS
+              if isinstance(config.get(key), int)]
+    return min(limits) if limits else None
+
+
+@runner.configure(name="distributed")
+class DistributedScenarioRunner(runner.ScenarioRunner):
+    """Runs the load of another runner on several hosts.
+
+    Agents (`rally agent start`) on load generating hosts register in the
+    Rally DB, which should be shared by all the hosts. The load of the
+    runner from the `runner` field is divided between the agents which
+    are alive: the number of iterations and the concurrency are divided as
+    evenly as possible, the rates are divided equally. Each agent runs its
+    shard of the load with the context which is set up by this host and
+    streams results back. Results of an agent which is lost are the
+    results which have been received before the loss.
+
+    The secret `agent_authkey` option should be set to the same value on
+    all the hosts.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "runner": {
+                "type": "object",
+                "properties": {
+                    "type": {
+                        "type": "string"
+                    }
+                },
+                "required": ["type"]
+            },
+            "agents": {
+                "type": "integer",
+                "minimum": 1
+            }
+        },
+        "required": ["type", "runner"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, *args, **kwargs):
+        super(DistributedScenarioRunner, self).__init__(*args, **kwargs)
+        self.agents = []
+        self._store_lock = threading.Lock()
+
+    def _choose_agents(self):
+        addresses = agent.get_alive_agents()
+        required = self.config.get("agents")
+        if not addresses or (required and len(addresses) < required):
+            raise exceptions.WorkersNotAvailable(
+                message="%d agents are alive, %d are required"
+                        % (len(addresses), required or 1))
+        if required:
+            addresses = addresses[:required]
+        max_parts = _get_max_parts(self.config["runner"])
+        if max_parts:
+            addresses = addresses[:max_parts]
+        return addresses
+
+    def _store_results(self, results):
+        with self._store_lock:
+            for result in results:
+                self._store_result(result)
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        runner_config = self.config["runner"]
+        if runner_config["type"] == self.get_name():
+            raise exceptions.InvalidConfigException(
+                message="Distributed runner can't run itself.")
+        runner.ScenarioRunner.validate(runner_config)
+
+        addresses = self._choose_agents()
+        shards = split_config(runner_config, len(addresses))
+        self._log_debug_info(runner=runner_config, agents=addresses)
+
+        # agents know only the UUID of the task
+        context = dict(context, task=objects.Task(
+            task={"uuid": self.task["uuid"]}, temporary=True))
+        self.agents = [agent.AgentClient(address) for address in addresses]
+        threads = []
+        for agent_client, shard in zip(self.agents, shards):
+            job = {"cls": cls, "method_name": method_name,
+                   "context": context, "args": args, "runner": shard}
+            thread = threading.Thread(
+                target=agent_client.run,
+                args=(job, self.aborted, self._store_results))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        self._flush_results()
+
+        for agent_client in self.agents:
+            LOG.info("Task %(task)s | Agent %(address)s: %(status)s, "
+                     "%(results)d results%(error)s"
+                     % {"task": self.task["uuid"],
+                        "address": agent_client.address,
+                        "status": agent_client.status,
+                        "results": agent_client.results,
+                        "error": (", error: %s" % agent_client.error
+                                  if agent_client.error else "")})
@@ -0,0 +1,321 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import math
+import multiprocessing
+import time
+
+from oslo_utils import timeutils
+
+from rally.common import utils
+from rally import consts
+from rally.task import runner
+
+
+# How often the target concurrency of a ramp is re-calculated, in seconds
+RAMP_STEP = 0.1
+
+
+class Phase(object):
+    """Phase of the load profile.
+
+    The load (rps or concurrency) of the phase changes linearly from the
+    start value to the end value, a constant load has equal values.
+    """
+
+    def __init__(self, config, offset):
+        """Phase constructor.
+
+        :param config: dict with the phase config
+        :param offset: number of seconds from the start of the load profile
+                       till the start of the phase
+        """
+        self.offset = offset
+        self.duration = float(config["duration"])
+        self.kind = "rps" if "rps" in config else "concurrency"
+        value = config[self.kind]
+        self.start, self.end = value if isinstance(value, list) else (value,
+                                                                      value)
+
+    def level(self, elapsed):
+        """Return the load after `elapsed` seconds from the phase start."""
+        elapsed = min(max(elapsed, 0), self.duration)
+        return self.start + (self.end - self.start) * elapsed / self.duration
+
+    def concurrency(self, elapsed, workers, worker):
+        """Return the concurrency of the worker process.
+
+        :param elapsed: seconds from the phase start
+        :param workers: number of worker processes
+        :param worker: index of the worker process
+        """
+        total = int(round(self.level(elapsed)))
+        return total // workers + (1 if worker < total % workers else 0)
+
+    @property
+    def times(self):
+        """Number of iterations of the rps phase."""
+        if self.kind != "rps":
+            return 0
+        scheduled = (self.start + self.end) * self.duration / 2.0
+        return int(math.ceil(scheduled))
+
+    def time_of(self, number):
+        """Return the intended start of the iteration of the rps phase.
+
+        Iterations are started with the rate that changes linearly, so the
+        number of iterations started by the time t is
+        `start * t + (end - start) * t^2 / (2 * duration)`.
+
+        :param number: number of the iteration in the phase (from 0)
+        :returns: seconds from the phase start
+        """
+        if self.start == self.end:
+            return number / float(self.start)
+        acceleration = (self.end - self.start) / self.duration
+        speed = math.sqrt(self.start ** 2 + 2 * acceleration * number)
+        return (speed - self.start) / acceleration
+
+
+def _run_rps_phase(pool, phase, idx, counter, limit, start, iteration_gen,
+                   aborted):
+    monotonic_start = start + timeutils.now() - time.time()
+    for number in counter:
+        if number >= phase.times or aborted.is_set():
+            break
+        elapsed = phase.time_of(number)
+        delay = monotonic_start + elapsed - timeutils.now()
+        if delay > 0 and aborted.wait(delay):
+            break
+        while not pool.wait_for_free_slot(limit, timeout=1):
+            if aborted.is_set():
+                return
+        pool.submit(next(iteration_gen), scheduled_at=start + elapsed,
+                    phase=idx)
+
+
+def _run_concurrency_phase(pool, phase, idx, start, workers, worker,
+                           iteration_gen, aborted):
+    finish = start + phase.duration
+    # the target concurrency of a constant phase never changes, so it is
+    # enough to wake up by the end of the phase or by the finished iteration
+    step = RAMP_STEP if phase.start != phase.end else phase.duration
+    while not aborted.is_set():
+        now = time.time()
+        if now >= finish:
+            break
+        limit = phase.concurrency(now - start, workers, worker)
+        if pool.wait_for_free_slot(limit, timeout=min(finish - now, step)):
+            pool.submit(next(iteration_gen), phase=idx)
+
+
+def _worker_process(queue, iteration_gen, timeout, phases, counters,
+                    max_concurrent, start, context, cls, method_name, args,
+                    aborted, info):
+    """Run iterations of the scenario by the load profile.
+
+    All the worker processes go through the same phases at the same time.
+    Iterations of rps phases follow the schedule shared by all the workers
+    (see rps._open_loop_worker_process), concurrency of concurrency phases
+    is split between the workers.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param phases: list of Phase objects
+    :param counters: list of iteration number generators of the phases
+    :param max_concurrent: maximum worker concurrency in rps phases
+    :param start: timestamp of the start of the load profile
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+    workers = info["processes_to_start"]
+    worker = info["processes_counter"]
+
+    runner._log_worker_info(phases=len(phases), timeout=timeout, cls=cls,
+                            method_name=method_name, args=args)
+
+    peak_concurrency = max(
+        [p.concurrency(e, workers, worker) for p in phases
+         if p.kind == "concurrency" for e in (0, p.duration)] or [0])
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.WorkerThreadPool(
+        sender, cls, method_name, context, args,
+        max(max_concurrent, peak_concurrency, 1), timeout)
+
+    for idx, phase in enumerate(phases):
+        if aborted.is_set():
+            break
+        phase_start = start + phase.offset
+        if phase.kind == "rps":
+            _run_rps_phase(pool, phase, idx, counters[idx], max_concurrent,
+                           phase_start, iteration_gen, aborted)
+        else:
+            delay = phase_start - time.time()
+            if delay > 0 and aborted.wait(delay):
+                break
+            _run_concurrency_phase(pool, phase, idx, phase_start, workers,
+                                   worker, iteration_gen, aborted)
+
+    pool.join()
+    sender.close()
+
+
+@runner.configure(name="load_profile")
+class LoadProfileScenarioRunner(runner.ScenarioRunner):
+    """Runs a scenario by the load profile which consists of phases.
+
+    Each phase has a duration and either rps or concurrency. The load of
+    the phase is a number (constant load) or a pair of numbers: then the
+    load changes linearly from the first value to the second one during
+    the phase. So a ramp-up is a single phase, a staircase is a sequence of
+    phases with constant loads and a spike is a short phase between phases
+    with a lower load, e.g.:
+
+        "phases": [{"duration": 60, "rps": [1, 50]},
+                   {"duration": 300, "rps": 50},
+                   {"duration": 60, "concurrency": 20}]
+
+    All the phases use the same context and the same pool of processes.
+    Iterations of rps phases are started by the schedule, regardless of how
+    long the previous iterations take (like the rps runner with
+    "open_loop": true). Results of iterations have the index of the phase.
+    """
+
+    PHASE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "duration": {
+                "type": "number",
+                "exclusiveMinimum": True,
+                "minimum": 0
+            },
+            "rps": {
+                "anyOf": [
+                    {"type": "number", "exclusiveMinimum": True,
+                     "minimum": 0},
+                    {"type": "array", "minItems": 2, "maxItems": 2,
+                     "items": {"type": "number", "minimum": 0}}
+                ]
+            },
+            "concurrency": {
+                "anyOf": [
+                    {"type": "integer", "minimum": 0},
+                    {"type": "array", "minItems": 2, "maxItems": 2,
+                     "items": {"type": "integer", "minimum": 0}}
+                ]
+            }
+        },
+        "oneOf": [{"required": ["duration", "rps"]},
+                  {"required": ["duration", "concurrency"]}],
+        "additionalProperties": False
+    }
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "phases": {
+                "type": "array",
+                "minItems": 1,
+                "items": PHASE_SCHEMA
+            },
+            "timeout": {
+                "type": "number",
+            },
+            "max_concurrency": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1
+            }
+        },
+        "required": ["type", "phases"],
+        "additionalProperties": False
+    }
+
+    @staticmethod
+    def _make_phases(config):
+        phases = []
+        offset = 0
+        for phase_config in config:
+            phases.append(Phase(phase_config, offset))
+            offset += phases[-1].duration
+        return phases
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+        """
+        phases = self._make_phases(self.config["phases"])
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        iteration_gen = utils.RAMInt()
+        counters = [utils.RAMInt() if p.kind == "rps" else None
+                    for p in phases]
+
+        rps_times = sum(p.times for p in phases)
+        peak_concurrency = max([max(p.start, p.end) for p in phases
+                                if p.kind == "concurrency"] or [0])
+
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
+        processes_to_start = max(1, min(
+            max_cpu_used, self.config.get("max_concurrency", max_cpu_used),
+            max(rps_times, peak_concurrency)))
+        # Every worker takes iterations of rps phases from the shared
+        # schedule, so each of them needs at least one slot for them even if
+        # there are more workers than iterations
+        max_concurrency = self.config.get(
+            "max_concurrency", max(rps_times, processes_to_start))
+        concurrency_per_worker, concurrency_overhead = divmod(
+            max_concurrency, processes_to_start)
+
+        self._log_debug_info(phases=self.config["phases"], timeout=timeout,
+                             max_cpu_used=max_cpu_used,
+                             processes_to_start=processes_to_start,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue = multiprocessing.Queue()
+        start = time.time()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout, phases, counters,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       start, context, cls, method_name, args, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
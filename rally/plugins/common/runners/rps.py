@@ -13,12 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
 import multiprocessing
-import threading
 import time
 
-from six.moves import queue as Queue
+from oslo_utils import timeutils
 
 from rally.common import logging
 from rally.common import utils
@@ -33,9 +31,9 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
                     args, aborted, info):
     """Start scenario within threads.
 
-    Spawn N threads per second. Each thread runs the scenario once, and appends
-    result to queue. A maximum of max_concurrent threads will be ran
-    concurrently.
+    Start N iterations per second in a pool of threads. Each thread runs the
+    scenario once per iteration, and appends result to queue. A maximum of
+    max_concurrent iterations will be ran concurrently.
 
     :param queue: queue object to append results
     :param iteration_gen: next iteration number generator
@@ -52,61 +50,97 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
     :param info: info about all processes count and counter of runned process
     """
 
-    pool = collections.deque()
     sleep = 1.0 / rps
 
     runner._log_worker_info(times=times, rps=rps, timeout=timeout,
                             cls=cls, method_name=method_name, args=args)
 
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.WorkerThreadPool(sender, cls, method_name, context, args,
+                                   max_concurrent, timeout)
+
     time.sleep(
         (sleep * info["processes_counter"]) / info["processes_to_start"])
 
     start = time.time()
-    timeout_queue = Queue.Queue()
-
-    if timeout:
-        collector_thr_by_timeout = threading.Thread(
-            target=utils.timeout_thread,
-            args=(timeout_queue, )
-        )
-        collector_thr_by_timeout.start()
 
     i = 0
     while i < times and not aborted.is_set():
-        scenario_context = runner._get_scenario_context(next(iteration_gen),
-                                                        context)
-        worker_args = (queue, cls, method_name, scenario_context, args)
-        thread = threading.Thread(target=runner._worker_thread,
-                                  args=worker_args)
+        # blocks while max_concurrent iterations are in progress
+        pool.submit(next(iteration_gen))
 
         i += 1
-        thread.start()
-        if timeout:
-            timeout_queue.put((thread, time.time() + timeout))
-        pool.append(thread)
-
         time_gap = time.time() - start
         real_rps = i / time_gap if time_gap else "Infinity"
 
         LOG.debug("Worker: %s rps: %s (requested rps: %s)" %
                   (i, real_rps, rps))
 
-        # try to join latest thread(s) until it finished, or until time to
-        # start new thread (if we have concurrent slots available)
-        while i / (time.time() - start) > rps or len(pool) >= max_concurrent:
-            if pool:
-                pool[0].join(0.001)
-                if not pool[0].isAlive():
-                    pool.popleft()
-            else:
-                time.sleep(0.001)
+        # wait until it is time to start the next iteration
+        delay = start + i * sleep - time.time()
+        if delay > 0:
+            aborted.wait(delay)
+
+    pool.join()
+    sender.close()
+
 
-    while pool:
-        pool.popleft().join()
+def _open_loop_worker_process(queue, iteration_gen, timeout, rps, times,
+                              max_concurrent, start, context, cls,
+                              method_name, args, aborted, info):
+    """Start iterations of the scenario by the schedule of the workload.
 
-    if timeout:
-        timeout_queue.put((None, None,))
-        collector_thr_by_timeout.join()
+    Iterations are not split between worker processes in advance: the
+    whole workload has a single schedule, where iteration N is intended to
+    be started at `start + N / rps`. The worker takes the next iteration
+    number, waits till its time and submits it to the pool of threads.
+    If all threads of the worker are busy, the iteration is started late,
+    but the schedule is not shifted, so the following iterations keep
+    their intended time. The intended time is saved in the result as
+    `scheduled_at`, so the delays are reported instead of being hidden in
+    a lower rate.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator, shared by all
+                          the workers
+    :param timeout: operation's timeout
+    :param rps: number of scenario iterations to be run per one second by
+                all the workers
+    :param times: total number of scenario iterations to be run
+    :param max_concurrent: maximum worker concurrency
+    :param start: timestamp of the start of the schedule
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of runned process
+    """
+
+    runner._log_worker_info(times=times, rps=rps, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    sender = runner.ResultsSender(queue, context["task"]["uuid"])
+    pool = runner.WorkerThreadPool(sender, cls, method_name, context, args,
+                                   max_concurrent, timeout)
+
+    # The schedule is shared with other processes, so it is set in wall
+    # clock time, while waits are measured by the monotonic clock, which
+    # is not affected by adjustments of the system time
+    monotonic_start = start + timeutils.now() - time.time()
+
+    for iteration in iteration_gen:
+        if iteration >= times or aborted.is_set():
+            break
+        delay = monotonic_start + iteration / rps - timeutils.now()
+        if delay > 0 and aborted.wait(delay):
+            break
+        # blocks while max_concurrent iterations are in progress
+        pool.submit(iteration, scheduled_at=start + iteration / rps)
+
+    pool.join()
+    sender.close()
 
 
 @runner.configure(name="rps")
@@ -120,6 +154,12 @@ class RPSScenarioRunner(runner.ScenarioRunner):
     An example of a rps scenario is booting 1 VM per second. This
     execution type is thus very helpful in understanding the maximal load that
     a certain cloud can handle.
+
+    With "open_loop": true all the iterations follow a single schedule of
+    the workload, regardless of how long the previous iterations take. The
+    intended start time of each iteration is saved in its result as
+    `scheduled_at`, and the HTML report shows the requested and achieved
+    rates and the schedule lag of iterations.
     """
 
     CONFIG_SCHEMA = {
@@ -148,12 +188,19 @@ class RPSScenarioRunner(runner.ScenarioRunner):
             "max_cpu_count": {
                 "type": "integer",
                 "minimum": 1
+            },
+            "open_loop": {
+                "type": "boolean"
             }
         },
         "required": ["type", "times", "rps"],
         "additionalProperties": False
     }
 
+    # functions which run iterations in a worker process
+    _worker = staticmethod(_worker_process)
+    _open_loop_worker = staticmethod(_open_loop_worker_process)
+
     def _run_scenario(self, cls, method_name, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
@@ -199,6 +246,13 @@ class RPSScenarioRunner(runner.ScenarioRunner):
 
         result_queue = multiprocessing.Queue()
 
+        if self.config.get("open_loop"):
+            self._run_open_loop(result_queue, iteration_gen, timeout,
+                                processes_to_start, concurrency_per_worker,
+                                concurrency_overhead, context, cls,
+                                method_name, args)
+            return
+
         def worker_args_gen(times_overhead, concurrency_overhead):
             """Generate arguments for process worker.
 
@@ -223,6 +277,26 @@ class RPSScenarioRunner(runner.ScenarioRunner):
                     concurrency_overhead -= 1
 
         process_pool = self._create_process_pool(
-            processes_to_start, _worker_process,
+            processes_to_start, self._worker,
             worker_args_gen(times_overhead, concurrency_overhead))
         self._join_processes(process_pool, result_queue)
+
+    def _run_open_loop(self, result_queue, iteration_gen, timeout,
+                       processes_to_start, concurrency_per_worker,
+                       concurrency_overhead, context, cls, method_name, args):
+        times = self.config["times"]
+        rps_ = float(self.config["rps"])
+        start = time.time()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout, rps_, times,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       start, context, cls, method_name, args, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, self._open_loop_worker,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
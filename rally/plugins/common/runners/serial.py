@@ -14,6 +14,7 @@
 #    under the License.
 
 from rally import consts
+from rally.task import context as task_context
 from rally.task import runner
 
 
@@ -64,13 +65,14 @@ class SerialScenarioRunner(runner.ScenarioRunner):
                   where each result is a dictionary
         """
         times = self.config.get("times", 1)
+        context_manager = task_context.ContextManager(context)
 
         for i in range(times):
             if self.aborted.is_set():
                 break
             result = runner._run_scenario_once(
-                cls, method_name, runner._get_scenario_context(i, context),
-                args)
+                cls, method_name,
+                runner._get_scenario_context(i, context_manager), args)
             self._send_result(result)
 
         self._flush_results()
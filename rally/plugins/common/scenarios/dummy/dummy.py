@@ -63,6 +63,23 @@ class Dummy(scenario.Scenario):
         utils.interruptable_sleep(sleep)
 
 
+@validation.required_async_runner()
+@scenario.configure(name="Dummy.dummy_coroutine")
+class DummyCoroutine(scenario.Scenario):
+    """Dummy benchmarks for testing the async runners at scale."""
+
+    def run(self, sleep=0):
+        """Sleep for the given number of seconds without blocking the loop.
+
+        Dummy.dummy_coroutine is Dummy.dummy for the async runners. It
+        returns a coroutine, so the iteration lasts until the coroutine is
+        done, while the event loop runs other iterations.
+
+        :param sleep: idle time of method (in seconds).
+        """
+        return atomic.asyncio.sleep(sleep)
+
+
 @validation.number("size_of_message",
                    minval=1, integer_only=True, nullable=True)
 @scenario.configure(name="Dummy.dummy_exception")
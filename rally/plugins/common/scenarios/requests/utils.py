@@ -10,20 +10,236 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import threading
+import time
+
+from oslo_config import cfg
 import requests
+from requests import adapters
+from requests.packages.urllib3 import connection
+from requests.packages.urllib3 import connectionpool
+from six.moves import http_cookiejar
+from six.moves.urllib import parse
 
 from rally.common.i18n import _
 from rally.task import atomic
 from rally.task import scenario
 
 
+REQUESTS_BENCHMARK_OPTS = [
+    cfg.IntOpt("requests_pool_size", default=10,
+               help="How many connections to one host are kept open by a "
+                    "runner process for reuse between iterations of HTTP "
+                    "requests scenarios"),
+    cfg.BoolOpt("requests_keep_alive", default=True,
+                help="Keep connections of HTTP requests scenarios alive "
+                     "between iterations. If disabled, each request opens a "
+                     "new connection"),
+    cfg.IntOpt("requests_warmup_connections", default=0,
+               help="How many connections to a host are opened by a runner "
+                    "process before its first request to the host, so that "
+                    "the first iterations do not measure handshakes. It is "
+                    "limited by requests_pool_size")]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(REQUESTS_BENCHMARK_OPTS, group=benchmark_group)
+
+# Durations of the connection handshakes made by the current request of
+# the thread. The request is sent by the thread which calls the session.
+_timings = threading.local()
+
+
+def _reset_timings():
+    _timings.connect = 0.0
+    _timings.tls = 0.0
+
+
+def _add_timing(name, duration):
+    setattr(_timings, name, getattr(_timings, name, 0.0) + duration)
+
+
+class _TimedConnectionMixin(object):
+    """Measure TCP and TLS handshakes of the connection."""
+
+    tls = False
+
+    def _new_conn(self):
+        started_at = time.time()
+        try:
+            return super(_TimedConnectionMixin, self)._new_conn()
+        finally:
+            _add_timing("connect", time.time() - started_at)
+
+    def connect(self):
+        connect_before = getattr(_timings, "connect", 0.0)
+        started_at = time.time()
+        super(_TimedConnectionMixin, self).connect()
+        if self.tls:
+            # HTTPS connection makes the TCP handshake in _new_conn() and
+            # the rest of connect() is the TLS handshake
+            tcp = getattr(_timings, "connect", 0.0) - connect_before
+            _add_timing("tls", max(time.time() - started_at - tcp, 0.0))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, connection.HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin,
+                           connection.HTTPSConnection):
+    tls = True
+
+
+class TimedHTTPAdapter(adapters.HTTPAdapter):
+    """HTTPAdapter whose connections measure their handshakes."""
+
+    @staticmethod
+    def _use_timed_connections(pool):
+        if isinstance(pool, connectionpool.HTTPSConnectionPool):
+            pool.ConnectionCls = TimedHTTPSConnection
+        else:
+            pool.ConnectionCls = TimedHTTPConnection
+        return pool
+
+    def get_connection(self, url, proxies=None):
+        return self._use_timed_connections(
+            super(TimedHTTPAdapter, self).get_connection(url, proxies))
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        # requests>=2.32 sends requests via this method
+        return self._use_timed_connections(
+            super(TimedHTTPAdapter, self).get_connection_with_tls_context(
+                *args, **kwargs))
+
+
+class _RejectCookiesPolicy(http_cookiejar.DefaultCookiePolicy):
+    """Cookie policy which doesn't let cookies into the jar."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class SessionsPool(object):
+    """Process-wide requests.Session of HTTP requests scenarios.
+
+    The session keeps up to requests_pool_size connections per host alive,
+    so iterations of a runner process reuse them instead of making TCP and
+    TLS handshakes for each request. The threads of the process share the
+    session: connections are taken from the pool by one request at a time.
+    Cookies set by responses are not kept, so iterations don't depend on
+    each other like requests of separate sessions.
+
+    A session inherited by a forked process is dropped, since connections
+    can not be shared between processes.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._warmed_up = set()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _make_session(self):
+        session = requests.Session()
+        session.cookies.set_policy(_RejectCookiesPolicy())
+        pool_size = max(CONF.benchmark.requests_pool_size, 1)
+        adapter = TimedHTTPAdapter(pool_connections=pool_size,
+                                   pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not CONF.benchmark.requests_keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def get(self):
+        """Return the session of the process."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._session = None
+                self._warmed_up.clear()
+                self._pid = os.getpid()
+            if self._session is None:
+                self._session = self._make_session()
+            return self._session
+
+    def warmup(self, url, verify=None, cert=None):
+        """Open connections to the host of the url if it is the first time.
+
+        :param url: url which is going to be requested
+        :param verify: the same as verify argument of requests
+        :param cert: the same as cert argument of requests
+        """
+        count = min(CONF.benchmark.requests_warmup_connections,
+                    CONF.benchmark.requests_pool_size)
+        if count <= 0 or not CONF.benchmark.requests_keep_alive:
+            return
+        session = self.get()
+        parsed = parse.urlsplit(url)
+        origin = (parsed.scheme, parsed.netloc)
+        with self._lock:
+            if origin in self._warmed_up:
+                return
+            self._warmed_up.add(origin)
+
+        adapter = session.get_adapter(url)
+        pool = adapter.get_connection(url)
+        adapter.cert_verify(pool, url,
+                            session.verify if verify is None else verify,
+                            session.cert if cert is None else cert)
+        # NOTE: urllib3 has no public API to open connections in advance, so
+        #     they are taken from the pool, connected and put back
+        conns = [pool._get_conn() for i in range(count)]
+        try:
+            for conn in conns:
+                conn.connect()
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+
+    def clear(self):
+        """Close the session of the process."""
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._warmed_up.clear()
+
+
+SESSIONS_POOL = SessionsPool()
+
+
 class RequestScenario(scenario.Scenario):
     """Base class for Request scenarios with basic atomic actions."""
 
-    @atomic.action_timer("requests.check_request")
+    # additive output with the parts of the requests of the iteration
+    _request_timings = None
+
+    def _add_request_timings(self, **timings):
+        if self._request_timings is None:
+            self._request_timings = {
+                "title": "Request timings",
+                "description": "Parts of the duration of requests of the "
+                               "iteration, they sum up to the duration of "
+                               "requests.check_request",
+                "chart_plugin": "StackedArea",
+                "data": [[name, 0.0]
+                         for name in ("connect", "tls", "ttfb", "body")],
+                "label": "Duration, seconds"}
+            self.add_output(additive=self._request_timings)
+        for item in self._request_timings["data"]:
+            item[1] += timings[item[0]]
+
     def _check_request(self, url, method, status_code, **kwargs):
         """Compare request status code with specified code
 
+        The request is sent via the pooled session of the runner process.
+        Besides the requests.check_request atomic action, the durations of
+        the parts of the request are reported by the "Request timings"
+        additive output: connect and tls (zero if a kept alive connection
+        is reused), ttfb (time to the response headers) and body.
+
         :param status_code: Expected status code of request
         :param url: Uniform resource locator
         :param method: Type of request method (GET | POST ..)
@@ -31,9 +247,28 @@ class RequestScenario(scenario.Scenario):
         :raises ValueError: if return http status code
                             not equal to expected status code
         """
+        session = SESSIONS_POOL.get()
+        SESSIONS_POOL.warmup(url, verify=kwargs.get("verify"),
+                             cert=kwargs.get("cert"))
+
+        # NOTE: the body is always read, so the connection goes back to
+        #     the pool and the reading is measured apart from the headers
+        kwargs["stream"] = True
+        with atomic.ActionTimer(self, "requests.check_request"):
+            _reset_timings()
+            started_at = time.time()
+            resp = session.request(method, url, **kwargs)
+            headers_at = time.time()
+            resp.content
+            finished_at = time.time()
+
+            self._add_request_timings(
+                connect=_timings.connect, tls=_timings.tls,
+                ttfb=max(headers_at - started_at - _timings.connect
+                         - _timings.tls, 0.0),
+                body=finished_at - headers_at)
 
-        resp = requests.request(method, url, **kwargs)
-        if status_code != resp.status_code:
-            error_msg = _("Expected HTTP request code is `%s` actual `%s`")
-            raise ValueError(
-                error_msg % (status_code, resp.status_code))
+            if status_code != resp.status_code:
+                error_msg = _("Expected HTTP request code is `%s` actual `%s`")
+                raise ValueError(
+                    error_msg % (status_code, resp.status_code))
@@ -0,0 +1,74 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally import consts
+from rally.task import sla
+
+
+@sla.configure(name="max_duration_percentile")
+class MaxDurationPercentile(sla.SLA):
+    """Maximum percentile of successful iterations duration in seconds.
+
+    For example, {"percentile": 95, "max": 2.5} requires 95% of successful
+    iterations to take no more than 2.5 seconds.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "percentile": {"type": "number", "minimum": 0.0,
+                           "exclusiveMinimum": True, "maximum": 100.0,
+                           "exclusiveMaximum": True},
+            "max": {"type": "number", "minimum": 0.0,
+                    "exclusiveMinimum": True}
+        },
+        "required": ["percentile", "max"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(MaxDurationPercentile, self).__init__(criterion_value)
+        self.percentile = self.criterion_value["percentile"]
+        self.max_duration = self.criterion_value["max"]
+        self.duration = 0.0
+        self.percentile_comp = streaming_algorithms.PercentileComputation(
+            self.percentile / 100.0)
+
+    def add_iteration(self, iteration):
+        if not iteration.get("error"):
+            self.percentile_comp.add(iteration["duration"])
+            self.duration = self.percentile_comp.result()
+        self.success = self.duration <= self.max_duration
+        return self.success
+
+    def merge(self, other):
+        self.percentile_comp.merge(other.percentile_comp)
+        self.duration = self.percentile_comp.result() or 0.0
+        self.success = self.duration <= self.max_duration
+        return self.success
+
+    def details(self):
+        return (_("%(percentile)s%%ile of iteration duration %(duration).2fs "
+                  "<= %(max).2fs - %(status)s") %
+                {"percentile": self.percentile, "duration": self.duration,
+                 "max": self.max_duration, "status": self.status()})
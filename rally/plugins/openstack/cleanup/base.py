@@ -16,6 +16,7 @@
 
 from oslo_config import cfg
 
+from rally.common.plugin import discover
 from rally.task import utils
 
 
@@ -25,7 +26,18 @@ CLEANUP_OPTS = [
     cfg.IntOpt("resource_deletion_timeout", default=600,
                help="A timeout in seconds for deleting resources"),
     cfg.IntOpt("cleanup_threads", default=20,
-               help="Number of cleanup threads to run")
+               help="Number of cleanup threads to run"),
+    cfg.IntOpt("cleanup_concurrency", default=60, min=1,
+               help="Max number of resources deleted concurrently by all "
+                    "the resource managers which run at the same time"),
+    cfg.DictOpt("service_rate_limits", default={},
+                help="Max number of deletion requests per second sent to "
+                     "services, e.g. nova:10,cinder:5. Services which are "
+                     "not listed or have zero rate are not limited"),
+    cfg.BoolOpt("pipelined_deletion", default=True,
+                help="Request deletion of all the found resources of a "
+                     "resource manager at once and confirm it by listing "
+                     "resources instead of fetching them one by one")
 ]
 cleanup_group = cfg.OptGroup(name="cleanup", title="Cleanup Options")
 CONF.register_group(cleanup_group)
@@ -35,7 +47,8 @@ CONF.register_opts(CLEANUP_OPTS, cleanup_group)
 def resource(service, resource, order=0, admin_required=False,
              perform_for_admin_only=False, tenant_resource=False,
              max_attempts=3, timeout=CONF.cleanup.resource_deletion_timeout,
-             interval=1, threads=CONF.cleanup.cleanup_threads):
+             interval=1, threads=CONF.cleanup.cleanup_threads,
+             delete_after=None):
     """Decorator that overrides resource specification.
 
     Just put it on top of your resource class and specify arguments that you
@@ -55,6 +68,13 @@ def resource(service, resource, order=0, admin_required=False,
     :param interval: Resource status pooling interval
     :param threads: Amount of threads (workers) that are deleting resources
                     simultaneously
+    :param delete_after: Names of resource managers (<service> or
+                         <service>.<resource>) which resources should be
+                         deleted before resources of this one, e.g. ports
+                         before networks. Resource managers which don't
+                         depend on each other are run concurrently. If it
+                         is None, resources are deleted after resources of
+                         all the resource managers with lower order
     """
 
     def inner(cls):
@@ -69,12 +89,14 @@ def resource(service, resource, order=0, admin_required=False,
         cls._interval = interval
         cls._threads = threads
         cls._tenant_resource = tenant_resource
+        cls._delete_after = delete_after
 
         return cls
 
     return inner
 
 
+@discover.index_subclasses
 @resource(service=None, resource=None)
 class ResourceManager(object):
     """Base class for cleanup plugins for specific resources.
@@ -125,3 +147,39 @@ class ResourceManager(object):
     def list(self):
         """List all resources specific for admin or user."""
         return self._manager().list()
+
+    def delete_many(self, resources):
+        """Delete resources by bulk requests.
+
+        Override it if the service has a bulk deletion API. It is called
+        on the instance which lists resources.
+
+        :param resources: instances of this class initiated with resources
+                          that should be deleted
+        :returns: list of resources which deletion failed, their deletion
+                  is requested again. None means that the deletion of all
+                  the resources is requested
+        :raises NotImplementedError: if there is no bulk deletion API, then
+                                     resources are deleted one by one
+        """
+        raise NotImplementedError()
+
+    def select_not_deleted(self, resources):
+        """Select resources which are not deleted yet.
+
+        Instead of fetching resources one by one, all of them are checked
+        by the single list() call. It is called on the instance which
+        lists resources.
+
+        :param resources: instances of this class initiated with resources
+                          which deletion was requested
+        :returns: list of resources which are not deleted yet
+        """
+        listed = {}
+        for raw_resource in self.list():
+            resource = self.__class__(resource=raw_resource)
+            listed[resource.id()] = raw_resource
+        return [r for r in resources
+                if r.id() in listed
+                and utils.get_status(listed[r.id()]) not in (
+                    "DELETED", "DELETE_COMPLETE")]
@@ -13,8 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
 import time
 
+from oslo_config import cfg
+
 from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
@@ -24,13 +28,36 @@ from rally import osclients
 from rally.plugins.openstack.cleanup import base
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
+class _RateLimiter(object):
+    """Spaces out calls of acquire() by threads to the given rate."""
+
+    def __init__(self, rate):
+        """Rate limiter constructor.
+
+        :param rate: max number of calls per second
+        """
+        self.interval = 1.0 / rate
+        self._next_at = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.time()
+            scheduled_at = max(self._next_at, now)
+            self._next_at = scheduled_at + self.interval
+        if scheduled_at > now:
+            time.sleep(scheduled_at - now)
+
+
 class SeekAndDestroy(object):
     cache = {}
 
-    def __init__(self, manager_cls, admin, users, api_versions=None):
+    def __init__(self, manager_cls, admin, users, api_versions=None,
+                 budget=None, rate_limiter=None):
         """Resource deletion class.
 
         This class contains method exterminate() that finds and deletes
@@ -40,11 +67,18 @@ class SeekAndDestroy(object):
         :param admin: admin credential like in context["admin"]
         :param users: users credentials like in context["users"]
         :param api_versions: dict of client API versions
+        :param budget: semaphore which limits the number of resources
+                       deleted concurrently, it can be shared with other
+                       SeekAndDestroy objects
+        :param rate_limiter: _RateLimiter of deletion requests to the
+                             service of manager_cls
         """
         self.manager_cls = manager_cls
         self.admin = admin
         self.users = users or []
         self.api_versions = api_versions
+        self.budget = budget
+        self.rate_limiter = rate_limiter
 
     def _get_cached_client(self, user):
         """Simplifies initialization and caching OpenStack clients."""
@@ -60,6 +94,31 @@ class SeekAndDestroy(object):
                 user["credential"], api_info=self.api_versions)
         return self.cache[key]
 
+    def _call_in_budget(self, func, *args):
+        if self.budget:
+            with self.budget:
+                return func(*args)
+        return func(*args)
+
+    def _request_deletion(self, resource):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        resource.delete()
+
+    def _request_bulk_deletion(self, manager, resources):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return manager.delete_many(resources)
+
+    @staticmethod
+    def _get_msg_kw(resource):
+        return {
+            "uuid": resource.id(),
+            "name": resource.name() or "",
+            "service": resource._service,
+            "resource": resource._resource
+        }
+
     def _delete_single_resource(self, resource):
         """Safe resource deletion with retries and timeouts.
 
@@ -72,19 +131,15 @@ class SeekAndDestroy(object):
                          that should be deleted.
         """
 
-        msg_kw = {
-            "uuid": resource.id(),
-            "name": resource.name() or "",
-            "service": resource._service,
-            "resource": resource._resource
-        }
+        msg_kw = self._get_msg_kw(resource)
 
         LOG.debug(
             "Deleting %(service)s %(resource)s object %(name)s (%(uuid)s)" %
             msg_kw)
 
         try:
-            rutils.retry(resource._max_attempts, resource.delete)
+            rutils.retry(resource._max_attempts, self._request_deletion,
+                         resource)
         except Exception as e:
             msg_kw["reason"] = e
             LOG.warning(
@@ -120,53 +175,63 @@ class SeekAndDestroy(object):
                           "%(service)s.%(resource)s: %(uuid)s.")
                         % msg_kw)
 
-    def _gen_publisher(self):
-        """Returns publisher for deletion jobs.
+    def _iter_listing_managers(self):
+        """Yields managers which list resources that should be deleted.
 
-        This method iterates over all users, lists all resources
-        (using manager_cls) and puts jobs for deletion.
+        Every item is a tuple of admin, user and an instance of manager_cls
+        initiated without resource.
 
-        Every deletion job contains tuple with two values: user and resource
-        uuid that should be deleted.
-
-        In case of tenant based resource, uuids are fetched only from one user
-        per tenant.
+        In case of tenant based resource, resources are listed only by one
+        user per tenant.
         """
+        if self.admin and (not self.users
+                           or self.manager_cls._perform_for_admin_only):
+            manager = self.manager_cls(
+                admin=self._get_cached_client(self.admin))
+            yield self.admin, None, manager
 
-        def publisher(queue):
+        else:
+            visited_tenants = set()
+            admin_client = self._get_cached_client(self.admin)
+            for user in self.users:
+                if (self.manager_cls._tenant_resource
+                   and user["tenant_id"] in visited_tenants):
+                    continue
+
+                visited_tenants.add(user["tenant_id"])
+                manager = self.manager_cls(
+                    admin=admin_client,
+                    user=self._get_cached_client(user),
+                    tenant_uuid=user["tenant_id"])
 
-            def _publish(admin, user, manager):
-                try:
-                    for raw_resource in rutils.retry(3, manager.list):
-                        queue.append((admin, user, raw_resource))
-                except Exception as e:
-                    LOG.warning(
-                        _("Seems like %s.%s.list(self) method is broken. "
-                          "It shouldn't raise any exceptions.")
-                        % (manager.__module__, type(manager).__name__))
-                    LOG.exception(e)
+                yield self.admin, user, manager
 
-            if self.admin and (not self.users
-                               or self.manager_cls._perform_for_admin_only):
-                manager = self.manager_cls(
-                    admin=self._get_cached_client(self.admin))
-                _publish(self.admin, None, manager)
+    @staticmethod
+    def _list(manager):
+        try:
+            return rutils.retry(3, manager.list)
+        except Exception as e:
+            LOG.warning(
+                _("Seems like %s.%s.list(self) method is broken. "
+                  "It shouldn't raise any exceptions.")
+                % (manager.__module__, type(manager).__name__))
+            LOG.exception(e)
+            return []
 
-            else:
-                visited_tenants = set()
-                admin_client = self._get_cached_client(self.admin)
-                for user in self.users:
-                    if (self.manager_cls._tenant_resource
-                       and user["tenant_id"] in visited_tenants):
-                        continue
+    def _gen_publisher(self):
+        """Returns publisher for deletion jobs.
 
-                    visited_tenants.add(user["tenant_id"])
-                    manager = self.manager_cls(
-                        admin=admin_client,
-                        user=self._get_cached_client(user),
-                        tenant_uuid=user["tenant_id"])
+        This method iterates over all users, lists all resources
+        (using manager_cls) and puts jobs for deletion.
 
-                    _publish(self.admin, user, manager)
+        Every deletion job contains tuple with three values: admin, user and
+        resource that should be deleted.
+        """
+
+        def publisher(queue):
+            for admin, user, manager in self._iter_listing_managers():
+                for raw_resource in self._list(manager):
+                    queue.append((admin, user, raw_resource))
 
         return publisher
 
@@ -183,15 +248,139 @@ class SeekAndDestroy(object):
                 user=self._get_cached_client(user),
                 tenant_uuid=user and user["tenant_id"])
 
-            self._delete_single_resource(manager)
+            self._call_in_budget(self._delete_single_resource, manager)
 
         return consumer
 
+    def _request_deletions(self, manager, resources):
+        """Request deletion of resources without waiting for it.
+
+        Resources are deleted by a bulk request if manager_cls supports it,
+        otherwise one by one in manager_cls._threads threads.
+
+        :param manager: instance of manager_cls which listed the resources
+        :param resources: instances of manager_cls initiated with resources
+                          that should be deleted
+        :returns: list of resources which deletion requests failed
+        """
+        try:
+            failed = self._call_in_budget(self._request_bulk_deletion,
+                                          manager, resources)
+            return failed or []
+        except NotImplementedError:
+            pass
+        except Exception as e:
+            LOG.warning(_("Bulk deletion of %(service)s.%(resource)s failed, "
+                          "resources are deleted one by one. Reason: "
+                          "%(reason)s")
+                        % {"service": manager._service,
+                           "resource": manager._resource, "reason": e})
+
+        failed = []
+
+        def delete(resource):
+            try:
+                self._call_in_budget(self._request_deletion, resource)
+            except Exception as e:
+                LOG.debug("Deletion request of %s.%s %s failed: %s"
+                          % (resource._service, resource._resource,
+                             resource.id(), e))
+                failed.append(resource)
+
+        broker.run_for_each(delete, resources,
+                            consumers_count=self.manager_cls._threads)
+        return failed
+
+    def _exterminate_pipelined(self):
+        """Delete resources of all the tenants at once.
+
+        Deletion of all the found resources is requested without waiting for
+        it, then every interval it is confirmed by a single list() call per
+        tenant. Deletion of resources which are still not deleted after
+        a timeout / max_attempts is requested again, only resources which
+        are not deleted after the timeout are reported.
+        """
+        cls = self.manager_cls
+        requests = collections.defaultdict(list)
+        for admin, user, manager in self._iter_listing_managers():
+            requests[manager] = [
+                cls(resource=raw_resource, admin=manager.admin,
+                    user=manager.user, tenant_uuid=manager.tenant_uuid)
+                for raw_resource in self._list(manager)]
+
+        waiting = collections.defaultdict(list)
+        list_failures = collections.Counter()
+        attempts = collections.Counter()
+        started_at = {}
+        requested_at = {}
+        retry_after = float(cls._timeout) / cls._max_attempts
+
+        while any(requests.values()) or any(waiting.values()):
+            retries = collections.defaultdict(list)
+            for manager, resources in requests.items():
+                if not resources:
+                    continue
+                now = time.time()
+                failed = set(self._request_deletions(manager, resources))
+                for resource in resources:
+                    attempts[resource] += 1
+                    started_at.setdefault(resource, now)
+                    requested_at[resource] = now
+                    if resource not in failed:
+                        waiting[manager].append(resource)
+                    elif attempts[resource] < cls._max_attempts:
+                        retries[manager].append(resource)
+                    else:
+                        LOG.warning(
+                            _("Resource deletion failed, max retries exceeded "
+                              "for %(service)s.%(resource)s: %(uuid)s.")
+                            % self._get_msg_kw(resource))
+            requests = retries
+            if not any(waiting.values()):
+                continue
+
+            time.sleep(cls._interval)
+
+            for manager, resources in waiting.items():
+                if not resources:
+                    continue
+                try:
+                    not_deleted = manager.select_not_deleted(resources)
+                except Exception as e:
+                    LOG.warning(
+                        _("Seems like %s.%s.select_not_deleted(self) method "
+                          "is broken. It shouldn't raise any exceptions.")
+                        % (manager.__module__, type(manager).__name__))
+                    LOG.exception(e)
+                    # avoid LOG spamming in case of a broken method
+                    list_failures[manager] += 1
+                    if list_failures[manager] > cls._max_attempts:
+                        not_deleted = []
+                    else:
+                        not_deleted = resources
+
+                waiting[manager] = []
+                for resource in not_deleted:
+                    now = time.time()
+                    if now - started_at[resource] >= cls._timeout:
+                        LOG.warning(
+                            _("Resource deletion failed, timeout occurred for "
+                              "%(service)s.%(resource)s: %(uuid)s.")
+                            % self._get_msg_kw(resource))
+                    elif (attempts[resource] < cls._max_attempts
+                          and now - requested_at[resource] >= retry_after):
+                        requests[manager].append(resource)
+                    else:
+                        waiting[manager].append(resource)
+
     def exterminate(self):
         """Delete all resources for passed users, admin and resource_mgr."""
 
-        broker.run(self._gen_publisher(), self._gen_consumer(),
-                   consumers_count=self.manager_cls._threads)
+        if CONF.cleanup.pipelined_deletion:
+            self._exterminate_pipelined()
+        else:
+            broker.run(self._gen_publisher(), self._gen_consumer(),
+                       consumers_count=self.manager_cls._threads)
 
 
 def list_resource_names(admin_required=None):
@@ -203,6 +392,7 @@ def list_resource_names(admin_required=None):
                            True -> returns only admin ResourceManagers
                            False -> returns only non admin ResourceManagers
     """
+    discover.import_lazy_modules(base=base.ResourceManager)
     res_mgrs = discover.itersubclasses(base.ResourceManager)
     if admin_required is not None:
         res_mgrs = filter(lambda cls: cls._admin_required == admin_required,
@@ -228,6 +418,7 @@ def find_resource_managers(names=None, admin_required=None):
     names = set(names or [])
 
     resource_managers = []
+    discover.import_lazy_modules(base=base.ResourceManager)
     for manager in discover.itersubclasses(base.ResourceManager):
         if admin_required is not None:
             if admin_required != manager._admin_required:
@@ -251,6 +442,117 @@ def find_resource_managers(names=None, admin_required=None):
     return resource_managers
 
 
+def _get_dependencies(managers):
+    """Map every resource manager to the ones it should be run after.
+
+    :param managers: resource managers sorted by order
+    :returns: dict with sets of resource managers from the `managers` list
+    """
+    dependencies = {}
+    for idx, mgr in enumerate(managers):
+        names = getattr(mgr, "_delete_after", None)
+        if names is None:
+            dependencies[mgr] = set(managers[:idx])
+            continue
+        dependencies[mgr] = set(
+            other for other in managers
+            if other is not mgr and (
+                other._service in names
+                or "%s.%s" % (other._service, other._resource) in names))
+    return dependencies
+
+
+def _run_graph(managers, dependencies, func):
+    """Call func for every manager as soon as its dependencies are done.
+
+    Resource managers which don't depend on each other are run in separate
+    threads at the same time. If the graph has a cycle, the pending
+    resource manager with the lowest order is started regardless of its
+    dependencies.
+
+    :param managers: resource managers sorted by order
+    :param dependencies: dict returned by _get_dependencies()
+    :param func: function which is called with a resource manager
+    :returns: dict with (started_at, finished_at) of every resource manager
+    """
+    condition = threading.Condition()
+    pending = list(managers)
+    running = set()
+    done = set()
+    timings = {}
+    errors = []
+
+    def run(mgr):
+        started_at = time.time()
+        try:
+            func(mgr)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            with condition:
+                timings[mgr] = (started_at, time.time())
+                running.discard(mgr)
+                done.add(mgr)
+                condition.notify()
+
+    threads = []
+    with condition:
+        while pending:
+            ready = [mgr for mgr in pending if dependencies[mgr] <= done]
+            if not ready and not running:
+                ready = pending[:1]
+                LOG.warning("Cleanup dependencies of %s.%s can't be "
+                            "satisfied, it is run regardless of them"
+                            % (ready[0]._service, ready[0]._resource))
+            for mgr in ready:
+                pending.remove(mgr)
+                running.add(mgr)
+                thread = threading.Thread(target=run, args=(mgr,))
+                thread.start()
+                threads.append(thread)
+            if pending:
+                condition.wait()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return timings
+
+
+def _get_service_stats(timings):
+    """Calculate how long resources of every service were deleted.
+
+    Resource managers of the same service may run at the same time, so the
+    busy time of the service is the length of the union of their intervals.
+
+    :param timings: dict returned by _run_graph()
+    :returns: dict with the total duration of the cleanup and durations
+              and shares of the total duration of services
+    """
+    if not timings:
+        return {"duration": 0, "services": {}}
+    started_at = min(start for start, finish in timings.values())
+    duration = max(finish for start, finish in timings.values()) - started_at
+    intervals = {}
+    for mgr, interval in timings.items():
+        intervals.setdefault(mgr._service, []).append(interval)
+
+    services = {}
+    for service, service_intervals in intervals.items():
+        busy = 0
+        busy_till = None
+        for start, finish in sorted(service_intervals):
+            if busy_till is not None and start < busy_till:
+                start = busy_till
+            if finish > start:
+                busy += finish - start
+                busy_till = finish
+        services[service] = {
+            "duration": busy,
+            "share": busy / duration if duration else 0}
+    return {"duration": duration, "services": services}
+
+
 def cleanup(names=None, admin_required=None, admin=None, users=None,
             api_versions=None):
     """Generic cleaner.
@@ -259,7 +561,10 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
     with _service from services or _resource from resources.
 
     Then goes through all passed users and using cleaners cleans all related
-    resources.
+    resources. Resource managers are run concurrently if they don't depend
+    on each other (see `delete_after` of base.resource), the total number
+    of resources deleted at the same time and the rate of deletion
+    requests to services are limited by the "cleanup" options.
 
     :param names: Use only resource manages that has name from this list.
                   There are in as _service or
@@ -278,9 +583,33 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
                     "credential": <rally.common.objects.Credential>
 
                   }
+    :returns: dict with the duration of the cleanup and durations and
+              shares of it of every service
     """
-    for manager in find_resource_managers(names, admin_required):
+    managers = find_resource_managers(names, admin_required)
+    budget = threading.BoundedSemaphore(CONF.cleanup.cleanup_concurrency)
+    rate_limiters = {}
+    for service, rate in CONF.cleanup.service_rate_limits.items():
+        # zero rate means that the service is not limited
+        if float(rate) > 0:
+            rate_limiters[service] = _RateLimiter(float(rate))
+
+    def exterminate(manager):
         LOG.debug("Cleaning up %(service)s %(resource)s objects" %
                   {"service": manager._service,
                    "resource": manager._resource})
-        SeekAndDestroy(manager, admin, users, api_versions).exterminate()
+        destroyer = SeekAndDestroy(
+            manager, admin, users, api_versions, budget=budget,
+            rate_limiter=rate_limiters.get(manager._service))
+        destroyer.exterminate()
+
+    timings = _run_graph(managers, _get_dependencies(managers), exterminate)
+    stats = _get_service_stats(timings)
+    for service, service_stats in sorted(stats["services"].items(),
+                                         key=lambda x: -x[1]["duration"]):
+        LOG.info("Cleanup of %(service)s took %(duration).3f sec "
+                 "(%(share).1f%% of the cleanup)"
+                 % {"service": service,
+                    "duration": service_stats["duration"],
+                    "share": service_stats["share"] * 100})
+    return stats
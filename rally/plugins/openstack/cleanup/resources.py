@@ -13,11 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 from boto import exception as boto_exception
 from neutronclient.common import exceptions as neutron_exceptions
 from novaclient import exceptions as nova_exc
 from oslo_config import cfg
 from saharaclient.api import base as saharaclient_base
+from six.moves.urllib import parse
 
 from rally.common import logging
 from rally.common.plugin import discover
@@ -45,11 +48,18 @@ def get_order(start):
     return iter(range(start, start + 99))
 
 
+# resources which can hold ports, volumes, images, etc. of other services
+_COMPUTE = ("heat", "senlin", "nova.servers", "ec2")
+
+
 class SynchronizedDeletion(object):
 
     def is_deleted(self):
         return True
 
+    def select_not_deleted(self, resources):
+        return []
+
 
 class QuotaMixin(SynchronizedDeletion):
 
@@ -68,7 +78,8 @@ class QuotaMixin(SynchronizedDeletion):
 
 # HEAT
 
-@base.resource("heat", "stacks", order=100, tenant_resource=True)
+@base.resource("heat", "stacks", order=100, tenant_resource=True,
+               delete_after=())
 class HeatStack(base.ResourceManager):
     def name(self):
         return self.raw_resource.stack_name
@@ -98,13 +109,15 @@ class SenlinMixin(base.ResourceManager):
         return getattr(self._manager(), "delete_%s" % res_name)(self.id())
 
 
-@base.resource("senlin", "clusters", order=next(_senlin_order))
+@base.resource("senlin", "clusters", order=next(_senlin_order),
+               delete_after=())
 class SenlinCluster(SenlinMixin):
     """Resource class for Senlin Cluster."""
 
 
 @base.resource("senlin", "profiles", order=next(_senlin_order),
-               admin_required=False, tenant_resource=True)
+               admin_required=False, tenant_resource=True,
+               delete_after=("senlin.clusters",))
 class SenlinProfile(SenlinMixin):
     """Resource class for Senlin Profile."""
 
@@ -115,7 +128,7 @@ _nova_order = get_order(200)
 
 
 @base.resource("nova", "servers", order=next(_nova_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=("heat", "senlin"))
 class NovaServer(base.ResourceManager):
     def list(self):
         """List all servers."""
@@ -148,20 +161,22 @@ class NovaServer(base.ResourceManager):
         super(NovaServer, self).delete()
 
 
-@base.resource("nova", "floating_ips", order=next(_nova_order))
+@base.resource("nova", "floating_ips", order=next(_nova_order),
+               delete_after=_COMPUTE)
 class NovaFloatingIPs(SynchronizedDeletion, base.ResourceManager):
 
     def name(self):
         return None
 
 
-@base.resource("nova", "keypairs", order=next(_nova_order))
+@base.resource("nova", "keypairs", order=next(_nova_order),
+               delete_after=_COMPUTE)
 class NovaKeypair(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("nova", "security_groups", order=next(_nova_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -170,13 +185,15 @@ class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("nova", "quotas", order=next(_nova_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               delete_after=_COMPUTE + ("nova",))
 class NovaQuotas(QuotaMixin, base.ResourceManager):
     pass
 
 
 @base.resource("nova", "flavors", order=next(_nova_order),
-               admin_required=True, perform_for_admin_only=True)
+               admin_required=True, perform_for_admin_only=True,
+               delete_after=_COMPUTE)
 class NovaFlavors(base.ResourceManager):
     def list(self):
         return [r for r in self._manager().list()
@@ -192,7 +209,7 @@ class NovaFlavors(base.ResourceManager):
 
 
 @base.resource("nova", "floating_ips_bulk", order=next(_nova_order),
-               admin_required=True)
+               admin_required=True, delete_after=_COMPUTE)
 class NovaFloatingIpsBulk(SynchronizedDeletion, base.ResourceManager):
 
     def id(self):
@@ -208,7 +225,9 @@ class NovaFloatingIpsBulk(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("nova", "networks", order=next(_nova_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               delete_after=_COMPUTE + ("nova.floating_ips",
+                                        "nova.floating_ips_bulk"))
 class NovaNetworks(SynchronizedDeletion, base.ResourceManager):
 
     def name(self):
@@ -221,6 +240,7 @@ class NovaNetworks(SynchronizedDeletion, base.ResourceManager):
         # parameters. so we need to check if there are nova networks
         # whose name pattern matches those of any loaded plugin that
         # implements RandomNameGeneratorMixin
+        discover.import_lazy_modules()
         classes = list(discover.itersubclasses(utils.RandomNameGeneratorMixin))
         return [net for net in self._manager().list()
                 if utils.name_matches_object(net.label, *classes)]
@@ -237,7 +257,8 @@ class EC2Mixin(object):
         return getattr(self.user, self._service)()
 
 
-@base.resource("ec2", "servers", order=next(_ec2_order))
+@base.resource("ec2", "servers", order=next(_ec2_order),
+               delete_after=("heat",))
 class EC2Server(EC2Mixin, base.ResourceManager):
 
     def is_deleted(self):
@@ -260,6 +281,15 @@ class EC2Server(EC2Mixin, base.ResourceManager):
     def delete(self):
         self._manager().terminate_instances(instance_ids=[self.id()])
 
+    def delete_many(self, resources):
+        self._manager().terminate_instances(
+            instance_ids=[r.id() for r in resources])
+
+    def select_not_deleted(self, resources):
+        # terminated instances are listed for a while after the deletion
+        alive = set(i.id for i in self.list() if i.state != "terminated")
+        return [r for r in resources if r.id() in alive]
+
     def list(self):
         return self._manager().get_only_instances()
 
@@ -310,25 +340,28 @@ class NeutronLbaasV1Mixin(NeutronMixin):
 
 
 @base.resource("neutron", "vip", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class NeutronV1Vip(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "health_monitor", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class NeutronV1Healthmonitor(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "pool", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron.vip",
+                                        "neutron.health_monitor"))
 class NeutronV1Pool(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "port", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron.vip", "neutron.pool"))
 class NeutronPort(NeutronMixin):
 
     def delete(self):
@@ -349,31 +382,36 @@ class NeutronPort(NeutronMixin):
 
 
 @base.resource("neutron", "router", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE + ("neutron.port",))
 class NeutronRouter(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "subnet", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron.pool", "neutron.port",
+                                        "neutron.router"))
 class NeutronSubnet(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "network", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron.port", "neutron.router",
+                                        "neutron.subnet"))
 class NeutronNetwork(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "floatingip", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron.port", "neutron.router"))
 class NeutronFloatingIP(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "security_group", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE + ("neutron.port",))
 class NeutronSecurityGroup(NeutronMixin):
     def list(self):
         tenant_sgs = super(NeutronSecurityGroup, self).list()
@@ -384,7 +422,8 @@ class NeutronSecurityGroup(NeutronMixin):
 
 
 @base.resource("neutron", "quota", order=next(_neutron_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               delete_after=_COMPUTE + ("neutron",))
 class NeutronQuota(QuotaMixin, NeutronMixin):
 
     def delete(self):
@@ -397,31 +436,35 @@ _cinder_order = get_order(400)
 
 
 @base.resource("cinder", "backups", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class CinderVolumeBackup(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volume_snapshots", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class CinderVolumeSnapshot(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "transfers", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=_COMPUTE)
 class CinderVolumeTransfer(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volumes", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               delete_after=_COMPUTE + ("cinder.backups",
+                                        "cinder.volume_snapshots",
+                                        "cinder.transfers"))
 class CinderVolume(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "quotas", order=next(_cinder_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               delete_after=_COMPUTE + ("cinder",))
 class CinderQuotas(QuotaMixin, base.ResourceManager):
     pass
 
@@ -451,7 +494,8 @@ class ManilaSecurityService(base.ResourceManager):
 
 # GLANCE
 
-@base.resource("glance", "images", order=500, tenant_resource=True)
+@base.resource("glance", "images", order=500, tenant_resource=True,
+               delete_after=_COMPUTE)
 class GlanceImage(base.ResourceManager):
 
     def _client(self):
@@ -540,7 +584,8 @@ class SaharaNodeGroup(SynchronizedDeletion, base.ResourceManager):
 
 # CEILOMETER
 
-@base.resource("ceilometer", "alarms", order=700, tenant_resource=True)
+@base.resource("ceilometer", "alarms", order=700, tenant_resource=True,
+               delete_after=("heat",))
 class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
     def id(self):
@@ -557,7 +602,7 @@ class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
 # ZAQAR
 
-@base.resource("zaqar", "queues", order=800)
+@base.resource("zaqar", "queues", order=800, delete_after=())
 class ZaqarQueues(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -666,9 +711,54 @@ class SwiftMixin(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("swift", "object", order=next(_swift_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=("heat",))
 class SwiftObject(SwiftMixin):
 
+    # max number of objects deleted by a single request of the bulk delete
+    # middleware of swift (max_deletes_per_request)
+    BULK_DELETE_SIZE = 10000
+
+    def delete_many(self, resources):
+        failed = []
+        for i in range(0, len(resources), self.BULK_DELETE_SIZE):
+            chunk = resources[i:i + self.BULK_DELETE_SIZE]
+            response = {}
+            body = self._manager().post_account(
+                headers={"Content-Type": "text/plain",
+                         "Accept": "application/json"},
+                query_string="bulk-delete",
+                data="\n".join(parse.quote("/%s/%s" % tuple(r.raw_resource))
+                               for r in chunk),
+                response_dict=response)[1]
+            # without the bulk delete middleware POST just updates metadata
+            # of the account and returns 204
+            if response.get("status") != 200:
+                raise NotImplementedError()
+            failed.extend(self._get_failed_deletions(chunk, body))
+        return failed
+
+    @staticmethod
+    def _get_failed_deletions(resources, body):
+        # The bulk delete middleware responds with 200 as soon as it starts
+        # deleting objects, so the real status of the request and errors of
+        # particular objects (not found ones are not errors) are in the body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        result = json.loads(body)
+        errors = set(parse.unquote(path)
+                     for path, status in result.get("Errors") or [])
+        if errors:
+            LOG.debug("Bulk deletion of %d swift objects failed: %s"
+                      % (len(errors), result["Errors"]))
+            return [r for r in resources
+                    if "/%s/%s" % tuple(r.raw_resource) in errors]
+        if not result.get("Response Status", "200").startswith("2"):
+            LOG.debug("Bulk deletion of swift objects failed: %s %s"
+                      % (result["Response Status"],
+                         result.get("Response Body", "")))
+            return resources
+        return []
+
     def list(self):
         object_list = []
         containers = self._manager().get_account(full_listing=True)[1]
@@ -682,7 +772,7 @@ class SwiftObject(SwiftMixin):
 
 
 @base.resource("swift", "container", order=next(_swift_order),
-               tenant_resource=True)
+               tenant_resource=True, delete_after=("heat", "swift.object"))
 class SwiftContainer(SwiftMixin):
 
     def list(self):
@@ -692,7 +782,8 @@ class SwiftContainer(SwiftMixin):
 
 # MISTRAL
 
-@base.resource("mistral", "workbooks", order=1100, tenant_resource=True)
+@base.resource("mistral", "workbooks", order=1100, tenant_resource=True,
+               delete_after=())
 class MistralWorkbooks(SynchronizedDeletion, base.ResourceManager):
     def delete(self):
         self._manager().delete(self.raw_resource.name)
@@ -14,7 +14,6 @@
 
 from rally.common.i18n import _
 from rally.common import logging
-from rally.common import utils as rutils
 from rally import consts
 from rally.plugins.openstack.cleanup import manager as resource_manager
 from rally.plugins.openstack.scenarios.cinder import utils as cinder_utils
@@ -24,7 +23,8 @@ from rally.task import context
 LOG = logging.getLogger(__name__)
 
 
-@context.configure(name="volumes", order=420)
+@context.configure(name="volumes", order=420, reads=["users"],
+                   writes=["tenants.volumes"])
 class VolumeGenerator(context.Context):
     """Context class for adding volumes to each user for benchmarks."""
 
@@ -58,8 +58,7 @@ class VolumeGenerator(context.Context):
         volume_type = self.config.get("type", None)
         volumes_per_tenant = self.config["volumes_per_tenant"]
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        def create_volumes(user, tenant_id):
             self.context["tenants"][tenant_id].setdefault("volumes", [])
             cinder_util = cinder_utils.CinderScenario(
                 {"user": user,
@@ -69,6 +68,8 @@ class VolumeGenerator(context.Context):
                 vol = cinder_util._create_volume(size, volume_type=volume_type)
                 self.context["tenants"][tenant_id]["volumes"].append(vol._info)
 
+        self._run_per_tenants(create_volumes)
+
     @logging.log_task_wrapper(LOG.info, _("Exit context: `Volumes`"))
     def cleanup(self):
         # TODO(boris-42): Delete only resources created by this context
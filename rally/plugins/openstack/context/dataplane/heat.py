@@ -15,6 +15,7 @@
 
 import pkgutil
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import utils as rutils
@@ -79,12 +80,17 @@ class HeatDataplane(context.Context):
             "context_parameters": {
                 "type": "object",
             },
+            "workers": {
+                "type": "integer",
+                "minimum": 1
+            },
         },
         "additionalProperties": False
     }
 
     DEFAULT_CONFIG = {
         "stacks_per_tenant": 1,
+        "workers": 1,
     }
 
     def _get_context_parameter(self, user, tenant_id, path):
@@ -118,27 +124,31 @@ class HeatDataplane(context.Context):
         with parameters.unlocked():
             if "network_id" not in parameters:
                 parameters["network_id"] = self._get_public_network_id()
-            for user, tenant_id in rutils.iterate_per_tenants(
-                    self.context["users"]):
-                for name, path in self.config.get("context_parameters",
-                                                  {}).items():
-                    parameters[name] = self._get_context_parameter(user,
-                                                                   tenant_id,
-                                                                   path)
-                if "router_id" not in parameters:
-                    networks = self.context["tenants"][tenant_id]["networks"]
-                    parameters["router_id"] = networks[0]["router_id"]
-                if "key_name" not in parameters:
-                    parameters["key_name"] = user["keypair"]["name"]
-                heat_scenario = heat_utils.HeatScenario(
-                    {"user": user, "task": self.context["task"]})
-                self.context["tenants"][tenant_id]["stack_dataplane"] = []
-                for i in range(self.config["stacks_per_tenant"]):
-                    stack = heat_scenario._create_stack(template, files=files,
-                                                        parameters=parameters)
-                    tenant_data = self.context["tenants"][tenant_id]
-                    tenant_data["stack_dataplane"].append([stack.id, template,
-                                                           files, parameters])
+
+        def create_stacks(user, tenant_id):
+            tenant_parameters = dict(parameters)
+            for name, path in self.config.get("context_parameters",
+                                              {}).items():
+                tenant_parameters[name] = self._get_context_parameter(
+                    user, tenant_id, path)
+            if "router_id" not in tenant_parameters:
+                networks = self.context["tenants"][tenant_id]["networks"]
+                tenant_parameters["router_id"] = networks[0]["router_id"]
+            if "key_name" not in tenant_parameters:
+                tenant_parameters["key_name"] = user["keypair"]["name"]
+            heat_scenario = heat_utils.HeatScenario(
+                {"user": user, "task": self.context["task"]})
+            tenant_data = self.context["tenants"][tenant_id]
+            tenant_data["stack_dataplane"] = []
+            for i in range(self.config["stacks_per_tenant"]):
+                stack = heat_scenario._create_stack(
+                    template, files=files, parameters=tenant_parameters)
+                tenant_data["stack_dataplane"].append(
+                    [stack.id, template, files, tenant_parameters])
+
+        # Stacks of up to `workers' tenants are created at once
+        broker.run_per_tenants(create_stacks, self.context["users"],
+                               self.config["workers"])
 
     @logging.log_task_wrapper(LOG.info, _("Exit context: `HeatDataplane`"))
     def cleanup(self):
@@ -16,7 +16,6 @@ from oslo_config import cfg
 
 from rally.common.i18n import _
 from rally.common import logging
-from rally.common import utils as rutils
 from rally import consts
 from rally import osclients
 from rally.plugins.openstack.wrappers import glance as glance_wrapper
@@ -34,7 +33,8 @@ CONF.import_opt("glance_image_delete_poll_interval",
 LOG = logging.getLogger(__name__)
 
 
-@context.configure(name="images", order=410)
+@context.configure(name="images", order=410, reads=["users"],
+                   writes=["tenants.images"])
 class ImageGenerator(context.Context):
     """Context class for adding images to each user for benchmarks."""
 
@@ -85,8 +85,7 @@ class ImageGenerator(context.Context):
         images_per_tenant = self.config["images_per_tenant"]
         image_name = self.config.get("image_name")
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        def create_images(user, tenant_id):
             current_images = []
             clients = osclients.Clients(
                 user["credential"],
@@ -118,10 +117,11 @@ class ImageGenerator(context.Context):
 
             self.context["tenants"][tenant_id]["images"] = current_images
 
+        self._run_per_tenants(create_images)
+
     @logging.log_task_wrapper(LOG.info, _("Exit context: `Images`"))
     def cleanup(self):
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        def delete_images(user, tenant_id):
             clients = osclients.Clients(
                 user["credential"],
                 api_info=self.context["config"].get("api_versions"))
@@ -136,3 +136,5 @@ class ImageGenerator(context.Context):
                     timeout=CONF.benchmark.glance_image_delete_timeout,
                     check_interval=CONF.benchmark.
                     glance_image_delete_poll_interval)
+
+        self._run_per_tenants(delete_images)
@@ -13,11 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
-from rally.common import utils
 from rally import consts
 from rally import osclients
 from rally.plugins.openstack.wrappers import network as network_wrapper
@@ -26,8 +27,11 @@ from rally.task import context
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
 
-@context.configure(name="network", order=350)
+
+@context.configure(name="network", order=350, reads=["admin", "users"],
+                   writes=["tenants.networks"])
 class Network(context.Context):
     """Create networking resources.
 
@@ -83,8 +87,8 @@ class Network(context.Context):
         kwargs = {}
         if self.config["dns_nameservers"] is not None:
             kwargs["dns_nameservers"] = self.config["dns_nameservers"]
-        for user, tenant_id in (utils.iterate_per_tenants(
-                self.context.get("users", []))):
+
+        def create_networks(user, tenant_id):
             self.context["tenants"][tenant_id]["networks"] = []
             for i in range(self.config["networks_per_tenant"]):
                 # NOTE(amaretskiy): add_router and subnets_num take effect
@@ -98,15 +102,23 @@ class Network(context.Context):
                     **kwargs)
                 self.context["tenants"][tenant_id]["networks"].append(network)
 
+        self._run_per_tenants(create_networks)
+
     @logging.log_task_wrapper(LOG.info, _("Exit context: `network`"))
     def cleanup(self):
         net_wrapper = network_wrapper.wrap(
             osclients.Clients(self.context["admin"]["credential"]),
             self, config=self.config)
-        for tenant_id, tenant_ctx in six.iteritems(self.context["tenants"]):
+
+        def delete_networks(args):
+            tenant_id, tenant_ctx = args
             for network in tenant_ctx.get("networks", []):
                 with logging.ExceptionLogger(
                         LOG,
                         _("Failed to delete network for tenant %s")
                         % tenant_id):
                     net_wrapper.delete_network(network)
+
+        broker.run_for_each(delete_networks,
+                            six.iteritems(self.context["tenants"]),
+                            CONF.context_tenant_workers)
@@ -12,6 +12,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from oslo_config import cfg
+
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import utils as rutils
@@ -25,8 +28,12 @@ from rally.task import context
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 
-@context.configure(name="servers", order=430)
+@context.configure(name="servers", order=430,
+                   reads=["users", "tenants.networks", "tenants.images"],
+                   writes=["tenants.servers"])
 class ServerGenerator(context.Context):
     """Context class for adding temporary servers for benchmarks.
 
@@ -92,8 +99,8 @@ class ServerGenerator(context.Context):
         flavor_id = types.Flavor.transform(clients=clients,
                                            resource_config=flavor)
 
-        for iter_, (user, tenant_id) in enumerate(rutils.iterate_per_tenants(
-                self.context["users"])):
+        def boot_servers(args):
+            iter_, (user, tenant_id) = args
             LOG.debug("Booting servers for user tenant %s "
                       % (user["tenant_id"]))
             tmp_context = {"user": user,
@@ -122,6 +129,11 @@ class ServerGenerator(context.Context):
             self.context["tenants"][tenant_id][
                 "servers"] = current_servers
 
+        broker.run_for_each(
+            boot_servers,
+            enumerate(rutils.iterate_per_tenants(self.context["users"])),
+            CONF.context_tenant_workers)
+
     @logging.log_task_wrapper(LOG.info, _("Exit context: `Servers`"))
     def cleanup(self):
         resource_manager.cleanup(names=["nova.servers"],
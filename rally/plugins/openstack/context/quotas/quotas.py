@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_config import cfg
+
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally import consts
@@ -27,6 +30,8 @@ from rally.task import context
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 
 @context.configure(name="quotas", order=300)
 class Quotas(context.Context):
@@ -65,7 +70,7 @@ class Quotas(context.Context):
 
     @logging.log_task_wrapper(LOG.info, _("Enter context: `quotas`"))
     def setup(self):
-        for tenant_id in self.context["tenants"]:
+        def update_quotas(tenant_id):
             for service in self.manager:
                 if self._service_has_quotas(service):
                     # NOTE(andreykurilin): in case of existing users it is
@@ -78,6 +83,9 @@ class Quotas(context.Context):
                     self.manager[service].update(tenant_id,
                                                  **self.config[service])
 
+        broker.run_for_each(update_quotas, list(self.context["tenants"]),
+                            CONF.context_tenant_workers)
+
     def _restore_quotas(self):
         for service, tenant_id, quotas in self.original_quotas:
             try:
@@ -91,15 +99,21 @@ class Quotas(context.Context):
     def _delete_quotas(self):
         for service in self.manager:
             if self._service_has_quotas(service):
-                for tenant_id in self.context["tenants"]:
-                    try:
-                        self.manager[service].delete(tenant_id)
-                    except Exception as e:
-                        LOG.warning("Failed to remove quotas for tenant "
-                                    "%(tenant_id)s in service %(service)s "
-                                    "\n reason: %(exc)s"
-                                    % {"tenant_id": tenant_id,
-                                       "service": service, "exc": e})
+                broker.run_for_each(
+                    lambda tenant_id: self._delete_tenant_quotas(service,
+                                                                 tenant_id),
+                    list(self.context["tenants"]),
+                    CONF.context_tenant_workers)
+
+    def _delete_tenant_quotas(self, service, tenant_id):
+        try:
+            self.manager[service].delete(tenant_id)
+        except Exception as e:
+            LOG.warning("Failed to remove quotas for tenant "
+                        "%(tenant_id)s in service %(service)s "
+                        "\n reason: %(exc)s"
+                        % {"tenant_id": tenant_id,
+                           "service": service, "exc": e})
 
     @logging.log_task_wrapper(LOG.info, _("Exit context: `quotas`"))
     def cleanup(self):
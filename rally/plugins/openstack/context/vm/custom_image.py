@@ -32,8 +32,8 @@ from rally.task import context
 LOG = logging.getLogger(__name__)
 
 
-@six.add_metaclass(abc.ABCMeta)
 @context.configure(name="custom_image", order=500, hidden=True)
+@six.add_metaclass(abc.ABCMeta)
 class BaseCustomImageGenerator(context.Context):
     """Base class for the contexts providing customized image with.
 
@@ -553,6 +553,13 @@ class NovaScenario(scenario.OpenStackScenario):
 
         :returns: List of created server objects
         """
+        secgroup = self.context.get("user", {}).get("secgroup")
+        if secgroup:
+            if "security_groups" not in kwargs:
+                kwargs["security_groups"] = [secgroup["name"]]
+            elif secgroup["name"] not in kwargs["security_groups"]:
+                kwargs["security_groups"].append(secgroup["name"])
+
         if auto_assign_nic and not kwargs.get("nics", False):
             nic = self._pick_random_nic()
             if nic:
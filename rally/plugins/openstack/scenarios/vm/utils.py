@@ -21,6 +21,7 @@ import netaddr
 from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import sshutils
@@ -100,20 +101,16 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
 
     RESOURCE_NAME_PREFIX = "rally_vm_"
 
-    @atomic.action_timer("vm.run_command_over_ssh")
-    def _run_command_over_ssh(self, ssh, command):
-        """Run command inside an instance.
-
-        This is a separate function so that only script execution is timed.
+    def _get_command_line(self, command):
+        """Return the command line of the command dictionary.
 
-        :param ssh: A SSHClient instance.
         :param command: Dictionary specifying command to execute.
             See `rally info find VMTasks.boot_runcommand_delete' parameter
             `command' docstring for explanation.
 
-        :returns: tuple (exit_status, stdout, stderr)
+        :returns: list with the command line
         """
-        cmd, stdin = [], None
+        cmd = []
 
         interpreter = command.get("interpreter") or []
         if interpreter:
@@ -132,9 +129,35 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
                 raise ValueError("command 'remote_path' value must be str "
                                  "or list type")
             cmd.extend(remote_path)
-            if command.get("local_path"):
-                ssh.put_file(command["local_path"], remote_path[-1],
-                             mode=self.USER_RWX_OTHERS_RX_ACCESS_MODE)
+
+        cmd.extend(command.get("command_args") or [])
+        return cmd
+
+    def _put_command_file(self, ssh, command):
+        """Upload `local_path' of the command to its `remote_path'."""
+        remote_path = command.get("remote_path")
+        if remote_path and command.get("local_path"):
+            if isinstance(remote_path, six.string_types):
+                remote_path = [remote_path]
+            ssh.put_file(command["local_path"], remote_path[-1],
+                         mode=self.USER_RWX_OTHERS_RX_ACCESS_MODE)
+
+    @atomic.action_timer("vm.run_command_over_ssh")
+    def _run_command_over_ssh(self, ssh, command):
+        """Run command inside an instance.
+
+        This is a separate function so that only script execution is timed.
+
+        :param ssh: A SSHClient instance.
+        :param command: Dictionary specifying command to execute.
+            See `rally info find VMTasks.boot_runcommand_delete' parameter
+            `command' docstring for explanation.
+
+        :returns: tuple (exit_status, stdout, stderr)
+        """
+        stdin = None
+        cmd = self._get_command_line(command)
+        self._put_command_file(ssh, command)
 
         if command.get("script_file"):
             stdin = open(os.path.expanduser(command["script_file"]), "rb")
@@ -142,16 +165,73 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
         elif command.get("script_inline"):
             stdin = six.moves.StringIO(command["script_inline"])
 
-        cmd.extend(command.get("command_args") or [])
-
         return ssh.execute(cmd, stdin=stdin)
 
+    @atomic.action_timer("vm.run_command_over_ssh")
+    def _run_command_over_ssh_many(self, hosts, command, concurrency=100):
+        """Run command inside many instances concurrently.
+
+        :param hosts: list of SSHClient instances
+        :param command: Dictionary specifying command to execute.
+            See `rally info find VMTasks.boot_runcommand_delete' parameter
+            `command' docstring for explanation.
+        :param concurrency: max number of instances processed at once
+
+        :returns: list of results in order of hosts, see
+                  rally.common.sshutils.run_many
+        """
+        stdin = None
+        cmd = self._get_command_line(command)
+        if command.get("remote_path") and command.get("local_path"):
+            broker.run_for_each(
+                lambda ssh: self._put_command_file(ssh, command),
+                hosts, concurrency)
+
+        if command.get("script_file"):
+            with open(os.path.expanduser(command["script_file"]),
+                      "rb") as script_file:
+                stdin = script_file.read()
+
+        elif command.get("script_inline"):
+            stdin = command["script_inline"]
+
+        return sshutils.run_many(hosts, cmd, stdin=stdin,
+                                 concurrency=concurrency)
+
     def _boot_server_with_fip(self, image, flavor, use_floating_ip=True,
                               floating_network=None, **kwargs):
         """Boot server prepared for SSH actions."""
         kwargs["auto_assign_nic"] = True
         server = self._boot_server(image, flavor, **kwargs)
+        return server, self._get_server_fip(server, use_floating_ip,
+                                            floating_network)
+
+    def _boot_servers_with_fip(self, image, flavor, servers_count,
+                               use_floating_ip=True, floating_network=None,
+                               concurrency=100, **kwargs):
+        """Boot servers prepared for SSH actions at once.
 
+        The servers are booted by one request and waited for together,
+        then floating IPs are attached to them concurrently.
+
+        :returns: list of (server, fip) tuples
+        """
+        servers = self._boot_servers(image, flavor, 1,
+                                     instances_amount=servers_count,
+                                     auto_assign_nic=True, **kwargs)
+
+        def get_fip(server):
+            return self._get_server_fip(server, use_floating_ip,
+                                        floating_network, atomic_action=False)
+
+        if not use_floating_ip:
+            return [(server, get_fip(server)) for server in servers]
+        with atomic.ActionTimer(self, "vm.attach_floating_ips"):
+            fips = broker.run_for_each(get_fip, servers, concurrency)
+        return list(zip(servers, fips))
+
+    def _get_server_fip(self, server, use_floating_ip=True,
+                        floating_network=None, atomic_action=True):
         if not server.networks:
             raise RuntimeError(
                 "Server `%s' is not connected to any network. "
@@ -160,16 +240,17 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
                 server.name)
 
         if use_floating_ip:
-            fip = self._attach_floating_ip(server, floating_network)
+            fip = self._attach_floating_ip(server, floating_network,
+                                           atomic_action=atomic_action)
         else:
             internal_network = list(server.networks)[0]
             fip = {"ip": server.addresses[internal_network][0]["addr"]}
 
-        return server, {"ip": fip.get("ip"),
-                        "id": fip.get("id"),
-                        "is_floating": use_floating_ip}
+        return {"ip": fip.get("ip"),
+                "id": fip.get("id"),
+                "is_floating": use_floating_ip}
 
-    @atomic.action_timer("vm.attach_floating_ip")
+    @atomic.optional_action_timer("vm.attach_floating_ip")
     def _attach_floating_ip(self, server, floating_network):
         internal_network = list(server.networks)[0]
         fixed_ip = server.addresses[internal_network][0]["addr"]
@@ -183,7 +264,7 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
 
         return fip
 
-    @atomic.action_timer("vm.delete_floating_ip")
+    @atomic.optional_action_timer("vm.delete_floating_ip")
     def _delete_floating_ip(self, server, fip):
         with logging.ExceptionLogger(
                 LOG, _("Unable to delete IP: %s") % fip["ip"]):
@@ -194,15 +275,49 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
                     fip["id"], wait=True)
 
     def _delete_server_with_fip(self, server, fip, force_delete=False):
+        # The address is reused by other servers, so connections to it
+        # are not kept in the pool
+        sshutils.CONNECTIONS_POOL.close_host(fip["ip"])
         if fip["is_floating"]:
             self._delete_floating_ip(server, fip)
         return self._delete_server(server, force=force_delete)
 
+    def _delete_servers_with_fip(self, servers, force_delete=False,
+                                 concurrency=100):
+        """Delete servers and their floating IPs at once.
+
+        :param servers: list of (server, fip) tuples
+        """
+        for server, fip in servers:
+            sshutils.CONNECTIONS_POOL.close_host(fip["ip"])
+        floating = [(server, fip) for server, fip in servers
+                    if fip["is_floating"]]
+        if floating:
+            with atomic.ActionTimer(self, "vm.delete_floating_ips"):
+                broker.run_for_each(
+                    lambda args: self._delete_floating_ip(
+                        *args, atomic_action=False),
+                    floating, concurrency)
+        self._delete_servers([server for server, fip in servers],
+                             force=force_delete)
+
     @atomic.action_timer("vm.wait_for_ssh")
     def _wait_for_ssh(self, ssh, timeout=120, interval=1):
         ssh.wait(timeout, interval)
 
+    @atomic.action_timer("vm.wait_for_ssh")
+    def _wait_for_ssh_many(self, hosts, timeout=120, interval=1,
+                           concurrency=100):
+        broker.run_for_each(lambda ssh: ssh.wait(timeout, interval),
+                            hosts, concurrency)
+
     @atomic.action_timer("vm.wait_for_ping")
+    def _wait_for_ping_many(self, server_ips, concurrency=100):
+        broker.run_for_each(
+            lambda ip: self._wait_for_ping(ip, atomic_action=False),
+            server_ips, concurrency)
+
+    @atomic.optional_action_timer("vm.wait_for_ping")
     def _wait_for_ping(self, server_ip):
         server = Host(server_ip)
         utils.wait_for_status(
@@ -240,3 +355,33 @@ class VMScenario(nova_utils.NovaScenario, cinder_utils.CinderScenario):
                            pkey=pkey, password=password)
         self._wait_for_ssh(ssh, timeout, interval)
         return self._run_command_over_ssh(ssh, command)
+
+    def _run_command_many(self, servers_ips, port, username, password,
+                          command, pkey=None, timeout=120, interval=1,
+                          concurrency=100):
+        """Run command via SSH on many servers concurrently.
+
+        The same as _run_command, but all the servers are waited for and
+        run the command at once, up to concurrency servers at a time.
+
+        :param servers_ips: list of server ip addresses
+        :param port: ssh port for SSH connection
+        :param username: str. ssh username for servers
+        :param password: Password for SSH authentication
+        :param command: Dictionary specifying command to execute.
+            See `rally info find VMTasks.boot_runcommand_delete' parameter
+            `command' docstring for explanation.
+        :param pkey: key for SSH authentication
+        :param timeout: wait for ssh timeout. Default is 120 seconds
+        :param interval: ssh retry interval. Default is 1 second
+        :param concurrency: max number of servers processed at once
+
+        :returns: list of results in order of servers_ips, see
+                  rally.common.sshutils.run_many
+        """
+        pkey = pkey if pkey else self.context["user"]["keypair"]["private"]
+        hosts = [sshutils.SSH(username, server_ip, port=port,
+                              pkey=pkey, password=password)
+                 for server_ip in servers_ips]
+        self._wait_for_ssh_many(hosts, timeout, interval, concurrency)
+        return self._run_command_over_ssh_many(hosts, command, concurrency)
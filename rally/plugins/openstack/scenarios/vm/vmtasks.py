@@ -223,6 +223,97 @@ class VMTasks(vm_utils.VMScenario):
                 for chart in charts:
                     self.add_output(**{chart_type: chart})
 
+    @types.convert(image={"type": "glance_image"},
+                   flavor={"type": "nova_flavor"})
+    @validation.image_valid_on_flavor("flavor", "image")
+    @validation.valid_command("command")
+    @validation.number("servers_count", minval=1, integer_only=True)
+    @validation.number("concurrency", minval=1, integer_only=True)
+    @validation.number("port", minval=1, maxval=65535, nullable=True,
+                       integer_only=True)
+    @validation.external_network_exists("floating_network")
+    @validation.required_services(consts.Service.NOVA)
+    @validation.required_openstack(users=True)
+    @scenario.configure(context={"cleanup": ["nova"],
+                                 "keypair": {}, "allow_ssh": {}})
+    def boot_many_runcommand_delete(self, image, flavor, username,
+                                    servers_count,
+                                    password=None,
+                                    command=None,
+                                    floating_network=None,
+                                    port=22,
+                                    use_floating_ip=True,
+                                    force_delete=False,
+                                    wait_for_ping=True,
+                                    concurrency=100,
+                                    **kwargs):
+        """Boot servers, run the command on all of them at once, delete them.
+
+        This is the parallel mode of boot_runcommand_delete: the servers are
+        booted by one request, then they are pinged, waited for and run the
+        command concurrently over ssh, so the load of hundreds of servers
+        can be generated by one iteration. The exit status of the command
+        on each server is reported in the "Command results" table.
+
+        :param image: glance image name to use for the vms
+        :param flavor: VM flavor name
+        :param username: ssh username on servers, str
+        :param servers_count: number of servers to boot
+        :param password: Password on SSH authentication
+        :param command: Command-specifying dictionary, see
+            boot_runcommand_delete
+        :param floating_network: external network name, for floating ip
+        :param port: ssh port for SSH connection
+        :param use_floating_ip: bool, floating or fixed IP for SSH connection
+        :param force_delete: whether to use force_delete for servers
+        :param wait_for_ping: whether to check connectivity on server creation
+        :param concurrency: max number of servers which are processed at
+                            once: given floating IPs, pinged, connected to
+                            and run the command
+        :param **kwargs: extra arguments for booting the servers
+        :raises ScriptError: if the command has failed on any server
+        """
+        servers = self._boot_servers_with_fip(
+            image, flavor, servers_count, use_floating_ip=use_floating_ip,
+            floating_network=floating_network, concurrency=concurrency,
+            key_name=self.context["user"]["keypair"]["name"], **kwargs)
+        try:
+            ips = [fip["ip"] for server, fip in servers]
+            if wait_for_ping:
+                self._wait_for_ping_many(ips, concurrency)
+
+            results = self._run_command_many(
+                ips, port, username, password, command=command,
+                concurrency=concurrency)
+        finally:
+            self._delete_servers_with_fip(servers, force_delete=force_delete,
+                                          concurrency=concurrency)
+
+        rows = []
+        errors = []
+        for ip, result in zip(ips, results):
+            if isinstance(result, Exception):
+                rows.append([ip, str(result)])
+                errors.append("%s: %s" % (ip, result))
+                continue
+            code, out, err = result
+            rows.append([ip, code])
+            if code:
+                errors.append("%s: error %s: %s" % (ip, code, err))
+
+        self.add_output(
+            complete={"title": "Command results",
+                      "description": "Exit status of the command on servers",
+                      "chart_plugin": "Table",
+                      "data": {"cols": ["server", "exit status"],
+                               "rows": rows}})
+        if errors:
+            raise exceptions.ScriptError(
+                "Error running command %(command)s on %(failed)d of "
+                "%(total)d servers:\n%(errors)s" % {
+                    "command": command, "failed": len(errors),
+                    "total": len(ips), "errors": "\n".join(errors)})
+
     @types.convert(image={"type": "glance_image"},
                    flavor={"type": "nova_flavor"})
     @validation.number("port", minval=1, maxval=65535, nullable=True,
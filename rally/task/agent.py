@@ -0,0 +1,334 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Agents which run shards of workloads of the distributed runner.
+
+An agent is a process on a load generating host. It registers itself in
+the workers table of the Rally DB (the hostname of the worker is the
+address of the agent, so several agents can run on one host) and marks
+itself as active every `agent_heartbeat_interval` seconds.
+
+The distributed runner (see rally.plugins.common.runners.distributed)
+connects to the alive agents and sends each of them a job: the scenario,
+its arguments, the context which is set up by the coordinator and the
+config of the runner which produces the shard of the load. The agent runs
+it with that runner and streams results back in batches encoded by
+transport.ResultsEncoder. Messages are tuples of their kind and payload:
+
+* coordinator to agent: ("run", job), ("abort", None);
+* agent to coordinator: ("results", message), ("heartbeat", None) and
+  finally ("done", {"results": count, "error": error or None}).
+
+Connections are authenticated by `agent_authkey`, which should be the same
+on all the hosts, since jobs are pickled objects.
+"""
+
+import datetime as dt
+from multiprocessing import connection
+import socket
+import threading
+
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from rally.common import db
+from rally.common.i18n import _
+from rally.common import logging
+from rally import exceptions
+from rally.task import atomic
+from rally.task import runner
+from rally.task import transport
+from rally.task import utils
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+AGENT_OPTS = [
+    cfg.StrOpt("agent_authkey", secret=True,
+               help="Secret key which authenticates the distributed runner "
+                    "and its agents to each other, it should be the same "
+                    "on all the hosts"),
+    cfg.FloatOpt("agent_heartbeat_interval", default=5.0, min=0.1,
+                 help="Interval between heartbeats of agents of the "
+                      "distributed runner, in seconds"),
+    cfg.FloatOpt("agent_heartbeat_timeout", default=30.0, min=0.1,
+                 help="Agents which haven't sent heartbeats for this "
+                      "number of seconds are considered dead")
+]
+CONF.register_opts(AGENT_OPTS)
+
+
+def _get_authkey():
+    if not CONF.agent_authkey:
+        raise exceptions.RallyException(
+            _("Option agent_authkey should be set to run the distributed "
+              "runner and its agents."))
+    return CONF.agent_authkey.encode("utf-8")
+
+
+def _parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def list_agents():
+    """Return registered agents with their health.
+
+    :returns: list of dicts with address, updated_at and alive keys
+    """
+    deadline = timeutils.utcnow() - dt.timedelta(
+        seconds=CONF.agent_heartbeat_timeout)
+    return [{"address": w["hostname"],
+             "updated_at": w["updated_at"],
+             "alive": w["updated_at"] > deadline}
+            for w in db.list_workers()]
+
+
+def get_alive_agents():
+    """Return addresses of agents which have sent heartbeats recently."""
+    deadline = timeutils.utcnow() - dt.timedelta(
+        seconds=CONF.agent_heartbeat_timeout)
+    return [w["hostname"] for w in db.list_workers(updated_after=deadline)]
+
+
+class Agent(object):
+    """Server which runs jobs of the distributed runner one by one."""
+
+    def __init__(self, host="0.0.0.0", port=0, public_host=None):
+        """Agent constructor.
+
+        :param host: host to listen at
+        :param port: port to listen at, 0 means any free port
+        :param public_host: host which the coordinator connects to, the
+                            FQDN of the host by default
+        """
+        self.listener = connection.Listener((host, port),
+                                            authkey=_get_authkey())
+        if not public_host:
+            public_host = (socket.getfqdn() if host in ("", "0.0.0.0")
+                           else host)
+        self._listener_address = self.listener.address
+        self.address = "%s:%d" % (public_host, self._listener_address[1])
+        self._stopped = threading.Event()
+
+    def serve(self):
+        """Register the agent and run jobs until the agent is stopped."""
+        db.register_worker({"hostname": self.address})
+        heartbeat = threading.Thread(target=self._send_heartbeats)
+        heartbeat.start()
+        LOG.info("Agent %s is started." % self.address)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    conn = self.listener.accept()
+                except (connection.AuthenticationError, EOFError,
+                        IOError, OSError) as e:
+                    if not self._stopped.is_set():
+                        LOG.warning("Agent %s rejected a connection: %s"
+                                    % (self.address, e))
+                    continue
+                try:
+                    if not self._stopped.is_set():
+                        self._handle(conn)
+                except Exception as e:
+                    LOG.exception(e)
+                finally:
+                    conn.close()
+        finally:
+            self._stopped.set()
+            heartbeat.join()
+            self.listener.close()
+            try:
+                db.unregister_worker(self.address)
+            except exceptions.WorkerNotFound:
+                pass
+            LOG.info("Agent %s is stopped." % self.address)
+
+    def stop(self):
+        """Stop serving after the current job."""
+        self._stopped.set()
+        # wake up the listener which waits for connections
+        try:
+            connection.Client(self._listener_address,
+                              authkey=_get_authkey()).close()
+        except (connection.AuthenticationError, EOFError, IOError, OSError):
+            pass
+
+    def _send_heartbeats(self):
+        while not self._stopped.wait(CONF.agent_heartbeat_interval):
+            try:
+                db.update_worker(self.address)
+            except Exception as e:
+                LOG.exception(e)
+
+    def _handle(self, conn):
+        try:
+            kind, job = conn.recv()
+            if kind != "run":
+                return
+            runner_cls = runner.ScenarioRunner.get(job["runner"]["type"])
+            runner_obj = runner_cls(job["context"]["task"], job["runner"])
+        except (EOFError, IOError, OSError):
+            return
+        except Exception as e:
+            LOG.exception(e)
+            conn.send(("done", {"results": 0, "error": utils.format_exc(e)}))
+            return
+
+        LOG.info("Agent %(address)s is running %(cls)s.%(method)s with "
+                 "the runner config %(config)s."
+                 % {"address": self.address, "cls": job["cls"].__name__,
+                    "method": job["method_name"], "config": job["runner"]})
+        done = threading.Event()
+        stats = {"results": 0, "error": None}
+        run_thread = threading.Thread(
+            target=self._run, args=(runner_obj, job, done, stats))
+        run_thread.start()
+        abort_thread = threading.Thread(
+            target=self._wait_for_abort, args=(conn, runner_obj, done))
+        abort_thread.start()
+        try:
+            self._send_results(conn, runner_obj, done, stats)
+            conn.send(("done", stats))
+        except (IOError, OSError) as e:
+            LOG.warning("Agent %s lost the coordinator: %s"
+                        % (self.address, e))
+            runner_obj.abort()
+        finally:
+            run_thread.join()
+            abort_thread.join()
+
+    @staticmethod
+    def _run(runner_obj, job, done, stats):
+        atomic.reset_history()
+        try:
+            # types of arguments are preprocessed by the coordinator
+            runner_obj._run_scenario(job["cls"], job["method_name"],
+                                     job["context"], job["args"])
+        except Exception as e:
+            LOG.exception(e)
+            stats["error"] = utils.format_exc(e)
+        finally:
+            done.set()
+            runner_obj.notify_results_waiters()
+
+    @staticmethod
+    def _send_results(conn, runner_obj, done, stats):
+        encoder = transport.ResultsEncoder()
+        while True:
+            finished = done.is_set()
+            sent = False
+            while runner_obj.result_queue:
+                results = runner_obj.result_queue.popleft()
+                if results:
+                    conn.send(("results", encoder.encode(results)))
+                    stats["results"] += len(results)
+                    sent = True
+            if finished:
+                return
+            if not sent:
+                conn.send(("heartbeat", None))
+            runner_obj.wait_for_results(CONF.agent_heartbeat_interval, done)
+
+    @staticmethod
+    def _wait_for_abort(conn, runner_obj, done):
+        while not done.is_set():
+            try:
+                if not conn.poll(0.1):
+                    continue
+                kind, payload = conn.recv()
+            except (EOFError, IOError, OSError):
+                runner_obj.abort()
+                return
+            if kind == "abort":
+                runner_obj.abort()
+
+
+class AgentClient(object):
+    """Runs a job on the agent and receives its results."""
+
+    def __init__(self, address):
+        """Client constructor.
+
+        :param address: address of the agent, "host:port"
+        """
+        self.address = address
+        self.status = "pending"
+        self.results = 0
+        self.error = None
+
+    def run(self, job, aborted, store_results):
+        """Run the job and wait until the agent finishes it.
+
+        :param job: dict with cls, method_name, context, args and runner
+                    (config of the runner) keys
+        :param aborted: threading or multiprocessing Event, when it is set
+                        the job is aborted
+        :param store_results: function which is called with each list of
+                              received results
+        """
+        try:
+            conn = connection.Client(_parse_address(self.address),
+                                     authkey=_get_authkey())
+        except (connection.AuthenticationError, EOFError,
+                IOError, OSError) as e:
+            self._set_status("unreachable", str(e))
+            return
+
+        self.status = "running"
+        decoder = transport.ResultsDecoder()
+        abort_sent = False
+        heard_at = timeutils.utcnow()
+        try:
+            conn.send(("run", job))
+            while True:
+                if aborted.is_set() and not abort_sent:
+                    conn.send(("abort", None))
+                    abort_sent = True
+                if not conn.poll(0.1):
+                    silence = timeutils.utcnow() - heard_at
+                    if (silence.total_seconds() >
+                            CONF.agent_heartbeat_timeout):
+                        self._set_status(
+                            "lost", "No heartbeats for %s" % silence)
+                        return
+                    continue
+                heard_at = timeutils.utcnow()
+                kind, payload = conn.recv()
+                if kind == "results":
+                    results = decoder.decode(payload)
+                    self.results += len(results)
+                    store_results(results)
+                elif kind == "done":
+                    if payload["error"]:
+                        self._set_status("failed", payload["error"][1])
+                    else:
+                        self.status = "finished"
+                    return
+        except (EOFError, IOError, OSError) as e:
+            self._set_status("lost", str(e) or e.__class__.__name__)
+        except Exception as e:
+            # e.g. the job can't be pickled
+            self._set_status("failed", str(e))
+        finally:
+            conn.close()
+
+    def _set_status(self, status, error):
+        self.status = status
+        self.error = error
+        LOG.error("Agent %(address)s is %(status)s: %(error)s"
+                  % {"address": self.address, "status": status,
+                     "error": error})
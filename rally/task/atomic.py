@@ -15,19 +15,105 @@
 
 import collections
 import functools
+import sys
+import threading
+import weakref
 
 from rally.common import utils
 
+try:
+    import asyncio
+except ImportError:
+    # Python 2.7, coroutine scenarios are not supported. Other modules use
+    # atomic.asyncio instead of importing it on their own
+    asyncio = None
+
+
+# How many durations of the latest atomic actions of each name are kept
+HISTORY_SIZE = 50
+
+# Durations of the latest successful atomic actions of the process by names
+_history = collections.defaultdict(
+    lambda: collections.deque(maxlen=HISTORY_SIZE))
+
+# Stacks of the ActionTimer objects which are entered in the thread and in
+# the tasks of event loops, coroutines of the same loop have separate ones
+_local = threading.local()
+_task_timers = weakref.WeakKeyDictionary()
+
+
+def get_expected_duration(name):
+    """Return the median duration of the latest atomic actions of the name.
+
+    :returns: duration in seconds or None if there were no such actions
+    """
+    durations = sorted(_history.get(name, ()))
+    if not durations:
+        return None
+    return durations[len(durations) // 2]
+
+
+def reset_history():
+    """Forget durations of the finished atomic actions."""
+    _history.clear()
+
+
+def _get_current_task():
+    """Return the asyncio task which is running in the thread, if any."""
+    if asyncio is None:
+        return None
+    get_running_loop = getattr(asyncio, "_get_running_loop", None)
+    if get_running_loop is not None and get_running_loop() is None:
+        return None
+    current_task = (getattr(asyncio, "current_task", None) or
+                    asyncio.Task.current_task)
+    try:
+        return current_task()
+    except RuntimeError:
+        # there is no event loop in the thread
+        return None
+
+
+def _get_timers():
+    task = _get_current_task()
+    if task is not None:
+        return _task_timers.setdefault(task, [])
+    if not hasattr(_local, "timers"):
+        _local.timers = []
+    return _local.timers
+
+
+def get_active_timers():
+    """Return ActionTimer objects active in the iteration, outer ones first.
+
+    Iterations of threads and coroutine iterations (asyncio tasks) have
+    their own stacks of timers, so concurrent iterations do not see timers
+    of each other.
+    """
+    return list(_get_timers())
+
 
 class ActionTimerMixin(object):
 
     def __init__(self):
         self._atomic_actions = collections.OrderedDict()
+        self._atomic_actions_uncertainty = collections.OrderedDict()
 
     def atomic_actions(self):
         """Returns the content of each atomic action."""
         return self._atomic_actions
 
+    def atomic_actions_uncertainty(self):
+        """Returns uncertainties of durations of atomic actions.
+
+        The uncertainty is known for actions which wait for a status of a
+        resource (see rally.task.utils.wait_for_status): it is the time
+        between the last poll which found the resource not ready and the
+        poll which found it ready, i.e. how much the duration of the action
+        could overshoot the real one.
+        """
+        return self._atomic_actions_uncertainty
+
 
 class ActionTimer(utils.Timer):
     """A class to measure the duration of atomic operations
@@ -48,8 +134,13 @@ class ActionTimer(utils.Timer):
         """
         super(ActionTimer, self).__init__()
         self.instance = instance
+        self.history_name = name
         self.name = self._get_atomic_action_name(instance, name)
         self.instance._atomic_actions[self.name] = None
+        self.uncertainty = None
+
+    def add_uncertainty(self, uncertainty):
+        self.uncertainty = (self.uncertainty or 0) + uncertainty
 
     @classmethod
     def _get_atomic_action_name(cls, instance, name):
@@ -66,9 +157,71 @@ class ActionTimer(utils.Timer):
             i += 1
         return name_template % i
 
+    def __enter__(self):
+        super(ActionTimer, self).__enter__()
+        self._timers = _get_timers()
+        self._timers.append(self)
+        return self
+
     def __exit__(self, type_, value, tb):
         super(ActionTimer, self).__exit__(type_, value, tb)
-        self.instance._atomic_actions[self.name] = self.duration()
+        self._timers.remove(self)
+        duration = self.duration()
+        self.instance._atomic_actions[self.name] = duration
+        if self.uncertainty is not None:
+            self.instance._atomic_actions_uncertainty[self.name] = (
+                self.uncertainty)
+        if type_ is None:
+            _history[self.history_name].append(duration)
+
+
+def is_awaitable(obj):
+    """Check whether obj is a coroutine or a future of the event loop."""
+    return asyncio is not None and (asyncio.iscoroutine(obj) or
+                                    isinstance(obj, asyncio.Future))
+
+
+def get_future_exc_info(future):
+    """Return exc_info of the exception of the done future.
+
+    :returns: (type, value, traceback) or (None, None, None) if the future
+              has a result
+    """
+    if future.cancelled():
+        return asyncio.CancelledError, asyncio.CancelledError(), None
+    exc = future.exception()
+    if exc is None:
+        return None, None, None
+    return type(exc), exc, exc.__traceback__
+
+
+def _timed_call(instance, name, func, args, kwargs):
+    """Call func within ActionTimer.
+
+    If func is a coroutine method, i.e. it returns an awaitable, the timer
+    is stopped when the awaitable is done instead of when func returns, and
+    a future of the awaitable is returned. The awaitable is run by its own
+    task, which inherits the active timers of the caller, and the timer is
+    active in that task only.
+    """
+    timer = ActionTimer(instance, name)
+    timer.__enter__()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException:
+        timer.__exit__(*sys.exc_info())
+        raise
+    if not is_awaitable(result):
+        timer.__exit__(None, None, None)
+        return result
+
+    timers = get_active_timers()
+    timer._timers.remove(timer)
+    future = asyncio.ensure_future(result)
+    _task_timers[future] = timer._timers = timers
+    future.add_done_callback(
+        lambda f: timer.__exit__(*get_future_exc_info(f)))
+    return future
 
 
 def action_timer(name):
@@ -76,13 +229,12 @@ def action_timer(name):
 
     Decorates methods of the Scenario class.
     This provides duration in seconds of each atomic action.
+    Coroutine methods are measured until the coroutine is done.
     """
     def wrap(func):
         @functools.wraps(func)
         def func_atomic_actions(self, *args, **kwargs):
-            with ActionTimer(self, name):
-                f = func(self, *args, **kwargs)
-            return f
+            return _timed_call(self, name, func, (self,) + args, kwargs)
         return func_atomic_actions
     return wrap
 
@@ -109,10 +261,7 @@ def optional_action_timer(name, argument_name="atomic_action", default=True):
         @functools.wraps(func)
         def func_atomic_actions(self, *args, **kwargs):
             if kwargs.pop(argument_name, default):
-                with ActionTimer(self, name):
-                    f = func(self, *args, **kwargs)
-            else:
-                f = func(self, *args, **kwargs)
-            return f
+                return _timed_call(self, name, func, (self,) + args, kwargs)
+            return func(self, *args, **kwargs)
         return func_atomic_actions
     return wrap
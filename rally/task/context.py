@@ -14,11 +14,16 @@
 #    under the License.
 
 import abc
+import collections
 import copy
+import threading
+import time
 
 import jsonschema
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common import logging
 from rally.common.plugin import plugin
 from rally.common import utils
@@ -27,8 +32,17 @@ from rally.task import functional
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
 
-def configure(name, order, hidden=False):
+CONTEXT_OPTS = [
+    cfg.IntOpt("context_tenant_workers", default=20, min=1,
+               help="How many tenants are set up (and cleaned up) "
+                    "concurrently by per-tenant contexts")
+]
+CONF.register_opts(CONTEXT_OPTS)
+
+
+def configure(name, order, hidden=False, reads=None, writes=None):
     """Context class wrapper.
 
     Each context class has to be wrapped by configure() wrapper. It
@@ -41,11 +55,22 @@ def configure(name, order, hidden=False):
                   Contexts with smaller order are run first
     :param hidden: If it is true you won't be able to specify context via
                    task config
+    :param reads: Keys of the context object the context depends on, e.g.
+                  "users" or "tenants.networks" (the "networks" item of
+                  each tenant). It covers cloud resources as well: a context
+                  which uses resources created by another context reads the
+                  key written by that context
+    :param writes: Keys of the context object the context sets up. Contexts
+                   which declare both reads and writes and do not depend on
+                   each other are set up and cleaned up concurrently, the
+                   rest are run one by one in order
     """
     def wrapper(cls):
         cls = plugin.configure(name=name)(cls)
         cls._meta_set("order", order)
         cls._meta_set("hidden", hidden)
+        cls._meta_set("reads", reads if reads is None else tuple(reads))
+        cls._meta_set("writes", writes if writes is None else tuple(writes))
         return cls
 
     return wrapper
@@ -116,6 +141,35 @@ class Context(plugin.Plugin, functional.FunctionalMixin,
     def get_order(cls):
         return cls._meta_get("order")
 
+    @classmethod
+    def depends_on(cls, other):
+        """Check whether the context has to be run after other one.
+
+        :param other: Context class which precedes this one in order
+        """
+        keys = [cls._meta_get("reads", default=None),
+                cls._meta_get("writes", default=None),
+                other._meta_get("reads", default=None),
+                other._meta_get("writes", default=None)]
+        if None in keys:
+            return True
+        reads, writes, other_reads, other_writes = keys
+
+        def overlap(first, second):
+            return any(a == b or a.startswith(b + ".") or
+                       b.startswith(a + ".") for a in first for b in second)
+
+        return (overlap(other_writes, reads + writes) or
+                overlap(writes, other_reads))
+
+    def _run_per_tenants(self, func):
+        """Call func(user, tenant_id) for each tenant concurrently.
+
+        :returns: List of results of func
+        """
+        return broker.run_per_tenants(func, self.context.get("users", []),
+                                      CONF.context_tenant_workers)
+
     @abc.abstractmethod
     def setup(self):
         """Prepare environment for test.
@@ -161,11 +215,31 @@ class Context(plugin.Plugin, functional.FunctionalMixin,
 
 
 class ContextManager(object):
-    """Create context environment and run method inside it."""
+    """Create context environment and run method inside it.
+
+    Contexts are set up in groups: a context joins the first group which
+    follows all the contexts it depends on (see Context.depends_on).
+    Contexts of a group are set up concurrently, groups one by one in
+    order. Cleanup goes through the groups in the reverse order.
+    """
+
+    def __init__(self, context_obj, shared=None):
+        """ContextManager constructor.
 
-    def __init__(self, context_obj):
+        :param context_obj: Context object with config of all the contexts
+        :param shared: ContextManager of the contexts which are already set
+                       up and shared with other workloads. Such contexts are
+                       not set up and cleaned up by this manager, their data
+                       is copied to context_obj and they map it for
+                       scenario as usual
+        """
         self._visited = []
         self.context_obj = context_obj
+        self.shared = shared
+        self._shared_context = None
+        self._scenario_mappers = None
+        self._lock = threading.Lock()
+        self.durations = collections.OrderedDict()
 
     @staticmethod
     def validate(ctx, non_hidden=False):
@@ -176,28 +250,94 @@ class ContextManager(object):
         ctxlst = map(Context.get, self.context_obj["config"])
         return sorted(map(lambda ctx: ctx(self.context_obj), ctxlst))
 
+    def _get_own_context_lst(self):
+        """Return sorted contexts which are not shared."""
+        ctxlst = self._get_sorted_context_lst()
+        if self.shared is None:
+            return ctxlst
+        shared = self.shared.context_obj["config"]
+        return [ctx for ctx in ctxlst if ctx.get_name() not in shared]
+
+    @staticmethod
+    def _get_groups(ctxlst):
+        """Split sorted contexts into groups which can be run concurrently."""
+        levels = []
+        groups = []
+        for i, ctx in enumerate(ctxlst):
+            level = max([levels[j] + 1 for j in range(i)
+                         if ctx.depends_on(ctxlst[j])] or [0])
+            levels.append(level)
+            if level == len(groups):
+                groups.append([])
+            groups[level].append(ctx)
+        return groups
+
+    def _run(self, ctx, method):
+        started_at = time.time()
+        try:
+            getattr(ctx, method)()
+        finally:
+            self.durations.setdefault(
+                ctx.get_name(), {})[method] = time.time() - started_at
+
+    def get_durations(self):
+        """Return wall times of setup and cleanup of contexts.
+
+        :returns: list of dicts with name of a context and durations of its
+                  setup and cleanup (if they were run) in order of setup
+        """
+        return [dict(durations, name=name)
+                for name, durations in self.durations.items()]
+
     def setup(self):
         """Creates benchmark environment from config."""
 
         self._visited = []
-        for ctx in self._get_sorted_context_lst():
-            self._visited.append(ctx)
-            ctx.setup()
+        if self.shared is not None:
+            # tenants are copied, since contexts add their resources there
+            for key, value in self.shared.context_obj.items():
+                self.context_obj.setdefault(
+                    key, copy.deepcopy(value) if key == "tenants" else value)
+
+        for group in self._get_groups(self._get_own_context_lst()):
+            for ctx in group:
+                self.durations.setdefault(ctx.get_name(), {})
+                self._visited.append(ctx)
+            if len(group) == 1:
+                self._run(group[0], "setup")
+            else:
+                broker.run_for_each(lambda ctx: self._run(ctx, "setup"),
+                                    group, len(group))
 
         return self.context_obj
 
     def cleanup(self):
         """Destroys benchmark environment."""
 
-        ctxlst = self._visited or self._get_sorted_context_lst()
-        for ctx in ctxlst[::-1]:
+        def cleanup(ctx):
             try:
-                ctx.cleanup()
+                self._run(ctx, "cleanup")
             except Exception as e:
                 LOG.error("Context %s failed during cleanup." % ctx.get_name())
                 LOG.exception(e)
 
-    def map_for_scenario(self):
+        ctxlst = self._visited or self._get_own_context_lst()
+        for group in self._get_groups(ctxlst)[::-1]:
+            if len(group) == 1:
+                cleanup(group[0])
+            else:
+                broker.run_for_each(cleanup, group[::-1], len(group))
+
+    def _get_shared_context(self):
+        with self._lock:
+            if self._shared_context is None:
+                # NOTE(boris-42): Original context_obj is read only and should
+                #                 not be modified
+                self._scenario_mappers = self._get_sorted_context_lst()
+                self._shared_context = utils.LockedDict(self.context_obj)
+        return self._shared_context
+
+    def map_for_scenario(self, iteration=None):
         """Returns scenario's specific context from full context.
 
         Each context class is able to map context object data as it want.
@@ -207,12 +347,21 @@ class ContextManager(object):
         This method iterates over all context classes used in task
         and performs transformation of each of them to full context, order of
         transformation is the same as order of context creation.
+
+        The full context is locked for updates and built only once per
+        ContextManager, so all the iterations share it and the scenario
+        context is a thin overlay: a new top-level dict which refers to
+        the shared read-only data and holds the per-iteration items
+        (iteration number and whatever context classes map, e.g. user
+        and tenant).
+
+        :param iteration: number of iteration (starting from 1)
         """
-        # NOTE(boris-42): Original context_obj is read only and should not
-        #                 be modified
-        context_obj = copy.deepcopy(self.context_obj)
+        context_obj = dict(self._get_shared_context())
+        if iteration is not None:
+            context_obj["iteration"] = iteration
 
-        for ctx in self._get_sorted_context_lst():
+        for ctx in self._scenario_mappers:
             context_obj = ctx.map_for_scenario(context_obj)
 
         return context_obj
@@ -18,10 +18,13 @@ import json
 import threading
 import time
 import traceback
+import uuid
 
 import jsonschema
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import objects
@@ -35,15 +38,34 @@ from rally.task import context
 from rally.task import runner
 from rally.task import scenario
 from rally.task import sla
+from rally.task import validation
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
+TASK_ENGINE_OPTS = [
+    cfg.IntOpt("validation_concurrency", default=10, min=1,
+               help="How many workloads (or users of a workload) are "
+                    "validated concurrently by the semantic validation "
+                    "of a task")
+]
+CONF.register_opts(TASK_ENGINE_OPTS)
+
 
 class ResultConsumer(object):
-    """ResultConsumer class stores results from ScenarioRunner, checks SLA."""
+    """ResultConsumer class stores results from ScenarioRunner, checks SLA.
+
+    Results of iterations are written to DB in batches while the load is
+    running, so only aggregated data (SLA, load duration) is kept in memory
+    and already written iterations survive a crash of Rally. Until the
+    workload is finished, its results are marked as partial.
+    """
 
-    def __init__(self, key, task, runner, abort_on_sla_failure):
+    def __init__(self, key, task, runner, abort_on_sla_failure,
+                 flush_size=1000, flush_interval=5.0, ctx_manager=None,
+                 shared_context=None, max_flush_attempts=3):
         """ResultConsumer constructor.
 
         :param key: Scenario identifier
@@ -52,6 +74,16 @@ class ResultConsumer(object):
                        consumed
         :param abort_on_sla_failure: True if the execution should be stopped
                                      when some SLA check fails
+        :param flush_size: Count of iterations results which triggers
+                           writing them to DB
+        :param flush_interval: Max number of seconds to keep iterations
+                               results before writing them to DB
+        :param ctx_manager: ContextManager of the workload, durations of
+                            setup and cleanup of contexts are taken from it
+        :param shared_context: SharedContext used by the workload (if any)
+        :param max_flush_attempts: Max number of failed attempts in a row to
+                                   write iterations results to DB, after
+                                   which the workload is aborted and failed
         """
 
         self.key = key
@@ -59,28 +91,103 @@ class ResultConsumer(object):
         self.runner = runner
         self.load_started_at = float("inf")
         self.load_finished_at = 0
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.ctx_manager = ctx_manager
+        self.shared_context = shared_context
+        self.max_flush_attempts = max_flush_attempts
 
         self.sla_checker = sla.SLAChecker(key["kw"])
         self.abort_on_sla_failure = abort_on_sla_failure
         self.is_done = threading.Event()
         self.unexpected_failure = {}
-        self.results = []
+        self.start = None
+        self.finish = None
+        self.result_id = None
+        self.iterations_count = 0
+        self.pending = []
+        self.flushed_at = 0
+        self.failed_flushes = 0
+        self.flush_error = None
         self.thread = threading.Thread(
             target=self._consume_results
         )
         self.aborting_checker = threading.Thread(target=self.wait_and_abort)
 
     def __enter__(self):
+        self.start = self.flushed_at = time.time()
+        self.result_id = self.task.append_results(
+            self.key, self._get_results_data(partial=True))["id"]
         self.thread.start()
         self.aborting_checker.start()
-        self.start = time.time()
         return self
 
+    def _get_results_data(self, partial=False):
+        finish = self.finish or time.time()
+        data = {
+            "raw": [],
+            "load_duration": max(
+                self.load_finished_at - self.load_started_at, 0),
+            "full_duration": finish - self.start,
+            "sla": self.sla_checker.results()}
+        if self.ctx_manager is not None:
+            data["contexts"] = self.ctx_manager.get_durations()
+        if self.shared_context is not None:
+            data["shared_context"] = self.shared_context.to_dict()
+        if partial:
+            data["partial"] = True
+        return data
+
+    def _flush_results(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        try:
+            self.task.append_iterations(self.result_id, pending)
+        except Exception as e:
+            LOG.exception("Failed to save results of %d iterations of %s."
+                          % (len(pending), self.key["name"]))
+            self.failed_flushes += 1
+            if self.failed_flushes < self.max_flush_attempts:
+                # The results are kept in pending, so they are written with
+                # the next batch
+                self.pending = pending + self.pending
+            else:
+                self._fail_flushing(e, len(pending) + len(self.pending))
+        else:
+            self.failed_flushes = 0
+            self.iterations_count += len(pending)
+            try:
+                self.task.update_results(
+                    self.result_id, self._get_results_data(partial=True))
+            except Exception:
+                LOG.exception("Failed to update partial results of %s."
+                              % self.key["name"])
+        self.flushed_at = time.time()
+
+    def _fail_flushing(self, exc, lost_count):
+        """Abort the workload which results can't be written to DB.
+
+        Results of the rest of iterations are dropped instead of being kept
+        in memory, so the workload is failed with the explicit error.
+        """
+        self.flush_error = (
+            _("Failed to save results of %(count)d iterations to DB "
+              "%(attempts)d times in a row, the workload is aborted: "
+              "%(error)s") % {"count": lost_count,
+                              "attempts": self.failed_flushes,
+                              "error": exc})
+        LOG.error(self.flush_error)
+        self.sla_checker.set_unexpected_failure(self.flush_error)
+        self.pending = []
+        self.runner.abort()
+
     def _consume_results(self):
         while True:
             if self.runner.result_queue:
                 results = self.runner.result_queue.popleft()
-                self.results.extend(results)
+                if self.flush_error is None:
+                    self.pending.extend(results)
                 for r in results:
                     self.load_started_at = min(r["timestamp"],
                                                self.load_started_at)
@@ -90,14 +197,28 @@ class ResultConsumer(object):
                     if self.abort_on_sla_failure and not success:
                         self.sla_checker.set_aborted_on_sla()
                         self.runner.abort()
+                if (len(self.pending) >= self.flush_size or
+                        time.time() - self.flushed_at >= self.flush_interval):
+                    self._flush_results()
             elif self.is_done.isSet():
                 break
             else:
-                time.sleep(0.1)
+                wait_for = self.flush_interval
+                if self.pending:
+                    wait_for -= time.time() - self.flushed_at
+                    if wait_for <= 0:
+                        self._flush_results()
+                        continue
+                # the runner wakes us up as soon as new results arrive and
+                # __exit__ does the same after setting is_done
+                self.runner.wait_for_results(timeout=wait_for,
+                                             done=self.is_done)
+        self._flush_results()
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
         self.finish = time.time()
         self.is_done.set()
+        self.runner.notify_results_waiters()
         self.aborting_checker.join()
         self.thread.join()
 
@@ -108,23 +229,37 @@ class ResultConsumer(object):
                 self.task["uuid"]) == consts.TaskStatus.ABORTED:
             self.sla_checker.set_aborted_manually()
 
-        # NOTE(boris-42): Sort in order of starting instead of order of ending
-        self.results.sort(key=lambda x: x["timestamp"])
+        if self.pending:
+            # The last attempt to save results which failed to be written
+            # while the load was running
+            try:
+                self.task.append_iterations(self.result_id, self.pending)
+            except Exception as e:
+                LOG.exception("Failed to save results of %d iterations of %s."
+                              % (len(self.pending), self.key["name"]))
+                self.failed_flushes += 1
+                self._fail_flushing(e, len(self.pending))
+            else:
+                self.iterations_count += len(self.pending)
+                self.pending = []
 
-        load_duration = max(self.load_finished_at - self.load_started_at, 0)
+        data = self._get_results_data()
 
         LOG.info("Load duration is: %s" % utils.format_float_to_str(
-            load_duration))
+            data["load_duration"]))
         LOG.info("Full runner duration is: %s" %
                  utils.format_float_to_str(self.runner.run_duration))
         LOG.info("Full duration is %s" % utils.format_float_to_str(
-            self.finish - self.start))
+            data["full_duration"]))
 
-        self.task.append_results(self.key, {
-            "raw": self.results,
-            "load_duration": load_duration,
-            "full_duration": self.finish - self.start,
-            "sla": self.sla_checker.results()})
+        self.task.update_results(self.result_id, data)
+        try:
+            self.task.aggregate_results(self.result_id, data)
+        except Exception:
+            # Aggregates are calculated from iterations on reading if
+            # they are not stored
+            LOG.exception("Failed to save aggregated results of %s."
+                          % self.key["name"])
 
     @staticmethod
     def is_task_in_aborting_status(task_uuid, check_soft=True):
@@ -153,7 +288,63 @@ class ResultConsumer(object):
                 self.runner.abort()
                 self.task.update_status(consts.TaskStatus.ABORTED)
                 break
-            time.sleep(2.0)
+            # wakes up immediately when the workload is finished
+            self.is_done.wait(2.0)
+
+
+class SharedContext(object):
+    """Contexts which are set up once for several workloads.
+
+    The contexts are set up by the first workload which acquires them and
+    cleaned up after the last one releases them.
+    """
+
+    def __init__(self, context_obj, consumers=0):
+        """SharedContext constructor.
+
+        :param context_obj: Context object with config of the contexts
+        :param consumers: Number of workloads which use the contexts
+        """
+        self.uuid = str(uuid.uuid4())
+        self.consumers = consumers
+        self.manager = context.ContextManager(context_obj)
+        self._is_set_up = False
+        self._is_cleaned_up = False
+        self._error = None
+
+    def acquire(self):
+        """Set up the contexts if they are not set up yet."""
+        if self._error is not None:
+            raise self._error
+        if self._is_set_up:
+            return
+        LOG.info("Setting up contexts shared by %d workloads: %s"
+                 % (self.consumers, ", ".join(
+                     sorted(self.manager.context_obj["config"]))))
+        try:
+            self.manager.setup()
+        except Exception as e:
+            self._error = e
+            self.cleanup()
+            raise
+        self._is_set_up = True
+
+    def release(self):
+        """Clean up the contexts if the last workload is done with them."""
+        self.consumers -= 1
+        if self.consumers <= 0:
+            self.cleanup()
+
+    def cleanup(self):
+        """Clean up the contexts if they were set up (even partially)."""
+        if self._is_cleaned_up or not (self._is_set_up or self._error):
+            return
+        self._is_cleaned_up = True
+        self.manager.cleanup()
+
+    def to_dict(self):
+        return {"uuid": self.uuid,
+                "contexts": self.manager.get_durations()}
 
 
 class TaskEngine(object):
@@ -229,7 +420,7 @@ class TaskEngine(object):
                 try:
                     runner.ScenarioRunner.validate(workload.runner)
                     context.ContextManager.validate(
-                        workload.context, non_hidden=True)
+                        workload.get_full_context(), non_hidden=True)
                     sla.SLA.validate(workload.sla)
                 except (exceptions.RallyException,
                         jsonschema.ValidationError) as e:
@@ -239,11 +430,15 @@ class TaskEngine(object):
                     raise exceptions.InvalidTaskConfig(**kw)
 
     def _validate_config_semantic_helper(self, admin, user, workload, pos,
-                                         deployment):
+                                         deployment, per_user_only=False):
+        config = workload.to_dict()
+        if workload.shared_context:
+            config["context"] = workload.get_full_context()
         try:
             scenario.Scenario.validate(
-                workload.name, workload.to_dict(),
-                admin=admin, users=[user], deployment=deployment)
+                workload.name, config,
+                admin=admin, users=[user], deployment=deployment,
+                per_user_only=per_user_only)
         except exceptions.InvalidScenarioArgument as e:
             kw = workload.make_exception_args(pos, six.text_type(e))
             raise exceptions.InvalidTaskConfig(**kw)
@@ -271,16 +466,43 @@ class TaskEngine(object):
         #                 will be replaced
         with self._get_user_ctx_for_validation(ctx_conf) as ctx:
             ctx.setup()
-            admin = osclients.Clients(self.admin)
-            user = osclients.Clients(ctx_conf["users"][0]["credential"])
+            # Cloud lookups (images, flavors, networks, services...) are
+            # made once per credential for the whole validation
+            lookups = validation.Lookups()
+            admin = validation.ValidationClients(self.admin, lookups)
+            users = [validation.ValidationClients(u["credential"], lookups)
+                     for u in ctx_conf["users"]]
+
+            def publish(queue):
+                for i, user in enumerate(users):
+                    for s_idx, subtask in enumerate(config.subtasks):
+                        for pos, workload in enumerate(subtask.workloads):
+                            queue.append(((i, s_idx, pos), user, workload))
+
+            errors = []
+
+            def consume(cache, args):
+                order, user, workload = args
+                if errors and min(e[0] for e in errors) < order:
+                    # the task is invalid already
+                    return
+                try:
+                    # the first user validates everything, the others run
+                    # only validators which depend on the user
+                    self._validate_config_semantic_helper(
+                        admin if not order[0] else None, user, workload,
+                        order[2], deployment, per_user_only=bool(order[0]))
+                except Exception as e:
+                    errors.append((order, e))
+
+            workloads_count = sum(len(s.workloads) for s in config.subtasks)
+            broker.run(publish, consume,
+                       min(CONF.validation_concurrency,
+                           workloads_count * len(users)) or 1)
 
-            for u in ctx_conf["users"]:
-                user = osclients.Clients(u["credential"])
-                for subtask in config.subtasks:
-                    for pos, workload in enumerate(subtask.workloads):
-                        self._validate_config_semantic_helper(
-                            admin, user, workload,
-                            pos, deployment)
+            if errors:
+                # report the same error as the sequential validation would
+                raise min(errors, key=lambda error: error[0])[1]
 
     @logging.log_task_wrapper(LOG.info, _("Task validation."))
     def validate(self):
@@ -318,6 +540,49 @@ class TaskEngine(object):
 
         return context_obj
 
+    def _prepare_shared_context(self, ctx):
+        config = dict(ctx)
+        if self.existing_users and "users" not in ctx:
+            config.setdefault("existing_users", self.existing_users)
+        elif "users" not in ctx:
+            config.setdefault("users", {})
+        return config
+
+    def _plan_shared_contexts(self):
+        """Find out which workloads share which contexts.
+
+        A workload reuses the shared contexts if none of its own contexts
+        (including the default ones of the scenario) overrides them with a
+        different config. Workloads with equal shared contexts use the same
+        SharedContext instance.
+
+        :returns: dict with SharedContext instances by workloads
+        """
+        shared_contexts = {}
+        plan = {}
+        for subtask in self.config.subtasks:
+            for workload in subtask.workloads:
+                if not workload.shared_context:
+                    continue
+                config = self._prepare_shared_context(workload.shared_context)
+                own = copy.deepcopy(scenario.Scenario.get(
+                    workload.name)._meta_get("default_context"))
+                own.update(workload.context)
+                if any(config[name] != own[name]
+                       for name in set(config) & set(own)):
+                    LOG.info("Workload %s overrides the shared contexts, "
+                             "its contexts are not shared." % workload.name)
+                    continue
+                key = json.dumps(config, sort_keys=True)
+                if key not in shared_contexts:
+                    shared_contexts[key] = SharedContext(
+                        {"task": self.task,
+                         "admin": {"credential": self.admin},
+                         "config": config})
+                shared_contexts[key].consumers += 1
+                plan[workload] = shared_contexts[key]
+        return plan
+
     @logging.log_task_wrapper(LOG.info, _("Benchmarking."))
     def run(self):
         """Run the benchmark according to the test configuration.
@@ -328,7 +593,30 @@ class TaskEngine(object):
                   corresponding benchmark test launches
         """
         self.task.update_status(consts.TaskStatus.RUNNING)
+        auth_requests_saved = osclients.CLIENTS_POOL.auth_requests_saved
+        shared_contexts = self._plan_shared_contexts()
+        try:
+            if not self._run_workloads(shared_contexts):
+                self._log_auth_requests_saved(auth_requests_saved)
+                return
+        finally:
+            # shared contexts of workloads which were not run (e.g. the task
+            # is aborted) are still to be cleaned up
+            for shared in set(shared_contexts.values()):
+                shared.cleanup()
+
+        self._log_auth_requests_saved(auth_requests_saved)
+        if objects.Task.get_status(
+                self.task["uuid"]) != consts.TaskStatus.ABORTED:
+            self.task.update_status(consts.TaskStatus.FINISHED)
+
+    def _run_workloads(self, shared_contexts):
+        """Run all the workloads one by one.
 
+        :param shared_contexts: dict with SharedContext instances by
+                                workloads, see _plan_shared_contexts()
+        :returns: False if the task is aborted, otherwise True
+        """
         for subtask in self.config.subtasks:
             for pos, workload in enumerate(subtask.workloads):
 
@@ -336,26 +624,48 @@ class TaskEngine(object):
                         self.task["uuid"]):
                     LOG.info("Received aborting signal.")
                     self.task.update_status(consts.TaskStatus.ABORTED)
-                    return
+                    return False
 
                 key = workload.make_key(pos)
                 LOG.info("Running benchmark with key: \n%s"
                          % json.dumps(key, indent=2))
                 runner_obj = self._get_runner(workload.runner)
-                context_obj = self._prepare_context(
-                    workload.context, workload.name, self.admin)
+                shared = shared_contexts.get(workload)
+                if shared is not None:
+                    ctx = dict(shared.manager.context_obj["config"])
+                    ctx.update(workload.context)
+                    context_obj = self._prepare_context(
+                        ctx, workload.name, self.admin)
+                    ctx_manager = context.ContextManager(
+                        context_obj, shared=shared.manager)
+                else:
+                    context_obj = self._prepare_context(
+                        workload.get_full_context(), workload.name,
+                        self.admin)
+                    ctx_manager = context.ContextManager(context_obj)
                 try:
                     with ResultConsumer(key, self.task, runner_obj,
-                                        self.abort_on_sla_failure):
-                        with context.ContextManager(context_obj):
+                                        self.abort_on_sla_failure,
+                                        ctx_manager=ctx_manager,
+                                        shared_context=shared):
+                        if shared is not None:
+                            shared.acquire()
+                        with ctx_manager:
                             runner_obj.run(workload.name, context_obj,
                                            workload.args)
                 except Exception as e:
                     LOG.exception(e)
+                finally:
+                    if shared is not None:
+                        shared.release()
+        return True
 
-        if objects.Task.get_status(
-                self.task["uuid"]) != consts.TaskStatus.ABORTED:
-            self.task.update_status(consts.TaskStatus.FINISHED)
+    def _log_auth_requests_saved(self, started_with):
+        LOG.info("Task %(uuid)s: %(count)d keystone authentication requests "
+                 "were saved by reusing pooled clients."
+                 % {"uuid": self.task["uuid"],
+                    "count": (osclients.CLIENTS_POOL.auth_requests_saved -
+                              started_with)})
 
 
 class TaskConfig(object):
@@ -398,6 +708,7 @@ class TaskConfig(object):
                 "type": "array",
                 "items": {"type": "string"}
             },
+            "context": {"type": "object"},
 
             "subtasks": {
                 "type": "array",
@@ -414,6 +725,7 @@ class TaskConfig(object):
                         },
 
                         "run_in_parallel": {"type": "boolean"},
+                        "context": {"type": "object"},
                         "workloads": {
                             "type": "array",
                             "minItems": 1,
@@ -470,6 +782,7 @@ class TaskConfig(object):
         self.title = config.get("title", "Task")
         self.tags = config.get("tags", [])
         self.description = config.get("description")
+        self.context = config.get("context", {}) if self.version == 2 else {}
 
         self.subtasks = self._make_subtasks(config)
 
@@ -495,7 +808,8 @@ class TaskConfig(object):
 
     def _make_subtasks(self, config):
         if self.version == 2:
-            return [SubTask(s) for s in config["subtasks"]]
+            return [SubTask(s, task_context=config.get("context"))
+                    for s in config["subtasks"]]
         elif self.version == 1:
             subtasks = []
             for name, v1_workloads in six.iteritems(config):
@@ -511,32 +825,51 @@ class SubTask(object):
     """Subtask -- unit of execution in Task
 
     """
-    def __init__(self, config):
+    def __init__(self, config, task_context=None):
         """Subtask constructor.
 
         :param config: Dict with configuration of specified subtask
+        :param task_context: Dict with contexts declared on the task level
         """
         self.title = config["title"]
         self.tags = config.get("tags", [])
         self.group = config.get("group")
         self.description = config.get("description")
-        self.workloads = [Workload(wconf)
+        self.context = config.get("context", {})
+        shared_context = dict(task_context or {})
+        shared_context.update(self.context)
+        self.workloads = [Workload(wconf, shared_context=shared_context)
                           for wconf
                           in config["workloads"]]
-        self.context = config.get("context", {})
 
 
 class Workload(object):
     """Workload -- workload configuration in SubTask.
 
     """
-    def __init__(self, config):
+    def __init__(self, config, shared_context=None):
+        """Workload constructor.
+
+        :param config: Dict with configuration of the workload
+        :param shared_context: Dict with contexts declared on the task and
+                               subtask levels, they are set up once for all
+                               the workloads which are compatible with them
+        """
         self.name = config["name"]
         self.runner = config.get("runner", {})
         self.sla = config.get("sla", {})
         self.context = config.get("context", {})
+        self.shared_context = shared_context or {}
         self.args = config.get("args", {})
 
+    def get_full_context(self):
+        """Return the shared contexts along with the workload ones."""
+        if not self.shared_context:
+            return self.context
+        full_context = dict(self.shared_context)
+        full_context.update(self.context)
+        return full_context
+
     def to_dict(self):
         workload = {"runner": self.runner}
 
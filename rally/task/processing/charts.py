@@ -171,32 +171,113 @@ class LoadProfileChart(Chart):
                            if (self.step * x) < self._duration]
         self._time_axis.append(self._duration)
         self._running = [0] * len(self._time_axis)
+        # iterations of phases of the load_profile runner are shown
+        # separately, one graph per phase
+        self._phases = {}
 
     def _map_iteration_values(self, iteration):
-        return (iteration["timestamp"], iteration["duration"])
+        return (iteration["timestamp"], iteration["duration"],
+                iteration.get("phase"))
 
     def add_iteration(self, iteration):
-        timestamp, duration = self._map_iteration_values(iteration)
+        timestamp, duration, phase = self._map_iteration_values(iteration)
+        if phase is None:
+            running = self._running
+        else:
+            if phase not in self._phases:
+                self._phases[phase] = [0] * len(self._time_axis)
+            running = self._phases[phase]
         ts_start = timestamp - self._tstamp_start
         started_idx = bisect.bisect(self._time_axis, ts_start)
         ended_idx = bisect.bisect(self._time_axis, ts_start + duration)
         if self._time_axis[ended_idx - 1] == ts_start + duration:
             ended_idx -= 1
         for idx in range(started_idx + 1, ended_idx):
-            self._running[idx] += 1
+            running[idx] += 1
         if started_idx == ended_idx:
-            self._running[ended_idx] += duration / self.step
+            running[ended_idx] += duration / self.step
         else:
-            self._running[started_idx] += (
+            running[started_idx] += (
                 self._time_axis[started_idx] - ts_start) / self.step
-            self._running[ended_idx] += (
+            running[ended_idx] += (
                 ts_start + duration
                 - self._time_axis[ended_idx - 1]) / self.step
 
     def render(self):
+        if self._phases:
+            return [("%s (phase %d)" % (self._name, phase + 1),
+                     list(zip(self._time_axis, self._phases[phase])))
+                    for phase in sorted(self._phases)]
         return [(self._name, list(zip(self._time_axis, self._running)))]
 
 
+class ScheduleRateChart(Chart):
+    """Requested and achieved rates of starting iterations.
+
+    The requested rate is calculated from `scheduled_at' of iterations and
+    the achieved one from their real start time. Iterations which have no
+    `scheduled_at' (i.e. not started by a schedule) are skipped.
+    """
+
+    widget = "Lines"
+
+    def __init__(self, workload_info, scale=100):
+        """Setup chart with the scale.
+
+        :workload_info:  dict, generalized info about iterations
+        :param scale: int number of X points
+        """
+        super(ScheduleRateChart, self).__init__(workload_info)
+        self._tstamp_start = workload_info["tstamp_start"]
+        self.step = (workload_info["load_duration"] / float(scale)) or 1.0
+        self._scale = int(scale)
+        self._requested = [0] * self._scale
+        self._achieved = [0] * self._scale
+        self._scheduled = False
+
+    def _map_iteration_values(self, iteration):
+        return iteration.get("scheduled_at"), iteration["timestamp"]
+
+    def _get_index(self, timestamp):
+        idx = int((timestamp - self._tstamp_start) / self.step)
+        return min(max(idx, 0), self._scale - 1)
+
+    def add_iteration(self, iteration):
+        scheduled_at, timestamp = self._map_iteration_values(iteration)
+        if scheduled_at is None:
+            return
+        self._scheduled = True
+        self._requested[self._get_index(scheduled_at)] += 1
+        self._achieved[self._get_index(timestamp)] += 1
+
+    def render(self):
+        if not self._scheduled:
+            return []
+        time_axis = [self.step * x for x in six.moves.range(self._scale)]
+        return [(name, [(x, count / self.step)
+                        for x, count in zip(time_axis, counts)])
+                for name, counts in (("requested rate", self._requested),
+                                     ("achieved rate", self._achieved))]
+
+
+class ScheduleLagChart(Chart):
+    """Durations of iterations counted from their intended start.
+
+    The schedule lag is the time which an iteration has waited for its
+    start after `scheduled_at', e.g. because all the workers were busy.
+    Stacked with the duration it gives the response time which would be
+    observed by a client sending requests by the schedule.
+    """
+
+    widget = "StackedArea"
+
+    def _map_iteration_values(self, iteration):
+        if "scheduled_at" not in iteration:
+            return []
+        lag = max(iteration["timestamp"] - iteration["scheduled_at"], 0)
+        return [("duration", iteration["duration"]), ("schedule lag", lag)]
+
+
 class HistogramChart(Chart):
     """Base class for chart with histograms.
 
@@ -330,6 +411,22 @@ class Table(Chart):
                 return ins.result() is not None
         return True
 
+    def merge(self, other):
+        """Merge rows of a table which has processed other iterations.
+
+        This allows to process iterations in parts (for example, in
+        different processes) and combine the partial statistics.
+
+        :param other: instance of the same Table subclass
+        """
+        for name, values in other._data.items():
+            if name not in self._data:
+                self._data[name] = values
+                continue
+            for (ins, fn), (other_ins, other_fn) in zip(self._data[name],
+                                                        values):
+                ins.merge(other_ins)
+
     def get_rows(self):
         """Collect rows values finally, after all data is processed.
 
@@ -356,13 +453,12 @@ class MainStatsTable(Table):
 
     def __init__(self, *args, **kwargs):
         super(MainStatsTable, self).__init__(*args, **kwargs)
-        iters_num = self._workload_info["iterations_count"]
         for name in (list(self._workload_info["atomic"].keys()) + ["total"]):
             self._data[name] = [
                 [streaming.MinComputation(), None],
-                [streaming.PercentileComputation(0.5, iters_num), None],
-                [streaming.PercentileComputation(0.9, iters_num), None],
-                [streaming.PercentileComputation(0.95, iters_num), None],
+                [streaming.PercentileComputation(0.5), None],
+                [streaming.PercentileComputation(0.9), None],
+                [streaming.PercentileComputation(0.95), None],
                 [streaming.MaxComputation(), None],
                 [streaming.MeanComputation(), None],
                 [streaming.MeanComputation(),
@@ -556,12 +652,11 @@ class OutputStatsTable(OutputTable):
     def add_iteration(self, iteration):
         for name, value in self._map_iteration_values(iteration):
             if name not in self._data:
-                iters_num = self._workload_info["iterations_count"]
                 self._data[name] = [
                     [streaming.MinComputation(), None],
-                    [streaming.PercentileComputation(0.5, iters_num), None],
-                    [streaming.PercentileComputation(0.9, iters_num), None],
-                    [streaming.PercentileComputation(0.95, iters_num), None],
+                    [streaming.PercentileComputation(0.5), None],
+                    [streaming.PercentileComputation(0.9), None],
+                    [streaming.PercentileComputation(0.95), None],
                     [streaming.MaxComputation(), None],
                     [streaming.MeanComputation(), None],
                     [streaming.IncrementComputation(),
@@ -0,0 +1,343 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Vectorized processing of iterations for the HTML report.
+
+The charts of rally.task.processing.charts process iterations one by one,
+which takes minutes for workloads with hundreds of thousands of
+iterations. Here the values of iterations are loaded into NumPy arrays
+once and the data of the main and atomic charts is calculated by array
+operations. The result is the same as render() of the charts: histograms
+and graphs are equal up to floating point rounding, percentiles are
+exact (the charts compute them approximately for long streams).
+
+NumPy is an optional dependency, see is_available().
+"""
+
+import math
+
+import six
+
+from rally.task.processing import charts
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def is_available():
+    return np is not None
+
+
+def _to_number(value):
+    if isinstance(value, (float, ) + six.integer_types):
+        return value
+    return 0
+
+
+class Columns(object):
+    """Values of iterations of a workload as arrays."""
+
+    def __init__(self, workload_info, iterations):
+        """Load iterations.
+
+        :param workload_info: dict with generalized info about iterations
+        :param iterations: list of iterations results
+        """
+        self.info = workload_info
+        self.size = len(iterations)
+        self.timestamp = np.array([i["timestamp"] for i in iterations],
+                                  dtype=float)
+        self.duration = np.array([_to_number(i["duration"])
+                                  for i in iterations], dtype=float)
+        self.idle_duration = np.array([_to_number(i["idle_duration"])
+                                       for i in iterations], dtype=float)
+        self.error = np.array([bool(i["error"]) for i in iterations],
+                              dtype=bool)
+        self.scheduled_at = np.array(
+            [i.get("scheduled_at", np.nan) for i in iterations], dtype=float)
+        self.phase = np.array(
+            [-1 if i.get("phase") is None else i["phase"]
+             for i in iterations], dtype=int)
+
+        # the order of names of atomic actions in the charts is the order
+        # of their first appearance after missed ones are set to 0
+        self.atomic_names = []
+        if iterations:
+            self.atomic_names = list(iterations[0]["atomic_actions"])
+        for name in workload_info["atomic"]:
+            if name not in self.atomic_names:
+                self.atomic_names.append(name)
+        self.atomic = {}
+        self.atomic_present = {}
+        actions = [i["atomic_actions"] for i in iterations]
+        for name in self.atomic_names:
+            self.atomic[name] = np.array(
+                [_to_number(a.get(name) or 0) for a in actions], dtype=float)
+            self.atomic_present[name] = np.array([name in a for a in actions],
+                                                 dtype=bool)
+
+
+_zip_schedules = {}
+
+
+def _get_zip_schedule(base_size, zipped_size, count):
+    """Find raw points which complete zipped points in GraphZipper.
+
+    The schedule doesn't depend on values of points, it is calculated
+    exactly like GraphZipper does (with the same float rounding), so the
+    zipped graphs have the same points.
+
+    :returns: tuple of an array of orders of raw points (from 1) which
+              complete zipped points and an array of weights of these raw
+              points in the zipped points
+    """
+    key = (base_size, zipped_size, count)
+    if key not in _zip_schedules:
+        ratio = base_size / float(zipped_size)
+        completed_by = []
+        rests = []
+        cached_ratios_sum = 0
+        for point_order in six.moves.range(1, count + 1):
+            if cached_ratios_sum + 1 < ratio:
+                cached_ratios_sum += 1
+            else:
+                rest = ratio - cached_ratios_sum
+                completed_by.append(point_order)
+                rests.append(rest)
+                cached_ratios_sum = 1 - rest
+        _zip_schedules.clear()
+        _zip_schedules[key] = (np.array(completed_by, dtype=int),
+                               np.array(rests, dtype=float))
+    return _zip_schedules[key]
+
+
+def zip_graph(values, base_size, zipped_size=1000):
+    """Calculate the same graph as utils.GraphZipper.
+
+    :param values: array of values of points
+    :param base_size: amount of points in the raw graph
+    :param zipped_size: amount of points in the zipped graph
+    :returns: list of [order, value] points
+    """
+    if base_size <= zipped_size:
+        return [[order, value]
+                for order, value in enumerate(values.tolist(), 1)]
+
+    ratio = base_size / float(zipped_size)
+    completed_by, rests = _get_zip_schedule(base_size, zipped_size,
+                                            len(values))
+    if not len(completed_by):
+        return []
+    # a zipped point consists of the rest of the raw point which has
+    # completed the previous zipped point, the whole raw points after it
+    # and a part (rest) of the raw point which completes this zipped point
+    last = values[completed_by - 1]
+    carried = np.concatenate(([0.0], (1 - rests[:-1]) * last[:-1]))
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    starts = np.concatenate(([0], completed_by[:-1]))
+    whole = cumulative[completed_by - 1] - cumulative[starts]
+    zipped = (carried + whole + rests * last) / ratio
+
+    orders = completed_by - int(ratio / 2.0)
+    orders[completed_by - ratio <= 1] = 1
+    orders[completed_by == base_size] = base_size
+    return [list(point) for point in zip(orders.tolist(), zipped.tolist())]
+
+
+def _stacked_area(columns, graphs):
+    if not columns.size:
+        return []
+    return [(name, zip_graph(values, columns.info.get("iterations_count", 0)))
+            for name, values in graphs]
+
+
+def main_stacked_area(columns):
+    """Data of charts.MainStackedAreaChart."""
+    graphs = [("duration", np.where(columns.error, 0, columns.duration)),
+              ("idle_duration",
+               np.where(columns.error, 0, columns.idle_duration))]
+    if columns.info["iterations_failed"]:
+        graphs.append(("failed_duration",
+                       np.where(columns.error,
+                                columns.duration + columns.idle_duration,
+                                0)))
+    return _stacked_area(columns, graphs)
+
+
+def atomic_stacked_area(columns):
+    """Data of charts.AtomicStackedAreaChart."""
+    graphs = [(name, columns.atomic[name]) for name in columns.atomic_names]
+    if columns.info["iterations_failed"]:
+        atomics = sum(columns.atomic.values(), np.zeros(columns.size))
+        graphs.append(("failed_duration", np.where(
+            columns.error,
+            columns.duration + columns.idle_duration - atomics, 0)))
+    return _stacked_area(columns, graphs)
+
+
+def schedule_lag(columns):
+    """Data of charts.ScheduleLagChart."""
+    scheduled = ~np.isnan(columns.scheduled_at)
+    if not scheduled.any():
+        return []
+    lag = np.maximum(columns.timestamp - columns.scheduled_at, 0)
+    return _stacked_area(columns, [("duration", columns.duration[scheduled]),
+                                   ("schedule lag", lag[scheduled])])
+
+
+def atomic_avg(columns):
+    """Data of charts.AtomicAvgChart."""
+    if not columns.size:
+        return []
+    return [(name, float(columns.atomic[name].mean()))
+            for name in columns.atomic_names]
+
+
+def _fill_histogram(chart, name, values):
+    for view in chart._data[name]["views"]:
+        bins = np.searchsorted(np.array(view["x"]), values, side="left")
+        counts = np.bincount(bins, minlength=len(view["x"]) + 1)
+        view["y"] = counts[:len(view["x"])].tolist()
+
+
+def main_histogram(columns):
+    """Data of charts.MainHistogramChart."""
+    chart = charts.MainHistogramChart(columns.info)
+    _fill_histogram(chart, "task",
+                    np.where(columns.error, 0, columns.duration))
+    return chart.render()
+
+
+def atomic_histogram(columns):
+    """Data of charts.AtomicHistogramChart."""
+    chart = charts.AtomicHistogramChart(columns.info)
+    for name in chart._data:
+        _fill_histogram(chart, name, columns.atomic[name])
+    return chart.render()
+
+
+def _percentile(sorted_values, percent):
+    # the same interpolation as streaming.PercentileComputation of short
+    # streams
+    k = (len(sorted_values) - 1) * percent
+    f, c = math.floor(k), math.ceil(k)
+    if f == c:
+        return float(sorted_values[int(k)])
+    return float(sorted_values[int(f)] * (c - k)
+                 + sorted_values[int(c)] * (k - f))
+
+
+def main_stats_table(columns):
+    """Data of charts.MainStatsTable."""
+    rows = []
+    for name in list(columns.info["atomic"]) + ["total"]:
+        if name == "total":
+            values = columns.duration
+            present = np.ones(columns.size, dtype=bool)
+        else:
+            values = columns.atomic[name]
+            present = columns.atomic_present[name]
+        count = int(present.sum())
+        succeeded = np.sort(values[present & ~columns.error])
+        if not len(succeeded):
+            rows.append([name] + ["n/a"] * 7 + [count])
+            continue
+        success = float((~columns.error[present]).mean())
+        rows.append([name,
+                     round(float(succeeded[0]), 3),
+                     round(_percentile(succeeded, 0.5), 3),
+                     round(_percentile(succeeded, 0.9), 3),
+                     round(_percentile(succeeded, 0.95), 3),
+                     round(float(succeeded[-1]), 3),
+                     round(float(succeeded.mean()), 3),
+                     "%.1f%%" % (success * 100),
+                     count])
+    return {"cols": charts.MainStatsTable.columns, "rows": rows}
+
+
+def _count_running(chart, ts_start, duration):
+    axis = np.array(chart._time_axis)
+    running = np.zeros(len(axis) + 1)
+    ts_end = ts_start + duration
+    started = np.searchsorted(axis, ts_start, side="right")
+    ended = np.searchsorted(axis, ts_end, side="right")
+    ended -= axis[ended - 1] == ts_end
+
+    # whole steps between the start and the end
+    spans = ended > started + 1
+    np.add.at(running, started[spans] + 1, 1)
+    np.add.at(running, ended[spans], -1)
+    running = np.cumsum(running)[:len(axis)]
+
+    same = started == ended
+    np.add.at(running, ended[same], duration[same] / chart.step)
+    np.add.at(running, started[~same],
+              (axis[started[~same]] - ts_start[~same]) / chart.step)
+    np.add.at(running, ended[~same],
+              (ts_end[~same] - axis[ended[~same] - 1]) / chart.step)
+    return running.tolist()
+
+
+def load_profile(columns):
+    """Data of charts.LoadProfileChart."""
+    chart = charts.LoadProfileChart(columns.info)
+    ts_start = columns.timestamp - chart._tstamp_start
+    in_phase = columns.phase >= 0
+    if (~in_phase).any():
+        chart._running = _count_running(
+            chart, ts_start[~in_phase], columns.duration[~in_phase])
+    for phase in np.unique(columns.phase[in_phase]).tolist():
+        mask = columns.phase == phase
+        chart._phases[phase] = _count_running(chart, ts_start[mask],
+                                              columns.duration[mask])
+    return chart.render()
+
+
+def schedule_rate(columns):
+    """Data of charts.ScheduleRateChart."""
+    chart = charts.ScheduleRateChart(columns.info)
+    scheduled = ~np.isnan(columns.scheduled_at)
+    if not scheduled.any():
+        return chart.render()
+    chart._scheduled = True
+
+    def count(timestamps):
+        idx = np.trunc((timestamps - chart._tstamp_start) / chart.step)
+        idx = np.clip(idx, 0, chart._scale - 1).astype(int)
+        return np.bincount(idx, minlength=chart._scale).tolist()
+
+    chart._requested = count(columns.scheduled_at[scheduled])
+    chart._achieved = count(columns.timestamp[scheduled])
+    return chart.render()
+
+
+def render(workload_info, iterations):
+    """Calculate data of the main and atomic charts of the workload.
+
+    :param workload_info: dict with generalized info about iterations
+    :param iterations: list of iterations results
+    :returns: dict with the same data as render() of the charts
+    """
+    columns = Columns(workload_info, iterations)
+    return {"main_area": main_stacked_area(columns),
+            "main_hist": main_histogram(columns),
+            "main_stat": main_stats_table(columns),
+            "load_profile": load_profile(columns),
+            "schedule_rate": schedule_rate(columns),
+            "schedule_lag": schedule_lag(columns),
+            "atomic_pie": atomic_avg(columns),
+            "atomic_area": atomic_stacked_area(columns),
+            "atomic_hist": atomic_histogram(columns)}
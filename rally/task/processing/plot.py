@@ -23,22 +23,49 @@ from rally.common import objects
 from rally.common.plugin import plugin
 from rally.common import version
 from rally.task.processing import charts
+from rally.task.processing import columnar
 from rally.ui import utils as ui_utils
 
 
-def _process_scenario(data, pos):
-    main_area = charts.MainStackedAreaChart(data["info"])
-    main_hist = charts.MainHistogramChart(data["info"])
-    main_stat = charts.MainStatsTable(data["info"])
-    load_profile = charts.LoadProfileChart(data["info"])
-    atomic_pie = charts.AtomicAvgChart(data["info"])
-    atomic_area = charts.AtomicStackedAreaChart(data["info"])
-    atomic_hist = charts.AtomicHistogramChart(data["info"])
+# Workloads with fewer iterations are processed by charts one iteration
+# at a time, the vectorized processing pays off for longer ones
+VECTORIZED_MIN_ITERATIONS = 10000
+
+
+def _process_scenario(data, pos, vectorized=None):
+    """Prepare data of the workload for the HTML report.
+
+    :param data: extended workload results, iterations may be an iterator
+                 (see objects.Task.extend_results), they are iterated once
+    :param pos: position of the workload among workloads of the scenario
+    :param vectorized: whether the main and atomic charts are calculated
+                       by rally.task.processing.columnar, by default it is
+                       done for long workloads if NumPy is installed
+    """
+    if vectorized is None:
+        vectorized = (data["info"]["iterations_count"]
+                      >= VECTORIZED_MIN_ITERATIONS)
+    vectorized = vectorized and columnar.is_available()
+    main_charts = collections.OrderedDict()
+    if not vectorized:
+        for name, chart_cls in (
+                ("main_area", charts.MainStackedAreaChart),
+                ("main_hist", charts.MainHistogramChart),
+                ("main_stat", charts.MainStatsTable),
+                ("load_profile", charts.LoadProfileChart),
+                ("schedule_rate", charts.ScheduleRateChart),
+                ("schedule_lag", charts.ScheduleLagChart),
+                ("atomic_pie", charts.AtomicAvgChart),
+                ("atomic_area", charts.AtomicStackedAreaChart),
+                ("atomic_hist", charts.AtomicHistogramChart)):
+            main_charts[name] = chart_cls(data["info"])
 
     errors = []
     output_errors = []
     additive_output_charts = []
     complete_output = []
+    # iterations for the vectorized processing, which requires all of them
+    iterations = []
     for idx, itr in enumerate(data["iterations"], 1):
         if itr["error"]:
             typ, msg, trace = itr["error"]
@@ -67,9 +94,16 @@ def _process_scenario(data, pos):
             complete_charts.append(complete_chart)
         complete_output.append(complete_charts)
 
-        for chart in (main_area, main_hist, main_stat, load_profile,
-                      atomic_pie, atomic_area, atomic_hist):
+        for chart in main_charts.values():
             chart.add_iteration(itr)
+        if vectorized:
+            iterations.append(itr)
+
+    if vectorized:
+        rendered = columnar.render(data["info"], iterations)
+    else:
+        rendered = dict((name, chart.render())
+                        for name, chart in main_charts.items())
 
     kw = data["key"]["kw"]
     cls, method = data["key"]["name"].split(".")
@@ -83,16 +117,18 @@ def _process_scenario(data, pos):
         "runner": kw["runner"]["type"],
         "config": json.dumps({data["key"]["name"]: [kw]}, indent=2),
         "iterations": {
-            "iter": main_area.render(),
+            "iter": rendered["main_area"],
             "pie": [("success", (data["info"]["iterations_count"]
                                  - len(errors))),
                     ("errors", len(errors))],
-            "histogram": main_hist.render()},
-        "load_profile": load_profile.render(),
-        "atomic": {"histogram": atomic_hist.render(),
-                   "iter": atomic_area.render(),
-                   "pie": atomic_pie.render()},
-        "table": main_stat.render(),
+            "histogram": rendered["main_hist"]},
+        "load_profile": rendered["load_profile"],
+        "schedule": {"rate": rendered["schedule_rate"],
+                     "lag": rendered["schedule_lag"]},
+        "atomic": {"histogram": rendered["atomic_hist"],
+                   "iter": rendered["atomic_area"],
+                   "pie": rendered["atomic_pie"]},
+        "table": rendered["main_stat"],
         "additive_output": additive_output,
         "complete_output": complete_output,
         "output_errors": output_errors,
@@ -128,7 +164,8 @@ def _extend_results(results):
     working with task results using new schema, until
     database refactoring actually comes.
 
-    :param results: tasks results list in old format
+    :param results: tasks results list in old format, results which are
+                    loaded from DB can have stored "aggregate"
     :returns: tasks results list in new format
     """
     extended_results = []
@@ -141,7 +178,8 @@ def _extend_results(results):
                             "full_duration": result["full_duration"],
                             "load_duration": result["load_duration"]},
                    "created_at": None,
-                   "updated_at": None}
+                   "updated_at": None,
+                   "aggregate": result.get("aggregate")}
         extended_results.extend(
             objects.Task.extend_results([generic]))
     return extended_results
@@ -16,18 +16,24 @@
 import abc
 import collections
 import copy
+import functools
 import multiprocessing
+import threading
 import time
 
 import jsonschema
 import six
+from six import moves
 
 from rally.common import logging
 from rally.common.plugin import plugin
 from rally.common import utils as rutils
+from rally import exceptions
+from rally.task import atomic
 from rally.task import context
 from rally.task.processing import charts
 from rally.task import scenario
+from rally.task import transport
 from rally.task import types
 from rally.task import utils
 
@@ -46,10 +52,15 @@ def format_result_on_timeout(exc, timeout):
     }
 
 
-def _get_scenario_context(iteration, context_obj):
-    context_obj = copy.deepcopy(context_obj)
-    context_obj["iteration"] = iteration + 1  # Numeration starts from `1'
-    return context.ContextManager(context_obj).map_for_scenario()
+def _get_scenario_context(iteration, context_manager):
+    """Return context for the single scenario iteration.
+
+    :param iteration: number of iteration (starting from 0)
+    :param context_manager: context.ContextManager of the benchmark context,
+                            shared by all the iterations of the process
+    """
+    # Numeration starts from `1'
+    return context_manager.map_for_scenario(iteration=iteration + 1)
 
 
 def _run_scenario_once(cls, method_name, context_obj, scenario_kwargs):
@@ -65,23 +76,199 @@ def _run_scenario_once(cls, method_name, context_obj, scenario_kwargs):
     error = []
     try:
         with rutils.Timer() as timer:
-            getattr(scenario_inst, method_name)(**scenario_kwargs)
+            result = getattr(scenario_inst, method_name)(**scenario_kwargs)
+            if atomic.is_awaitable(result):
+                _discard_awaitable(result)
+                raise exceptions.RallyException(
+                    "Scenario %s returned a coroutine, which only the async "
+                    "runners can wait for" % cls.__name__)
     except Exception as e:
         error = utils.format_exc(e)
         if logging.is_debug():
             LOG.exception(e)
     finally:
-        status = "Error %s: %s" % tuple(error[0:2]) if error else "OK"
-        LOG.info("Task %(task)s | ITER: %(iteration)s END: %(status)s" %
-                 {"task": context_obj["task"]["uuid"], "iteration": iteration,
-                  "status": status})
+        return _get_iteration_result(context_obj, scenario_inst, timer, error)
+
+
+def _discard_awaitable(awaitable):
+    """Drop the awaitable which nobody is going to wait for."""
+    if atomic.asyncio.iscoroutine(awaitable):
+        awaitable.close()
+    else:
+        awaitable.cancel()
+
+
+def _get_iteration_result(context_obj, scenario_inst, timer, error):
+    status = "Error %s: %s" % tuple(error[0:2]) if error else "OK"
+    LOG.info("Task %(task)s | ITER: %(iteration)s END: %(status)s" %
+             {"task": context_obj["task"]["uuid"],
+              "iteration": context_obj["iteration"], "status": status})
+
+    result = {"duration": timer.duration() - scenario_inst.idle_duration(),
+              "timestamp": timer.timestamp(),
+              "idle_duration": scenario_inst.idle_duration(),
+              "error": error,
+              "output": scenario_inst._output,
+              "atomic_actions": scenario_inst.atomic_actions()}
+    if scenario_inst.atomic_actions_uncertainty():
+        result["atomic_actions_uncertainty"] = (
+            scenario_inst.atomic_actions_uncertainty())
+    return result
+
+
+def _run_scenario_once_async(cls, method_name, context_obj, scenario_kwargs,
+                             timeout=0):
+    """Start the iteration of a coroutine scenario on the event loop.
+
+    The scenario method is called like by _run_scenario_once. If it returns
+    an awaitable, the iteration lasts till the awaitable is done. If it
+    takes longer than `timeout`, the awaitable is cancelled and the
+    iteration fails with ThreadTimeoutException, like the iterations
+    terminated by timeout in threads. Methods which return anything else
+    are finished on return.
+
+    :param timeout: iteration timeout, 0 means no timeout
+    :returns: asyncio.Future of the result of the iteration
+    """
+    # provide arguments isolation between iterations
+    scenario_kwargs = copy.deepcopy(scenario_kwargs)
 
-        return {"duration": timer.duration() - scenario_inst.idle_duration(),
-                "timestamp": timer.timestamp(),
-                "idle_duration": scenario_inst.idle_duration(),
-                "error": error,
-                "output": scenario_inst._output,
-                "atomic_actions": scenario_inst.atomic_actions()}
+    LOG.info("Task %(task)s | ITER: %(iteration)s START" %
+             {"task": context_obj["task"]["uuid"],
+              "iteration": context_obj["iteration"]})
+
+    scenario_inst = cls(context_obj)
+    result = atomic.asyncio.Future()
+    timer = rutils.Timer().__enter__()
+
+    def finish(error):
+        timer.__exit__(None, None, None)
+        result.set_result(_get_iteration_result(context_obj, scenario_inst,
+                                                timer, error))
+
+    try:
+        awaitable = getattr(scenario_inst, method_name)(**scenario_kwargs)
+    except Exception as e:
+        if logging.is_debug():
+            LOG.exception(e)
+        finish(utils.format_exc(e))
+        return result
+    if not atomic.is_awaitable(awaitable):
+        finish([])
+        return result
+
+    loop = atomic.asyncio.get_event_loop()
+    future = atomic.asyncio.ensure_future(awaitable, loop=loop)
+    timed_out = []
+
+    def terminate():
+        timed_out.append(True)
+        future.cancel()
+
+    handle = loop.call_later(timeout, terminate) if timeout else None
+
+    def done(future):
+        if handle:
+            handle.cancel()
+        try:
+            if timed_out:
+                raise exceptions.ThreadTimeoutException()
+            if future.cancelled():
+                raise exceptions.RallyException("Iteration is cancelled.")
+            future.result()
+        except Exception as e:
+            if logging.is_debug():
+                LOG.exception(e)
+            finish(utils.format_exc(e))
+        else:
+            finish([])
+
+    future.add_done_callback(done)
+    return result
+
+
+_RESULT_SCHEMA = {
+    "fields": [("duration", float), ("timestamp", float),
+               ("idle_duration", float), ("output", dict),
+               ("atomic_actions", dict), ("error", list)],
+    "optional_fields": [("scheduled_at", float), ("phase", int),
+                        ("atomic_actions_uncertainty", dict),
+                        ("termination_delay", float)]
+}
+
+
+def _result_has_valid_schema(result, task_uuid):
+    """Check whatever result has valid schema or not."""
+    # NOTE(boris-42): We can't use here jsonschema, this function is called
+    #                 to check every iteration result schema. And this
+    #                 function works 200 times faster then jsonschema
+    #                 which totally makes sense.
+    for key, proper_type in _RESULT_SCHEMA["fields"]:
+        if key not in result:
+            LOG.warning("'%s' is not result" % key)
+            return False
+        if not isinstance(result[key], proper_type):
+            LOG.warning(
+                "Task %(uuid)s | result['%(key)s'] has wrong type "
+                "'%(actual_type)s', should be '%(proper_type)s'"
+                % {"uuid": task_uuid,
+                   "key": key,
+                   "actual_type": type(result[key]),
+                   "proper_type": proper_type.__name__})
+            return False
+
+    for key, proper_type in _RESULT_SCHEMA["optional_fields"]:
+        if key in result and not isinstance(result[key], proper_type):
+            LOG.warning(
+                "Task %(uuid)s | result['%(key)s'] has wrong type "
+                "'%(actual_type)s', should be '%(proper_type)s'"
+                % {"uuid": task_uuid,
+                   "key": key,
+                   "actual_type": type(result[key]),
+                   "proper_type": proper_type.__name__})
+            return False
+
+    for action, value in result["atomic_actions"].items():
+        if not isinstance(value, float):
+            LOG.warning(
+                "Task %(uuid)s | Atomic action %(action)s has wrong type "
+                "'%(type)s', should be 'float'"
+                % {"uuid": task_uuid,
+                   "action": action,
+                   "type": type(value)})
+            return False
+
+    for e in result["error"]:
+        if not isinstance(e, str):
+            LOG.warning("error value has wrong type '%s', should be 'str'"
+                        % type(e))
+            return False
+
+    for key in ("additive", "complete"):
+        if key not in result["output"]:
+            LOG.warning("Task %(uuid)s | Output missing key '%(key)s'"
+                        % {"uuid": task_uuid, "key": key})
+            return False
+
+        type_ = type(result["output"][key])
+        if type_ != list:
+            LOG.warning(
+                "Task %(uuid)s | Value of result['output']['%(key)s'] "
+                "has wrong type '%(type)s', must be 'list'"
+                % {"uuid": task_uuid,
+                   "key": key, "type": type_.__name__})
+            return False
+
+    for key in result["output"]:
+        for output_data in result["output"][key]:
+            message = charts.validate_output(key, output_data)
+            if message:
+                LOG.warning("Task %(uuid)s | %(message)s"
+                            % {"uuid": task_uuid,
+                               "message": message})
+                return False
+
+    return True
 
 
 def _worker_thread(queue, cls, method_name, context_obj, scenario_kwargs):
@@ -89,6 +276,327 @@ def _worker_thread(queue, cls, method_name, context_obj, scenario_kwargs):
                                  scenario_kwargs))
 
 
+class WorkerThreadPool(object):
+    """Pool of long-lived threads which run scenario iterations.
+
+    Threads are started on demand (not more than `concurrency`) and then
+    reused for the following iterations, so a worker process neither pays
+    for starting a new thread per iteration nor polls threads to find a
+    free slot: `submit` blocks on a semaphore which is released as soon as
+    any of the running iterations is finished.
+
+    Iterations which run longer than `timeout` are terminated by the
+    watchdog shared by all the pools of the process
+    (see rutils.TimeoutWatchdog). Results of such iterations have the
+    "termination_delay" field, the number of seconds the termination was
+    late by.
+    """
+
+    def __init__(self, result_queue, cls, method_name, context_obj,
+                 scenario_kwargs, concurrency, timeout=0):
+        """Pool constructor.
+
+        :param result_queue: queue object to append results
+        :param cls: scenario class
+        :param method_name: scenario method name
+        :param context_obj: benchmark context object
+        :param scenario_kwargs: scenario args
+        :param concurrency: maximum number of concurrent iterations
+        :param timeout: iteration timeout, 0 means no timeout
+        """
+        self.result_queue = result_queue
+        self.cls = cls
+        self.method_name = method_name
+        self.context_obj = context_obj
+        self.scenario_kwargs = scenario_kwargs
+        self.concurrency = concurrency
+        self.context_manager = context.ContextManager(context_obj)
+        self.timeout = timeout
+
+        self._iterations = moves.queue.Queue()
+        self._free_slots = threading.Semaphore(concurrency)
+        self._lock = threading.Condition()
+        self._busy = 0
+        self._threads = []
+
+        self._watchdog = rutils.get_timeout_watchdog() if timeout else None
+        # number of iterations terminated by timeout and the total and the
+        # max delays of the terminations
+        self.terminated = 0
+        self.total_termination_delay = 0
+        self.max_termination_delay = 0
+
+    def submit(self, iteration, scheduled_at=None, phase=None):
+        """Schedule the iteration, blocking while all the slots are busy.
+
+        :param iteration: number of iteration (starting from 0)
+        :param scheduled_at: timestamp when the iteration was intended to
+                             be started, it is saved in the result
+        :param phase: index of the phase of the load profile, it is saved
+                      in the result
+        """
+        self._free_slots.acquire()
+        with self._lock:
+            self._busy += 1
+            # Every busy slot has its own thread, so a new thread is
+            # required only if all the existing ones are busy
+            if self._busy > len(self._threads):
+                thread = threading.Thread(target=self._consume)
+                thread.start()
+                self._threads.append(thread)
+        self._iterations.put((iteration, scheduled_at, phase))
+
+    def wait_for_free_slot(self, limit, timeout=None):
+        """Block while `limit` or more iterations are in progress.
+
+        It allows to run less iterations concurrently than the pool allows
+        and to change that number on the fly.
+
+        :param limit: number of concurrent iterations
+        :param timeout: max number of seconds to wait
+        :returns: True if less than `limit` iterations are in progress
+        """
+        with self._lock:
+            if self._busy >= limit:
+                self._lock.wait(timeout)
+            return self._busy < limit
+
+    def join(self):
+        """Wait until all the submitted iterations are finished."""
+        for thread in self._threads:
+            self._iterations.put(None)
+        for thread in self._threads:
+            thread.join()
+
+        if self.terminated:
+            LOG.warning(
+                "%(count)d iterations were terminated by timeout, the "
+                "terminations were late by %(avg).3f seconds on average "
+                "and by %(max).3f seconds at most."
+                % {"count": self.terminated,
+                   "avg": self.total_termination_delay / self.terminated,
+                   "max": self.max_termination_delay})
+
+    def _consume(self):
+        while True:
+            item = self._iterations.get()
+            if item is None:
+                return
+            try:
+                self._run_iteration(*item)
+            except Exception as e:
+                # The thread should not die, otherwise the following
+                # iterations submitted to the pool would never be run
+                LOG.exception(e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._lock.notify_all()
+                self._free_slots.release()
+
+    def _run_iteration(self, iteration, scheduled_at=None, phase=None):
+        scenario_context = _get_scenario_context(iteration,
+                                                 self.context_manager)
+        watch = None
+        if self._watchdog:
+            watch = self._watchdog.watch(self.timeout)
+        started_at = time.time()
+        try:
+            try:
+                result = _run_scenario_once(self.cls, self.method_name,
+                                            scenario_context,
+                                            self.scenario_kwargs)
+            finally:
+                # The pending exception is cancelled as well, so it can't
+                # be raised while the result is being sent or while the
+                # thread waits for the next iteration
+                terminated = watch and self._watchdog.cancel(watch)
+        except exceptions.ThreadTimeoutException as e:
+            # The timeout has fired right after the scenario is finished
+            result = format_result_on_timeout(e, self.timeout)
+            result["timestamp"] = started_at
+            terminated = self._watchdog.cancel(watch)
+        if terminated:
+            result["termination_delay"] = watch.delay
+            with self._lock:
+                self.terminated += 1
+                self.total_termination_delay += watch.delay
+                self.max_termination_delay = max(
+                    self.max_termination_delay, watch.delay)
+        if scheduled_at is not None:
+            result["scheduled_at"] = scheduled_at
+        if phase is not None:
+            result["phase"] = phase
+        self.result_queue.put(result)
+
+
+class AsyncIterationPool(object):
+    """Runs iterations of a coroutine scenario on an event loop.
+
+    It is WorkerThreadPool of the async runners: all the iterations of the
+    worker process are run by one event loop in the calling thread, so the
+    number of concurrent iterations is limited neither by the number of
+    threads nor by memory of their stacks.
+
+    The load is generated by the `feed` callback passed to run(). It starts
+    iterations by start() and it is called back every time an iteration is
+    finished, until the load generation is stopped by stop_feeding() or
+    aborted.
+    """
+
+    # how often the loop checks whether the load generation is aborted
+    ABORT_CHECK_INTERVAL = 0.1
+
+    def __init__(self, result_queue, cls, method_name, context_obj,
+                 scenario_kwargs, timeout=0):
+        """Pool constructor.
+
+        :param result_queue: queue object to append results
+        :param cls: scenario class
+        :param method_name: scenario method name
+        :param context_obj: benchmark context object
+        :param scenario_kwargs: scenario args
+        :param timeout: iteration timeout, 0 means no timeout
+        """
+        if atomic.asyncio is None:
+            raise exceptions.RallyException(
+                "Coroutine scenarios require Python 3.4 or newer.")
+        self.result_queue = result_queue
+        self.cls = cls
+        self.method_name = method_name
+        self.scenario_kwargs = scenario_kwargs
+        self.context_manager = context.ContextManager(context_obj)
+        self.timeout = timeout
+
+        self.loop = atomic.asyncio.new_event_loop()
+        # number of iterations in progress
+        self.running = 0
+        self.feeding = False
+        self._feed = None
+        self._aborted = None
+
+    def start(self, iteration, scheduled_at=None, phase=None):
+        """Start the iteration.
+
+        :param iteration: number of iteration (starting from 0)
+        :param scheduled_at: timestamp when the iteration was intended to
+                             be started, it is saved in the result
+        :param phase: index of the phase of the load profile, it is saved
+                      in the result
+        """
+        self.running += 1
+        scenario_context = _get_scenario_context(iteration,
+                                                 self.context_manager)
+        future = _run_scenario_once_async(self.cls, self.method_name,
+                                          scenario_context,
+                                          self.scenario_kwargs, self.timeout)
+        future.add_done_callback(
+            functools.partial(self._finish, scheduled_at, phase))
+
+    def _finish(self, scheduled_at, phase, future):
+        result = future.result()
+        if scheduled_at is not None:
+            result["scheduled_at"] = scheduled_at
+        if phase is not None:
+            result["phase"] = phase
+        self.result_queue.put(result)
+        self.running -= 1
+        if self.feeding:
+            self._feed()
+        self._stop_if_done()
+
+    def stop_feeding(self):
+        """Stop the loop as soon as the started iterations are finished."""
+        self.feeding = False
+        self._stop_if_done()
+
+    def _stop_if_done(self):
+        if not self.feeding and not self.running:
+            self.loop.stop()
+
+    def _check_aborted(self):
+        if self._aborted.is_set():
+            self.stop_feeding()
+        elif self.feeding:
+            self.loop.call_later(self.ABORT_CHECK_INTERVAL,
+                                 self._check_aborted)
+
+    def run(self, feed, aborted):
+        """Run the event loop until all the started iterations are finished.
+
+        :param feed: callable which starts iterations, it is called when
+                     the loop is started and every time an iteration is
+                     finished, until stop_feeding() is called
+        :param aborted: multiprocessing.Event, once it is set new iterations
+                        are not started
+        """
+        self._feed = feed
+        self._aborted = aborted
+        self.feeding = True
+        atomic.asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(feed)
+        self.loop.call_soon(self._check_aborted)
+        try:
+            self.loop.run_forever()
+        finally:
+            atomic.asyncio.set_event_loop(None)
+            self.loop.close()
+
+
+class ResultsSender(object):
+    """Sends results of iterations from a worker process to the runner.
+
+    Results are validated here, in the worker process, and sent in batches
+    encoded by transport.ResultsEncoder, so the runner neither validates
+    nor unpickles them one by one. The sending thread takes all the results
+    which have been collected while the previous batch was being sent, so
+    a result is never delayed for the sake of batching.
+    """
+
+    def __init__(self, queue, task_uuid):
+        """Sender constructor.
+
+        :param queue: multiprocessing.Queue which is read by
+                      ScenarioRunner._join_processes
+        :param task_uuid: UUID of the task, used for logging
+        """
+        self.queue = queue
+        self.task_uuid = task_uuid
+        self._encoder = transport.ResultsEncoder()
+        self._results = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._send)
+        self._thread.start()
+
+    def put(self, result):
+        """Validate the result and schedule it for sending."""
+        if not _result_has_valid_schema(result, self.task_uuid):
+            LOG.warning("Task %s | Scenario iteration result has wrong "
+                        "format and is dropped" % self.task_uuid)
+            return
+        with self._cond:
+            self._results.append(result)
+            self._cond.notify()
+
+    def close(self):
+        """Send the rest of the results and stop the sending thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _send(self):
+        while True:
+            with self._cond:
+                while not self._results and not self._closed:
+                    self._cond.wait()
+                results, self._results = self._results, []
+            if not results:
+                return
+            self.queue.put(self._encoder.encode(results))
+
+
 def _log_worker_info(**info):
     """Log worker parameters for debugging.
 
@@ -129,6 +637,7 @@ class ScenarioRunner(plugin.Plugin):
         self.run_duration = 0
         self.batch_size = batch_size
         self.result_batch = []
+        self._results_cond = threading.Condition()
 
     @staticmethod
     def validate(config):
@@ -162,6 +671,9 @@ class ScenarioRunner(plugin.Plugin):
             cls, method_name = (scenario_plugin._meta_get("cls_ref"),
                                 name.split(".", 1).pop())
 
+        # durations of atomic actions of the previous workloads shouldn't
+        # affect the adaptive polling (see utils.wait_for_status)
+        atomic.reset_history()
         with rutils.Timer() as timer:
             self._run_scenario(cls, method_name, context, args)
 
@@ -171,6 +683,30 @@ class ScenarioRunner(plugin.Plugin):
         """Abort the execution of further benchmark scenario iterations."""
         self.aborted.set()
 
+    def wait_for_results(self, timeout=None, done=None):
+        """Block until there are results in result_queue.
+
+        :param timeout: max number of seconds to wait
+        :param done: threading.Event, if it is set the waiting is finished
+                     as well. The event should be set before calling
+                     notify_results_waiters() to wake up the waiter
+        :returns: True if there are results in result_queue
+        """
+        with self._results_cond:
+            if not self.result_queue and not (done and done.is_set()):
+                self._results_cond.wait(timeout)
+            return bool(self.result_queue)
+
+    def notify_results_waiters(self):
+        """Wake up the threads which wait for results."""
+        with self._results_cond:
+            self._results_cond.notify_all()
+
+    def _put_results_batch(self, batch):
+        with self._results_cond:
+            self.result_queue.append(batch)
+            self._results_cond.notify_all()
+
     @staticmethod
     def _create_process_pool(processes_to_start, worker_process,
                              worker_args_gen):
@@ -200,93 +736,48 @@ class ScenarioRunner(plugin.Plugin):
         :param process_pool: pool of processes to join
         :result_queue: multiprocessing.Queue that receives the results
         """
+        decoder = transport.ResultsDecoder()
         while process_pool:
+            # Block until some result arrives, the timeout only limits
+            # the time to notice finished processes
+            try:
+                self._receive_results(result_queue.get(timeout=0.1), decoder)
+            except moves.queue.Empty:
+                pass
+            self._drain_result_queue(result_queue, decoder)
+
             while process_pool and not process_pool[0].is_alive():
                 process_pool.popleft().join()
 
-            if result_queue.empty():
-                # sleep a bit to avoid 100% usage of CPU by this method
-                time.sleep(0.001)
-
-            while not result_queue.empty():
-                self._send_result(result_queue.get())
-
+        self._drain_result_queue(result_queue, decoder)
         self._flush_results()
         result_queue.close()
 
+    def _drain_result_queue(self, result_queue, decoder):
+        while True:
+            try:
+                self._receive_results(result_queue.get_nowait(), decoder)
+            except moves.queue.Empty:
+                break
+
+    def _receive_results(self, message, decoder):
+        if decoder.is_encoded(message):
+            # results sent by ResultsSender are validated by workers
+            for result in decoder.decode(message):
+                self._store_result(result)
+        else:
+            self._send_result(message)
+
     def _flush_results(self):
         if self.result_batch:
-            sorted_batch = sorted(self.result_batch)
-            self.result_queue.append(sorted_batch)
+            sorted_batch = sorted(self.result_batch,
+                                  key=lambda r: r["timestamp"])
+            self._put_results_batch(sorted_batch)
             del self.result_batch[:]
 
-    _RESULT_SCHEMA = {
-        "fields": [("duration", float), ("timestamp", float),
-                   ("idle_duration", float), ("output", dict),
-                   ("atomic_actions", dict), ("error", list)]
-    }
-
     def _result_has_valid_schema(self, result):
         """Check whatever result has valid schema or not."""
-        # NOTE(boris-42): We can't use here jsonschema, this method is called
-        #                 to check every iteration result schema. And this
-        #                 method works 200 times faster then jsonschema
-        #                 which totally makes sense.
-        for key, proper_type in self._RESULT_SCHEMA["fields"]:
-            if key not in result:
-                LOG.warning("'%s' is not result" % key)
-                return False
-            if not isinstance(result[key], proper_type):
-                LOG.warning(
-                    "Task %(uuid)s | result['%(key)s'] has wrong type "
-                    "'%(actual_type)s', should be '%(proper_type)s'"
-                    % {"uuid": self.task["uuid"],
-                       "key": key,
-                       "actual_type": type(result[key]),
-                       "proper_type": proper_type.__name__})
-                return False
-
-        for action, value in result["atomic_actions"].items():
-            if not isinstance(value, float):
-                LOG.warning(
-                    "Task %(uuid)s | Atomic action %(action)s has wrong type "
-                    "'%(type)s', should be 'float'"
-                    % {"uuid": self.task["uuid"],
-                       "action": action,
-                       "type": type(value)})
-                return False
-
-        for e in result["error"]:
-            if not isinstance(e, str):
-                LOG.warning("error value has wrong type '%s', should be 'str'"
-                            % type(e))
-                return False
-
-        for key in ("additive", "complete"):
-            if key not in result["output"]:
-                LOG.warning("Task %(uuid)s | Output missing key '%(key)s'"
-                            % {"uuid": self.task["uuid"], "key": key})
-                return False
-
-            type_ = type(result["output"][key])
-            if type_ != list:
-                LOG.warning(
-                    "Task %(uuid)s | Value of result['output']['%(key)s'] "
-                    "has wrong type '%(type)s', must be 'list'"
-                    % {"uuid": self.task["uuid"],
-                       "key": key, "type": type_.__name__})
-                return False
-
-        for key in result["output"]:
-            for output_data in result["output"][key]:
-                message = charts.validate_output(key, output_data)
-                if message:
-                    LOG.warning("Task %(uuid)s | %(message)s"
-                                % {"uuid": self.task["uuid"],
-                                   "message": message})
-                    return False
-
-        return True
+        return _result_has_valid_schema(result, self.task["uuid"])
 
     def _send_result(self, result):
         """Store partial result to send it to consumer later.
@@ -303,12 +794,15 @@ class ScenarioRunner(plugin.Plugin):
                 % {"task": self.task["uuid"], "runner": self.get_name()})
             return
 
+        self._store_result(result)
+
+    def _store_result(self, result):
         self.result_batch.append(result)
 
         if len(self.result_batch) >= self.batch_size:
             sorted_batch = sorted(self.result_batch,
-                                  key=lambda r: result["timestamp"])
-            self.result_queue.append(sorted_batch)
+                                  key=lambda r: r["timestamp"])
+            self._put_results_batch(sorted_batch)
             del self.result_batch[:]
 
     def _log_debug_info(self, **info):
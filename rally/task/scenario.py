@@ -166,11 +166,21 @@ class Scenario(plugin.Plugin,
                 raise exceptions.InvalidArgumentsException(msg)
 
     @classmethod
-    def validate(cls, name, config, admin=None, users=None, deployment=None):
-        """Semantic check of benchmark arguments."""
+    def validate(cls, name, config, admin=None, users=None, deployment=None,
+                 per_user_only=False):
+        """Semantic check of benchmark arguments.
+
+        Validators which are marked as user independent are called with
+        the first of users only.
+
+        :param per_user_only: call only validators which depend on the user,
+                              the rest of checks is supposed to be done by
+                              another call
+        """
         scenario = Scenario.get(name)
 
-        cls._validate_scenario_args(scenario, name, config)
+        if not per_user_only:
+            cls._validate_scenario_args(scenario, name, config)
 
         validators = scenario._meta_get("validators", default=[])
 
@@ -181,14 +191,20 @@ class Scenario(plugin.Plugin,
                             if v.permission == consts.EndpointPermission.ADMIN]
         user_validators = [v for v in validators
                            if v.permission == consts.EndpointPermission.USER]
+        per_user_validators = [v for v in user_validators
+                               if not getattr(v, "user_independent", False)]
 
         # NOTE(boris-42): Potential bug, what if we don't have "admin" client
         #                 and scenario have "admin" validators.
-        if admin:
+        if admin and not per_user_only:
             cls._validate_helper(admin_validators, admin, config, deployment)
         if users:
-            for user in users:
-                cls._validate_helper(user_validators, user, config, deployment)
+            for i, user in enumerate(users):
+                if i or per_user_only:
+                    validators = per_user_validators
+                else:
+                    validators = user_validators
+                cls._validate_helper(validators, user, config, deployment)
 
     def sleep_between(self, min_sleep, max_sleep, atomic_delay=0.1):
         """Call an interruptable_sleep() for a random amount of seconds.
@@ -202,13 +218,37 @@ class Scenario(plugin.Plugin,
         :param atomic_delay: parameter with which  time.sleep would be called
                              int(sleep_time / atomic_delay) times.
         """
+        sleep_time = self._get_sleep_time(min_sleep, max_sleep)
+        utils.interruptable_sleep(sleep_time, atomic_delay)
+        self._idle_duration += sleep_time
+
+    def async_sleep_between(self, min_sleep, max_sleep):
+        """Sleep for a random amount of seconds without blocking the loop.
+
+        It is sleep_between() for coroutine scenarios, which are run on the
+        event loop by the async runners and have to await the returned
+        future instead of blocking the thread.
+
+        :param min_sleep: Minimum sleep time in seconds (non-negative)
+        :param max_sleep: Maximum sleep time in seconds (non-negative)
+        :returns: future of the sleep
+        """
+        sleep_time = self._get_sleep_time(min_sleep, max_sleep)
+
+        def add_idle_duration(future):
+            if not future.cancelled():
+                self._idle_duration += sleep_time
+
+        future = atomic.asyncio.ensure_future(atomic.asyncio.sleep(sleep_time))
+        future.add_done_callback(add_idle_duration)
+        return future
+
+    @staticmethod
+    def _get_sleep_time(min_sleep, max_sleep):
         if not 0 <= min_sleep <= max_sleep:
             raise exceptions.InvalidArgumentsException(
                 "0 <= min_sleep <= max_sleep")
-
-        sleep_time = random.uniform(min_sleep, max_sleep)
-        utils.interruptable_sleep(sleep_time, atomic_delay)
-        self._idle_duration += sleep_time
+        return random.uniform(min_sleep, max_sleep)
 
     def idle_duration(self):
         """Returns duration of all sleep_between."""
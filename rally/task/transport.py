@@ -0,0 +1,144 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compact format of iteration results sent from worker processes.
+
+A batch of results is encoded into a single message instead of pickling
+every result dict on its own:
+
+* timestamp, duration, idle_duration, scheduled_at and phase (if any) and
+  atomic actions (with their uncertainties, if any) of all the results are
+  packed into one bytes string, one record per result;
+* names of atomic actions are replaced by indexes in the table of names of
+  the encoder, only names which are unknown to the decoder yet are sent
+  along with the message;
+* errors, output and termination delays, which are empty for most of the
+  iterations, are sent as they are and only for the results which have
+  them.
+"""
+
+import collections
+import struct
+import uuid
+
+
+# timestamp, duration, idle_duration, scheduled_at (NaN if the result
+# doesn't have it), phase (-1 if the result doesn't have it), count of
+# atomic actions
+_RECORD = struct.Struct("<ddddhH")
+# index of the atomic action name, duration of the atomic action,
+# uncertainty of the duration (NaN if the result doesn't have it)
+_ATOMIC_ACTION = struct.Struct("<Hdd")
+
+_NAN = float("nan")
+
+
+class ResultsEncoder(object):
+    """Encodes batches of results of a single worker.
+
+    Results should be validated before encoding, the decoder trusts them.
+    """
+
+    def __init__(self):
+        self.sender_id = uuid.uuid4().hex
+        self._names = {}
+
+    def encode(self, results):
+        """Encode the batch of results into a message.
+
+        :param results: list of iteration results
+        :returns: message which can be put into multiprocessing.Queue
+        """
+        new_names = []
+        extras = {}
+        chunks = []
+        for i, result in enumerate(results):
+            actions = result["atomic_actions"]
+            uncertainties = result.get("atomic_actions_uncertainty", {})
+            chunks.append(_RECORD.pack(result["timestamp"],
+                                       result["duration"],
+                                       result["idle_duration"],
+                                       result.get("scheduled_at", _NAN),
+                                       result.get("phase", -1),
+                                       len(actions)))
+            for name, value in actions.items():
+                index = self._names.get(name)
+                if index is None:
+                    index = self._names[name] = len(self._names)
+                    new_names.append(name)
+                chunks.append(_ATOMIC_ACTION.pack(
+                    index, value, uncertainties.get(name, _NAN)))
+            output = result["output"]
+            termination_delay = result.get("termination_delay")
+            if (result["error"] or output["additive"] or output["complete"]
+                    or termination_delay is not None):
+                extras[i] = (result["error"], output, termination_delay)
+        return self.sender_id, new_names, b"".join(chunks), extras
+
+
+class ResultsDecoder(object):
+    """Decodes messages of any number of ResultsEncoder instances."""
+
+    def __init__(self):
+        self._names = collections.defaultdict(list)
+
+    @staticmethod
+    def is_encoded(message):
+        return isinstance(message, tuple)
+
+    def decode(self, message):
+        """Decode the message into the list of results.
+
+        :param message: message returned by ResultsEncoder.encode()
+        :returns: list of iteration results
+        """
+        sender_id, new_names, payload, extras = message
+        names = self._names[sender_id]
+        names.extend(new_names)
+
+        results = []
+        offset = 0
+        while offset < len(payload):
+            (timestamp, duration, idle_duration, scheduled_at, phase,
+             count) = _RECORD.unpack_from(payload, offset)
+            offset += _RECORD.size
+            actions = collections.OrderedDict()
+            uncertainties = collections.OrderedDict()
+            for _ in range(count):
+                index, value, uncertainty = _ATOMIC_ACTION.unpack_from(
+                    payload, offset)
+                offset += _ATOMIC_ACTION.size
+                actions[names[index]] = value
+                if uncertainty == uncertainty:
+                    uncertainties[names[index]] = uncertainty
+            error, output, termination_delay = extras.get(
+                len(results), ([], {"additive": [], "complete": []}, None))
+            result = {"timestamp": timestamp,
+                      "duration": duration,
+                      "idle_duration": idle_duration,
+                      "error": error,
+                      "output": output,
+                      "atomic_actions": actions}
+            # NaN is the only value which is not equal to itself
+            if scheduled_at == scheduled_at:
+                result["scheduled_at"] = scheduled_at
+            if phase >= 0:
+                result["phase"] = phase
+            if uncertainties:
+                result["atomic_actions_uncertainty"] = uncertainties
+            if termination_delay is not None:
+                result["termination_delay"] = termination_delay
+            results.append(result)
+        return results
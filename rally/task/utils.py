@@ -14,21 +14,45 @@
 #    under the License.
 
 import itertools
+import os
+import threading
 import time
 import traceback
 
 import jsonschema
 from novaclient import exceptions as nova_exc
+from oslo_config import cfg
 import six
 
 from rally.common.i18n import _
 from rally.common import logging
 from rally import consts
 from rally import exceptions
+from rally.task import atomic
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
+TASK_UTILS_OPTS = [
+    cfg.BoolOpt("batch_status_polling", default=True,
+                help="Poll statuses of resources of the same type and tenant "
+                     "(e.g. servers and volumes) which are waited for "
+                     "concurrently with a single list request instead of "
+                     "a request per resource"),
+    cfg.BoolOpt("adaptive_status_polling", default=True,
+                help="Poll the status of a resource more often around the "
+                     "moment when it is expected to be ready. The moment is "
+                     "predicted by durations of the previous atomic actions "
+                     "of the same name"),
+    cfg.FloatOpt("adaptive_status_polling_min_interval", default=0.2,
+                 min=0.01,
+                 help="Min interval (in seconds) between two polls of the "
+                      "status of a resource by the adaptive polling")
+]
+CONF.register_opts(TASK_UTILS_OPTS)
+
 
 def get_status(resource, status_attr="status"):
     """Get the status of a given resource object.
@@ -68,17 +92,9 @@ class resource_is(object):
 
 def get_from_manager(error_statuses=None):
     error_statuses = error_statuses or ["ERROR"]
-    error_statuses = map(lambda str: str.upper(), error_statuses)
-
-    def _get_from_manager(resource, id_attr="id"):
-        # catch client side errors
-        try:
-            res = resource.manager.get(getattr(resource, id_attr))
-        except Exception as e:
-            if getattr(e, "code", getattr(e, "http_status", 400)) == 404:
-                raise exceptions.GetResourceNotFound(resource=resource)
-            raise exceptions.GetResourceFailure(resource=resource, err=e)
+    error_statuses = [s.upper() for s in error_statuses]
 
+    def check_status(res):
         # catch abnormal status, such as "no valid host" for servers
         status = get_status(res)
 
@@ -91,9 +107,149 @@ def get_from_manager(error_statuses=None):
 
         return res
 
+    def _get_from_manager(resource, id_attr="id"):
+        # catch client side errors
+        try:
+            res = resource.manager.get(getattr(resource, id_attr))
+        except Exception as e:
+            if getattr(e, "code", getattr(e, "http_status", 400)) == 404:
+                raise exceptions.GetResourceNotFound(resource=resource)
+            raise exceptions.GetResourceFailure(resource=resource, err=e)
+
+        return check_status(res)
+
+    # allows BatchStatusPoller to check resources taken from bulk lists
+    _get_from_manager.check_status = check_status
     return _get_from_manager
 
 
+class _StatusWaiter(object):
+
+    def __init__(self, resource, update_resource, status_attr, interval):
+        self.resource = resource
+        self.update_resource = update_resource
+        self.status_attr = status_attr
+        self.status = get_status(resource, status_attr)
+        self.interval = interval
+        self.event = threading.Event()
+        self.error = None
+        self.unchanged_at = None
+
+    def update(self, listed=None):
+        """Update the resource by the listed one or with a GET request."""
+        try:
+            if listed is None:
+                resource = self.update_resource(self.resource)
+            else:
+                resource = self.update_resource.check_status(listed)
+        except Exception as e:
+            self.error = e
+            self.event.set()
+            return
+        self.resource = resource
+        if get_status(resource, self.status_attr) != self.status:
+            self.event.set()
+        else:
+            self.unchanged_at = time.time()
+
+
+class BatchStatusPoller(object):
+    """Polls statuses of many resources with bulk list requests.
+
+    Waiters of resources of the same manager (i.e. the same resource type
+    and the same client, so the same tenant) are polled together: a single
+    list request per interval instead of a GET request per resource. A
+    waiter is woken up as soon as the status of its resource changes.
+    Resources which are not in the list (deleted ones or ones which are not
+    on the first page of the list) are polled with GET requests, as well as
+    resources of managers which can't list resources in details.
+    """
+
+    # Managers which return resources with statuses from list()
+    LISTABLE_MANAGERS = {
+        "novaclient": ("ServerManager",),
+        "cinderclient": ("VolumeManager", "SnapshotManager")
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._pid = os.getpid()
+
+    @classmethod
+    def is_supported(cls, resource, update_resource):
+        """Check that statuses of the resource can be polled in batches."""
+        if not hasattr(update_resource, "check_status"):
+            return False
+        manager_cls = type(getattr(resource, "manager", None))
+        package = manager_cls.__module__.split(".")[0]
+        return manager_cls.__name__ in cls.LISTABLE_MANAGERS.get(package, ())
+
+    def wait(self, resource, update_resource, status_attr="status",
+             interval=1, timeout=60):
+        """Wait for the next status of the resource.
+
+        :param resource: resource object, its status is the current one
+        :param update_resource: function returned by get_from_manager()
+        :param status_attr: name of the status attribute of the resource
+        :param interval: max interval between two polls of the resource
+        :param timeout: max number of seconds to wait for
+        :returns: tuple of the resource with a new status (or the latest
+                  polled one if the status is not changed in time) and the
+                  time of the latest poll which found the status unchanged
+                  (None if there was no such poll)
+        """
+        waiter = _StatusWaiter(resource, update_resource, status_attr,
+                               interval)
+        manager = resource.manager
+        with self._lock:
+            if self._pid != os.getpid():
+                # polling threads are not inherited by forked processes
+                self._groups = {}
+                self._pid = os.getpid()
+            if manager not in self._groups:
+                self._groups[manager] = set()
+                thread = threading.Thread(target=self._poll,
+                                          args=(manager,))
+                thread.daemon = True
+                thread.start()
+            self._groups[manager].add(waiter)
+        try:
+            waiter.event.wait(max(timeout, 0))
+        finally:
+            with self._lock:
+                self._groups[manager].discard(waiter)
+        if waiter.error is not None:
+            raise waiter.error
+        return waiter.resource, waiter.unchanged_at
+
+    def _poll(self, manager):
+        while True:
+            with self._lock:
+                waiters = self._groups[manager]
+                if not waiters:
+                    del self._groups[manager]
+                    return
+                waiters = list(waiters)
+            time.sleep(min(w.interval for w in waiters))
+
+            try:
+                listed = dict((r.id, r) for r in manager.list(detailed=True))
+            except Exception as e:
+                LOG.debug("Failed to list resources of %s, polling them "
+                          "one by one: %s" % (type(manager).__name__, e))
+                listed = {}
+            with self._lock:
+                # woken up waiters keep the resource they were woken up with
+                waiters = [w for w in self._groups[manager]
+                           if not w.event.is_set()]
+            for waiter in waiters:
+                waiter.update(listed.get(waiter.resource.id))
+
+
+BATCH_STATUS_POLLER = BatchStatusPoller()
+
+
 def manager_list_size(sizes):
     def _list(mgr):
         return len(mgr.list()) in sizes
@@ -208,14 +364,30 @@ def wait_for_status(resource, ready_statuses, failure_statuses=None,
     latest_status = get_status(resource, status_attr)
     latest_status_update = start
 
+    batch_poller = None
+    if (CONF.batch_status_polling and id_attr == "id" and
+            BatchStatusPoller.is_supported(resource, update_resource)):
+        batch_poller = BATCH_STATUS_POLLER
+    polled = False
+
+    # the uncertainty of the measured duration is tracked only inside
+    # atomic actions, the status of the given resource is the first
+    # negative poll
+    timers = atomic.get_active_timers()
+    last_negative_at = start
+
     while True:
         try:
-            if id_attr == "id":
+            if polled:
+                # the resource is already updated by the batch poller
+                polled = False
+            elif id_attr == "id":
                 resource = update_resource(resource)
             else:
                 resource = update_resource(resource, id_attr=id_attr)
         except exceptions.GetResourceNotFound:
             if check_deletion:
+                _add_uncertainty(timers, last_negative_at)
                 return
             else:
                 raise
@@ -234,14 +406,32 @@ def wait_for_status(resource, ready_statuses, failure_statuses=None,
             latest_status_update = current_time
 
         if status in ready_statuses:
+            _add_uncertainty(timers, last_negative_at)
             return resource
         if status in failure_statuses:
             raise exceptions.GetResourceErrorStatus(
                 resource=resource,
                 status=status,
                 fault="Status in failure list %s" % str(failure_statuses))
-
-        time.sleep(check_interval)
+        if timers:
+            last_negative_at = time.time()
+
+        interval = _get_poll_interval(timers, check_interval)
+        if batch_poller is not None:
+            try:
+                resource, unchanged_at = batch_poller.wait(
+                    resource, update_resource, status_attr=status_attr,
+                    interval=interval, timeout=start + timeout - time.time())
+            except exceptions.GetResourceNotFound:
+                if check_deletion:
+                    _add_uncertainty(timers, last_negative_at)
+                    return
+                raise
+            if unchanged_at is not None:
+                last_negative_at = unchanged_at
+            polled = True
+        else:
+            time.sleep(interval)
         if time.time() - start > timeout:
             raise exceptions.TimeoutException(
                 desired_status="('%s')" % "', '".join(ready_statuses),
@@ -251,6 +441,42 @@ def wait_for_status(resource, ready_statuses, failure_statuses=None,
                 resource_status=get_status(resource))
 
 
+def _get_poll_interval(timers, check_interval):
+    """Return the interval till the next poll of the resource.
+
+    If the resource is waited for inside of an atomic action which was
+    finished before, the action is expected to take as long as usual
+    (see atomic.get_expected_duration). Polls get denser while that moment
+    approaches (the interval is a half of the remaining time) and sparser
+    after it (the interval is the time the action is late), but they are
+    never more often than adaptive_status_polling_min_interval or more
+    rare than check_interval.
+
+    :param timers: active atomic.ActionTimer objects, from outer to inner
+    :param check_interval: max interval between two polls
+    """
+    if not (CONF.adaptive_status_polling and timers):
+        return check_interval
+    timer = timers[-1]
+    expected = atomic.get_expected_duration(timer.history_name)
+    if expected is None:
+        return check_interval
+
+    remaining = timer.start + expected - time.time()
+    interval = remaining / 2.0 if remaining > 0 else -remaining
+    min_interval = min(CONF.adaptive_status_polling_min_interval,
+                       check_interval)
+    return min(max(interval, min_interval), check_interval)
+
+
+def _add_uncertainty(timers, last_negative_at):
+    """Report the time between the last negative and the positive polls."""
+    if timers:
+        uncertainty = time.time() - last_negative_at
+        for timer in timers:
+            timer.add_uncertainty(uncertainty)
+
+
 @logging.log_deprecated("Use wait_for_status instead.", "0.1.2", once=True)
 def wait_for_delete(resource, update_resource=None, timeout=60,
                     check_interval=1):
@@ -15,8 +15,10 @@
 #    under the License.
 
 import functools
+import json
 import os
 import re
+import threading
 
 from glanceclient import exc as glance_exc
 from novaclient import exceptions as nova_exc
@@ -43,6 +45,81 @@ class ValidationResult(object):
         self.msg = msg
 
 
+class Lookups(object):
+    """Cloud lookups of validators memoized for one validation pass.
+
+    Lookups are memoized per credential, since users may see different
+    resources. Failed lookups are memoized as well. If several validators
+    need the same lookup at the same time, only one of them makes it and
+    the others wait for its result.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, credential, key, func, *args, **kwargs):
+        """Return the memoized result of func(*args, **kwargs).
+
+        :param credential: objects.Credential the lookup is made with
+        :param key: tuple that identifies the lookup for the credential
+        """
+        key = (json.dumps(credential.to_dict(include_permission=True),
+                          sort_keys=True),) + tuple(key)
+        with self._lock:
+            result = self._results.get(key)
+            owner = result is None
+            if owner:
+                result = self._results[key] = {"done": threading.Event()}
+        if owner:
+            try:
+                result["value"] = func(*args, **kwargs)
+            except Exception as e:
+                result["error"] = e
+            finally:
+                result["done"].set()
+        else:
+            result["done"].wait()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+
+
+class ValidationClients(osclients.Clients):
+    """Clients which memoize lookups of validators in Lookups."""
+
+    def __init__(self, credential, lookups, api_info=None):
+        super(ValidationClients, self).__init__(credential, api_info)
+        self.lookups = lookups
+
+    def lookup(self, key, func, *args, **kwargs):
+        return self.lookups.get(self.credential, key, func, *args, **kwargs)
+
+
+def _lookup(clients, key, func, *args, **kwargs):
+    """Make the lookup, memoized if clients are ValidationClients."""
+    if isinstance(clients, ValidationClients):
+        return clients.lookup(key, func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def _admin_clients(clients, deployment):
+    credential = objects.Credential(**deployment["admin"])
+    if isinstance(clients, ValidationClients):
+        return ValidationClients(credential, clients.lookups)
+    return osclients.Clients(credential)
+
+
+def user_independent(fn):
+    """Mark the validator which gives the same result for any user.
+
+    Such validators do not use clients of the user, so they are run once
+    per workload instead of once per user.
+    """
+    fn.user_independent = True
+    return fn
+
+
 def validator(fn):
     """Decorator that constructs a scenario validator from given function.
 
@@ -69,6 +146,8 @@ def validator(fn):
             # TODO(boris-42): remove this in future.
             wrap_validator.permission = getattr(fn, "permission",
                                                 consts.EndpointPermission.USER)
+            wrap_validator.user_independent = getattr(fn, "user_independent",
+                                                      False)
 
             scenario._meta_setdefault("validators", [])
             scenario._meta_get("validators").append(wrap_validator)
@@ -80,6 +159,7 @@ def validator(fn):
 
 
 @validator
+@user_independent
 def number(config, clients, deployment, param_name, minval=None, maxval=None,
            nullable=False, integer_only=False):
     """Checks that parameter is number that pass specified condition.
@@ -145,6 +225,7 @@ def _file_access_ok(filename, mode, param_name, required=True):
 
 
 @validator
+@user_independent
 def file_exists(config, clients, deployment, param_name, mode=os.R_OK,
                 required=True):
     """Validator checks parameter is proper path to file with proper mode.
@@ -209,6 +290,7 @@ def check_command_dict(command):
 
 
 @validator
+@user_independent
 def valid_command(config, clients, deployment, param_name, required=True):
     """Checks that parameter is a proper command-specifying dictionary.
 
@@ -263,21 +345,28 @@ def _get_validated_image(config, clients, param_name):
             }
             return (ValidationResult(True), image)
     try:
-        image_id = openstack_types.GlanceImage.transform(
-            clients=clients, resource_config=image_args)
-        image = clients.glance().images.get(image=image_id).to_dict()
-        if not image.get("size"):
-            image["size"] = 0
-        if not image.get("min_ram"):
-            image["min_ram"] = 0
-        if not image.get("min_disk"):
-            image["min_disk"] = 0
+        image = _lookup(clients, ("image", json.dumps(image_args,
+                                                      sort_keys=True)),
+                        _get_image, clients, image_args)
         return (ValidationResult(True), image)
     except (glance_exc.HTTPNotFound, exceptions.InvalidScenarioArgument):
         message = _("Image '%s' not found") % image_args
         return (ValidationResult(False, message), None)
 
 
+def _get_image(clients, image_args):
+    image_id = openstack_types.GlanceImage.transform(
+        clients=clients, resource_config=image_args)
+    image = clients.glance().images.get(image=image_id).to_dict()
+    if not image.get("size"):
+        image["size"] = 0
+    if not image.get("min_ram"):
+        image["min_ram"] = 0
+    if not image.get("min_disk"):
+        image["min_disk"] = 0
+    return image
+
+
 def _get_flavor_from_context(config, flavor_value):
     if "flavors" not in config.get("context", {}):
         raise exceptions.InvalidScenarioArgument("No flavors context")
@@ -297,9 +386,9 @@ def _get_validated_flavor(config, clients, param_name):
         msg = "Parameter %s is not specified." % param_name
         return (ValidationResult(False, msg), None)
     try:
-        flavor_id = openstack_types.Flavor.transform(
-            clients=clients, resource_config=flavor_value)
-        flavor = clients.nova().flavors.get(flavor=flavor_id)
+        flavor = _lookup(clients, ("flavor", json.dumps(flavor_value,
+                                                        sort_keys=True)),
+                         _get_flavor, clients, flavor_value)
         return (ValidationResult(True), flavor)
     except (nova_exc.NotFound, exceptions.InvalidScenarioArgument):
         try:
@@ -310,7 +399,14 @@ def _get_validated_flavor(config, clients, param_name):
         return (ValidationResult(False, message), None)
 
 
+def _get_flavor(clients, flavor_value):
+    flavor_id = openstack_types.Flavor.transform(
+        clients=clients, resource_config=flavor_value)
+    return clients.nova().flavors.get(flavor=flavor_id)
+
+
 @validator
+@user_independent
 def validate_share_proto(config, clients, deployment):
     """Validates value of share protocol for creation of Manila share."""
     allowed = ("NFS", "CIFS", "GLUSTERFS", "HDFS", )
@@ -393,7 +489,8 @@ def network_exists(config, clients, deployment, network_name):
     network = config.get("args", {}).get(network_name, "private")
 
     networks = [net.label for net in
-                clients.nova().networks.list()]
+                _lookup(clients, ("nova_networks",),
+                        lambda: clients.nova().networks.list())]
     if network not in networks:
         message = _("Network with name %(network)s not found. "
                     "Available networks: %(networks)s") % {
@@ -410,7 +507,9 @@ def external_network_exists(config, clients, deployment, network_name):
     if not ext_network:
         return ValidationResult(True)
 
-    networks = [net.name for net in clients.nova().floating_ip_pools.list()]
+    networks = [net.name for net in
+                _lookup(clients, ("floating_ip_pools",),
+                        lambda: clients.nova().floating_ip_pools.list())]
 
     if networks and isinstance(networks[0], dict):
         networks = [n["name"] for n in networks]
@@ -425,6 +524,7 @@ def external_network_exists(config, clients, deployment, network_name):
 
 
 @validator
+@user_independent
 def tempest_tests_exists(config, clients, deployment):
     """Validator checks that specified test exists."""
     args = config.get("args", {})
@@ -464,6 +564,7 @@ def tempest_tests_exists(config, clients, deployment):
 
 
 @validator
+@user_independent
 def tempest_set_exists(config, clients, deployment):
     """Validator that check that tempest set_name is valid."""
     set_name = config.get("args", {}).get("set_name")
@@ -478,6 +579,7 @@ def tempest_set_exists(config, clients, deployment):
 
 
 @validator
+@user_independent
 def required_parameters(config, clients, deployment, *required_params):
     """Validator for checking required parameters are specified.
 
@@ -496,12 +598,13 @@ def required_services(config, clients, deployment, *required_services):
 
     :param *required_services: list of services names
     """
-    available_services = list(clients.services().values())
+    available_services = list(
+        _lookup(clients, ("services",), clients.services).values())
 
     if consts.Service.NOVA_NET in required_services:
-        nova = osclients.Clients(
-            objects.Credential(**deployment["admin"])).nova()
-        for service in nova.services.list():
+        admin = _admin_clients(clients, deployment)
+        for service in _lookup(admin, ("nova_services",),
+                               lambda: admin.nova().services.list()):
             if (service.binary == consts.Service.NOVA_NET and
                     service.status == "enabled"):
                 available_services.append(consts.Service.NOVA_NET)
@@ -527,7 +630,9 @@ def required_neutron_extensions(config, clients, deployment,
 
     :param required_extensions: list of Neutron extensions
     """
-    extensions = clients.neutron().list_extensions().get("extensions", [])
+    extensions = _lookup(
+        clients, ("neutron_extensions",),
+        lambda: clients.neutron().list_extensions()).get("extensions", [])
     aliases = map(lambda x: x["alias"], extensions)
     for extension in required_extensions:
         if extension not in aliases:
@@ -536,6 +641,7 @@ def required_neutron_extensions(config, clients, deployment,
 
 
 @validator
+@user_independent
 def required_cinder_services(config, clients, deployment, service_name):
     """Validator checks that specified Cinder service is available.
 
@@ -545,10 +651,10 @@ def required_cinder_services(config, clients, deployment, service_name):
     :param service_name: Cinder service name
     """
 
-    admin_client = osclients.Clients(
-        objects.Credential(**deployment["admin"])).cinder()
+    admin = _admin_clients(clients, deployment)
 
-    for service in admin_client.services.list():
+    for service in _lookup(admin, ("cinder_services",),
+                           lambda: admin.cinder().services.list()):
         if (service.binary == six.text_type(service_name) and
                 service.state == six.text_type("up")):
             return ValidationResult(True)
@@ -580,6 +686,7 @@ def required_clients(config, clients, deployment, *components, **kwargs):
 
 
 @validator
+@user_independent
 def required_contexts(config, clients, deployment, *context_names):
     """Validator checks if required benchmark contexts are specified.
 
@@ -594,6 +701,23 @@ def required_contexts(config, clients, deployment, *context_names):
 
 
 @validator
+@user_independent
+def required_async_runner(config, clients, deployment):
+    """Validator checks that the workload is run by an async runner.
+
+    Coroutine scenarios return awaitables, which only the async runners
+    wait for.
+    """
+    runner_type = config.get("runner", {}).get("type", "serial")
+    if not runner_type.startswith("async_"):
+        message = (_("The scenario returns coroutines and requires an async "
+                     "runner (async_constant or async_rps), but the runner "
+                     "is '%s'") % runner_type)
+        return ValidationResult(False, message)
+
+
+@validator
+@user_independent
 def required_openstack(config, clients, deployment, admin=False, users=False):
     """Validator that requires OpenStack admin or (and) users.
 
@@ -664,7 +788,9 @@ def volume_type_exists(config, clients, deployment, param_name):
     """
     val = config.get("args", {}).get(param_name)
     if val:
-        volume_types_list = clients.cinder().volume_types.list()
+        volume_types_list = _lookup(
+            clients, ("volume_types",),
+            lambda: clients.cinder().volume_types.list())
         if not volume_types_list:
             message = (_("Must have at least one volume type created "
                          "when specifying use of volume types."))
@@ -672,6 +798,7 @@ def volume_type_exists(config, clients, deployment, param_name):
 
 
 @validator
+@user_independent
 def restricted_parameters(config, clients, deployment, param_names,
                           subdict=None):
     """Validates that parameters is not set.
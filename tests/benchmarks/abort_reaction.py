@@ -0,0 +1,146 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure how fast abort_on_sla_failure stops the load and coordinator CPU.
+
+The load is produced by Dummy.failure via the constant runner, the results
+are consumed by ResultConsumer which writes them to a temporary sqlite DB.
+The iteration number --fail-at raises an error, so the failure_rate SLA
+fails and the runner is aborted. The script prints:
+
+* reaction time - from the end of the failed iteration till the call of
+  runner.abort();
+* count of iterations started after the failed one had finished;
+* CPU time of the coordinator process (runner + consumer threads, without
+  worker processes) relative to the wall time of the workload.
+
+Run this script on two revisions of Rally to compare them:
+
+    python -m tests.benchmarks.abort_reaction --sleep 0.05 --concurrency 10
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from oslo_config import cfg
+
+from rally.common import db
+from rally.common import objects
+from rally import plugins
+from rally.plugins.common.runners import constant
+from rally.plugins.common.scenarios.dummy import dummy
+from rally.task import engine
+
+
+def _cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_benchmark(task, config, args, abort_on_sla_failure=True):
+    """Run Dummy.failure with ResultConsumer and measure the abort.
+
+    :returns: dict with measurements
+    """
+    runner_obj = constant.ConstantScenarioRunner(task, config)
+    aborted_at = []
+    runner_abort = runner_obj.abort
+
+    def abort():
+        if not aborted_at:
+            aborted_at.append(time.time())
+        runner_abort()
+
+    runner_obj.abort = abort
+    key = {"name": "Dummy.failure", "pos": 0,
+           "kw": {"sla": {"failure_rate": {"max": 0}}}}
+    context = {"task": task, "config": {}}
+
+    cpu_started = _cpu_time()
+    started_at = time.time()
+    with engine.ResultConsumer(key, task, runner_obj,
+                               abort_on_sla_failure) as consumer:
+        # NOTE: ScenarioRunner.run() is skipped to not require admin
+        #     credentials for the types preprocessing
+        runner_obj._run_scenario(dummy.DummyFailure, "run", context, args)
+    duration = time.time() - started_at
+    cpu = _cpu_time() - cpu_started
+
+    results = task.get_results()[-1]["data"]["raw"]
+    failed = [r for r in results if r["error"]]
+    result = {"iterations": consumer.iterations_count,
+              "duration": duration,
+              "cpu": cpu,
+              "reaction": None,
+              "started_after": None}
+    if failed and aborted_at:
+        failed_at = min(r["timestamp"] + r["duration"] for r in failed)
+        result["reaction"] = aborted_at[0] - failed_at
+        result["started_after"] = len(
+            [r for r in results if r["timestamp"] > failed_at])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--times", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--sleep", type=float, default=0.05)
+    parser.add_argument("--fail-at", type=int, default=100)
+    args = parser.parse_args()
+
+    plugins.load()
+    fd, db_path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    cfg.CONF([], project="rally")
+    cfg.CONF.set_override("connection", "sqlite:///%s" % db_path,
+                          group="database")
+    try:
+        db.schema_create()
+        task = objects.Task(deployment_uuid="benchmark")
+        config = {"type": "constant", "times": args.times,
+                  "concurrency": args.concurrency}
+
+        aborted = run_benchmark(
+            task, config, {"sleep": args.sleep,
+                           "from_iteration": args.fail_at,
+                           "to_iteration": args.fail_at})
+        print("abort on SLA failure at iteration %d:" % args.fail_at)
+        print("  reaction time, ms:                %10.1f"
+              % (aborted["reaction"] * 1000))
+        print("  iterations started after failure: %10d"
+              % aborted["started_after"])
+        print("  iterations total:                 %10d"
+              % aborted["iterations"])
+
+        # without failures, to measure the idle coordinator
+        full = run_benchmark(task, dict(config, times=args.fail_at),
+                             {"sleep": args.sleep})
+        print("load of %d iterations, %.2f s:" % (full["iterations"],
+                                                  full["duration"]))
+        print("  coordinator CPU time, s:          %10.3f" % full["cpu"])
+        print("  coordinator CPU usage, %%:         %10.1f"
+              % (full["cpu"] / full["duration"] * 100))
+    finally:
+        db.engine_reset()
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare the threaded and the async runners on an I/O bound scenario.
+
+The constant runner runs Dummy.dummy in threads and the async_constant
+runner runs Dummy.dummy_coroutine on event loops with the same sleep,
+times and concurrency. The script prints the throughput of both runs and
+the overhead of the iterations, i.e. how much longer than the sleep they
+took on average:
+
+    python -m tests.benchmarks.async_runners --times 50000 \\
+        --concurrency 5000 --sleep 0.5
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+from rally.plugins.common.runners import async_runners
+from rally.plugins.common.runners import constant
+from rally.plugins.common.scenarios.dummy import dummy
+
+
+def run_benchmark(runner_cls, config, scenario_cls, sleep):
+    """Run the scenario via the runner.
+
+    :returns: tuple with number of iterations, duration of the run in
+              seconds and the average duration of iterations
+    """
+    task = {"uuid": "benchmark"}
+    runner_obj = runner_cls(task, config)
+    context = {"task": task, "config": {}}
+
+    started_at = time.time()
+    runner_obj._run_scenario(scenario_cls, "run", context, {"sleep": sleep})
+    duration = time.time() - started_at
+
+    results = [r for batch in runner_obj.result_queue for r in batch]
+    average = sum(r["duration"] for r in results) / len(results)
+    return len(results), duration, average
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--times", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=2000)
+    parser.add_argument("--sleep", type=float, default=0.5)
+    parser.add_argument("--max-cpu-count", type=int)
+    args = parser.parse_args()
+
+    cpu = {"max_cpu_count": args.max_cpu_count} if args.max_cpu_count else {}
+    benchmarks = [
+        ("constant", constant.ConstantScenarioRunner, dummy.Dummy),
+        ("async_constant", async_runners.AsyncConstantScenarioRunner,
+         dummy.DummyCoroutine)
+    ]
+
+    print("%-16s %12s %12s %14s %12s" % ("runner", "iterations",
+                                         "duration, s", "iterations/s",
+                                         "overhead, s"))
+    for name, runner_cls, scenario_cls in benchmarks:
+        config = dict(type=name, times=args.times,
+                      concurrency=args.concurrency, **cpu)
+        iterations, duration, average = run_benchmark(
+            runner_cls, config, scenario_cls, args.sleep)
+        print("%-16s %12d %12.2f %14.1f %12.4f"
+              % (name, iterations, duration, iterations / duration,
+                 average - args.sleep))
+
+
+if __name__ == "__main__":
+    main()
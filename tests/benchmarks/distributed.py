@@ -0,0 +1,127 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the distributed runner with several local agent processes.
+
+Agents are started as separate processes which share a temporary sqlite
+DB with the coordinator, like agents on different hosts share the Rally
+DB. Dummy.dummy is run by the constant runner locally and then by the
+distributed runner with the same constant load divided between the agents.
+The script prints the throughput of both runs and the status and the count
+of results of each agent:
+
+    python -m tests.benchmarks.distributed --agents 4 --times 20000 \\
+        --concurrency 400
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from oslo_config import cfg
+
+from rally.common import db
+from rally.common import objects
+from rally import plugins
+from rally.plugins.common.runners import constant
+from rally.plugins.common.runners import distributed
+from rally.plugins.common.scenarios.dummy import dummy
+from rally.task import agent
+
+
+def _configure(db_path):
+    cfg.CONF([], project="rally")
+    cfg.CONF.set_override("connection", "sqlite:///%s" % db_path,
+                          group="database")
+    cfg.CONF.set_override("agent_authkey", "benchmark")
+    cfg.CONF.set_override("agent_heartbeat_interval", 1)
+
+
+def _run_agent(db_path, started):
+    _configure(db_path)
+    plugins.load()
+    agent_obj = agent.Agent("127.0.0.1", 0)
+    started.release()
+    try:
+        agent_obj.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+def run(runner_obj, sleep):
+    context = {"task": runner_obj.task, "config": {}}
+    started_at = time.time()
+    runner_obj._run_scenario(dummy.Dummy, "run", context, {"sleep": sleep})
+    duration = time.time() - started_at
+    results = sum(len(batch) for batch in runner_obj.result_queue)
+    return duration, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--times", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=400)
+    parser.add_argument("--sleep", type=float, default=0.01)
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    _configure(db_path)
+    plugins.load()
+    db.schema_create()
+
+    started = multiprocessing.Semaphore(0)
+    processes = [multiprocessing.Process(target=_run_agent,
+                                         args=(db_path, started))
+                 for i in range(args.agents)]
+    try:
+        for process in processes:
+            process.start()
+        for process in processes:
+            started.acquire()
+        # agents register themselves after the start
+        while len(agent.get_alive_agents()) < args.agents:
+            time.sleep(0.1)
+
+        task = objects.Task(temporary=True)
+        config = {"type": "constant", "times": args.times,
+                  "concurrency": args.concurrency}
+        duration, results = run(constant.ConstantScenarioRunner(task, config),
+                                args.sleep)
+        print("local:       %6d results in %7.2f s, %8.1f iterations/s"
+              % (results, duration, results / duration))
+
+        runner_obj = distributed.DistributedScenarioRunner(
+            task, {"type": "distributed", "runner": config})
+        duration, results = run(runner_obj, args.sleep)
+        print("distributed: %6d results in %7.2f s, %8.1f iterations/s"
+              % (results, duration, results / duration))
+        for agent_client in runner_obj.agents:
+            print("  agent %-20s %-10s %6d results"
+                  % (agent_client.address, agent_client.status,
+                     agent_client.results))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure requests per second of HttpRequests.check_random_request.
+
+The scenario is run by the constant runner against a local stand-in HTTP
+server (started in separate processes) with kept alive connections and
+with a new connection per request. The script prints the throughput and
+the average durations of the parts of the requests:
+
+    python -m tests.benchmarks.http_requests --times 100000 \\
+        --concurrency 64 --servers 4
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import socket
+import threading
+import time
+
+from oslo_config import cfg
+
+from rally.plugins.common.runners import constant
+from rally.plugins.common.scenarios.requests import http_requests
+from rally.plugins.common.scenarios.requests import utils
+
+CONF = cfg.CONF
+
+RESPONSE = (b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+            b"Content-Length: 2\r\n\r\nok")
+RESPONSE_CLOSE = (b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                  b"Connection: close\r\nContent-Length: 2\r\n\r\nok")
+
+
+def handle(conn):
+    """Answer bodiless requests of the connection with a canned response."""
+    data = b""
+    try:
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                return
+            data += chunk
+            while b"\r\n\r\n" in data:
+                head, data = data.split(b"\r\n\r\n", 1)
+                if b"connection: close" in head.lower():
+                    conn.sendall(RESPONSE_CLOSE)
+                    return
+                conn.sendall(RESPONSE)
+    finally:
+        conn.close()
+
+
+def serve(sock):
+    while True:
+        conn, addr = sock.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        thread = threading.Thread(target=handle, args=(conn,))
+        thread.daemon = True
+        thread.start()
+
+
+def start_servers(count):
+    """Start count processes which accept connections of one socket.
+
+    :returns: tuple with url of the server and list of the processes
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1024)
+    processes = [multiprocessing.Process(target=serve, args=(sock,))
+                 for i in range(count)]
+    for process in processes:
+        process.daemon = True
+        process.start()
+    sock.close()
+    return "http://127.0.0.1:%d/" % sock.getsockname()[1], processes
+
+
+def run_benchmark(config, url):
+    """Run HttpRequests.check_random_request via the constant runner.
+
+    :returns: tuple with number of iterations, duration of the run in
+              seconds and dict with average durations of parts of requests
+    """
+    task = {"uuid": "benchmark"}
+    runner_obj = constant.ConstantScenarioRunner(task, config)
+    context = {"task": task, "config": {}}
+    args = {"requests": [{"url": url, "method": "GET"},
+                         {"url": url + "foo", "method": "GET"}],
+            "status_code": 200}
+
+    started_at = time.time()
+    runner_obj._run_scenario(http_requests.HttpRequestsCheckRandomRequest,
+                             "run", context, args)
+    duration = time.time() - started_at
+
+    results = [r for batch in runner_obj.result_queue for r in batch]
+    timings = {}
+    for result in results:
+        for output in result["output"]["additive"]:
+            if output["title"] == "Request timings":
+                for name, value in output["data"]:
+                    timings[name] = timings.get(name, 0) + value
+    averages = dict((name, total / len(results))
+                    for name, total in timings.items())
+    return len(results), duration, averages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--times", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--servers", type=int, default=4)
+    parser.add_argument("--max-cpu-count", type=int)
+    args = parser.parse_args()
+
+    url, processes = start_servers(args.servers)
+    cpu = {"max_cpu_count": args.max_cpu_count} if args.max_cpu_count else {}
+    config = dict(type="constant", times=args.times,
+                  concurrency=args.concurrency, **cpu)
+
+    print("%-12s %12s %12s %12s %12s %12s %12s"
+          % ("keep-alive", "iterations", "duration, s", "requests/s",
+             "connect, ms", "ttfb, ms", "body, ms"))
+    for keep_alive in (True, False):
+        CONF.set_override("requests_keep_alive", keep_alive,
+                          group="benchmark")
+        utils.SESSIONS_POOL.clear()
+        iterations, duration, averages = run_benchmark(config, url)
+        print("%-12s %12d %12.2f %12.1f %12.3f %12.3f %12.3f"
+              % (keep_alive, iterations, duration, iterations / duration,
+                 averages.get("connect", 0) * 1000,
+                 averages.get("ttfb", 0) * 1000,
+                 averages.get("body", 0) * 1000))
+
+    for process in processes:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
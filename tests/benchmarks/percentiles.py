@@ -0,0 +1,98 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare PercentileComputation with exact percentiles of sorted samples.
+
+Durations are generated with log-normal distribution, which is close to
+durations of real iterations. For each percentile the value error, the
+rank error and the time of processing all samples are printed:
+
+    python -m tests.benchmarks.percentiles --samples 1000000
+"""
+
+from __future__ import print_function
+
+import argparse
+import bisect
+import random
+import time
+
+from rally.common import streaming_algorithms as streaming
+from rally.task.processing import utils
+
+
+def exact_percentile(sorted_values, percent):
+    k = (len(sorted_values) - 1) * percent
+    f = int(k)
+    c = min(f + 1, len(sorted_values) - 1)
+    return sorted_values[f] + (sorted_values[c] - sorted_values[f]) * (k - f)
+
+
+def zipped_percentile(values, percent):
+    """Percentile of averaged points, as it was computed before t-digest."""
+    zipper = utils.GraphZipper(len(values), 10000)
+    for value in values:
+        zipper.add_point(value)
+    return exact_percentile(
+        sorted(p[1] for p in zipper.get_zipped_graph()), percent)
+
+
+def streaming_percentile(values, percent, parts):
+    comps = [streaming.PercentileComputation(percent) for _ in range(parts)]
+    for idx, value in enumerate(values):
+        comps[idx % parts].add(value)
+    for comp in comps[1:]:
+        comps[0].merge(comp)
+    return comps[0].result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--samples", type=int, default=1000000)
+    parser.add_argument("--parts", type=int, default=8,
+                        help="Samples are processed by that many instances "
+                             "which are merged to get the result")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    values = [random.lognormvariate(0, 1) for i in range(args.samples)]
+
+    started_at = time.time()
+    sorted_values = sorted(values)
+    sort_duration = time.time() - started_at
+    print("Sorting of %d samples: %.2fs\n" % (args.samples, sort_duration))
+
+    methods = [("t-digest", lambda p: streaming_percentile(values, p, 1)),
+               ("t-digest, %d merged" % args.parts,
+                lambda p: streaming_percentile(values, p, args.parts)),
+               ("graph zipper", lambda p: zipped_percentile(values, p))]
+
+    print("%-7s %-22s %12s %12s %12s %10s" % (
+        "%ile", "method", "exact", "result", "rank error", "time, s"))
+    for percent in (0.5, 0.9, 0.95, 0.99, 0.999):
+        exact = exact_percentile(sorted_values, percent)
+        for name, method in methods:
+            started_at = time.time()
+            result = method(percent)
+            duration = time.time() - started_at
+            rank = bisect.bisect_left(sorted_values, result) / float(
+                args.samples)
+            print("%-7s %-22s %12.6f %12.6f %12.6f %10.2f" % (
+                percent * 100, name, exact, result, rank - percent,
+                duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare processing of a workload for the HTML report by charts and NumPy.
+
+A workload with synthetic iterations (some of them failed, with scheduled
+start and atomic actions) is processed by both ways. The processing time
+of each way and the maximal deviation of data of each chart are printed
+(percentiles of long workloads are approximated by charts, so the stats
+table deviates slightly):
+
+    python -m tests.benchmarks.report --iterations 1000000
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import numbers
+import random
+import time
+
+from rally.task.processing import charts
+from rally.task.processing import columnar
+
+
+CHARTS = collections.OrderedDict([
+    ("main_area", charts.MainStackedAreaChart),
+    ("main_hist", charts.MainHistogramChart),
+    ("main_stat", charts.MainStatsTable),
+    ("load_profile", charts.LoadProfileChart),
+    ("schedule_rate", charts.ScheduleRateChart),
+    ("schedule_lag", charts.ScheduleLagChart),
+    ("atomic_pie", charts.AtomicAvgChart),
+    ("atomic_area", charts.AtomicStackedAreaChart),
+    ("atomic_hist", charts.AtomicHistogramChart)])
+
+
+def make_workload(count, atomics, failure_rate):
+    iterations = []
+    for i in range(count):
+        duration = random.lognormvariate(0, 0.5)
+        actions = collections.OrderedDict(
+            ("action_%d" % a, duration / (atomics + 1))
+            for a in range(atomics))
+        timestamp = 1000 + i * 0.01
+        iterations.append({
+            "timestamp": timestamp + random.random() * 0.1,
+            "scheduled_at": timestamp,
+            "duration": duration,
+            "idle_duration": random.random() * 0.01,
+            "error": (["E", "msg", "trace"]
+                      if random.random() < failure_rate else []),
+            "output": {"additive": [], "complete": []},
+            "atomic_actions": actions})
+    durations = [i["duration"] for i in iterations]
+    info = {"iterations_count": count,
+            "iterations_failed": sum(bool(i["error"]) for i in iterations),
+            "min_duration": min(durations), "max_duration": max(durations),
+            "tstamp_start": 1000, "load_duration": count * 0.01 + 10,
+            "atomic": collections.OrderedDict(
+                ("action_%d" % a, {"min_duration": min(durations) / 2,
+                                   "max_duration": max(durations) / 2})
+                for a in range(atomics))}
+    return info, iterations
+
+
+def max_deviation(expected, observed):
+    if isinstance(expected, dict):
+        return max([max_deviation(expected[k], observed[k])
+                    for k in expected] or [0])
+    if isinstance(expected, (list, tuple)):
+        if len(expected) != len(observed):
+            return float("inf")
+        return max([max_deviation(e, o)
+                    for e, o in zip(expected, observed)] or [0])
+    if (isinstance(expected, numbers.Number)
+            and isinstance(observed, numbers.Number)):
+        return abs(expected - observed)
+    return 0 if expected == observed else float("inf")
+
+
+def process_by_charts(info, iterations):
+    main_charts = [(name, cls(info)) for name, cls in CHARTS.items()]
+    for iteration in iterations:
+        for name, chart in main_charts:
+            chart.add_iteration(iteration)
+    return dict((name, chart.render()) for name, chart in main_charts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=1000000)
+    parser.add_argument("--atomics", type=int, default=3,
+                        help="Number of atomic actions in each iteration")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not columnar.is_available():
+        parser.error("NumPy is not installed")
+
+    random.seed(args.seed)
+    info, iterations = make_workload(args.iterations, args.atomics,
+                                     args.failure_rate)
+
+    started_at = time.time()
+    expected = process_by_charts(info, iterations)
+    charts_duration = time.time() - started_at
+
+    started_at = time.time()
+    observed = columnar.render(info, iterations)
+    columnar_duration = time.time() - started_at
+
+    print("Processing of %d iterations: charts %.2fs, vectorized %.2fs "
+          "(x%.1f)\n" % (args.iterations, charts_duration, columnar_duration,
+                         charts_duration / max(columnar_duration, 1e-9)))
+    print("%-15s %15s" % ("chart", "max deviation"))
+    for name in CHARTS:
+        print("%-15s %15.9f" % (name, max_deviation(expected[name],
+                                                    observed[name])))
+
+
+if __name__ == "__main__":
+    main()
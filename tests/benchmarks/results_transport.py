@@ -0,0 +1,113 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the cost of sending iteration results from worker processes.
+
+Results of Dummy.dummy_random_action are sent the way they are sent by
+runners: the worker side prepares messages for multiprocessing.Queue (which
+pickles them) and the runner side unpickles and accepts them. The runner
+side is a single process for all the workers, so its cost per result
+limits the rate of iterations of the whole task.
+
+    python -m tests.benchmarks.results_transport --results 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import pickle
+import time
+
+from rally.plugins.common.scenarios.dummy import dummy
+from rally.task import runner
+from rally.task import transport
+
+
+def make_results(count, actions_num):
+    context = {"task": {"uuid": "benchmark"}, "iteration": 1}
+    args = {"actions_num": actions_num, "sleep_min": 0, "sleep_max": 0}
+    result = runner._run_scenario_once(dummy.DummyRandomAction, "run",
+                                       context, args)
+    return [dict(result, timestamp=result["timestamp"] + i)
+            for i in range(count)]
+
+
+def measure(func, *args):
+    started_at = time.time()
+    func(*args)
+    return time.time() - started_at
+
+
+def pickled_dicts(results, batch_size):
+    """Worker and runner sides of sending every result on its own."""
+    validate = runner._result_has_valid_schema
+
+    def worker():
+        return [pickle.dumps(r, pickle.HIGHEST_PROTOCOL) for r in results]
+
+    def runner_side(messages):
+        for message in messages:
+            validate(pickle.loads(message), "benchmark")
+
+    messages = worker()
+    return measure(worker), measure(runner_side, messages)
+
+
+def encoded_batches(results, batch_size):
+    """Worker and runner sides of ResultsSender and ResultsDecoder."""
+    validate = runner._result_has_valid_schema
+    batches = [results[i:i + batch_size]
+               for i in range(0, len(results), batch_size)]
+
+    def worker():
+        encoder = transport.ResultsEncoder()
+        messages = []
+        for batch in batches:
+            for r in batch:
+                validate(r, "benchmark")
+            messages.append(pickle.dumps(encoder.encode(batch),
+                                         pickle.HIGHEST_PROTOCOL))
+        return messages
+
+    def runner_side(messages):
+        decoder = transport.ResultsDecoder()
+        for message in messages:
+            decoder.decode(pickle.loads(message))
+
+    messages = worker()
+    return measure(worker), measure(runner_side, messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--results", type=int, default=100000)
+    parser.add_argument("--actions", type=int, default=5)
+    args = parser.parse_args()
+
+    results = make_results(args.results, args.actions)
+    print("%-24s %10s %18s %18s" % ("transport", "batch", "worker, us/result",
+                                    "runner, us/result"))
+    for name, func, batch_size in (
+            ("pickled dicts", pickled_dicts, 1),
+            ("encoded batches", encoded_batches, 1),
+            ("encoded batches", encoded_batches, 10),
+            ("encoded batches", encoded_batches, 100)):
+        worker, runner_side = func(results, batch_size)
+        print("%-24s %10d %18.2f %18.2f" % (
+            name, batch_size, worker / args.results * 10 ** 6,
+            runner_side / args.results * 10 ** 6))
+
+
+if __name__ == "__main__":
+    main()
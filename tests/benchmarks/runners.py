@@ -0,0 +1,87 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure iterations per second which runners achieve with Dummy.dummy.
+
+Dummy.dummy does nothing, so the measured rate is the overhead of the
+runner itself (processes, threads, queues, results validation).
+Run this script on two revisions of Rally to compare them:
+
+    python -m tests.benchmarks.runners --times 20000 --concurrency 500
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+from rally.plugins.common.runners import constant
+from rally.plugins.common.runners import rps
+from rally.plugins.common.scenarios.dummy import dummy
+
+
+def run_benchmark(runner_cls, config, batch_size=1000):
+    """Run Dummy.dummy via the runner and return the count of iterations.
+
+    :param runner_cls: ScenarioRunner subclass
+    :param config: runner config
+    :param batch_size: size of the batches sent to the results consumer
+    :returns: tuple with number of iterations and duration in seconds
+    """
+    task = {"uuid": "benchmark"}
+    runner_obj = runner_cls(task, config, batch_size=batch_size)
+    context = {"task": task, "config": {}}
+
+    # NOTE: ScenarioRunner.run() is skipped to not require admin
+    #     credentials for the types preprocessing
+    started_at = time.time()
+    runner_obj._run_scenario(dummy.Dummy, "run", context, {})
+    duration = time.time() - started_at
+
+    iterations = sum(len(batch) for batch in runner_obj.result_queue)
+    return iterations, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--times", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--rps", type=float, default=10000)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--max-cpu-count", type=int)
+    args = parser.parse_args()
+
+    cpu = {"max_cpu_count": args.max_cpu_count} if args.max_cpu_count else {}
+    benchmarks = [
+        ("constant", constant.ConstantScenarioRunner,
+         dict(type="constant", times=args.times,
+              concurrency=args.concurrency, **cpu)),
+        ("constant_for_duration", constant.ConstantForDurationScenarioRunner,
+         {"type": "constant_for_duration", "duration": args.duration,
+          "concurrency": args.concurrency}),
+        ("rps", rps.RPSScenarioRunner,
+         dict(type="rps", times=args.times, rps=args.rps,
+              max_concurrency=args.concurrency, **cpu)),
+    ]
+
+    print("%-24s %12s %12s %14s" % ("runner", "iterations", "duration, s",
+                                    "iterations/s"))
+    for name, runner_cls, config in benchmarks:
+        iterations, duration = run_benchmark(runner_cls, config)
+        print("%-24s %12d %12.2f %14.1f" % (name, iterations, duration,
+                                            iterations / duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the time of loading plugins at the start of the CLI.
+
+Each measurement is a new Python process which imports the CLI, loads
+plugins and looks up a plugin, like `rally plugin show` and `rally task
+start` do. The processes use a temporary HOME, so the index of plugins
+(rally.plugins.INDEX_PATH) of the user is not touched. Modes:
+
+* eager - all modules of plugins are imported;
+* lazy-cold - there is no index, so it is made (the first run after
+  installing or updating Rally);
+* lazy-warm - modules are imported by the index on the first use.
+
+The script prints the median wall time of each mode and the count of
+imported modules of Rally:
+
+    python -m tests.benchmarks.startup --runs 10
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SCRIPT = """
+import sys
+import rally.cli.main
+from rally import plugins
+plugins.load(lazy=%(lazy)s)
+from rally.task import scenario
+scenario.Scenario.get(%(plugin)r)
+print(len([m for m in sys.modules if m.startswith("rally.")]))
+"""
+
+
+def run_once(home, lazy, plugin):
+    """Run a process which loads plugins.
+
+    :returns: tuple of wall time and count of imported modules of Rally
+    """
+    env = dict(os.environ, HOME=home)
+    started_at = time.time()
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT % {"lazy": lazy, "plugin": plugin}],
+        env=env)
+    return time.time() - started_at, int(output.strip())
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=10,
+                        help="count of processes of each mode")
+    parser.add_argument("--plugin", default="Dummy.dummy",
+                        help="name of scenario to look up")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    index_path = os.path.join(home, ".rally", "plugins_index.json")
+    try:
+        modes = [("eager", False, False), ("lazy-cold", True, True),
+                 ("lazy-warm", True, False)]
+        for mode, lazy, remove_index in modes:
+            times = []
+            modules = None
+            for i in range(args.runs):
+                if remove_index and os.path.exists(index_path):
+                    os.remove(index_path)
+                duration, modules = run_once(home, lazy, args.plugin)
+                times.append(duration)
+            print("%-10s median %.3f s, min %.3f s, %d Rally modules"
+                  % (mode, _median(times), min(times), modules))
+    finally:
+        shutil.rmtree(home)
+
+
+if __name__ == "__main__":
+    main()
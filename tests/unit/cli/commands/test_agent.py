@@ -0,0 +1,65 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime as dt
+
+import mock
+
+from rally.cli.commands import agent
+from tests.unit import test
+
+
+class AgentCommandsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AgentCommandsTestCase, self).setUp()
+        self.agent = agent.AgentCommands()
+
+    @mock.patch("rally.cli.commands.agent.agent.Agent")
+    def test_start(self, mock_agent):
+        self.agent.start("127.0.0.1", 1234, public_host="example.com")
+
+        mock_agent.assert_called_once_with("127.0.0.1", 1234,
+                                           public_host="example.com")
+        mock_agent.return_value.serve.assert_called_once_with()
+
+    @mock.patch("rally.cli.commands.agent.agent.Agent")
+    def test_start_interrupted(self, mock_agent):
+        mock_agent.return_value.serve.side_effect = KeyboardInterrupt
+
+        self.agent.start()
+
+        mock_agent.assert_called_once_with("0.0.0.0", 0, public_host=None)
+
+    @mock.patch("rally.cli.commands.agent.cliutils.print_list")
+    @mock.patch("rally.cli.commands.agent.agent.list_agents")
+    def test_list(self, mock_list_agents, mock_print_list):
+        updated_at = dt.datetime(2016, 1, 1)
+        mock_list_agents.return_value = [
+            {"address": "a:1", "updated_at": updated_at, "alive": True}]
+
+        self.agent.list()
+
+        headers = ["address", "updated_at", "alive"]
+        mock_print_list.assert_called_once_with(mock.ANY, headers)
+        rows = mock_print_list.call_args[0][0]
+        self.assertEqual([("a:1", str(updated_at), "True")],
+                         [(r.address, r.updated_at, r.alive) for r in rows])
+
+    @mock.patch("rally.cli.commands.agent.cliutils.print_list")
+    @mock.patch("rally.cli.commands.agent.agent.list_agents",
+                return_value=[])
+    def test_list_empty(self, mock_list_agents, mock_print_list):
+        self.agent.list()
+        self.assertFalse(mock_print_list.called)
@@ -65,8 +65,9 @@ class ShowCommandsTestCase(test.TestCase):
         self.show.images(self.fake_deployment_id)
         mock_deployment_get.assert_called_once_with(self.fake_deployment_id)
 
-        mock_glance_create_client.assert_has_calls([mock.call()] * 3)
-        self.assertEqual(3, mock_glance_create_client.call_count)
+        # clients of the same user credentials are pooled
+        mock_glance_create_client.assert_has_calls([mock.call()] * 2)
+        self.assertEqual(2, mock_glance_create_client.call_count)
 
         headers = ["UUID", "Name", "Size (B)"]
         fake_data = dict(
@@ -103,8 +104,9 @@ class ShowCommandsTestCase(test.TestCase):
         })
         self.show.flavors(self.fake_deployment_id)
         mock_deployment_get.assert_called_once_with(self.fake_deployment_id)
-        mock_nova_create_client.assert_has_calls([mock.call()] * 3)
-        self.assertEqual(3, mock_nova_create_client.call_count)
+        # clients of the same user credentials are pooled
+        mock_nova_create_client.assert_has_calls([mock.call()] * 2)
+        self.assertEqual(2, mock_nova_create_client.call_count)
 
         headers = ["ID", "Name", "vCPUs", "RAM (MB)", "Swap (MB)", "Disk (GB)"]
         fake_data = dict(
@@ -143,8 +145,9 @@ class ShowCommandsTestCase(test.TestCase):
         })
         self.show.networks(self.fake_deployment_id)
         mock_deployment_get.assert_called_once_with(self.fake_deployment_id)
-        mock_nova_create_client.assert_has_calls([mock.call()] * 3)
-        self.assertEqual(3, mock_nova_create_client.call_count)
+        # clients of the same user credentials are pooled
+        mock_nova_create_client.assert_has_calls([mock.call()] * 2)
+        self.assertEqual(2, mock_nova_create_client.call_count)
 
         headers = ["ID", "Label", "CIDR"]
         fake_data = dict(
@@ -213,8 +216,9 @@ class ShowCommandsTestCase(test.TestCase):
         })
         self.show.keypairs(self.fake_deployment_id)
         mock_deployment_get.assert_called_once_with(self.fake_deployment_id)
-        mock_nova_create_client.assert_has_calls([mock.call()] * 3)
-        self.assertEqual(3, mock_nova_create_client.call_count)
+        # clients of the same user credentials are pooled
+        mock_nova_create_client.assert_has_calls([mock.call()] * 2)
+        self.assertEqual(2, mock_nova_create_client.call_count)
 
         headers = ["Name", "Fingerprint"]
         fake_data = dict(
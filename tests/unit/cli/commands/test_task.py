@@ -364,6 +364,30 @@ class TaskCommandsTestCase(test.TestCase):
                                     "is 'finished'.")]
         mock_stdout.write.assert_has_calls(expected_calls, any_order=True)
 
+    @mock.patch("rally.cli.commands.task.api.Task")
+    @mock.patch("rally.cli.commands.task.sys.stdout")
+    def test_detailed_task_in_progress(self, mock_stdout, mock_task):
+        test_uuid = "test_task_id"
+        mock_task.get_detailed.return_value = {
+            "id": "task", "uuid": test_uuid,
+            "status": consts.TaskStatus.RUNNING, "results": []}
+        mock_task.get.return_value.get_results.return_value = [
+            {"key": {"name": "Dummy.dummy", "pos": 0},
+             "data": {"raw": [{}] * 10}},
+            {"key": {"name": "Dummy.dummy", "pos": 1},
+             "data": {"raw": [{}] * 3, "partial": True}}]
+
+        self.task.detailed(test_uuid)
+
+        mock_task.get.assert_called_once_with(test_uuid)
+        expected_calls = [
+            mock.call("\nIterations saved so far:"),
+            mock.call("  Dummy.dummy (args position 0): 10 iterations, "
+                      "finished"),
+            mock.call("  Dummy.dummy (args position 1): 3 iterations, "
+                      "in progress")]
+        mock_stdout.write.assert_has_calls(expected_calls, any_order=True)
+
     @mock.patch("rally.cli.commands.task.envutils.get_global")
     def test_detailed_no_task_id(self, mock_get_global):
         mock_get_global.side_effect = exceptions.InvalidArgumentsException
@@ -383,7 +407,7 @@ class TaskCommandsTestCase(test.TestCase):
     def test_results(self, mock_task_get, mock_json_dumps):
         task_id = "foo_task_id"
         data = [
-            {"key": "foo_key", "data": {"raw": "foo_raw", "sla": [],
+            {"key": "foo_key", "data": {"raw": ["foo_raw"], "sla": [],
                                         "load_duration": 1.0,
                                         "full_duration": 2.0}}
         ]
@@ -427,7 +451,8 @@ class TaskCommandsTestCase(test.TestCase):
                  "data": {"raw": key + "_raw",
                           "sla": key + "_sla",
                           "load_duration": 1.2,
-                          "full_duration": 2.3}} for key in keys]
+                          "full_duration": 2.3},
+                 "aggregate": key + "_aggregate"} for key in keys]
 
     @mock.patch("rally.cli.commands.task.jsonschema.validate",
                 return_value=None)
@@ -454,9 +479,11 @@ class TaskCommandsTestCase(test.TestCase):
                                out="output.html", out_format="html")
         expected = [
             {"load_duration": 1.2, "full_duration": 2.3, "sla": "bar_sla",
-             "key": {"name": "bar", "pos": 0}, "result": "bar_raw"},
+             "key": {"name": "bar", "pos": 0}, "result": "bar_raw",
+             "aggregate": "bar_aggregate"},
             {"load_duration": 1.2, "full_duration": 2.3, "sla": "spam_sla",
-             "key": {"name": "spam", "pos": 0}, "result": "spam_raw"},
+             "key": {"name": "spam", "pos": 0}, "result": "spam_raw",
+             "aggregate": "spam_aggregate"},
             "result_1_from_file", "result_2_from_file"]
         mock_plot.trends.assert_called_once_with(expected)
         self.assertEqual([mock.call("path_to_file_expanded", "r"),
@@ -553,7 +580,8 @@ class TaskCommandsTestCase(test.TestCase):
             {"key": {"name": "class.test", "pos": 0},
              "data": {"raw": "foo_raw", "sla": "foo_sla",
                       "load_duration": 0.1,
-                      "full_duration": 1.2}},
+                      "full_duration": 1.2},
+             "aggregate": "foo_aggregate"},
             {"key": {"name": "class.test", "pos": 0},
              "data": {"raw": "bar_raw", "sla": "bar_sla",
                       "load_duration": 2.1,
@@ -563,7 +591,8 @@ class TaskCommandsTestCase(test.TestCase):
                     "result": x["data"]["raw"],
                     "sla": x["data"]["sla"],
                     "load_duration": x["data"]["load_duration"],
-                    "full_duration": x["data"]["full_duration"]}
+                    "full_duration": x["data"]["full_duration"],
+                    "aggregate": x.get("aggregate")}
                    for x in data]
         mock_results = mock.Mock(return_value=data)
         mock_task_get.return_value = mock.Mock(get_results=mock_results)
@@ -619,7 +648,8 @@ class TaskCommandsTestCase(test.TestCase):
             {"key": {"name": "test", "pos": 0},
              "data": {"raw": "foo_raw", "sla": "foo_sla",
                       "load_duration": 0.1,
-                      "full_duration": 1.2}},
+                      "full_duration": 1.2},
+             "aggregate": "foo_aggregate"},
             {"key": {"name": "test", "pos": 0},
              "data": {"raw": "bar_raw", "sla": "bar_sla",
                       "load_duration": 2.1,
@@ -632,7 +662,8 @@ class TaskCommandsTestCase(test.TestCase):
                                "result": x["data"]["raw"],
                                "sla": x["data"]["sla"],
                                "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
+                               "full_duration": x["data"]["full_duration"],
+                               "aggregate": x.get("aggregate")},
                     data))
 
         mock_results = mock.Mock(return_value=data)
@@ -666,7 +697,8 @@ class TaskCommandsTestCase(test.TestCase):
             {"key": {"name": "test", "pos": 0},
              "data": {"raw": "foo_raw", "sla": "foo_sla",
                       "load_duration": 0.1,
-                      "full_duration": 1.2}},
+                      "full_duration": 1.2},
+             "aggregate": "foo_aggregate"},
             {"key": {"name": "test", "pos": 1},
              "data": {"raw": "bar_raw", "sla": "bar_sla",
                       "load_duration": 2.1,
@@ -676,7 +708,8 @@ class TaskCommandsTestCase(test.TestCase):
                     "result": x["data"]["raw"],
                     "sla": x["data"]["sla"],
                     "load_duration": x["data"]["load_duration"],
-                    "full_duration": x["data"]["full_duration"]}
+                    "full_duration": x["data"]["full_duration"],
+                    "aggregate": x.get("aggregate")}
                    for x in data]
 
         mock_plot.plot.return_value = "html_report"
@@ -17,6 +17,7 @@
 import datetime as dt
 
 import ddt
+import mock
 from six import moves
 
 from rally.common import db
@@ -253,6 +254,115 @@ class TasksTestCase(test.DBTestCase):
             self.assertEqual(res[0]["key"], data)
             self.assertEqual(res[0]["data"], data)
 
+    def test_task_result_create_with_iterations(self):
+        task_id = self._create_task()["uuid"]
+        iterations = [{"timestamp": ts, "duration": ts}
+                      for ts in (3.0, 1.0, 2.0)]
+        data = {"raw": iterations, "sla": []}
+
+        result = db.task_result_create(task_id, {"name": "foo"}, data)
+        self.assertEqual({"raw": [], "sla": []}, result["data"])
+
+        res = db.task_result_get_all_by_uuid(task_id)
+        raw = res[0]["data"]["raw"]
+        self.assertEqual(3, len(raw))
+        expected = sorted(iterations, key=lambda i: i["timestamp"])
+        self.assertEqual(expected, list(raw))
+        # the sequence can be iterated again
+        self.assertEqual(expected, list(raw))
+
+        task = db.task_get_detailed(task_id)
+        self.assertEqual(expected, list(task["results"][0]["data"]["raw"]))
+
+        db.task_delete(task_id)
+        self.assertEqual(0, db.workload_iterations_count(result["id"]))
+
+    def test_task_result_create_with_iterations_fails(self):
+        task_id = self._create_task()["uuid"]
+
+        def iterations():
+            for ts in range(3):
+                yield {"timestamp": ts, "duration": ts}
+            raise RuntimeError("broken iteration")
+
+        with mock.patch.object(s_api, "ITERATIONS_BATCH_SIZE", 2):
+            self.assertRaises(RuntimeError, db.task_result_create, task_id,
+                              {"name": "foo"}, {"raw": iterations()})
+
+        # neither the result nor its first batch of iterations is saved
+        self.assertEqual([], db.task_result_get_all_by_uuid(task_id))
+        self.assertEqual(0, s_api.get_session().query(
+            s_api.models.WorkloadIteration).count())
+
+    def test_task_result_update(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "foo"},
+                                       {"raw": [], "partial": True})
+        db.task_result_update(result["id"], {"raw": [], "sla": []})
+        res = db.task_result_get_all_by_uuid(task_id)
+        self.assertEqual([], list(res[0]["data"]["raw"]))
+        self.assertEqual([], res[0]["data"]["sla"])
+        self.assertNotIn("partial", res[0]["data"])
+
+    def test_task_result_update_not_found(self):
+        self.assertRaises(exceptions.RallyException,
+                          db.task_result_update, 42, {})
+
+    def test_workload_iterations_create_and_get(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "foo"}, {"raw": []})
+
+        with mock.patch.object(s_api, "ITERATIONS_BATCH_SIZE", 3):
+            db.workload_iterations_create(
+                result["id"], ({"timestamp": i, "idx": i} for i in range(10)))
+            db.workload_iterations_create(result["id"],
+                                          [{"timestamp": 4.5, "idx": 42}])
+
+            self.assertEqual(11, db.workload_iterations_count(result["id"]))
+            self.assertEqual([0, 1, 2, 3, 4, 42, 5, 6, 7, 8, 9],
+                             [itr["idx"] for itr in
+                              db.workload_iterations_get(result["id"])])
+
+    def test_workload_aggregate_create_and_get(self):
+        task_id = self._create_task()["uuid"]
+        results = [db.task_result_create(task_id, {"name": "foo"},
+                                         {"raw": []}) for i in range(3)]
+        values = {"iterations_count": 10, "iterations_failed": 1,
+                  "min_duration": 1.0, "max_duration": 3.0,
+                  "tstamp_start": 42.0, "load_duration": 11.0,
+                  "full_duration": 12.0, "sla_success": True,
+                  "data": {"stat": {"cols": [], "rows": []}}}
+
+        db.workload_aggregate_create(results[0]["id"], values)
+        db.workload_aggregate_create(results[1]["id"], values)
+        # aggregates are replaced
+        db.workload_aggregate_create(results[1]["id"],
+                                     dict(values, sla_success=False))
+
+        aggregates = db.workload_aggregates_get(
+            [result["id"] for result in results])
+        self.assertEqual(sorted([results[0]["id"], results[1]["id"]]),
+                         sorted(aggregates))
+        for result_id, sla_success in ((results[0]["id"], True),
+                                       (results[1]["id"], False)):
+            aggregate = aggregates[result_id]
+            self.assertEqual(result_id, aggregate["task_result_id"])
+            self.assertEqual(dict(values, sla_success=sla_success),
+                             dict((k, aggregate[k]) for k in values))
+
+        res = db.task_result_get_all_by_uuid(task_id)
+        self.assertEqual([aggregates[results[0]["id"]],
+                          aggregates[results[1]["id"]], None],
+                         [r["aggregate"] for r in res])
+        task = db.task_get_detailed(task_id)
+        self.assertEqual([aggregates[results[0]["id"]],
+                          aggregates[results[1]["id"]], None],
+                         [r["aggregate"] for r in task["results"]])
+
+        db.task_delete(task_id)
+        self.assertEqual({}, db.workload_aggregates_get(
+            [result["id"] for result in results]))
+
     def test_task_get_detailed(self):
         task1 = self._create_task()
         key = {"name": "atata"}
@@ -555,5 +665,17 @@ class WorkerTestCase(test.DBTestCase):
         worker = db.get_worker("test")
         self.assertNotEqual(self.worker["updated_at"], worker["updated_at"])
 
+    def test_list_workers(self):
+        db.register_worker({"hostname": "another"})
+        self.assertEqual(["another", "test"],
+                         [w["hostname"] for w in db.list_workers()])
+
+    def test_list_workers_updated_after(self):
+        worker = db.register_worker({"hostname": "another"})
+        workers = db.list_workers(updated_after=self.worker["updated_at"])
+        self.assertEqual(["another"], [w["hostname"] for w in workers])
+        self.assertEqual(
+            [], db.list_workers(updated_after=worker["updated_at"]))
+
     def test_update_worker_not_found(self):
         self.assertRaises(exceptions.WorkerNotFound, db.update_worker, "fake")
@@ -383,3 +383,88 @@ class MigrationWalkTestCase(rtest.DBTestCase,
                     deployment_table.delete().where(
                         deployment_table.c.uuid == deployment.uuid)
                 )
+
+    def _pre_upgrade_e654a0648db0(self, engine):
+        deployment_table = db_utils.get_table(engine, "deployments")
+        task_table = db_utils.get_table(engine, "tasks")
+        task_result_table = db_utils.get_table(engine, "task_results")
+
+        self._e654a0648db0_iterations = [
+            {"timestamp": 1.0, "duration": 1.5, "error": []},
+            {"timestamp": 2.0, "duration": 2.5, "error": ["Error"]}]
+        with engine.connect() as conn:
+            conn.execute(
+                deployment_table.insert(),
+                [{"uuid": "e654a0648db0-deployment", "name": "e654a0648db0",
+                  "config": json.dumps({}),
+                  "enum_deployments_status":
+                      consts.DeployStatus.DEPLOY_FINISHED,
+                  "credentials": six.b(json.dumps([])),
+                  "users": six.b(json.dumps([]))}])
+            conn.execute(
+                task_table.insert(),
+                [{"uuid": "e654a0648db0-task",
+                  "deployment_uuid": "e654a0648db0-deployment",
+                  "status": consts.TaskStatus.FINISHED}])
+            conn.execute(
+                task_result_table.insert(),
+                [{"task_uuid": "e654a0648db0-task",
+                  "key": json.dumps({"name": "Dummy.dummy"}),
+                  "data": json.dumps(
+                      {"raw": self._e654a0648db0_iterations, "sla": [],
+                       "load_duration": 4, "full_duration": 5})},
+                 {"task_uuid": "e654a0648db0-task",
+                  "key": json.dumps({"name": "Dummy.dummy"}),
+                  "data": json.dumps({"raw": [], "sla": []})}])
+
+    def _check_e654a0648db0(self, engine, data):
+        self.assertEqual(
+            "e654a0648db0", api.get_backend().schema_revision(engine=engine))
+
+        deployment_table = db_utils.get_table(engine, "deployments")
+        task_table = db_utils.get_table(engine, "tasks")
+        task_result_table = db_utils.get_table(engine, "task_results")
+        iterations_table = db_utils.get_table(engine, "workload_iterations")
+
+        with engine.connect() as conn:
+            results = conn.execute(task_result_table.select().where(
+                task_result_table.c.task_uuid == "e654a0648db0-task").order_by(
+                task_result_table.c.id)).fetchall()
+            self.assertEqual(2, len(results))
+            self.assertEqual({"raw": [], "sla": [], "load_duration": 4,
+                              "full_duration": 5},
+                             json.loads(results[0].data))
+            self.assertEqual({"raw": [], "sla": []},
+                             json.loads(results[1].data))
+
+            iterations = conn.execute(iterations_table.select().order_by(
+                iterations_table.c.id)).fetchall()
+            self.assertEqual([results[0].id] * 2,
+                             [itr.task_result_id for itr in iterations])
+            self.assertEqual([1.0, 2.0],
+                             [itr.timestamp for itr in iterations])
+            self.assertEqual(self._e654a0648db0_iterations,
+                             [json.loads(itr.data) for itr in iterations])
+
+            # this data created at _pre_upgrade step is not needed
+            # anymore and we can remove it
+            conn.execute(iterations_table.delete())
+            conn.execute(task_result_table.delete())
+            conn.execute(task_table.delete())
+            conn.execute(deployment_table.delete().where(
+                deployment_table.c.uuid == "e654a0648db0-deployment"))
+
+    def _check_a43700a813a5(self, engine, data):
+        self.assertEqual(
+            "a43700a813a5", api.get_backend().schema_revision(engine=engine))
+
+        aggregates_table = db_utils.get_table(engine, "workload_aggregates")
+        self.assertEqual(
+            ["created_at", "data", "full_duration", "id", "iterations_count",
+             "iterations_failed", "load_duration", "max_duration",
+             "min_duration", "sla_success", "task_result_id", "tstamp_start",
+             "updated_at"],
+            sorted(column.name for column in aggregates_table.columns))
+        with engine.connect() as conn:
+            self.assertEqual(
+                [], conn.execute(aggregates_table.select()).fetchall())
@@ -17,6 +17,7 @@
 
 import datetime as dt
 import json
+import types
 
 import ddt
 import jsonschema
@@ -203,14 +204,14 @@ class TaskTestCase(test.TestCase):
 
         # serializable is default
         results = objects.Task.extend_results(obsolete)
-        self.assertIsInstance(results[0]["iterations"], type(iter([])))
+        self.assertIsInstance(results[0]["iterations"], types.GeneratorType)
         self.assertEqual(list(results[0]["iterations"]), iterations)
         results[0]["iterations"] = "foo_iterations"
         self.assertEqual(results, expected)
 
         # serializable is False
         results = objects.Task.extend_results(obsolete, serializable=False)
-        self.assertIsInstance(results[0]["iterations"], type(iter([])))
+        self.assertIsInstance(results[0]["iterations"], types.GeneratorType)
         self.assertEqual(list(results[0]["iterations"]), iterations)
         results[0]["iterations"] = "foo_iterations"
         self.assertEqual(results, expected)
@@ -225,6 +226,90 @@ class TaskTestCase(test.TestCase):
         results[0]["iterations"] = "foo_iterations"
         self.assertEqual(results, expected)
 
+    @mock.patch("rally.common.objects.task.charts")
+    def test_extend_results_with_aggregate(self, mock_charts):
+        raw = mock.MagicMock()
+        iterations = [{"timestamp": 1,
+                       "output": {"additive": [], "complete": []}}]
+        raw.__iter__.side_effect = lambda: iter(iterations)
+        aggregate = {
+            "id": 1, "task_result_id": 11,
+            "iterations_count": 10, "iterations_failed": 1,
+            "min_duration": 5, "max_duration": 14, "tstamp_start": 2,
+            "load_duration": 32, "full_duration": 40, "sla_success": True,
+            "data": {"atomic": [["b", {"min_duration": 1, "max_duration": 2}],
+                                ["a", {"min_duration": 3, "max_duration": 4}]],
+                     "stat": "durations_stat", "sla": []}}
+        obsolete = [
+            {"task_uuid": "foo_uuid", "created_at": None, "updated_at": None,
+             "id": 11, "key": {"kw": {"foo": 42},
+                               "name": "Foo.bar", "pos": 0},
+             "data": {"raw": raw, "sla": [],
+                      "full_duration": 40, "load_duration": 32},
+             "aggregate": aggregate}]
+
+        results = objects.Task.extend_results(obsolete)
+
+        self.assertFalse(mock_charts.MainStatsTable.called)
+        self.assertFalse(raw.__iter__.called)
+        self.assertEqual(["b", "a"], list(results[0]["info"]["atomic"]))
+        self.assertEqual(
+            {"atomic": {"a": {"min_duration": 3, "max_duration": 4},
+                        "b": {"min_duration": 1, "max_duration": 2}},
+             "iterations_count": 10, "iterations_failed": 1,
+             "max_duration": 14, "min_duration": 5, "tstamp_start": 2,
+             "full_duration": 40, "load_duration": 32,
+             "stat": "durations_stat"},
+            results[0]["info"])
+        self.assertNotIn("aggregate", results[0])
+        self.assertEqual(iterations, list(results[0]["iterations"]))
+
+    @mock.patch("rally.common.objects.task.db.workload_aggregate_create")
+    @mock.patch("rally.common.objects.task.db.workload_iterations_get")
+    def test_aggregate_results(self, mock_workload_iterations_get,
+                               mock_workload_aggregate_create):
+        iterations = [
+            {"timestamp": i + 2, "duration": i + 5,
+             "error": ["E", "msg", "trace"] if i == 3 else [],
+             "idle_duration": i,
+             "atomic_actions": {"foo": i + 10, "bar": i}} for i in range(10)]
+        mock_workload_iterations_get.side_effect = lambda result_id: iter(
+            iterations)
+        data = {"raw": [], "full_duration": 40, "load_duration": 32,
+                "sla": [{"criterion": "foo", "success": True},
+                        {"criterion": "bar", "success": False}]}
+        task = objects.Task(task=self.task)
+
+        task.aggregate_results(42, data)
+
+        mock_workload_iterations_get.assert_has_calls([mock.call(42)] * 2)
+        mock_workload_aggregate_create.assert_called_once_with(
+            42, mock.ANY)
+        values = mock_workload_aggregate_create.call_args[0][1]
+        self.assertEqual(
+            {"iterations_count": 10, "iterations_failed": 1,
+             "min_duration": 5, "max_duration": 14, "tstamp_start": 2,
+             "load_duration": 32, "full_duration": 40, "sla_success": False},
+            dict((k, v) for k, v in values.items() if k != "data"))
+        self.assertEqual(data["sla"], values["data"]["sla"])
+
+        # the stored aggregate gives the same extended results as the
+        # processing of iterations
+        result = {"task_uuid": "foo_uuid", "created_at": None,
+                  "updated_at": None, "id": 42,
+                  "key": {"kw": {}, "name": "Foo.bar", "pos": 0},
+                  "data": data}
+        aggregate = json.loads(json.dumps(values))
+        without_aggregate = objects.Task.extend_results(
+            [dict(result, data=dict(data, raw=iterations))],
+            serializable=True)
+        with_aggregate = objects.Task.extend_results(
+            [dict(result, data=dict(data, raw=iterations),
+                  aggregate=aggregate)], serializable=True)
+        self.assertEqual(without_aggregate, with_aggregate)
+        self.assertEqual(list(without_aggregate[0]["info"]["atomic"]),
+                         list(with_aggregate[0]["info"]["atomic"]))
+
     @mock.patch("rally.common.objects.task.db.task_result_get_all_by_uuid",
                 return_value="foo_results")
     def test_get_results(self, mock_task_result_get_all_by_uuid):
@@ -237,10 +322,23 @@ class TaskTestCase(test.TestCase):
     @mock.patch("rally.common.objects.task.db.task_result_create")
     def test_append_results(self, mock_task_result_create):
         task = objects.Task(task=self.task)
-        task.append_results("opt", "val")
+        self.assertEqual(mock_task_result_create.return_value,
+                         task.append_results("opt", "val"))
         mock_task_result_create.assert_called_once_with(
             self.task["uuid"], "opt", "val")
 
+    @mock.patch("rally.common.objects.task.db.task_result_update")
+    def test_update_results(self, mock_task_result_update):
+        task = objects.Task(task=self.task)
+        task.update_results(42, "val")
+        mock_task_result_update.assert_called_once_with(42, "val")
+
+    @mock.patch("rally.common.objects.task.db.workload_iterations_create")
+    def test_append_iterations(self, mock_workload_iterations_create):
+        task = objects.Task(task=self.task)
+        task.append_iterations(42, ["itr"])
+        mock_workload_iterations_create.assert_called_once_with(42, ["itr"])
+
     @mock.patch("rally.common.objects.task.db.task_update")
     def test_set_failed(self, mock_task_update):
         mock_task_update.return_value = self.task
@@ -13,6 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import os
+import shutil
+import tempfile
+
 import mock
 
 from rally.common.plugin import discover
@@ -101,3 +106,177 @@ class LoadExtraModulesTestCase(test.TestCase):
         # test no fails if module is broken
         # TODO(olkonami): check exception is handled correct
         discover.load_plugins("/somewhere")
+
+
+class ImportModulesLazilyTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ImportModulesLazilyTestCase, self).setUp()
+        for name in ("_LAZY_MODULES", "_LAZY_NAMES", "_LAZY_BASES"):
+            patcher = mock.patch("%s.%s" % (DISCOVER, name),
+                                 type(getattr(discover, name))())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.index_path = os.path.join(tmp_dir, "index", "plugins_index.json")
+
+    def _save_index(self, index):
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path, "w") as f:
+            json.dump(index, f)
+
+    def test__make_index(self):
+        signature = "fake_signature"
+        index = discover._make_index(["rally.plugins.common"], signature)
+        self.assertEqual(signature, index["signature"])
+        self.assertIn(
+            ["constant", "rally.task.runner.ScenarioRunner"],
+            index["modules"]["rally.plugins.common.runners.constant"])
+        # plugins of functions are indexed by modules of functions
+        self.assertIn(
+            ["Dummy.dummy", "rally.task.scenario.Scenario"],
+            index["modules"]["rally.plugins.common.scenarios.dummy.dummy"])
+        for module_name in index["modules"]:
+            self.assertTrue(module_name.startswith("rally.plugins.common."))
+
+    @mock.patch("%s._INDEXED_BASES" % DISCOVER, new_callable=list)
+    def test__make_index_indexed_bases(self, mock__indexed_bases):
+        self.assertIs(Base, discover.index_subclasses(Base))
+        discover.index_subclasses(Base)
+        self.assertEqual([Base], mock__indexed_bases)
+
+        index = discover._make_index(["tests.unit.common.plugin"], "sig")
+
+        # subclasses of indexed bases are indexed once per module
+        self.assertEqual([[None, "%s.Base" % __name__]],
+                         index["modules"][__name__])
+
+    @mock.patch("%s._make_index" % DISCOVER,
+                return_value={"signature": "new", "modules": {}})
+    @mock.patch("%s.import_modules_from_package" % DISCOVER)
+    @mock.patch("%s._get_packages_signature" % DISCOVER, return_value="new")
+    def test_import_modules_lazily_makes_index(
+            self, mock__get_packages_signature,
+            mock_import_modules_from_package, mock__make_index):
+        discover.import_modules_lazily(["a", "b"], self.index_path)
+
+        mock_import_modules_from_package.assert_has_calls(
+            [mock.call("a"), mock.call("b")])
+        mock__make_index.assert_called_once_with(["a", "b"], "new")
+        with open(self.index_path) as f:
+            self.assertEqual(mock__make_index.return_value, json.load(f))
+        self.assertEqual(set(), discover._LAZY_MODULES)
+
+    @mock.patch("%s._make_index" % DISCOVER,
+                return_value={"signature": "new", "modules": {}})
+    @mock.patch("%s.import_modules_from_package" % DISCOVER)
+    @mock.patch("%s._get_packages_signature" % DISCOVER, return_value="new")
+    def test_import_modules_lazily_outdated_index(
+            self, mock__get_packages_signature,
+            mock_import_modules_from_package, mock__make_index):
+        self._save_index({"signature": "old",
+                          "modules": {"foo.bar": [["bar", "foo.Base"]]}})
+
+        discover.import_modules_lazily(["foo"], self.index_path)
+
+        mock_import_modules_from_package.assert_called_once_with("foo")
+        with open(self.index_path) as f:
+            self.assertEqual("new", json.load(f)["signature"])
+        self.assertEqual(set(), discover._LAZY_MODULES)
+
+    @mock.patch("%s.LOG" % DISCOVER)
+    @mock.patch("%s._make_index" % DISCOVER,
+                return_value={"signature": "new", "modules": {}})
+    @mock.patch("%s.import_modules_from_package" % DISCOVER)
+    @mock.patch("%s._get_packages_signature" % DISCOVER, return_value="new")
+    def test_import_modules_lazily_save_fails(
+            self, mock__get_packages_signature,
+            mock_import_modules_from_package, mock__make_index, mock_log):
+        with mock.patch("%s.open" % DISCOVER, create=True,
+                        side_effect=IOError("denied")):
+            discover.import_modules_lazily(["foo"], self.index_path)
+
+        mock_import_modules_from_package.assert_called_once_with("foo")
+        self.assertTrue(mock_log.debug.called)
+
+    @mock.patch("%s.import_modules_from_package" % DISCOVER)
+    @mock.patch("%s._get_packages_signature" % DISCOVER, return_value="sig")
+    def test_import_modules_lazily(self, mock__get_packages_signature,
+                                   mock_import_modules_from_package):
+        self._save_index({
+            "signature": "sig",
+            "modules": {"foo.bar": [["bar", "foo.Base"],
+                                    ["baz", "foo.Other"]],
+                        "foo.qux": [["qux", "foo.Base"],
+                                    [None, "foo.Indexed"]],
+                        DISCOVER: [["imported", "foo.Base"]]}})
+
+        discover.import_modules_lazily(["foo"], self.index_path)
+
+        self.assertFalse(mock_import_modules_from_package.called)
+        self.assertEqual({"foo.bar", "foo.qux"}, discover._LAZY_MODULES)
+        self.assertEqual({"bar": {"foo.bar"}, "baz": {"foo.bar"},
+                          "qux": {"foo.qux"}}, discover._LAZY_NAMES)
+        self.assertEqual({"foo.Base": {"foo.bar", "foo.qux"},
+                          "foo.Other": {"foo.bar"},
+                          "foo.Indexed": {"foo.qux"}}, discover._LAZY_BASES)
+
+    def _register(self):
+        discover._LAZY_MODULES.update(["foo.bar", "foo.qux"])
+        discover._LAZY_NAMES.update({"bar": {"foo.bar"}, "qux": {"foo.qux"}})
+        discover._LAZY_BASES.update({"%s.Base" % __name__: {"foo.bar",
+                                                            "foo.qux"}})
+
+    @mock.patch("%s.sys.modules" % DISCOVER, new_callable=dict)
+    @mock.patch("%s.importutils.import_module" % DISCOVER)
+    def test_import_lazy_modules_by_name(self, mock_import_module,
+                                         mock_modules):
+        self._register()
+
+        discover.import_lazy_modules(name="bar")
+        discover.import_lazy_modules(name="bar")
+        discover.import_lazy_modules(name="unknown")
+
+        mock_import_module.assert_called_once_with("foo.bar")
+        self.assertEqual({"foo.bar": mock_import_module.return_value},
+                         mock_modules)
+        self.assertEqual({"foo.qux"}, discover._LAZY_MODULES)
+        self.assertEqual({"qux": {"foo.qux"}}, discover._LAZY_NAMES)
+
+    @mock.patch("%s.sys.modules" % DISCOVER, new_callable=dict)
+    @mock.patch("%s.importutils.import_module" % DISCOVER)
+    def test_import_lazy_modules_by_base(self, mock_import_module,
+                                         mock_modules):
+        self._register()
+
+        discover.import_lazy_modules(base=Base)
+        discover.import_lazy_modules(name="bar")
+
+        self.assertEqual([mock.call("foo.bar"), mock.call("foo.qux")],
+                         mock_import_module.call_args_list)
+        self.assertEqual(set(), discover._LAZY_MODULES)
+        self.assertEqual({}, discover._LAZY_BASES)
+
+    @mock.patch("%s.sys.modules" % DISCOVER, new_callable=dict)
+    @mock.patch("%s.importutils.import_module" % DISCOVER)
+    def test_import_lazy_modules_all(self, mock_import_module, mock_modules):
+        self._register()
+        mock_modules["foo.qux"] = "already imported"
+
+        discover.import_lazy_modules()
+
+        mock_import_module.assert_called_once_with("foo.bar")
+        self.assertEqual(set(), discover._LAZY_MODULES)
+
+
+class Base(object):
+    pass
+
+
+class Sub(Base):
+    pass
+
+
+class SubOfSub(Sub):
+    pass
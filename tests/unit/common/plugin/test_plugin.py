@@ -13,6 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import abc
+import gc
+
+import mock
+import six
+
 from rally.common.plugin import plugin
 from rally import exceptions
 from tests.unit import test
@@ -174,6 +180,45 @@ class PluginTestCase(test.TestCase):
         self.assertEqual(SomePlugin,
                          BasePlugin.get("test_some_plugin"))
 
+    @mock.patch("rally.common.plugin.discover.import_lazy_modules")
+    def test_get_imports_lazy_modules(self, mock_import_lazy_modules):
+        self.assertEqual(SomePlugin, BasePlugin.get("test_some_plugin"))
+        mock_import_lazy_modules.assert_called_once_with(
+            name="test_some_plugin")
+
+    def test_get_by_name_index(self):
+        self.assertEqual(
+            [SomePlugin],
+            [ref() for ref in plugin._PLUGINS_BY_NAME["test_some_plugin"]])
+        self.assertRaises(exceptions.PluginNotFound,
+                          SomePlugin.get, "test_some_plugin")
+        self.assertRaises(exceptions.PluginNotFound,
+                          BasePlugin.get, "test_some_plugin",
+                          namespace="non_existing")
+
+    def test_get_replaced_class(self):
+
+        @six.add_metaclass(abc.ABCMeta)
+        @plugin.configure(name="test_replaced_plugin")
+        class ReplacedPlugin(BasePlugin):
+            pass
+
+        self.addCleanup(ReplacedPlugin.unregister)
+        # the configured class is referenced only by the index after it is
+        # replaced
+        gc.collect()
+        self.assertEqual(ReplacedPlugin,
+                         BasePlugin.get("test_replaced_plugin"))
+
+    def test_unregister_removes_from_name_index(self):
+
+        @plugin.configure(name="test_some_temp_plugin")
+        class SomeTempPlugin(BasePlugin):
+            pass
+
+        SomeTempPlugin.unregister()
+        self.assertEqual([], plugin._PLUGINS_BY_NAME["test_some_temp_plugin"])
+
     def test_get_not_found(self):
         self.assertRaises(exceptions.PluginNotFound,
                           BasePlugin.get, "non_existing")
@@ -84,3 +84,30 @@ class BrokerTestCase(test.TestCase):
         consumer_count = 2
         broker.run(publish, consume, consumer_count)
         self.assertEqual(set([1, 2, 3]), consumed)
+
+    def test_run_for_each(self):
+        items = [3, 1, 2]
+        self.assertEqual([6, 2, 4],
+                         broker.run_for_each(lambda x: x * 2, items, 2))
+        self.assertEqual([], broker.run_for_each(lambda x: x * 2, [], 2))
+
+    def test_run_for_each_fails(self):
+        processed = []
+
+        def func(item):
+            processed.append(item)
+            if item in (2, 3):
+                raise ValueError(item)
+
+        e = self.assertRaises(ValueError, broker.run_for_each, func,
+                              [1, 2, 3, 4], 3)
+        self.assertEqual((2,), e.args)
+        self.assertEqual([1, 2, 3, 4], sorted(processed))
+
+    def test_run_per_tenants(self):
+        users = [{"id": "u1", "tenant_id": "t1"},
+                 {"id": "u2", "tenant_id": "t1"},
+                 {"id": "u3", "tenant_id": "t2"}]
+        self.assertEqual(
+            [("u1", "t1"), ("u3", "t2")],
+            broker.run_per_tenants(lambda u, t: (u["id"], t), users, 2))
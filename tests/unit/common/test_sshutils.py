@@ -15,9 +15,11 @@
 
 import os
 import socket
+import threading
 
 import ddt
 import mock
+from oslo_config import fixture
 
 from rally.common import sshutils
 from rally import exceptions
@@ -153,6 +155,199 @@ class SSHTestCase(test.TestCase):
         self.ssh.wait()
         self.assertEqual([mock.call("uname")] * 3, self.ssh.execute.mock_calls)
 
+    @mock.patch("rally.common.sshutils.SSH._connect")
+    def test__get_client_pooled(self, mock_ssh__connect):
+        mock_ssh__connect.side_effect = lambda: mock.Mock()
+        client = self.ssh._get_client()
+        same_ssh = sshutils.SSH("root", "example.net")
+
+        self.assertIs(client, same_ssh._get_client())
+        self.assertIs(self.ssh._channels, same_ssh._channels)
+        mock_ssh__connect.assert_called_once_with()
+
+        other_ssh = sshutils.SSH("admin", "example.net")
+        self.assertIsNot(client, other_ssh._get_client())
+
+    @mock.patch("rally.common.sshutils.SSH._connect")
+    def test__get_client_connection_error(self, mock_ssh__connect):
+        mock_ssh__connect.side_effect = socket.error
+        self.assertRaises(exceptions.SSHError, self.ssh._get_client)
+        self.assertFalse(self.ssh._client)
+
+    @mock.patch("rally.common.sshutils.SSH._connect")
+    def test_close_pooled(self, mock_ssh__connect):
+        mock_ssh__connect.side_effect = lambda: mock.Mock()
+        client = self.ssh._get_client()
+        self.ssh.close()
+
+        client.close.assert_called_once_with()
+        self.assertFalse(self.ssh._client)
+        self.assertIsNot(client, sshutils.SSH("root",
+                                              "example.net")._get_client())
+
+
+class SSHConnectionsPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(SSHConnectionsPoolTestCase, self).setUp()
+        self.pool = sshutils.SSHConnectionsPool()
+        self.connect = mock.Mock(side_effect=lambda: mock.Mock())
+
+    def test_get(self):
+        client, channels = self.pool.get("key", self.connect)
+
+        self.assertEqual((client, channels),
+                         self.pool.get("key", self.connect))
+        self.assertNotEqual(client, self.pool.get("other", self.connect)[0])
+        self.assertEqual(2, self.connect.call_count)
+
+    def test_get_dead_connection(self):
+        client = self.pool.get("key", self.connect)[0]
+        client.get_transport.return_value.is_active.return_value = False
+
+        new_client = self.pool.get("key", self.connect)[0]
+        self.assertIsNot(client, new_client)
+        client.close.assert_called_once_with()
+        self.assertIs(new_client, self.pool.get("key", self.connect)[0])
+
+    def test_get_evicts_least_recently_used(self):
+        self.useFixture(fixture.Config()).config(ssh_connection_pool_size=2)
+        client1 = self.pool.get("key1", self.connect)[0]
+        client2 = self.pool.get("key2", self.connect)[0]
+        self.pool.get("key1", self.connect)
+        self.pool.get("key3", self.connect)
+
+        client2.close.assert_called_once_with()
+        self.assertFalse(client1.close.called)
+        self.assertIs(client1, self.pool.get("key1", self.connect)[0])
+        self.assertIsNot(client2, self.pool.get("key2", self.connect)[0])
+
+    def test_get_keeps_connections_in_use(self):
+        self.useFixture(fixture.Config()).config(ssh_connection_pool_size=1)
+        client1, channels1 = self.pool.get("key1", self.connect)
+        with channels1:
+            client2 = self.pool.get("key2", self.connect)[0]
+            self.assertFalse(client1.close.called)
+            self.assertIs(client1, self.pool.get("key1", self.connect)[0])
+
+        self.pool.get("key3", self.connect)
+        client1.close.assert_called_once_with()
+        client2.close.assert_called_once_with()
+
+    @mock.patch("rally.common.sshutils.time.time")
+    def test_get_expires_idle_connections(self, mock_time):
+        mock_time.return_value = 0
+        client, channels = self.pool.get("key", self.connect)
+        mock_time.return_value = 30
+        with channels:
+            mock_time.return_value = 100
+            self.assertIs(client, self.pool.get("key", self.connect)[0])
+
+        mock_time.return_value = 159
+        self.pool.get("other", self.connect)
+        self.assertIs(client, self.pool.get("key", self.connect)[0])
+        mock_time.return_value = 160
+        self.assertIsNot(client, self.pool.get("key", self.connect)[0])
+        client.close.assert_called_once_with()
+
+    def test_get_without_pooling(self):
+        self.useFixture(fixture.Config()).config(ssh_connection_pool_size=0)
+        self.assertIsNot(self.pool.get("key", self.connect)[0],
+                         self.pool.get("key", self.connect)[0])
+
+    @mock.patch("rally.common.sshutils.os.getpid")
+    def test_get_in_forked_process(self, mock_getpid):
+        mock_getpid.return_value = 1
+        pool = sshutils.SSHConnectionsPool()
+        client = pool.get("key", self.connect)[0]
+
+        mock_getpid.return_value = 2
+        self.assertIsNot(client, pool.get("key", self.connect)[0])
+        # the connection is used by the parent process
+        self.assertFalse(client.close.called)
+
+    def test_get_concurrently(self):
+        started = threading.Event()
+        proceed = threading.Event()
+
+        def connect():
+            started.set()
+            proceed.wait(5)
+            return mock.Mock()
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(self.pool.get("key", connect)))
+            for i in range(2)]
+        threads[0].start()
+        started.wait(5)
+        threads[1].start()
+        proceed.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results[0], results[1])
+
+    def test_remove(self):
+        client = self.pool.get("key", self.connect)[0]
+        self.pool.remove("key", mock.Mock())
+        self.assertIs(client, self.pool.get("key", self.connect)[0])
+
+        self.pool.remove("key", client)
+        self.assertIsNot(client, self.pool.get("key", self.connect)[0])
+
+    def test_close_host(self):
+        client1 = self.pool.get(("host1", 22, "root"), self.connect)[0]
+        client2 = self.pool.get(("host1", 22, "admin"), self.connect)[0]
+        client3 = self.pool.get(("host2", 22, "root"), self.connect)[0]
+        self.pool.close_host("host1")
+
+        client1.close.assert_called_once_with()
+        client2.close.assert_called_once_with()
+        self.assertFalse(client3.close.called)
+        self.assertIsNot(client1,
+                         self.pool.get(("host1", 22, "root"), self.connect)[0])
+        self.assertIs(client3,
+                      self.pool.get(("host2", 22, "root"), self.connect)[0])
+
+    def test_clear(self):
+        client = self.pool.get("key", self.connect)[0]
+        self.pool.clear()
+        client.close.assert_called_once_with()
+        self.assertIsNot(client, self.pool.get("key", self.connect)[0])
+
+
+class RunManyTestCase(test.TestCase):
+
+    def test_run_many(self):
+        hosts = [mock.Mock(host="h1"), mock.Mock(host="h2"),
+                 mock.Mock(host="h3")]
+        hosts[0].execute.return_value = (0, "out", "")
+        hosts[1].execute.side_effect = exceptions.SSHTimeout()
+        hosts[2].execute.side_effect = socket.error()
+
+        results = sshutils.run_many(hosts, "cmd", stdin="data", timeout=5)
+
+        self.assertEqual((0, "out", ""), results[0])
+        self.assertIsInstance(results[1], exceptions.SSHTimeout)
+        self.assertIsInstance(results[2], socket.error)
+        for host in hosts:
+            host.execute.assert_called_once_with("cmd", stdin="data",
+                                                 timeout=5)
+
+    def test_run_many_bytes_stdin(self):
+        hosts = [mock.Mock(host="h1"), mock.Mock(host="h2")]
+        sshutils.run_many(hosts, "cmd", stdin=b"data")
+
+        for host in hosts:
+            stdin = host.execute.call_args[1]["stdin"]
+            self.assertEqual(b"data", stdin.read())
+
+    def test_run_many_unexpected_error(self):
+        hosts = [mock.Mock(host="h1")]
+        hosts[0].execute.side_effect = ValueError
+        self.assertRaises(ValueError, sshutils.run_many, hosts, "cmd")
+
 
 @ddt.ddt
 class SSHRunTestCase(test.TestCase):
@@ -261,16 +456,51 @@ class SSHRunTestCase(test.TestCase):
         send_calls = [call("line1"), call("line2"), call("e2")]
         self.assertEqual(send_calls, self.fake_session.send.mock_calls)
 
+    @mock.patch("rally.common.sshutils.select")
+    def test_run_stdout_grows_buffer(self, mock_select):
+        mock_select.select.return_value = ([], [], [])
+        size = sshutils.MIN_BUFFER_SIZE
+        self.fake_session.recv_ready.side_effect = [True, True, False]
+        self.fake_session.recv.side_effect = [b"a" * size, b"b"]
+        self.ssh.run("cmd", stdout=mock.Mock())
+        self.assertEqual([mock.call(size), mock.call(size * 2)],
+                         self.fake_session.recv.mock_calls)
+
+    @mock.patch("rally.common.sshutils.select")
+    def test_run_stdout_split_character(self, mock_select):
+        mock_select.select.return_value = ([], [], [])
+        data = u"\u0444".encode("utf8")
+        self.fake_session.recv_ready.side_effect = [True, True, False]
+        self.fake_session.recv.side_effect = [data[:1], data[1:]]
+        stdout = mock.Mock()
+        self.ssh.run("cmd", stdout=stdout)
+        stdout.write.assert_called_once_with(u"\u0444")
+
+    @mock.patch("rally.common.sshutils.select")
+    def test_run_poll_interval(self, mock_select):
+        mock_select.select.return_value = ([], [], [])
+        self.fake_session.exit_status_ready.side_effect = [0, 0, 0, True]
+        self.fake_session.recv_ready.side_effect = [False, True, False,
+                                                    False, False]
+        self.fake_session.recv.return_value = b"ok"
+        self.ssh.run("cmd")
+        intervals = [c[1][3] for c in mock_select.select.mock_calls]
+        min_interval = sshutils.MIN_POLL_INTERVAL
+        self.assertEqual([min_interval, min_interval * 2, min_interval,
+                          min_interval * 2], intervals)
+
     @mock.patch("rally.common.sshutils.select")
     def test_run_select_error(self, mock_select):
         self.fake_session.exit_status_ready.return_value = False
         mock_select.select.return_value = ([], [], [True])
         self.assertRaises(exceptions.SSHError, self.ssh.run, "cmd")
+        self.fake_session.close.assert_called_once_with()
 
     @mock.patch("rally.common.sshutils.time")
     @mock.patch("rally.common.sshutils.select")
     def test_run_timemout(self, mock_select, mock_time):
-        mock_time.time.side_effect = [1, 3700]
+        # the last call marks the end of use of the connection
+        mock_time.time.side_effect = [1, 3700, 3700]
         mock_select.select.return_value = ([], [], [])
         self.fake_session.exit_status_ready.return_value = False
         self.assertRaises(exceptions.SSHTimeout, self.ssh.run, "cmd")
@@ -221,11 +221,6 @@ class PercentileComputationTestCase(test.TestCase):
         {"stream": "mixed50", "percent": 0.50, "expected": 51.89},
         {"stream": "mixed50", "percent": 0.90, "expected":
             82.81300000000002},
-        {"stream": "mixed5000", "percent": 0.25, "expected":
-            35.54600000000001},
-        {"stream": "mixed5000", "percent": 0.50, "expected": 48.351},
-        {"stream": "mixed5000", "percent": 0.90, "expected":
-            66.05880000000437},
         {"stream": "range5000", "percent": 0.25, "expected": 1249.75},
         {"stream": "range5000", "percent": 0.50, "expected": 2499.5},
         {"stream": "range5000", "percent": 0.90, "expected": 4499.1})
@@ -236,6 +231,85 @@ class PercentileComputationTestCase(test.TestCase):
         [comp.add(i) for i in getattr(self, stream)]
         self.assertEqual(expected, comp.result())
 
+    @ddt.data(
+        {"stream": "mixed5000", "percent": 0.25},
+        {"stream": "mixed5000", "percent": 0.50},
+        {"stream": "mixed5000", "percent": 0.90},
+        {"stream": "mixed5000", "percent": 0.999},
+        {"stream": "range5000", "percent": 0.01},
+        {"stream": "range5000", "percent": 0.95},
+        {"stream": "range5000", "percent": 0.999})
+    @ddt.unpack
+    def test_add_and_result_compressed(self, percent, stream):
+        compression = 100
+        comp = algo.PercentileComputation(percent, compression=compression,
+                                          buffer_size=100)
+        values = list(getattr(self, stream))
+        [comp.add(i) for i in values]
+        self.assertLess(len(comp._centroids) + len(comp._buffer),
+                        len(values))
+
+        values.sort()
+        error = 2 * math.pi * math.sqrt(percent * (1 - percent)) / compression
+        self.assertGreaterEqual(
+            comp.result(),
+            values[max(0, int(math.floor((percent - error) *
+                                         (len(values) - 1))))])
+        self.assertLessEqual(
+            comp.result(),
+            values[min(len(values) - 1, int(math.ceil((percent + error) *
+                                                      (len(values) - 1))))])
+
+    @ddt.data({"percent": 0.5, "buffer_size": 10000},
+              {"percent": 0.9, "buffer_size": 10000},
+              {"percent": 0.5, "buffer_size": 100},
+              {"percent": 0.95, "buffer_size": 100})
+    @ddt.unpack
+    def test_merge(self, percent, buffer_size):
+        single_comp = algo.PercentileComputation(percent,
+                                                 buffer_size=buffer_size)
+        for val in self.mixed5000:
+            single_comp.add(val)
+
+        comps = [algo.PercentileComputation(percent, buffer_size=buffer_size)
+                 for _ in six.moves.range(10)]
+        for idx, val in enumerate(self.mixed5000):
+            comps[idx % 10].add(val)
+        merged_comp = comps[0]
+        for comp in comps[1:]:
+            merged_comp.merge(comp)
+
+        values = sorted(self.mixed5000)
+        error = 2 * math.pi * math.sqrt(percent * (1 - percent)) / 200
+        for comp in (single_comp, merged_comp):
+            self.assertGreaterEqual(
+                comp.result(),
+                values[int(math.floor((percent - error) * (len(values) - 1)))])
+            self.assertLessEqual(
+                comp.result(),
+                values[int(math.ceil((percent + error) * (len(values) - 1)))])
+
+    @ddt.data(10, 100)
+    def test_centroids_count_bounded(self, compression):
+        comp = algo.PercentileComputation(0.9, compression=compression,
+                                          buffer_size=100)
+        for value in six.moves.range(200000):
+            comp.add(value)
+        comp.result()
+
+        self.assertLessEqual(len(comp._centroids), compression + 1)
+        # the digest is not compressed more than it is needed
+        self.assertGreater(len(comp._centroids), compression / 4)
+
+    def test_merge_exact(self):
+        comps = [algo.PercentileComputation(0.9) for _ in range(3)]
+        for idx, val in enumerate(self.mixed50):
+            comps[idx % 3].add(val)
+        comps[0].merge(comps[1])
+        comps[0].merge(comps[2])
+        comps[0].merge(algo.PercentileComputation(0.9))
+        self.assertEqual(82.81300000000002, comps[0].result())
+
     def test_add_raises(self):
         comp = algo.PercentileComputation(0.50, 100)
         self.assertRaises(TypeError, comp.add)
@@ -13,6 +13,7 @@
 #    under the License.
 
 from __future__ import print_function
+import pickle
 import string
 import sys
 import threading
@@ -485,6 +486,100 @@ class TimeoutThreadTestCase(test.TestCase):
         self.assertLess(time_elapsed, 11,
                         "Thread killed too late (%s seconds)" % time_elapsed)
 
+    def test_timeout_thread_unsorted_deadlines(self):
+        queue = Queue.Queue()
+        long_thread = mock.Mock(ident=1)
+        short_thread = mock.Mock(ident=2)
+        start_time = time.time()
+        queue.put((long_thread, start_time + 30))
+        queue.put((short_thread, start_time + 0.05))
+        killer_thread = threading.Thread(target=utils.timeout_thread,
+                                         args=(queue,))
+
+        with mock.patch("rally.common.utils.terminate_thread") as mock_term:
+            killer_thread.start()
+            time.sleep(0.3)
+            queue.put((None, None))
+            killer_thread.join()
+
+        # the second deadline fires before the first one
+        mock_term.assert_called_once_with(2)
+
+
+class TimeoutWatchdogTestCase(test.TestCase):
+
+    @mock.patch("rally.common.utils.terminate_thread")
+    def test_watch(self, mock_terminate_thread):
+        watchdog = utils.TimeoutWatchdog()
+        fired = threading.Event()
+        mock_terminate_thread.side_effect = lambda ident: fired.set()
+
+        long_watch = watchdog.watch(30, thread_ident=1)
+        short_watch = watchdog.watch(0.05, thread_ident=2)
+        self.assertTrue(fired.wait(5))
+
+        mock_terminate_thread.assert_called_once_with(2)
+        self.assertTrue(watchdog.cancel(short_watch))
+        self.assertFalse(watchdog.cancel(long_watch))
+        self.assertTrue(short_watch.fired)
+        self.assertFalse(long_watch.fired)
+        self.assertEqual({"terminated": 1, "avg_delay": short_watch.delay,
+                          "max_delay": short_watch.delay}, watchdog.stats())
+        self.assertGreaterEqual(short_watch.delay, 0)
+
+    @mock.patch("rally.common.utils.terminate_thread")
+    def test_cancel(self, mock_terminate_thread):
+        watchdog = utils.TimeoutWatchdog()
+        watches = [watchdog.watch(0.05 + i * 0.001, thread_ident=i)
+                   for i in range(10)]
+        for watch in watches:
+            self.assertFalse(watchdog.cancel(watch))
+        # cancelled deadlines are removed from the heap
+        self.assertLessEqual(len(watchdog._heap), 5)
+
+        time.sleep(0.2)
+        self.assertFalse(mock_terminate_thread.called)
+        self.assertEqual({"terminated": 0, "avg_delay": 0, "max_delay": 0},
+                         watchdog.stats())
+
+    @mock.patch("rally.common.utils.cancel_thread_termination")
+    @mock.patch("rally.common.utils.terminate_thread")
+    def test_cancel_fired(self, mock_terminate_thread,
+                          mock_cancel_thread_termination):
+        watchdog = utils.TimeoutWatchdog()
+        fired = threading.Event()
+        mock_terminate_thread.side_effect = lambda ident: fired.set()
+        current_ident = threading.current_thread().ident
+        own_watch = watchdog.watch(0.01)
+        self.assertTrue(fired.wait(5))
+        fired.clear()
+        other_watch = watchdog.watch(0.01, thread_ident=current_ident + 1)
+        self.assertTrue(fired.wait(5))
+
+        self.assertTrue(watchdog.cancel(own_watch))
+        self.assertTrue(watchdog.cancel(other_watch))
+        # only the pending exception of the current thread is cancelled
+        mock_cancel_thread_termination.assert_called_once_with(
+            current_ident)
+
+    def test_terminate_current_thread(self):
+        watchdog = utils.get_timeout_watchdog()
+        self.assertIs(watchdog, utils.get_timeout_watchdog())
+        result = {}
+
+        def run():
+            watch = watchdog.watch(0.1)
+            try:
+                utils.interruptable_sleep(30, 0.01)
+            except exceptions.ThreadTimeoutException:
+                result["terminated"] = watchdog.cancel(watch)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(11)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual({"terminated": True}, result)
+
 
 class LockedDictTestCase(test.TestCase):
 
@@ -531,6 +626,13 @@ class LockedDictTestCase(test.TestCase):
         self.assertRaises(RuntimeError, setitem, d, 123, 456)
         self.assertRaises(RuntimeError, delitem, d, "foo")
 
+    def test_pickle(self):
+        d = utils.LockedDict(foo="bar", spam={"a": ["b", {"c": "d"}]})
+        restored = pickle.loads(pickle.dumps(d))
+        self.assertEqual(d, restored)
+        self.assertIsInstance(restored["spam"]["a"][1], utils.LockedDict)
+        self.assertRaises(RuntimeError, restored.__setitem__, "foo", "baz")
+
     @mock.patch("rally.common.utils.copy.deepcopy")
     def test___deepcopy__(self, mock_deepcopy):
         mock_deepcopy.side_effect = lambda *args, **kw: (args, kw)
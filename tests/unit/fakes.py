@@ -30,6 +30,7 @@ from swiftclient import exceptions as swift_exceptions
 from rally.common import objects
 from rally.common import utils as rally_utils
 from rally import consts
+from rally.task import atomic
 from rally.task import context
 from rally.task import scenario
 
@@ -1705,6 +1706,22 @@ class FakeClassBasedScenario(FakeScenario):
         pass
 
 
+class FakeCoroutineScenario(FakeScenario):
+
+    def sleep(self, delay=0):
+        return atomic.asyncio.sleep(delay)
+
+    def fail(self):
+        future = atomic.asyncio.Future()
+        atomic.asyncio.get_event_loop().call_soon(
+            future.set_exception, ValueError("fail"))
+        return future
+
+    @atomic.action_timer("action")
+    def action(self):
+        return self.sleep()
+
+
 class FakeTimer(rally_utils.Timer):
 
     def duration(self):
@@ -42,7 +42,7 @@ class FileExporterTestCase(test.TestCase):
         mock_task.get_results.return_value = [{
             "key": "fake_key",
             "data": {
-                "raw": "bar_raw",
+                "raw": ["bar_raw"],
                 "sla": "baz_sla",
                 "load_duration": "foo_load_duration",
                 "full_duration": "foo_full_duration",
@@ -61,7 +61,7 @@ class FileExporterTestCase(test.TestCase):
             {
                 "load_duration": "foo_load_duration",
                 "full_duration": "foo_full_duration",
-                "result": "bar_raw",
+                "result": ["bar_raw"],
                 "key": "fake_key",
                 "sla": "baz_sla"
             }
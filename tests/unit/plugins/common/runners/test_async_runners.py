@@ -0,0 +1,167 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+import ddt
+import jsonschema
+import mock
+import testtools
+
+from rally.plugins.common.runners import async_runners
+from rally.task import atomic
+from rally.task import runner
+from tests.unit import fakes
+from tests.unit import test
+
+
+ASYNC_RUNNERS = "rally.plugins.common.runners.async_runners."
+
+
+@ddt.ddt
+class AsyncRunnersTestCase(test.TestCase):
+
+    @ddt.data({"type": "async_constant", "times": 4, "concurrency": 2,
+               "timeout": 2, "max_cpu_count": 2},
+              {"type": "async_rps", "times": 4, "rps": 2,
+               "max_concurrency": 2, "open_loop": True})
+    def test_validate(self, config):
+        runner.ScenarioRunner.validate(config)
+
+    @ddt.data({"type": "async_constant", "rps": 2},
+              {"type": "async_rps", "times": 4})
+    def test_validate_failed(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          runner.ScenarioRunner.validate, config)
+
+    @ddt.data(
+        ("async_constant", {"concurrency": 2}, "_worker_process"),
+        ("async_rps", {"rps": 2}, "_rps_worker_process"),
+        ("async_rps", {"rps": 2, "open_loop": True},
+         "_open_loop_rps_worker_process"))
+    @ddt.unpack
+    @mock.patch("rally.task.runner.ScenarioRunner._join_processes")
+    @mock.patch("rally.task.runner.ScenarioRunner._create_process_pool")
+    def test__run_scenario(self, runner_type, config, worker_name,
+                           mock_scenario_runner__create_process_pool,
+                           mock_scenario_runner__join_processes):
+        runner_cls = runner.ScenarioRunner.get(runner_type)
+        runner_obj = runner_cls(
+            mock.MagicMock(), dict(type=runner_type, times=4, **config))
+
+        runner_obj._run_scenario(fakes.FakeCoroutineScenario, "sleep",
+                                 {"task": {"uuid": "uuid"}}, {})
+
+        args, kwargs = mock_scenario_runner__create_process_pool.call_args
+        self.assertEqual(getattr(async_runners, worker_name), args[1])
+
+
+@testtools.skipIf(atomic.asyncio is None, "asyncio is not available")
+class AsyncWorkerProcessTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AsyncWorkerProcessTestCase, self).setUp()
+        self.context = fakes.FakeContext({"task": {"uuid": "uuid"}}).context
+        self.info = {"processes_to_start": 1, "processes_counter": 0}
+        self.aborted = multiprocessing.Event()
+        self.mock_results_sender = mock.patch(
+            "rally.task.runner.ResultsSender").start()
+
+    def _get_results(self):
+        self.mock_results_sender.assert_called_once_with("queue", "uuid")
+        mock_sender = self.mock_results_sender.return_value
+        mock_sender.close.assert_called_once_with()
+        return [c[0][0] for c in mock_sender.put.call_args_list]
+
+    def test__worker_process(self):
+        async_runners._worker_process(
+            "queue", iter(range(10)), 0, 3, 5, None, self.context,
+            fakes.FakeCoroutineScenario, "sleep", {"delay": 0.01},
+            self.aborted, self.info)
+
+        results = self._get_results()
+        self.assertEqual(5, len(results))
+        for result in results:
+            self.assertEqual([], result["error"])
+            self.assertGreaterEqual(result["duration"], 0.01)
+
+    def test__worker_process_timeout(self):
+        async_runners._worker_process(
+            "queue", iter(range(10)), 0.01, 2, 2, None, self.context,
+            fakes.FakeCoroutineScenario, "sleep", {"delay": 10},
+            self.aborted, self.info)
+
+        results = self._get_results()
+        self.assertEqual(["ThreadTimeoutException"] * 2,
+                         [r["error"][0] for r in results])
+
+    def test__worker_process_aborted(self):
+        self.aborted.set()
+
+        async_runners._worker_process(
+            "queue", iter(range(10)), 0, 3, 5, None, self.context,
+            fakes.FakeCoroutineScenario, "sleep", {}, self.aborted,
+            self.info)
+
+        self.assertEqual([], self._get_results())
+
+    @mock.patch(ASYNC_RUNNERS + "time.sleep")
+    def test__rps_worker_process(self, mock_sleep):
+        async_runners._rps_worker_process(
+            "queue", iter(range(10)), 0, 100, 5, 2, self.context,
+            fakes.FakeCoroutineScenario, "do_it", {}, self.aborted,
+            {"processes_to_start": 2, "processes_counter": 1})
+
+        mock_sleep.assert_called_once_with(0.005)
+        results = self._get_results()
+        self.assertEqual(5, len(results))
+        timestamps = sorted(r["timestamp"] for r in results)
+        # iterations are started 0.01 seconds one after another
+        self.assertGreaterEqual(timestamps[-1] - timestamps[0], 0.035)
+
+    def test__rps_worker_process_max_concurrent(self):
+        async_runners._rps_worker_process(
+            "queue", iter(range(10)), 0, 1000, 4, 1, self.context,
+            fakes.FakeCoroutineScenario, "sleep", {"delay": 0.01},
+            self.aborted, self.info)
+
+        results = sorted(self._get_results(),
+                         key=lambda r: r["timestamp"])
+        self.assertEqual(4, len(results))
+        for prev, result in zip(results, results[1:]):
+            # the next iteration waits for the previous one
+            self.assertGreaterEqual(result["timestamp"],
+                                    prev["timestamp"] + prev["duration"])
+
+    @mock.patch(ASYNC_RUNNERS + "time.time", return_value=1000.0)
+    def test__open_loop_rps_worker_process(self, mock_time):
+        async_runners._open_loop_rps_worker_process(
+            "queue", iter(range(10)), 0, 100, 5, 2, 1000.0, self.context,
+            fakes.FakeCoroutineScenario, "do_it", {}, self.aborted,
+            self.info)
+
+        results = self._get_results()
+        self.assertEqual([1000.0, 1000.01, 1000.02, 1000.03, 1000.04],
+                         sorted(round(r["scheduled_at"], 2)
+                                for r in results))
+
+    def test__open_loop_rps_worker_process_aborted(self):
+        self.aborted.set()
+
+        async_runners._open_loop_rps_worker_process(
+            "queue", iter(range(10)), 0, 100, 5, 2, 0, self.context,
+            fakes.FakeCoroutineScenario, "do_it", {}, self.aborted,
+            self.info)
+
+        self.assertEqual([], self._get_results())
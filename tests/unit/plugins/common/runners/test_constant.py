@@ -47,25 +47,7 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
                           self.config)
 
     @mock.patch(RUNNERS + "constant.runner")
-    def test__run_scenario_once_with_unpack_args(self, mock_runner):
-        result = constant._run_scenario_once_with_unpack_args(
-            ("FOO", ("BAR", "QUUZ")))
-
-        self.assertEqual(mock_runner._run_scenario_once.return_value, result)
-        mock_runner._run_scenario_once.assert_called_once_with(
-            "FOO", ("BAR", "QUUZ"))
-
-    @mock.patch(RUNNERS + "constant.time")
-    @mock.patch(RUNNERS + "constant.threading.Thread")
-    @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
-    @mock.patch(RUNNERS + "constant.runner")
-    def test__worker_process(self, mock_runner, mock_queue, mock_thread,
-                             mock_time):
-
-        mock_thread_instance = mock.MagicMock(
-            isAlive=mock.MagicMock(return_value=False))
-        mock_thread.return_value = mock_thread_instance
-
+    def test__worker_process(self, mock_runner):
         mock_event = mock.MagicMock(
             is_set=mock.MagicMock(return_value=False))
 
@@ -74,28 +56,56 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
         fake_ram_int = iter(range(10))
 
         context = {"users": [{"tenant_id": "t1", "credential": "c1",
-                              "id": "uuid1"}]}
+                              "id": "uuid1"}],
+                   "task": {"uuid": "task_uuid"}}
         info = {"processes_to_start": 1, "processes_counter": 1}
 
-        constant._worker_process(mock_queue, fake_ram_int, 1, 2, times,
+        constant._worker_process("queue", fake_ram_int, 1, 2, times, None,
                                  context, "Dummy", "dummy", (), mock_event,
                                  info)
 
-        self.assertEqual(times + 1, mock_thread.call_count)
-        self.assertEqual(times + 1, mock_thread_instance.start.call_count)
-        self.assertEqual(times + 1, mock_thread_instance.join.call_count)
-        # NOTE(rvasilets): `times` + 1 here because `times` the number of
-        # scenario repetition and one more need on "initialization" stage
-        # of the thread stuff.
-        self.assertEqual(times, mock_runner._get_scenario_context.call_count)
-
-        for i in range(times):
-            scenario_context = mock_runner._get_scenario_context(i, context)
-            call = mock.call(
-                args=(mock_queue, "Dummy", "dummy", scenario_context, ()),
-                target=mock_runner._worker_thread,
-            )
-            self.assertIn(call, mock_thread.mock_calls)
+        mock_runner.ResultsSender.assert_called_once_with("queue",
+                                                          "task_uuid")
+        mock_sender = mock_runner.ResultsSender.return_value
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            mock_sender, "Dummy", "dummy", context, (), 2, 1)
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertEqual([mock.call(i) for i in range(times)],
+                         mock_pool.submit.mock_calls)
+        mock_pool.join.assert_called_once_with()
+        mock_sender.close.assert_called_once_with()
+
+    @mock.patch(RUNNERS + "constant.time.time")
+    @mock.patch(RUNNERS + "constant.runner")
+    def test__worker_process_for_duration(self, mock_runner, mock_time):
+        mock_time.side_effect = [1, 2, 3, 4]
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        constant._worker_process("queue", iter(range(10)), 1, 2, None, 3,
+                                 {"task": {"uuid": "task_uuid"}}, "Dummy",
+                                 "dummy", (), mock_event, info)
+
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertEqual([mock.call(i) for i in range(4)],
+                         mock_pool.submit.mock_calls)
+        mock_pool.join.assert_called_once_with()
+
+    @mock.patch(RUNNERS + "constant.runner")
+    def test__worker_process_aborted(self, mock_runner):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(side_effect=[False, False, True]))
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        constant._worker_process("queue", iter(range(10)), 0, 2, 10, None,
+                                 {"task": {"uuid": "task_uuid"}}, "Dummy",
+                                 "dummy", (), mock_event, info)
+
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertEqual([mock.call(0), mock.call(1)],
+                         mock_pool.submit.mock_calls)
+        mock_pool.join.assert_called_once_with()
 
     @mock.patch(RUNNERS_BASE + "_run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
@@ -251,6 +261,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.context = fakes.FakeContext({"task": {"uuid": "uuid"}}).context
         self.context["iteration"] = 14
         self.args = {"a": 1}
+        self.task = mock.MagicMock()
 
     def test_validate(self):
         constant.ConstantForDurationScenarioRunner.validate(self.config)
@@ -263,7 +274,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "do_it",
                                  self.context, self.args)
@@ -276,7 +287,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_exception(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "something_went_wrong",
                                  self.context, self.args)
@@ -290,7 +301,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_timeout(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "raise_timeout",
                                  self.context, self.args)
@@ -302,9 +313,35 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
                 self.assertIsNotNone(result)
         self.assertIn("error", runner_obj.result_queue[0][0])
 
+    @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "constant.multiprocessing.cpu_count")
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._create_process_pool")
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._join_processes")
+    def test__run_scenario_process_pool(self, mock__join_processes,
+                                        mock__create_process_pool,
+                                        mock_cpu_count, mock_queue):
+        mock_cpu_count.return_value = 4
+        self.config["concurrency"] = 10
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 self.context, self.args)
+
+        args, kwargs = mock__create_process_pool.call_args
+        self.assertEqual(4, args[0])
+        self.assertEqual(constant._worker_process, args[1])
+        concurrencies = [next(args[2])[3] for i in range(4)]
+        self.assertEqual([3, 3, 2, 2], concurrencies)
+        mock__join_processes.assert_called_once_with(
+            mock__create_process_pool.return_value,
+            mock_queue.return_value)
+
     def test__run_scenario_constantly_aborted(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
-                                                                self.config)
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
 
         runner_obj.abort()
         runner_obj._run_scenario(fakes.FakeScenario, "do_it",
@@ -312,8 +349,8 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(len(runner_obj.result_queue), 0)
 
     def test_abort(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
-                                                                self.config)
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
         self.assertFalse(runner_obj.aborted.is_set())
         runner_obj.abort()
         self.assertTrue(runner_obj.aborted.is_set())
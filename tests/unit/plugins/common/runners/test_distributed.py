@@ -0,0 +1,177 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+import jsonschema
+import mock
+
+from rally import exceptions
+from rally.plugins.common.runners import distributed
+from rally.task import runner
+from tests.unit import fakes
+from tests.unit import test
+
+
+DISTRIBUTED = "rally.plugins.common.runners.distributed"
+
+
+@ddt.ddt
+class SplitConfigTestCase(test.TestCase):
+
+    @ddt.data(
+        {"config": {"type": "serial", "times": 5}, "parts": 2,
+         "expected": [{"type": "serial", "times": 3},
+                      {"type": "serial", "times": 2}]},
+        {"config": {"type": "constant", "times": 10, "concurrency": 3,
+                    "timeout": 5}, "parts": 3,
+         "expected": [
+             {"type": "constant", "times": 4, "concurrency": 1,
+              "timeout": 5},
+             {"type": "constant", "times": 3, "concurrency": 1,
+              "timeout": 5},
+             {"type": "constant", "times": 3, "concurrency": 1,
+              "timeout": 5}]},
+        {"config": {"type": "rps", "times": 4, "rps": 5,
+                    "max_concurrency": 2}, "parts": 2,
+         "expected": [
+             {"type": "rps", "times": 2, "rps": 2.5, "max_concurrency": 1},
+             {"type": "rps", "times": 2, "rps": 2.5, "max_concurrency": 1}]},
+        {"config": {"type": "load_profile",
+                    "phases": [{"duration": 10, "rps": [1, 4]},
+                               {"duration": 5, "concurrency": [2, 5]},
+                               {"duration": 5, "concurrency": 3}]},
+         "parts": 2,
+         "expected": [
+             {"type": "load_profile",
+              "phases": [{"duration": 10, "rps": [0.5, 2.0]},
+                         {"duration": 5, "concurrency": [1, 3]},
+                         {"duration": 5, "concurrency": 2}]},
+             {"type": "load_profile",
+              "phases": [{"duration": 10, "rps": [0.5, 2.0]},
+                         {"duration": 5, "concurrency": [1, 2]},
+                         {"duration": 5, "concurrency": 1}]}]}
+    )
+    @ddt.unpack
+    def test_split_config(self, config, parts, expected):
+        self.assertEqual(expected, distributed.split_config(config, parts))
+
+    @ddt.data(
+        ({"type": "serial", "times": 5}, 5),
+        ({"type": "constant", "times": 10, "concurrency": 3}, 3),
+        ({"type": "constant_for_duration", "duration": 10}, None),
+        ({"type": "load_profile",
+          "phases": [{"duration": 5, "concurrency": 1}]}, None)
+    )
+    @ddt.unpack
+    def test__get_max_parts(self, config, expected):
+        self.assertEqual(expected, distributed._get_max_parts(config))
+
+
+@ddt.ddt
+class DistributedScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(DistributedScenarioRunnerTestCase, self).setUp()
+        self.task = {"uuid": "task_uuid"}
+        self.context = fakes.FakeContext({"task": self.task}).context
+        self.mock_agent = mock.patch("%s.agent" % DISTRIBUTED).start()
+        self.mock_agent.get_alive_agents.return_value = ["a:1", "b:1",
+                                                         "c:1"]
+
+    def _get_runner(self, **config):
+        config = dict({"type": "distributed",
+                       "runner": {"type": "serial", "times": 5}}, **config)
+        return distributed.DistributedScenarioRunner(self.task, config)
+
+    @ddt.data({"type": "distributed", "runner": {"type": "serial"}},
+              {"type": "distributed", "runner": {"type": "constant",
+                                                 "times": 10},
+               "agents": 2})
+    def test_validate(self, config):
+        runner.ScenarioRunner.validate(config)
+
+    @ddt.data({"type": "distributed"},
+              {"type": "distributed", "runner": {}},
+              {"type": "distributed", "runner": {"type": "serial"},
+               "agents": 0})
+    def test_validate_failed(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          runner.ScenarioRunner.validate, config)
+
+    @ddt.data(
+        {"config": {}, "expected": ["a:1", "b:1", "c:1"]},
+        {"config": {"agents": 2}, "expected": ["a:1", "b:1"]},
+        {"config": {"runner": {"type": "serial", "times": 2}},
+         "expected": ["a:1", "b:1"]},
+        {"config": {"runner": {"type": "constant_for_duration",
+                               "duration": 1}},
+         "expected": ["a:1", "b:1", "c:1"]}
+    )
+    @ddt.unpack
+    def test__choose_agents(self, config, expected):
+        self.assertEqual(expected, self._get_runner(**config)._choose_agents())
+
+    @ddt.data({"alive": [], "config": {}},
+              {"alive": ["a:1", "b:1"], "config": {"agents": 3}})
+    @ddt.unpack
+    def test__choose_agents_not_available(self, alive, config):
+        self.mock_agent.get_alive_agents.return_value = alive
+        runner_obj = self._get_runner(**config)
+        self.assertRaises(exceptions.WorkersNotAvailable,
+                          runner_obj._choose_agents)
+
+    def test__run_scenario(self):
+        results = [{"duration": 1.0, "idle_duration": 0.0, "error": [],
+                    "output": {"additive": [], "complete": []},
+                    "atomic_actions": {}, "timestamp": float(i)}
+                   for i in range(3)]
+
+        def run(job, aborted, store_results):
+            store_results(results)
+
+        self.mock_agent.AgentClient.return_value.run.side_effect = run
+        runner_obj = self._get_runner()
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                                 {"a": 1})
+
+        self.assertEqual(
+            [mock.call("a:1"), mock.call("b:1"), mock.call("c:1")],
+            self.mock_agent.AgentClient.call_args_list)
+        calls = self.mock_agent.AgentClient.return_value.run.call_args_list
+        self.assertEqual([2, 2, 1],
+                         [c[0][0]["runner"]["times"] for c in calls])
+        for call in calls:
+            job, aborted, store_results = call[0]
+            self.assertEqual(fakes.FakeScenario, job["cls"])
+            self.assertEqual("do_it", job["method_name"])
+            self.assertEqual({"a": 1}, job["args"])
+            self.assertEqual("task_uuid", job["context"]["task"]["uuid"])
+            self.assertTrue(job["context"]["task"].is_temporary)
+            self.assertEqual(self.context["config"],
+                             job["context"]["config"])
+            self.assertEqual(runner_obj.aborted, aborted)
+        self.assertEqual(9, sum(len(batch)
+                                for batch in runner_obj.result_queue))
+
+    @ddt.data(({"type": "distributed"}, exceptions.InvalidConfigException),
+              ({"type": "non_existing"}, exceptions.PluginNotFound),
+              ({"type": "serial", "times": 0}, jsonschema.ValidationError))
+    @ddt.unpack
+    def test__run_scenario_invalid_runner(self, runner_config, error):
+        runner_obj = distributed.DistributedScenarioRunner(
+            self.task, {"type": "distributed", "runner": runner_config})
+        self.assertRaises(error, runner_obj._run_scenario,
+                          fakes.FakeScenario, "do_it", self.context, {})
+        self.assertFalse(self.mock_agent.AgentClient.called)
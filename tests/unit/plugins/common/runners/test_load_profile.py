@@ -0,0 +1,222 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import ddt
+import jsonschema
+import mock
+
+from rally.plugins.common.runners import load_profile
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+@ddt.ddt
+class PhaseTestCase(test.TestCase):
+
+    def test_constant_rps(self):
+        phase = load_profile.Phase({"duration": 10, "rps": 2}, 5)
+        self.assertEqual(5, phase.offset)
+        self.assertEqual("rps", phase.kind)
+        self.assertEqual(2, phase.level(3))
+        self.assertEqual(20, phase.times)
+        self.assertEqual([0, 0.5, 1.0, 9.5],
+                         [phase.time_of(n) for n in (0, 1, 2, 19)])
+
+    def test_ramp_rps(self):
+        phase = load_profile.Phase({"duration": 10, "rps": [0, 10]}, 0)
+        self.assertEqual(5, phase.level(5))
+        self.assertEqual(10, phase.level(20))
+        # the area under the rate line
+        self.assertEqual(50, phase.times)
+        # N(t) = t^2 / 2
+        for number in (0, 2, 8, 32, 49):
+            self.assertAlmostEqual((2 * number) ** 0.5,
+                                   phase.time_of(number))
+
+    def test_ramp_down_rps(self):
+        phase = load_profile.Phase({"duration": 4, "rps": [3, 1]}, 0)
+        self.assertEqual(8, phase.times)
+        times = [phase.time_of(n) for n in range(phase.times)]
+        self.assertEqual(sorted(times), times)
+        self.assertLess(times[-1], 4)
+
+    def test_pause(self):
+        phase = load_profile.Phase({"duration": 4, "rps": [0, 0]}, 0)
+        self.assertEqual(0, phase.times)
+
+    @ddt.data({"workers": 1, "expected": [5]},
+              {"workers": 2, "expected": [3, 2]},
+              {"workers": 3, "expected": [2, 2, 1]},
+              {"workers": 6, "expected": [1, 1, 1, 1, 1, 0]})
+    @ddt.unpack
+    def test_concurrency(self, workers, expected):
+        phase = load_profile.Phase({"duration": 10, "concurrency": [1, 9]},
+                                   0)
+        self.assertEqual("concurrency", phase.kind)
+        self.assertEqual(0, phase.times)
+        self.assertEqual(expected,
+                         [phase.concurrency(5, workers, w)
+                          for w in range(workers)])
+
+
+@ddt.ddt
+class LoadProfileScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(LoadProfileScenarioRunnerTestCase, self).setUp()
+        self.task = mock.MagicMock()
+
+    @ddt.data(
+        [{"duration": 60, "rps": [1, 50]}, {"duration": 300, "rps": 50}],
+        [{"duration": 1, "concurrency": 5},
+         {"duration": 1.5, "concurrency": [5, 0]},
+         {"duration": 2, "rps": [0, 0]}])
+    def test_validate(self, phases):
+        load_profile.LoadProfileScenarioRunner.validate(
+            {"type": "load_profile", "phases": phases, "timeout": 10,
+             "max_concurrency": 5, "max_cpu_count": 2})
+
+    @ddt.data(
+        [],
+        [{"duration": 60}],
+        [{"duration": 60, "rps": 1, "concurrency": 1}],
+        [{"duration": 0, "rps": 1}],
+        [{"duration": 1, "rps": 0}],
+        [{"duration": 1, "rps": [1]}],
+        [{"duration": 1, "rps": [1, 2, 3]}],
+        [{"duration": 1, "concurrency": 1.5}],
+        [{"duration": 1, "concurrency": 1, "foo": "bar"}])
+    def test_validate_failed(self, phases):
+        self.assertRaises(jsonschema.ValidationError,
+                          load_profile.LoadProfileScenarioRunner.validate,
+                          {"type": "load_profile", "phases": phases})
+
+    def test__make_phases(self):
+        phases = load_profile.LoadProfileScenarioRunner._make_phases(
+            [{"duration": 2, "rps": 1}, {"duration": 3, "concurrency": 1},
+             {"duration": 1, "rps": 1}])
+        self.assertEqual([0, 2, 5], [p.offset for p in phases])
+
+    @mock.patch(RUNNERS + "load_profile.time.time")
+    @mock.patch(RUNNERS + "load_profile.timeutils.now")
+    @mock.patch(RUNNERS + "load_profile.runner")
+    def test__worker_process(self, mock_runner, mock_now, mock_time):
+        mock_now.return_value = 0
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False),
+            wait=mock.MagicMock(return_value=False))
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        mock_pool.wait_for_free_slot.return_value = True
+        phases = load_profile.LoadProfileScenarioRunner._make_phases(
+            [{"duration": 2, "rps": 1}, {"duration": 1, "concurrency": 4}])
+        mock_time.side_effect = [2.0, 2.0, 2.0, 2.5, 3.0]
+        context = {"task": {"uuid": "task_uuid"}}
+        info = {"processes_to_start": 2, "processes_counter": 0}
+
+        load_profile._worker_process(
+            "queue", iter(range(10)), 1, phases, [iter(range(10)), None], 3,
+            0, context, "Dummy", "dummy", (), mock_event, info)
+
+        mock_runner.ResultsSender.assert_called_once_with("queue",
+                                                          "task_uuid")
+        mock_sender = mock_runner.ResultsSender.return_value
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            mock_sender, "Dummy", "dummy", context, (), 3, 1)
+        self.assertEqual(
+            [mock.call(0, scheduled_at=0.0, phase=0),
+             mock.call(1, scheduled_at=1.0, phase=0),
+             mock.call(2, phase=1), mock.call(3, phase=1)],
+            mock_pool.submit.mock_calls)
+        # the worker runs a half of the concurrency of the phase
+        self.assertEqual(
+            [mock.call(3, timeout=1), mock.call(3, timeout=1),
+             mock.call(2, timeout=1.0),
+             mock.call(2, timeout=0.5)],
+            mock_pool.wait_for_free_slot.mock_calls)
+        mock_pool.join.assert_called_once_with()
+        mock_sender.close.assert_called_once_with()
+
+    @mock.patch(RUNNERS + "load_profile.runner")
+    def test__worker_process_aborted(self, mock_runner):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=True))
+        phases = load_profile.LoadProfileScenarioRunner._make_phases(
+            [{"duration": 2, "rps": 1}])
+        info = {"processes_to_start": 1, "processes_counter": 0}
+
+        load_profile._worker_process(
+            "queue", iter(range(10)), 1, phases, [iter(range(10))], 3, 0,
+            {"task": {"uuid": "task_uuid"}}, "Dummy", "dummy", (),
+            mock_event, info)
+
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertFalse(mock_pool.submit.called)
+        mock_pool.join.assert_called_once_with()
+
+    def test__run_scenario(self):
+        config = {"type": "load_profile", "timeout": 5,
+                  "phases": [{"duration": 0.1, "rps": [100, 300]},
+                             {"duration": 0.1, "concurrency": 2},
+                             {"duration": 0.05, "rps": 100}]}
+        runner_obj = load_profile.LoadProfileScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        results = [r for batch in runner_obj.result_queue for r in batch]
+        phases = collections.Counter(r["phase"] for r in results)
+        self.assertEqual(20, phases[0])
+        # the count of iterations of the concurrency phase depends on the
+        # speed of the host, if the rps phase is late it may be skipped
+        self.assertEqual(5, phases[2])
+        for result in results:
+            self.assertEqual(result["phase"] != 1, "scheduled_at" in result)
+
+    @mock.patch(RUNNERS + "load_profile.multiprocessing.cpu_count",
+                return_value=8)
+    def test__run_scenario_peak_concurrency_exceeds_rps_times(
+            self, mock_cpu_count):
+        config = {"type": "load_profile",
+                  "phases": [{"duration": 1, "rps": 1},
+                             {"duration": 10, "concurrency": 8}]}
+        runner_obj = load_profile.LoadProfileScenarioRunner(self.task, config)
+        runner_obj._create_process_pool = mock.Mock()
+        runner_obj._join_processes = mock.Mock()
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        processes_to_start, worker, args_gen = (
+            runner_obj._create_process_pool.call_args[0])
+        self.assertEqual(8, processes_to_start)
+        # every worker may take the only iteration of the rps phase
+        self.assertEqual([1] * 8,
+                         [next(args_gen)[5] for i in range(8)])
+
+    def test__run_scenario_aborted(self):
+        config = {"type": "load_profile",
+                  "phases": [{"duration": 10, "rps": 10}]}
+        runner_obj = load_profile.LoadProfileScenarioRunner(self.task, config)
+
+        runner_obj.abort()
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        self.assertEqual(0, len(runner_obj.result_queue))
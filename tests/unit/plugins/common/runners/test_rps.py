@@ -59,6 +59,14 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         self.assertRaises(jsonschema.ValidationError,
                           rps.RPSScenarioRunner.validate, config)
 
+    def test_validate_open_loop(self):
+        config = {"type": "rps", "times": 10, "rps": 5, "open_loop": True}
+        rps.RPSScenarioRunner.validate(config)
+
+        config["open_loop"] = "yes"
+        self.assertRaises(jsonschema.ValidationError,
+                          rps.RPSScenarioRunner.validate, config)
+
     def test_validate_failed(self):
         config = {"type": "rps", "a": 10}
         self.assertRaises(jsonschema.ValidationError,
@@ -66,11 +74,8 @@ class RPSScenarioRunnerTestCase(test.TestCase):
 
     @mock.patch(RUNNERS + "rps.LOG")
     @mock.patch(RUNNERS + "rps.time")
-    @mock.patch(RUNNERS + "rps.threading.Thread")
-    @mock.patch(RUNNERS + "rps.multiprocessing.Queue")
     @mock.patch(RUNNERS + "rps.runner")
-    def test__worker_process(self, mock_runner, mock_queue, mock_thread,
-                             mock_time, mock_log):
+    def test__worker_process(self, mock_runner, mock_time, mock_log):
 
         def time_side():
             time_side.last += 0.03
@@ -81,10 +86,6 @@ class RPSScenarioRunnerTestCase(test.TestCase):
 
         mock_time.time = time_side
 
-        mock_thread_instance = mock.MagicMock(
-            isAlive=mock.MagicMock(return_value=False))
-        mock_thread.return_value = mock_thread_instance
-
         mock_event = mock.MagicMock(
             is_set=mock.MagicMock(return_value=False))
 
@@ -94,34 +95,105 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         fake_ram_int = iter(range(10))
 
         context = {"users": [{"tenant_id": "t1", "credential": "c1",
-                              "id": "uuid1"}]}
+                              "id": "uuid1"}],
+                   "task": {"uuid": "task_uuid"}}
         info = {"processes_to_start": 1, "processes_counter": 1}
 
-        rps._worker_process(mock_queue, fake_ram_int, 1, 10, times,
+        rps._worker_process("queue", fake_ram_int, 1, 10, times,
                             max_concurrent, context, "Dummy", "dummy",
                             (), mock_event, info)
 
         self.assertEqual(times, mock_log.debug.call_count)
-        self.assertEqual(times + 1, mock_thread.call_count)
-        self.assertEqual(times + 1, mock_thread_instance.start.call_count)
-        self.assertEqual(times + 1, mock_thread_instance.join.call_count)
-        # NOTE(rvasilets): `times` + 1 here because `times` the number of
-        # scenario repetition and one more need on "initialization" stage
-        # of the thread stuff.
-
         self.assertEqual(1, mock_time.sleep.call_count)
-        self.assertEqual(2, mock_thread_instance.isAlive.call_count)
-        self.assertEqual(times * 4 - 1, mock_time.time.count)
-
-        self.assertEqual(times, mock_runner._get_scenario_context.call_count)
-
-        for i in range(times):
-            scenario_context = mock_runner._get_scenario_context(i, context)
-            call = mock.call(
-                args=(mock_queue, "Dummy", "dummy", scenario_context, ()),
-                target=mock_runner._worker_thread,
-            )
-            self.assertIn(call, mock_thread.mock_calls)
+        self.assertEqual(times * 2 + 1, time_side.count)
+
+        mock_runner.ResultsSender.assert_called_once_with("queue",
+                                                          "task_uuid")
+        mock_sender = mock_runner.ResultsSender.return_value
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            mock_sender, "Dummy", "dummy", context, (), max_concurrent, 1)
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertEqual([mock.call(i) for i in range(times)],
+                         mock_pool.submit.mock_calls)
+        mock_pool.join.assert_called_once_with()
+        mock_sender.close.assert_called_once_with()
+
+        # fake time does not move while waiting, so the delay before the
+        # next iteration grows on each step
+        self.assertEqual(times, mock_event.wait.call_count)
+        for i, call in enumerate(mock_event.wait.mock_calls, 1):
+            self.assertAlmostEqual(0.04 * i, call[1][0])
+
+    @mock.patch(RUNNERS + "rps.timeutils.now")
+    @mock.patch(RUNNERS + "rps.time.time")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__open_loop_worker_process(self, mock_runner, mock_time,
+                                       mock_now):
+        mock_time.return_value = 1000.0
+        # the monotonic clock is 900 seconds behind the wall clock
+        mock_now.side_effect = [100.0, 100.0, 100.3, 101.0, 101.0]
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False),
+            wait=mock.MagicMock(return_value=False))
+        context = {"task": {"uuid": "task_uuid"}}
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        rps._open_loop_worker_process(
+            "queue", iter(range(10)), 1, 2.0, 4, 3, 1000.0, context,
+            "Dummy", "dummy", (), mock_event, info)
+
+        mock_runner.ResultsSender.assert_called_once_with("queue",
+                                                          "task_uuid")
+        mock_sender = mock_runner.ResultsSender.return_value
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            mock_sender, "Dummy", "dummy", context, (), 3, 1)
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        self.assertEqual(
+            [mock.call(i, scheduled_at=1000.0 + i / 2.0) for i in range(4)],
+            mock_pool.submit.mock_calls)
+        # the 2nd iteration waits for 0.2s, the 3rd one is started late
+        # without waiting, the 4th is started right on time
+        self.assertEqual(2, mock_event.wait.call_count)
+        self.assertAlmostEqual(0.2, mock_event.wait.call_args_list[0][0][0])
+        self.assertAlmostEqual(0.5, mock_event.wait.call_args_list[1][0][0])
+        mock_pool.join.assert_called_once_with()
+        mock_sender.close.assert_called_once_with()
+
+    @mock.patch(RUNNERS + "rps.timeutils.now")
+    @mock.patch(RUNNERS + "rps.time.time")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__open_loop_worker_process_aborted(self, mock_runner, mock_time,
+                                               mock_now):
+        mock_time.return_value = 0
+        mock_now.return_value = 0
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False),
+            wait=mock.MagicMock(return_value=True))
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        rps._open_loop_worker_process(
+            "queue", iter(range(10)), 1, 2.0, 4, 3, 0, {"task": {"uuid": 1}},
+            "Dummy", "dummy", (), mock_event, info)
+
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        # the very first iteration is not delayed
+        self.assertEqual([mock.call(0, scheduled_at=0)],
+                         mock_pool.submit.mock_calls)
+        mock_pool.join.assert_called_once_with()
+
+    def test__run_scenario_open_loop(self):
+        config = {"times": 20, "rps": 1000, "timeout": 5,
+                  "max_concurrency": 15, "open_loop": True}
+        runner_obj = rps.RPSScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        results = [r for batch in runner_obj.result_queue for r in batch]
+        self.assertEqual(config["times"], len(results))
+        scheduled = sorted(r["scheduled_at"] for r in results)
+        for i, scheduled_at in enumerate(scheduled):
+            self.assertAlmostEqual(scheduled[0] + i / 1000.0, scheduled_at)
 
     @mock.patch(RUNNERS + "rps.runner._run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
@@ -70,6 +70,14 @@ class DummyTestCase(test.TestCase):
         scenario.run(sleep=10)
         mock_interruptable_sleep.assert_called_once_with(10)
 
+    @mock.patch("rally.task.atomic.asyncio")
+    def test_dummy_coroutine(self, mock_asyncio):
+        scenario = dummy.DummyCoroutine(test.get_test_context())
+
+        self.assertEqual(mock_asyncio.sleep.return_value,
+                         scenario.run(sleep=10))
+        mock_asyncio.sleep.assert_called_once_with(10)
+
     @mock.patch(DUMMY + "utils.interruptable_sleep")
     def test_dummy_exception(self, mock_interruptable_sleep):
         scenario = dummy.DummyException(test.get_test_context())
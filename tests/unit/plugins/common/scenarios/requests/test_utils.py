@@ -12,27 +12,202 @@
 
 
 import mock
+from oslo_config import fixture
+import requests
+from requests.packages.urllib3 import connectionpool
 
 from rally.plugins.common.scenarios.requests import utils
 from tests.unit import test
 
+UTILS = "rally.plugins.common.scenarios.requests.utils"
+
 
 class RequestsTestCase(test.TestCase):
 
-    @mock.patch("requests.request")
-    def test__check_request(self, mock_request):
-        mock_request.return_value = mock.MagicMock(status_code=200)
+    def setUp(self):
+        super(RequestsTestCase, self).setUp()
+        self.addCleanup(utils.SESSIONS_POOL.clear)
+
+    @mock.patch("%s.SESSIONS_POOL" % UTILS)
+    def test__check_request(self, mock_sessions_pool):
+        mock_session = mock_sessions_pool.get.return_value
+        mock_session.request.return_value = mock.MagicMock(status_code=200)
         scenario = utils.RequestScenario(test.get_test_context())
         scenario._check_request(status_code=200, url="sample", method="GET")
 
+        self.assertEqual(["requests.check_request"],
+                         list(scenario.atomic_actions()))
         self._test_atomic_action_timer(scenario.atomic_actions(),
                                        "requests.check_request")
-        mock_request.assert_called_once_with("GET", "sample")
+        output = scenario._output["additive"]
+        self.assertEqual(1, len(output))
+        self.assertEqual("Request timings", output[0]["title"])
+        self.assertEqual(["connect", "tls", "ttfb", "body"],
+                         [name for name, value in output[0]["data"]])
+        mock_session.request.assert_called_once_with("GET", "sample",
+                                                     stream=True)
+        mock_sessions_pool.warmup.assert_called_once_with(
+            "sample", verify=None, cert=None)
+
+    @mock.patch("%s.time.time" % UTILS,
+                side_effect=[10, 10, 12, 13, 13, 20, 20, 21, 23, 23])
+    @mock.patch("%s.SESSIONS_POOL" % UTILS)
+    def test__check_request_twice(self, mock_sessions_pool, mock_time):
+        def request(*args, **kwargs):
+            utils._add_timing("connect", 0.5)
+            utils._add_timing("tls", 0.25)
+            return mock.MagicMock(status_code=200)
 
-    @mock.patch("requests.request")
-    def test_check_wrong_request(self, mock_request):
-        mock_request.return_value = mock.MagicMock(status_code=200)
+        mock_session = mock_sessions_pool.get.return_value
+        mock_session.request.side_effect = request
+        scenario = utils.RequestScenario(test.get_test_context())
+        scenario._check_request(status_code=200, url="sample", method="GET",
+                                verify=False)
+        scenario._check_request(status_code=200, url="sample", method="GET",
+                                verify=False)
+
+        self.assertEqual(
+            ["requests.check_request", "requests.check_request (2)"],
+            list(scenario.atomic_actions()))
+        # the parts of both the requests are summed up by the single output
+        self.assertEqual(
+            [{"title": "Request timings",
+              "description": mock.ANY,
+              "chart_plugin": "StackedArea",
+              "data": [["connect", 1.0], ["tls", 0.5], ["ttfb", 1.5],
+                       ["body", 3.0]],
+              "label": "Duration, seconds"}],
+            scenario._output["additive"])
+        mock_sessions_pool.warmup.assert_called_with(
+            "sample", verify=False, cert=None)
+
+    @mock.patch("%s.SESSIONS_POOL" % UTILS)
+    def test_check_wrong_request(self, mock_sessions_pool):
+        mock_session = mock_sessions_pool.get.return_value
+        mock_session.request.return_value = mock.MagicMock(status_code=200)
         scenario = utils.RequestScenario(test.get_test_context())
 
         self.assertRaises(ValueError, scenario._check_request,
                           status_code=201, url="sample", method="GET")
+        self._test_atomic_action_timer(scenario.atomic_actions(),
+                                       "requests.check_request")
+
+
+class TimedConnectionTestCase(test.TestCase):
+
+    @mock.patch("%s.time.time" % UTILS, side_effect=[10, 11, 12, 15])
+    @mock.patch("%s.connection.HTTPSConnection.connect" % UTILS)
+    def test_connect_https(self, mock_https_connection_connect, mock_time):
+        conn = utils.TimedHTTPSConnection("example.com")
+
+        def connect():
+            # TCP handshake is made by _new_conn()
+            with mock.patch("%s.connection.HTTPSConnection._new_conn"
+                            % UTILS):
+                conn._new_conn()
+
+        mock_https_connection_connect.side_effect = connect
+        utils._reset_timings()
+        conn.connect()
+
+        self.assertEqual(1, utils._timings.connect)
+        self.assertEqual(4, utils._timings.tls)
+
+    @mock.patch("%s.time.time" % UTILS, side_effect=[10, 11, 12, 13])
+    @mock.patch("%s.connection.HTTPConnection.connect" % UTILS)
+    def test_connect_http(self, mock_http_connection_connect, mock_time):
+        conn = utils.TimedHTTPConnection("example.com")
+
+        def connect():
+            with mock.patch("%s.connection.HTTPConnection._new_conn"
+                            % UTILS):
+                conn._new_conn()
+
+        mock_http_connection_connect.side_effect = connect
+        utils._reset_timings()
+        conn.connect()
+
+        self.assertEqual(1, utils._timings.connect)
+        self.assertEqual(0, utils._timings.tls)
+
+    def test_adapter_get_connection(self):
+        adapter = utils.TimedHTTPAdapter()
+        self.assertEqual(
+            utils.TimedHTTPConnection,
+            adapter.get_connection("http://example.com").ConnectionCls)
+        pool = adapter.get_connection("https://example.com")
+        self.assertIsInstance(pool, connectionpool.HTTPSConnectionPool)
+        self.assertEqual(utils.TimedHTTPSConnection, pool.ConnectionCls)
+
+
+class SessionsPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(SessionsPoolTestCase, self).setUp()
+        self.conf = self.useFixture(fixture.Config()).config
+        self.pool = utils.SessionsPool()
+        self.addCleanup(self.pool.clear)
+
+    def test_get(self):
+        self.conf(requests_pool_size=3, group="benchmark")
+        session = self.pool.get()
+
+        self.assertIs(session, self.pool.get())
+        adapter = session.get_adapter("https://example.com")
+        self.assertIsInstance(adapter, utils.TimedHTTPAdapter)
+        self.assertEqual(3, adapter._pool_maxsize)
+        self.assertNotIn("close", session.headers.get("Connection", ""))
+
+    def test_get_rejects_cookies(self):
+        session = self.pool.get()
+        request = requests.Request("GET", "http://example.com/").prepare()
+        session.cookies.set_cookie_if_ok(
+            requests.cookies.create_cookie("foo", "bar"),
+            requests.cookies.MockRequest(request))
+
+        self.assertEqual({}, session.cookies.get_dict())
+
+    def test_get_without_keep_alive(self):
+        self.conf(requests_keep_alive=False, group="benchmark")
+        self.assertEqual("close", self.pool.get().headers["Connection"])
+
+    @mock.patch("%s.os.getpid" % UTILS)
+    def test_get_in_forked_process(self, mock_getpid):
+        mock_getpid.return_value = 1
+        pool = utils.SessionsPool()
+        session = pool.get()
+
+        mock_getpid.return_value = 2
+        self.assertIsNot(session, pool.get())
+
+    def test_warmup_disabled(self):
+        with mock.patch.object(self.pool, "get") as mock_get:
+            self.pool.warmup("http://example.com")
+        self.assertFalse(mock_get.called)
+
+    def test_warmup(self):
+        self.conf(requests_pool_size=2, requests_warmup_connections=5,
+                  group="benchmark")
+        session = self.pool.get()
+        adapter = session.get_adapter("http://example.com")
+        mock_pool = mock.Mock()
+        mock_conns = [mock.Mock(), mock.Mock()]
+        mock_pool._get_conn.side_effect = mock_conns
+
+        with mock.patch.object(adapter, "get_connection",
+                               return_value=mock_pool) as mock_get_conn:
+            self.pool.warmup("http://example.com/foo", verify=False)
+            self.pool.warmup("http://example.com/bar")
+
+        mock_get_conn.assert_called_once_with("http://example.com/foo")
+        for conn in mock_conns:
+            conn.connect.assert_called_once_with()
+        self.assertEqual([mock.call(c) for c in mock_conns],
+                         mock_pool._put_conn.call_args_list)
+
+    def test_clear(self):
+        session = self.pool.get()
+        with mock.patch.object(session, "close") as mock_close:
+            self.pool.clear()
+        mock_close.assert_called_once_with()
+        self.assertIsNot(session, self.pool.get())
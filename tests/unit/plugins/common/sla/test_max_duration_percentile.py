@@ -0,0 +1,91 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import ddt
+import jsonschema
+
+from rally.plugins.common.sla import max_duration_percentile
+from tests.unit import test
+
+
+@ddt.ddt
+class MaxDurationPercentileTestCase(test.TestCase):
+
+    @ddt.data({"percentile": 0, "max": 1},
+              {"percentile": 100, "max": 1},
+              {"percentile": 95, "max": 0},
+              {"percentile": 95},
+              {"max": 1},
+              {"percentile": 95, "max": 1, "foo": 1})
+    def test_config_schema(self, config):
+        self.assertRaises(
+            jsonschema.ValidationError,
+            max_duration_percentile.MaxDurationPercentile.validate,
+            {"max_duration_percentile": config})
+
+    def test_result(self):
+        sla1 = max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 50, "max": 3.0})
+        sla2 = max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 90, "max": 3.0})
+        for sla in [sla1, sla2]:
+            for duration in (1.0, 2.0, 3.0, 4.0):
+                sla.add_iteration({"duration": duration})
+            sla.add_iteration({"duration": 100.0, "error": ["Error"]})
+        self.assertTrue(sla1.result()["success"])   # median = 2.5
+        self.assertFalse(sla2.result()["success"])  # 90%ile = 3.7
+        self.assertEqual("Passed", sla1.status())
+        self.assertEqual("Failed", sla2.status())
+        self.assertEqual("50%ile of iteration duration 2.50s <= 3.00s - "
+                         "Passed", sla1.details())
+
+    def test_result_no_iterations(self):
+        sla = max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 95, "max": 1.0})
+        self.assertTrue(sla.result()["success"])
+
+    def test_add_iteration(self):
+        sla = max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 50, "max": 4.0})
+        self.assertTrue(sla.add_iteration({"duration": 3.5}))
+        self.assertFalse(sla.add_iteration({"duration": 5.0}))  # 4.25
+        self.assertTrue(sla.add_iteration({"duration": 1.0}))   # 3.5
+        self.assertFalse(sla.add_iteration({"duration": 7.0}))  # 4.25
+
+    @ddt.data([[1.0, 2.0, 1.5, 4.3],
+               [2.1, 3.4, 1.2, 6.3, 7.2, 7.0, 1.],
+               [1.1, 1.1, 2.2, 2.2, 3.3, 4.3]])
+    def test_merge(self, durations):
+        single_sla = max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 90, "max": 4.0})
+
+        for dd in durations:
+            for d in dd:
+                single_sla.add_iteration({"duration": d})
+
+        slas = [max_duration_percentile.MaxDurationPercentile(
+            {"percentile": 90, "max": 4.0}) for _ in durations]
+
+        for idx, sla in enumerate(slas):
+            for duration in durations[idx]:
+                sla.add_iteration({"duration": duration})
+
+        merged_sla = slas[0]
+        for sla in slas[1:]:
+            merged_sla.merge(sla)
+
+        self.assertEqual(single_sla.success, merged_sla.success)
+        self.assertEqual(single_sla.duration, merged_sla.duration)
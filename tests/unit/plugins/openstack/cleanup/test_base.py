@@ -32,6 +32,7 @@ class ResourceDecoratorTestCase(test.TestCase):
 
         self.assertEqual(Fake._service, "service")
         self.assertEqual(Fake._resource, "res")
+        self.assertIsNone(Fake._delete_after)
 
 
 class ResourceManagerTestCase(test.TestCase):
@@ -120,3 +121,19 @@ class ResourceManagerTestCase(test.TestCase):
         base.ResourceManager().list()
         mock_resource_manager__manager.assert_has_calls(
             [mock.call(), mock.call().list()])
+
+    def test_delete_many(self):
+        self.assertRaises(NotImplementedError,
+                          base.ResourceManager().delete_many, [])
+
+    @mock.patch("%s.ResourceManager.list" % BASE)
+    def test_select_not_deleted(self, mock_resource_manager_list):
+        mock_resource_manager_list.return_value = [
+            mock.MagicMock(id="a", status="ACTIVE"),
+            mock.MagicMock(id="b", status="DELETED")]
+        res = [base.ResourceManager(resource=mock.MagicMock(id=id_))
+               for id_ in ("a", "b", "c")]
+
+        self.assertEqual(res[:1],
+                         base.ResourceManager().select_not_deleted(res))
+        mock_resource_manager_list.assert_called_once_with()
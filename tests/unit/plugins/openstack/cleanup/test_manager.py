@@ -13,9 +13,18 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
 import mock
 import six
 
+from rally.common.plugin import discover
 from rally.plugins.openstack.cleanup import base
 from rally.plugins.openstack.cleanup import manager
 from tests.unit import test
@@ -321,11 +330,39 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock__delete_single_resource.assert_called_once_with(
             mock_mgr.return_value)
 
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    @mock.patch("%s.SeekAndDestroy._delete_single_resource" % BASE)
+    def test__gen_consumer_with_budget(self, mock__delete_single_resource,
+                                       mock__get_cached_client):
+        budget = mock.MagicMock()
+        mock__delete_single_resource.side_effect = (
+            lambda res: self.assertTrue(budget.__enter__.called))
+
+        consumer = manager.SeekAndDestroy(
+            mock.MagicMock(), None, None, budget=budget)._gen_consumer()
+        consumer({}, (None, None, "res"))
+
+        self.assertEqual(1, mock__delete_single_resource.call_count)
+        budget.__exit__.assert_called_once_with(None, None, None)
+
+    def test__request_deletion(self):
+        rate_limiter = mock.MagicMock()
+        resource = mock.MagicMock()
+
+        manager.SeekAndDestroy(
+            None, None, None, rate_limiter=rate_limiter)._request_deletion(
+                resource)
+
+        rate_limiter.acquire.assert_called_once_with()
+        resource.delete.assert_called_once_with()
+
+    @mock.patch("%s.CONF" % BASE)
     @mock.patch("%s.SeekAndDestroy._gen_consumer" % BASE)
     @mock.patch("%s.SeekAndDestroy._gen_publisher" % BASE)
     @mock.patch("%s.broker.run" % BASE)
     def test_exterminate(self, mock_broker_run, mock__gen_publisher,
-                         mock__gen_consumer):
+                         mock__gen_consumer, mock_conf):
+        mock_conf.cleanup.pipelined_deletion = False
 
         manager_cls = mock.MagicMock(_threads=5)
         manager.SeekAndDestroy(manager_cls, None, None).exterminate()
@@ -337,6 +374,184 @@ class SeekAndDestroyTestCase(test.TestCase):
             mock__gen_consumer.return_value,
             consumers_count=5)
 
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.SeekAndDestroy._exterminate_pipelined" % BASE)
+    @mock.patch("%s.broker.run" % BASE)
+    def test_exterminate_pipelined(self, mock_broker_run,
+                                   mock__exterminate_pipelined, mock_conf):
+        mock_conf.cleanup.pipelined_deletion = True
+
+        manager.SeekAndDestroy(mock.MagicMock(), None, None).exterminate()
+
+        mock__exterminate_pipelined.assert_called_once_with()
+        self.assertFalse(mock_broker_run.called)
+
+
+def make_fake_manager_cls(cloud, **attrs):
+    """Make a resource manager of resources of the `cloud` dict.
+
+    :param cloud: dict with sets of ids of resources of tenants
+    """
+
+    class FakeManager(object):
+        _service = "fake"
+        _resource = "res"
+        _tenant_resource = True
+        _perform_for_admin_only = False
+        _max_attempts = 3
+        _timeout = 10
+        _interval = 0
+        _threads = 2
+        calls = collections.Counter()
+
+        def __init__(self, resource=None, admin=None, user=None,
+                     tenant_uuid=None):
+            self.raw_resource = resource
+            self.admin = admin
+            self.user = user
+            self.tenant_uuid = tenant_uuid
+
+        def id(self):
+            return self.raw_resource
+
+        def name(self):
+            return ""
+
+        def list(self):
+            self.calls["list"] += 1
+            return sorted(cloud[self.tenant_uuid])
+
+        def delete(self):
+            self.calls[("delete", self.id())] += 1
+            self.on_delete(self.id(), self.calls[("delete", self.id())])
+
+        def on_delete(self, resource_id, attempt):
+            for resources in cloud.values():
+                resources.discard(resource_id)
+
+        def delete_many(self, resources):
+            raise NotImplementedError()
+
+        def select_not_deleted(self, resources):
+            listed = self.list()
+            return [r for r in resources if r.id() in listed]
+
+    for name, value in attrs.items():
+        setattr(FakeManager, name, value)
+    return FakeManager
+
+
+class SeekAndDestroyPipelinedTestCase(test.TestCase):
+
+    def setUp(self):
+        super(SeekAndDestroyPipelinedTestCase, self).setUp()
+        manager.SeekAndDestroy.cache = {}
+        self.users = [{"id": "u1", "tenant_id": "t1"},
+                      {"id": "u2", "tenant_id": "t1"},
+                      {"id": "u3", "tenant_id": "t2"}]
+        patcher = mock.patch(
+            "%s.SeekAndDestroy._get_cached_client" % BASE,
+            side_effect=lambda user: user and user["id"])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__exterminate_pipelined(self, mock_log):
+        cloud = {"t1": {1, 2}, "t2": {3}}
+
+        def on_delete(self, resource_id, attempt):
+            if resource_id == 2 and attempt == 1:
+                raise Exception("Failed to delete")
+            # the first deletion request of 3 is lost
+            if resource_id != 3 or attempt > 1:
+                cloud[self.tenant_uuid].discard(resource_id)
+
+        manager_cls = make_fake_manager_cls(
+            cloud, _timeout=0.3, on_delete=on_delete)
+
+        manager.SeekAndDestroy(
+            manager_cls, None, self.users)._exterminate_pipelined()
+
+        self.assertEqual({"t1": set(), "t2": set()}, cloud)
+        self.assertEqual(1, manager_cls.calls[("delete", 1)])
+        self.assertEqual(2, manager_cls.calls[("delete", 2)])
+        self.assertEqual(2, manager_cls.calls[("delete", 3)])
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__exterminate_pipelined_bulk(self, mock_log):
+        cloud = {"t1": {1, 2}, "t2": {3}}
+
+        def delete_many(self, resources):
+            cloud[self.tenant_uuid].difference_update(
+                r.id() for r in resources)
+
+        manager_cls = make_fake_manager_cls(cloud, delete_many=delete_many)
+        rate_limiter = mock.MagicMock()
+
+        manager.SeekAndDestroy(
+            manager_cls, None, self.users,
+            rate_limiter=rate_limiter)._exterminate_pipelined()
+
+        self.assertEqual({"t1": set(), "t2": set()}, cloud)
+        # one list() per tenant to find resources and one to confirm
+        self.assertEqual({"list": 4}, manager_cls.calls)
+        self.assertEqual(2, rate_limiter.acquire.call_count)
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__exterminate_pipelined_bulk_failed(self, mock_log):
+        cloud = {"t1": {1, 2}, "t2": {3}}
+        attempts = collections.Counter()
+
+        def delete_many(self, resources):
+            attempts[self.tenant_uuid] += 1
+            # deletion of 2 fails the first time
+            failed = [r for r in resources
+                      if r.id() == 2 and attempts[self.tenant_uuid] == 1]
+            cloud[self.tenant_uuid].difference_update(
+                r.id() for r in resources if r not in failed)
+            return failed
+
+        manager_cls = make_fake_manager_cls(cloud, delete_many=delete_many)
+
+        manager.SeekAndDestroy(
+            manager_cls, None, self.users)._exterminate_pipelined()
+
+        self.assertEqual({"t1": set(), "t2": set()}, cloud)
+        self.assertEqual({"t1": 2, "t2": 1}, attempts)
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__exterminate_pipelined_timeout(self, mock_log):
+        cloud = {"t1": {1}, "t2": set()}
+        manager_cls = make_fake_manager_cls(
+            cloud, _timeout=0.05, _max_attempts=2, _interval=0.01,
+            on_delete=lambda self, resource_id, attempt: None)
+
+        manager.SeekAndDestroy(
+            manager_cls, None, self.users)._exterminate_pipelined()
+
+        self.assertEqual(2, manager_cls.calls[("delete", 1)])
+        self.assertEqual(1, mock_log.warning.call_count)
+        self.assertIn("timeout", mock_log.warning.call_args[0][0])
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__exterminate_pipelined_max_attempts(self, mock_log):
+        cloud = {"t1": {1}, "t2": set()}
+
+        def on_delete(self, resource_id, attempt):
+            raise Exception("Failed to delete")
+
+        manager_cls = make_fake_manager_cls(cloud, on_delete=on_delete)
+
+        manager.SeekAndDestroy(
+            manager_cls, None, self.users)._exterminate_pipelined()
+
+        self.assertEqual(3, manager_cls.calls[("delete", 1)])
+        self.assertEqual(1, mock_log.warning.call_count)
+        self.assertIn("max retries", mock_log.warning.call_args[0][0])
+
 
 class ResourceManagerTestCase(test.TestCase):
 
@@ -373,6 +588,37 @@ class ResourceManagerTestCase(test.TestCase):
             ["fake", "other", "fake.2", "other.2"],
             False, mock_itersubclasses)
 
+    @mock.patch("rally.common.plugin.discover._get_packages_signature",
+                return_value="sig")
+    def test_find_resource_managers_lazy(self,
+                                         mock__get_packages_signature):
+        # the index is warm, so the module with resource managers is not
+        # imported until resource managers are looked up
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        module_name = "lazy_cleanup_resources"
+        with open(os.path.join(tmp_dir, module_name + ".py"), "w") as f:
+            f.write("from rally.plugins.openstack.cleanup import base\n\n\n"
+                    "@base.resource(\"lazy_service\", \"things\")\n"
+                    "class LazyThings(base.ResourceManager):\n"
+                    "    pass\n")
+        index_path = os.path.join(tmp_dir, "plugins_index.json")
+        with open(index_path, "w") as f:
+            json.dump({"signature": "sig", "modules": {module_name: [
+                [None, "%s.ResourceManager" % base.__name__]]}}, f)
+        sys.path.insert(0, tmp_dir)
+        self.addCleanup(sys.path.remove, tmp_dir)
+        self.addCleanup(sys.modules.pop, module_name, None)
+
+        discover.import_modules_lazily(["lazy"], index_path)
+        self.assertNotIn(module_name, sys.modules)
+
+        self.assertIn("lazy_service.things",
+                      manager.list_resource_names())
+        managers = manager.find_resource_managers(["lazy_service"])
+        self.assertEqual(["LazyThings"], [m.__name__ for m in managers])
+        self.assertIn(module_name, sys.modules)
+
     @mock.patch("%s.discover.itersubclasses" % BASE)
     def test_find_resource_managers(self, mock_itersubclasses):
         mock_itersubclasses.return_value = [
@@ -405,7 +651,8 @@ class ResourceManagerTestCase(test.TestCase):
 
     @mock.patch("%s.SeekAndDestroy" % BASE)
     @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     def test_cleanup(self, mock_find_resource_managers, mock_seek_and_destroy):
         manager.cleanup(names=["a", "b"], admin_required=True,
                         admin="admin", users=["user"])
@@ -415,19 +662,20 @@ class ResourceManagerTestCase(test.TestCase):
         mock_seek_and_destroy.assert_has_calls([
             mock.call(
                 mock_find_resource_managers.return_value[0], "admin",
-                ["user"], None
+                ["user"], None, budget=mock.ANY, rate_limiter=None
             ),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1], "admin",
-                ["user"], None
+                ["user"], None, budget=mock.ANY, rate_limiter=None
             ),
             mock.call().exterminate()
         ])
 
     @mock.patch("%s.SeekAndDestroy" % BASE)
     @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     def test_cleanup_with_api_versions(self,
                                        mock_find_resource_managers,
                                        mock_seek_and_destroy):
@@ -443,13 +691,146 @@ class ResourceManagerTestCase(test.TestCase):
             mock.call(
                 mock_find_resource_managers.return_value[0], "admin",
                 ["user"],
-                {"cinder": {"service_type": "volume", "version": "1"}}
+                {"cinder": {"service_type": "volume", "version": "1"}},
+                budget=mock.ANY, rate_limiter=None
             ),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1], "admin",
                 ["user"],
-                {"cinder": {"service_type": "volume", "version": "1"}}
+                {"cinder": {"service_type": "volume", "version": "1"}},
+                budget=mock.ANY, rate_limiter=None
             ),
             mock.call().exterminate()
         ])
+
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_limits(self, mock_find_resource_managers,
+                            mock_seek_and_destroy, mock_conf):
+        mock_conf.cleanup.cleanup_concurrency = 3
+        mock_conf.cleanup.service_rate_limits = {"nova": "4", "cinder": "0"}
+        mgrs = [make_manager("nova", "servers", 1, ()),
+                make_manager("cinder", "volumes", 2, ()),
+                make_manager("glance", "images", 3, ())]
+        mock_find_resource_managers.return_value = mgrs
+
+        stats = manager.cleanup(names=["nova", "cinder", "glance"])
+
+        self.assertEqual({"nova", "cinder", "glance"}, set(stats["services"]))
+        kwargs = dict((c[1][0], c[2]) for c in
+                      mock_seek_and_destroy.mock_calls if c[0] == "")
+        self.assertEqual(kwargs[mgrs[0]]["budget"], kwargs[mgrs[1]]["budget"])
+        self.assertEqual(0.25, kwargs[mgrs[0]]["rate_limiter"].interval)
+        self.assertIsNone(kwargs[mgrs[1]]["rate_limiter"])
+        self.assertIsNone(kwargs[mgrs[2]]["rate_limiter"])
+
+
+def make_manager(service, resource, order, delete_after=None):
+    return type("%s_%s" % (service, resource), (object, ),
+                {"_service": service, "_resource": resource,
+                 "_order": order, "_delete_after": delete_after})
+
+
+class DependencyGraphTestCase(test.TestCase):
+
+    def test__get_dependencies(self):
+        heat = make_manager("heat", "stacks", 1, ())
+        server = make_manager("nova", "servers", 2, ("heat", "senlin"))
+        port = make_manager("neutron", "port", 3, ("nova.servers", ))
+        network = make_manager("neutron", "network", 4,
+                               ("neutron.port", "neutron.network"))
+        quota = make_manager("neutron", "quota", 5, ("neutron", ))
+        user = make_manager("keystone", "user", 6)
+        mgrs = [heat, server, port, network, quota, user]
+
+        self.assertEqual(
+            {heat: set(), server: {heat}, port: {server},
+             network: {port}, quota: {port, network},
+             user: {heat, server, port, network, quota}},
+            manager._get_dependencies(mgrs))
+
+    def test__run_graph(self):
+        mgrs = [make_manager("s", str(i), i) for i in range(5)]
+        dependencies = {mgrs[0]: set(), mgrs[1]: set(),
+                        mgrs[2]: {mgrs[0]}, mgrs[3]: {mgrs[1], mgrs[2]},
+                        mgrs[4]: set()}
+        lock = threading.Lock()
+        barrier = threading.Event()
+        log = []
+
+        def func(mgr):
+            with lock:
+                log.append(("start", mgr))
+            if mgr in (mgrs[0], mgrs[1], mgrs[4]):
+                # independent managers are run at the same time
+                if len([e for e in log if e[0] == "start"]) == 3:
+                    barrier.set()
+                self.assertTrue(barrier.wait(5))
+            with lock:
+                log.append(("finish", mgr))
+
+        timings = manager._run_graph(mgrs, dependencies, func)
+
+        self.assertEqual(set(mgrs), set(timings))
+        for mgr, deps in dependencies.items():
+            for dep in deps:
+                self.assertLess(log.index(("finish", dep)),
+                                log.index(("start", mgr)))
+                self.assertLessEqual(timings[dep][1], timings[mgr][0])
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__run_graph_cycle(self, mock_log):
+        mgrs = [make_manager("s", str(i), i) for i in range(3)]
+        dependencies = {mgrs[0]: {mgrs[1]}, mgrs[1]: {mgrs[0]},
+                        mgrs[2]: {mgrs[1]}}
+        log = []
+
+        manager._run_graph(mgrs, dependencies, log.append)
+
+        self.assertEqual(mgrs, log)
+        self.assertEqual(1, mock_log.warning.call_count)
+
+    def test__run_graph_error(self):
+        mgrs = [make_manager("s", str(i), i) for i in range(2)]
+        log = []
+
+        def func(mgr):
+            log.append(mgr)
+            if mgr is mgrs[0]:
+                raise ValueError()
+
+        self.assertRaises(ValueError, manager._run_graph, mgrs,
+                          {mgrs[0]: set(), mgrs[1]: {mgrs[0]}}, func)
+        self.assertEqual(mgrs, log)
+
+    def test__get_service_stats(self):
+        nova = [make_manager("nova", str(i), i) for i in range(3)]
+        cinder = make_manager("cinder", "volumes", 4)
+        timings = {nova[0]: (10, 14), nova[1]: (12, 16), nova[2]: (17, 18),
+                   cinder: (12, 20)}
+
+        self.assertEqual(
+            {"duration": 10,
+             "services": {"nova": {"duration": 7, "share": 0.7},
+                          "cinder": {"duration": 8, "share": 0.8}}},
+            manager._get_service_stats(timings))
+
+    def test__get_service_stats_empty(self):
+        self.assertEqual({"duration": 0, "services": {}},
+                         manager._get_service_stats({}))
+
+
+class RateLimiterTestCase(test.TestCase):
+
+    @mock.patch("%s.time" % BASE)
+    def test_acquire(self, mock_time):
+        mock_time.time.side_effect = [10, 10, 10.25, 11.5]
+        limiter = manager._RateLimiter(2)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        self.assertEqual([mock.call(0.5), mock.call(0.75)],
+                         mock_time.sleep.mock_calls)
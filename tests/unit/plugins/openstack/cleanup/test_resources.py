@@ -34,6 +34,10 @@ class SynchronizedDeletionTestCase(test.TestCase):
     def test_is_deleted(self):
         self.assertTrue(resources.SynchronizedDeletion().is_deleted())
 
+    def test_select_not_deleted(self):
+        self.assertEqual(
+            [], resources.SynchronizedDeletion().select_not_deleted(["a"]))
+
 
 class QuotaMixinTestCase(test.TestCase):
 
@@ -284,6 +288,25 @@ class EC2ServerTestCase(test.TestCase):
             "a", "b", "c"]
         self.assertEqual(["a", "b", "c"], manager.list())
 
+    @mock.patch("%s.EC2Server._manager" % BASE)
+    def test_delete_many(self, mock_ec2_server__manager):
+        res = [resources.EC2Server(resource=mock.MagicMock(id=id_))
+               for id_ in ("a", "b")]
+        resources.EC2Server().delete_many(res)
+        mock_ec2_server__manager().terminate_instances.assert_called_once_with(
+            instance_ids=["a", "b"])
+
+    @mock.patch("%s.EC2Server._manager" % BASE)
+    def test_select_not_deleted(self, mock_ec2_server__manager):
+        mock_ec2_server__manager().get_only_instances.return_value = [
+            mock.MagicMock(id="a", state="running"),
+            mock.MagicMock(id="b", state="terminated")]
+        res = [resources.EC2Server(resource=mock.MagicMock(id=id_))
+               for id_ in ("a", "b", "c")]
+
+        self.assertEqual(res[:1],
+                         resources.EC2Server().select_not_deleted(res))
+
 
 class NeutronMixinTestCase(test.TestCase):
 
@@ -640,6 +663,71 @@ class SwiftObjectTestCase(test.TestCase):
         self.assertEqual(len(containers) * len(objects),
                          len(resources.SwiftObject().list()))
 
+    def _mock_post_account(self, mock__manager, *bodies):
+        bodies = iter(bodies)
+
+        def post_account(*args, **kwargs):
+            kwargs["response_dict"].update(status=200)
+            return {}, next(bodies)
+
+        mock_post_account = mock__manager().post_account
+        mock_post_account.side_effect = post_account
+        return mock_post_account
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_delete_many(self, mock_swift_mixin__manager):
+        mock_post_account = self._mock_post_account(
+            mock_swift_mixin__manager,
+            b'{"Response Status": "200 OK", "Errors": [], '
+            b'"Number Deleted": 3, "Number Not Found": 0}',
+            b'{"Response Status": "200 OK", "Errors": [], '
+            b'"Number Deleted": 0, "Number Not Found": 1}')
+        res = [resources.SwiftObject(resource=["c", "o%d" % i])
+               for i in range(3)]
+        res.append(resources.SwiftObject(resource=["c", "o 3"]))
+
+        with mock.patch.object(resources.SwiftObject, "BULK_DELETE_SIZE",
+                               3):
+            self.assertEqual([], resources.SwiftObject().delete_many(res))
+
+        self.assertEqual(
+            [mock.call(headers={"Content-Type": "text/plain",
+                                "Accept": "application/json"},
+                       query_string="bulk-delete", data=data,
+                       response_dict={"status": 200})
+             for data in ("/c/o0\n/c/o1\n/c/o2", "/c/o%203")],
+            mock_post_account.mock_calls)
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_delete_many_errors(self, mock_swift_mixin__manager):
+        self._mock_post_account(
+            mock_swift_mixin__manager,
+            b'{"Response Status": "400 Bad Request", "Number Deleted": 1, '
+            b'"Errors": [["/c/o%201", "409 Conflict"]]}',
+            b'{"Response Status": "502 Bad Gateway", "Errors": [], '
+            b'"Response Body": "Failed", "Number Deleted": 0}')
+        res = [resources.SwiftObject(resource=["c", "o%d" % i])
+               for i in range(2)]
+        res.extend(resources.SwiftObject(resource=["c", "o %d" % i])
+                   for i in range(1, 3))
+
+        with mock.patch.object(resources.SwiftObject, "BULK_DELETE_SIZE",
+                               2):
+            failed = resources.SwiftObject().delete_many(res)
+
+        # only the objects with errors of the first request are failed and
+        # all the objects of the failed second request
+        self.assertEqual(res[2:], failed)
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_delete_many_not_supported(self, mock_swift_mixin__manager):
+        mock_swift_mixin__manager().post_account.side_effect = (
+            lambda *args, **kwargs: kwargs["response_dict"].update(
+                status=204) or ({}, b""))
+        self.assertRaises(
+            NotImplementedError, resources.SwiftObject().delete_many,
+            [resources.SwiftObject(resource=["c", "o"])])
+
 
 class SwiftContainerTestCase(test.TestCase):
 
@@ -46,7 +46,8 @@ class AdminCleanupTestCase(test.TestCase):
                           admin.AdminCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers):
 
@@ -67,18 +68,21 @@ class AdminCleanupTestCase(test.TestCase):
                 mock_find_resource_managers.return_value[0],
                 ctx["admin"],
                 ctx["users"],
-                None),
+                None,
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1],
                 ctx["admin"],
                 ctx["users"],
-                None),
+                None,
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate()
         ])
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup_admin_with_api_versions(
             self,
@@ -110,12 +114,14 @@ class AdminCleanupTestCase(test.TestCase):
                 mock_find_resource_managers.return_value[0],
                 ctx["admin"],
                 ctx["users"],
-                ctx["config"]["api_versions"]),
+                ctx["config"]["api_versions"],
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1],
                 ctx["admin"],
                 ctx["users"],
-                ctx["config"]["api_versions"]),
+                ctx["config"]["api_versions"],
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate()
         ])
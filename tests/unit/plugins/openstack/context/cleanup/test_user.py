@@ -46,7 +46,8 @@ class UserCleanupTestCase(test.TestCase):
                           user.UserCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers):
 
@@ -65,16 +66,19 @@ class UserCleanupTestCase(test.TestCase):
         mock_seek_and_destroy.assert_has_calls([
             mock.call(
                 mock_find_resource_managers.return_value[0],
-                None, ctx["users"], None),
+                None, ctx["users"], None,
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1],
-                None, ctx["users"], None),
+                None, ctx["users"], None,
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate()
         ])
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_delete_after=None),
+                              mock.MagicMock(_delete_after=None)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup_user_with_api_versions(
             self,
@@ -106,12 +110,14 @@ class UserCleanupTestCase(test.TestCase):
                 mock_find_resource_managers.return_value[0],
                 None,
                 ctx["users"],
-                ctx["config"]["api_versions"]),
+                ctx["config"]["api_versions"],
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate(),
             mock.call(
                 mock_find_resource_managers.return_value[1],
                 None,
                 ctx["users"],
-                ctx["config"]["api_versions"]),
+                ctx["config"]["api_versions"],
+                budget=mock.ANY, rate_limiter=None),
             mock.call().exterminate()
         ])
@@ -103,3 +103,39 @@ class TestHeatWorkload(test.ScenarioTestCase):
             "network_id": "fake_net",
             "router_id": "rid"}
         self.assertEqual(expected, wl[3])
+
+    @mock.patch(MOD + "get_data")
+    @mock.patch(MOD + "heat_utils")
+    def test_setup_many_tenants(self, mock_heat_utils, mock_get_data):
+        self.context.update({
+            "config": {
+                "heat_dataplane": {
+                    "stacks_per_tenant": 2,
+                    "template": "tpl.yaml",
+                    "parameters": {"key": "value"},
+                    "workers": 2,
+                }
+            },
+            "users": [{"tenant_id": "t1", "keypair": {"name": "kp1"}},
+                      {"tenant_id": "t1", "keypair": {"name": "kp2"}},
+                      {"tenant_id": "t2", "keypair": {"name": "kp3"}}],
+            "tenants": {"t1": {"networks": [{"router_id": "rid1"}]},
+                        "t2": {"networks": [{"router_id": "rid2"}]}},
+        })
+        mock_get_data.return_value = "tpl"
+        ctx = dataplane.heat.HeatDataplane(self.context)
+        ctx._get_public_network_id = mock.Mock(return_value="fake_net")
+        ctx.setup()
+
+        for tenant_id, key_name, router_id in (("t1", "kp1", "rid1"),
+                                               ("t2", "kp3", "rid2")):
+            workloads = self.context["tenants"][tenant_id]["stack_dataplane"]
+            self.assertEqual(2, len(workloads))
+            for wl in workloads:
+                self.assertEqual({"key": "value",
+                                  "key_name": key_name,
+                                  "network_id": "fake_net",
+                                  "router_id": router_id}, wl[3])
+        fake_scenario = mock_heat_utils.HeatScenario.return_value
+        self.assertEqual(4, fake_scenario._create_stack.call_count)
+        ctx._get_public_network_id.assert_called_once_with()
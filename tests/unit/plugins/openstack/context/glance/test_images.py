@@ -191,10 +191,10 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
         mock_wrap.assert_has_calls(wrapper_calls, any_order=True)
 
         glance_client = mock_clients.return_value.glance.return_value
-        glance_client.images.delete.assert_has_calls([mock.call(i)
-                                                      for i in created_images])
-        glance_client.images.get.assert_has_calls([mock.call(i)
-                                                   for i in created_images])
+        glance_client.images.delete.assert_has_calls(
+            [mock.call(i) for i in created_images], any_order=True)
+        glance_client.images.get.assert_has_calls(
+            [mock.call(i) for i in created_images], any_order=True)
 
         mock_clients.assert_has_calls(
             [mock.call(mock.ANY, api_info=api_versions)] * tenants_count,
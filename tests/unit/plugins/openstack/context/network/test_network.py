@@ -65,7 +65,7 @@ class NetworkTestCase(test.TestCase):
               {"dns_nameservers": ["1.2.3.4", "5.6.7.8"]})
     @ddt.unpack
     @mock.patch(NET + "wrap")
-    @mock.patch("rally.plugins.openstack.context.network.networks.utils")
+    @mock.patch("rally.common.broker.utils")
     @mock.patch("rally.osclients.Clients")
     def test_setup(self, mock_clients, mock_utils, mock_wrap, **dns_kwargs):
         mock_utils.iterate_per_tenants.return_value = [
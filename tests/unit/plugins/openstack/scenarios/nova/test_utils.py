@@ -474,6 +474,19 @@ class NovaScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(scenario.atomic_actions(),
                                        "nova.boot_servers")
 
+    def test__boot_servers_with_secgroup(self):
+        self.clients("nova").servers.list.return_value = []
+        context = self._context_with_secgroup({"name": "new"})
+        scenario = utils.NovaScenario(context=context)
+        scenario.generate_random_name = mock.Mock(return_value="name")
+
+        scenario._boot_servers("image", "flavor", 1, instances_amount=2,
+                               security_groups=["old"])
+
+        self.clients("nova").servers.create.assert_called_once_with(
+            "name_0", "image", "flavor", min_count=2, max_count=2,
+            security_groups=["old", "new"])
+
     def test__show_server(self):
         nova_scenario = utils.NovaScenario(context=self.context)
         nova_scenario._show_server(self.server)
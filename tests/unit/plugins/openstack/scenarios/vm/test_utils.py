@@ -102,6 +102,97 @@ class VMScenarioTestCase(test.ScenarioTestCase):
         vm_scenario._wait_for_ssh(ssh)
         ssh.wait.assert_called_once_with(120, 1)
 
+    def test__wait_for_ssh_many(self):
+        hosts = [mock.MagicMock(), mock.MagicMock()]
+        vm_scenario = utils.VMScenario(self.context)
+        vm_scenario._wait_for_ssh_many(hosts, 60, 2)
+        for host in hosts:
+            host.wait.assert_called_once_with(60, 2)
+        self._test_atomic_action_timer(vm_scenario.atomic_actions(),
+                                       "vm.wait_for_ssh")
+
+    @mock.patch("%s.sshutils.run_many" % VMTASKS_UTILS)
+    @mock.patch("%s.open" % VMTASKS_UTILS,
+                side_effect=mock.mock_open(read_data="script"), create=True)
+    def test__run_command_over_ssh_many_script_file(self, mock_open,
+                                                    mock_run_many):
+        hosts = [mock.MagicMock(), mock.MagicMock()]
+        vm_scenario = utils.VMScenario(self.context)
+        result = vm_scenario._run_command_over_ssh_many(
+            hosts,
+            {
+                "script_file": "foobar",
+                "interpreter": ["interpreter", "interpreter_arg"],
+                "command_args": ["arg1", "arg2"]
+            },
+            concurrency=10
+        )
+        self.assertEqual(mock_run_many.return_value, result)
+        mock_run_many.assert_called_once_with(
+            hosts, ["interpreter", "interpreter_arg", "arg1", "arg2"],
+            stdin="script", concurrency=10)
+        mock_open.assert_called_once_with("foobar", "rb")
+        self._test_atomic_action_timer(vm_scenario.atomic_actions(),
+                                       "vm.run_command_over_ssh")
+
+    @mock.patch("%s.sshutils.run_many" % VMTASKS_UTILS)
+    def test__run_command_over_ssh_many_script_inline(self, mock_run_many):
+        hosts = [mock.MagicMock()]
+        vm_scenario = utils.VMScenario(self.context)
+        vm_scenario._run_command_over_ssh_many(
+            hosts, {"script_inline": "foobar", "interpreter": "sh"})
+        mock_run_many.assert_called_once_with(
+            hosts, ["sh"], stdin="foobar", concurrency=100)
+
+    @mock.patch("%s.sshutils.run_many" % VMTASKS_UTILS)
+    def test__run_command_over_ssh_many_remote_path_copy(self,
+                                                         mock_run_many):
+        hosts = [mock.MagicMock(), mock.MagicMock()]
+        vm_scenario = utils.VMScenario(self.context)
+        vm_scenario._run_command_over_ssh_many(
+            hosts,
+            {
+                "remote_path": ["foo", "bar"],
+                "local_path": "/bin/false",
+                "command_args": ["arg1", "arg2"]
+            }
+        )
+        for host in hosts:
+            host.put_file.assert_called_once_with(
+                "/bin/false", "bar", mode=0o755)
+        mock_run_many.assert_called_once_with(
+            hosts, ["foo", "bar", "arg1", "arg2"], stdin=None,
+            concurrency=100)
+
+    @mock.patch(VMTASKS_UTILS + ".VMScenario._run_command_over_ssh_many")
+    @mock.patch(VMTASKS_UTILS + ".VMScenario._wait_for_ssh_many")
+    @mock.patch("rally.common.sshutils.SSH")
+    def test__run_command_many(self, mock_sshutils_ssh,
+                               mock_vm_scenario__wait_for_ssh_many,
+                               mock_vm_scenario__run_command_over_ssh_many):
+        mock_sshutils_ssh.side_effect = lambda *args, **kwargs: mock.Mock()
+        vm_scenario = utils.VMScenario(self.context)
+        vm_scenario.context = {"user": {"keypair": {"private": "ssh"}}}
+        result = vm_scenario._run_command_many(
+            ["1.2.3.4", "1.2.3.5"], 22, "username", "password",
+            command={"script_file": "foo", "interpreter": "bar"},
+            concurrency=5)
+
+        self.assertEqual(mock_vm_scenario__run_command_over_ssh_many.
+                         return_value, result)
+        self.assertEqual(
+            [mock.call("username", "1.2.3.4", port=22, pkey="ssh",
+                       password="password"),
+             mock.call("username", "1.2.3.5", port=22, pkey="ssh",
+                       password="password")],
+            mock_sshutils_ssh.call_args_list)
+        hosts = mock_vm_scenario__wait_for_ssh_many.call_args[0][0]
+        self.assertEqual(2, len(hosts))
+        mock_vm_scenario__wait_for_ssh_many.assert_called_once_with(
+            hosts, 120, 1, 5)
+        mock_vm_scenario__run_command_over_ssh_many.assert_called_once_with(
+            hosts, {"script_file": "foo", "interpreter": "bar"}, 5)
+
     def test__wait_for_ping(self):
         vm_scenario = utils.VMScenario(self.context)
         vm_scenario._ping_ip_address = mock.Mock(return_value=True)
@@ -113,6 +204,26 @@ class VMScenarioTestCase(test.ScenarioTestCase):
             timeout=CONF.benchmark.vm_ping_timeout,
             check_interval=CONF.benchmark.vm_ping_poll_interval)
 
+    def test__wait_for_ping_many(self):
+        vm_scenario = utils.VMScenario(self.context)
+        vm_scenario._wait_for_ping_many(["1.2.3.4", "1.2.3.5"], 2)
+
+        self.assertEqual(
+            [mock.call(utils.Host("1.2.3.4"),
+                       ready_statuses=[utils.Host.ICMP_UP_STATUS],
+                       update_resource=utils.Host.update_status,
+                       timeout=CONF.benchmark.vm_ping_timeout,
+                       check_interval=CONF.benchmark.vm_ping_poll_interval),
+             mock.call(utils.Host("1.2.3.5"),
+                       ready_statuses=[utils.Host.ICMP_UP_STATUS],
+                       update_resource=utils.Host.update_status,
+                       timeout=CONF.benchmark.vm_ping_timeout,
+                       check_interval=CONF.benchmark.vm_ping_poll_interval)],
+            sorted(self.mock_wait_for_status.mock.call_args_list,
+                   key=lambda call: str(call[0][0].ip)))
+        self.assertEqual(["vm.wait_for_ping"],
+                         list(vm_scenario.atomic_actions()))
+
     @mock.patch(VMTASKS_UTILS + ".VMScenario._run_command_over_ssh")
     @mock.patch("rally.common.sshutils.SSH")
     def test__run_command(self, mock_sshutils_ssh,
@@ -183,7 +294,46 @@ class VMScenarioTestCase(test.ScenarioTestCase):
             "foo_image", "foo_flavor",
             auto_assign_nic=True, foo_arg="foo_value")
         scenario._attach_floating_ip.assert_called_once_with(
-            server, "ext_network")
+            server, "ext_network", atomic_action=True)
+
+    def test__boot_servers_with_fip(self):
+        scenario, server = self.get_scenario()
+        servers = [server, mock.Mock(networks={"foo_net": "foo_data"})]
+        scenario._boot_servers = mock.Mock(return_value=servers)
+        scenario._attach_floating_ip = mock.Mock(
+            side_effect=lambda server, network, atomic_action: {
+                "id": "id_%s" % id(server), "ip": "ip_%s" % id(server)})
+
+        result = scenario._boot_servers_with_fip(
+            "foo_image", "foo_flavor", 2, floating_network="ext_network",
+            concurrency=2, foo_arg="foo_value")
+
+        self.assertEqual(
+            [(s, {"id": "id_%s" % id(s), "ip": "ip_%s" % id(s),
+                  "is_floating": True}) for s in servers], result)
+        scenario._boot_servers.assert_called_once_with(
+            "foo_image", "foo_flavor", 1, instances_amount=2,
+            auto_assign_nic=True, foo_arg="foo_value")
+        self.assertEqual(
+            sorted([mock.call(s, "ext_network", atomic_action=False)
+                    for s in servers], key=str),
+            sorted(scenario._attach_floating_ip.call_args_list, key=str))
+        self.assertEqual(["vm.attach_floating_ips"],
+                         list(scenario.atomic_actions()))
+
+    def test__boot_servers_with_fixed_ip(self):
+        scenario, server = self.get_scenario()
+        scenario._boot_servers = mock.Mock(return_value=[server])
+        scenario._attach_floating_ip = mock.Mock()
+
+        result = scenario._boot_servers_with_fip(
+            "foo_image", "foo_flavor", 1, use_floating_ip=False)
+
+        self.assertEqual(
+            [(server, {"ip": "foo_ip", "id": None, "is_floating": False})],
+            result)
+        self.assertFalse(scenario._attach_floating_ip.called)
+        self.assertEqual([], list(scenario.atomic_actions()))
 
     def test__delete_server_with_fixed_ip(self):
         ip = {"ip": "foo_ip", "id": None, "is_floating": False}
@@ -194,15 +344,37 @@ class VMScenarioTestCase(test.ScenarioTestCase):
         self.assertEqual(scenario._delete_floating_ip.mock_calls, [])
         scenario._delete_server.assert_called_once_with(server, force=True)
 
-    def test__delete_server_with_fip(self):
+    @mock.patch("%s.sshutils.CONNECTIONS_POOL" % VMTASKS_UTILS)
+    def test__delete_server_with_fip(self, mock_connections_pool):
         fip = {"ip": "foo_ip", "id": "foo_id", "is_floating": True}
         scenario, server = self.get_scenario()
         scenario._delete_floating_ip = mock.Mock()
         scenario._delete_server_with_fip(server, fip, force_delete=True)
 
+        mock_connections_pool.close_host.assert_called_once_with("foo_ip")
         scenario._delete_floating_ip.assert_called_once_with(server, fip)
         scenario._delete_server.assert_called_once_with(server, force=True)
 
+    @mock.patch("%s.sshutils.CONNECTIONS_POOL" % VMTASKS_UTILS)
+    def test__delete_servers_with_fip(self, mock_connections_pool):
+        scenario = utils.VMScenario(self.context)
+        scenario._delete_floating_ip = mock.Mock()
+        scenario._delete_servers = mock.Mock()
+        servers = [("server1", {"ip": "ip1", "id": "id1",
+                                "is_floating": True}),
+                   ("server2", {"ip": "ip2", "id": None,
+                                "is_floating": False})]
+        scenario._delete_servers_with_fip(servers, force_delete=True)
+
+        self.assertEqual([mock.call("ip1"), mock.call("ip2")],
+                         mock_connections_pool.close_host.call_args_list)
+        scenario._delete_floating_ip.assert_called_once_with(
+            "server1", servers[0][1], atomic_action=False)
+        scenario._delete_servers.assert_called_once_with(
+            ["server1", "server2"], force=True)
+        self.assertEqual(["vm.delete_floating_ips"],
+                         list(scenario.atomic_actions()))
+
     @mock.patch(VMTASKS_UTILS + ".network_wrapper.wrap")
     def test__attach_floating_ip(self, mock_wrap):
         scenario, server = self.get_scenario()
@@ -197,6 +197,82 @@ class VMTasksTestCase(test.ScenarioTestCase):
                 "interpreter": "bar_interpreter"}
         )
 
+    def _mock_boot_many(self, count):
+        servers = [("server%d" % i,
+                    {"id": "id%d" % i, "ip": "ip%d" % i, "is_floating": True})
+                   for i in range(count)]
+        self.scenario._boot_servers_with_fip = mock.Mock(return_value=servers)
+        self.scenario._wait_for_ping_many = mock.Mock()
+        self.scenario._delete_servers_with_fip = mock.Mock()
+        return servers
+
+    def test_boot_many_runcommand_delete(self):
+        servers = self._mock_boot_many(3)
+        self.scenario._run_command_many = mock.Mock(
+            return_value=[(0, "out", "")] * 3)
+
+        self.scenario.boot_many_runcommand_delete(
+            "foo_image", "foo_flavor", "foo_username", 3,
+            password="foo_password", command={"remote_path": "foo"},
+            use_floating_ip="use_fip", floating_network="ext_network",
+            concurrency=2, foo_arg="foo_value")
+
+        self.scenario._boot_servers_with_fip.assert_called_once_with(
+            "foo_image", "foo_flavor", 3, use_floating_ip="use_fip",
+            floating_network="ext_network", concurrency=2,
+            key_name="keypair_name", foo_arg="foo_value")
+        self.assertFalse(self.scenario._boot_server_with_fip.called)
+        self.scenario._wait_for_ping_many.assert_called_once_with(
+            ["ip0", "ip1", "ip2"], 2)
+        self.scenario._run_command_many.assert_called_once_with(
+            ["ip0", "ip1", "ip2"], 22, "foo_username", "foo_password",
+            command={"remote_path": "foo"}, concurrency=2)
+        self.scenario._delete_servers_with_fip.assert_called_once_with(
+            servers, force_delete=False, concurrency=2)
+        self.scenario.add_output.assert_called_once_with(
+            complete={"title": "Command results",
+                      "description": "Exit status of the command on servers",
+                      "chart_plugin": "Table",
+                      "data": {"cols": ["server", "exit status"],
+                               "rows": [["ip0", 0], ["ip1", 0],
+                                        ["ip2", 0]]}})
+
+    def test_boot_many_runcommand_delete_fails(self):
+        servers = self._mock_boot_many(3)
+        self.scenario._run_command_many = mock.Mock(
+            return_value=[(0, "out", ""), (1, "", "err"),
+                          exceptions.SSHTimeout("timeout")])
+
+        self.assertRaises(exceptions.ScriptError,
+                          self.scenario.boot_many_runcommand_delete,
+                          "foo_image", "foo_flavor", "foo_username", 3,
+                          force_delete=True, wait_for_ping=False)
+
+        self.assertFalse(self.scenario._wait_for_ping_many.called)
+        self.scenario._delete_servers_with_fip.assert_called_once_with(
+            servers, force_delete=True, concurrency=100)
+        rows = self.scenario.add_output.call_args[1]["complete"]["data"][
+            "rows"]
+        self.assertEqual([["ip0", 0], ["ip1", 1], ["ip2", "timeout"]], rows)
+
+    def test_boot_many_runcommand_delete_ping_fails(self):
+        servers = self._mock_boot_many(2)
+        self.scenario._wait_for_ping_many.side_effect = (
+            exceptions.TimeoutException(
+                timeout=1, resource_type="host", resource_name="ip1",
+                resource_id="ip1", desired_status="ICMP UP",
+                resource_status="ICMP DOWN"))
+        self.scenario._run_command_many = mock.Mock()
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.scenario.boot_many_runcommand_delete,
+                          "foo_image", "foo_flavor", "foo_username", 2)
+
+        self.assertFalse(self.scenario._run_command_many.called)
+        self.scenario._delete_servers_with_fip.assert_called_once_with(
+            servers, force_delete=False, concurrency=100)
+        self.assertFalse(self.scenario.add_output.called)
+
     @mock.patch("rally.plugins.openstack.scenarios.vm.vmtasks.heat")
     @mock.patch("rally.plugins.openstack.scenarios.vm.vmtasks.sshutils")
     def test_runcommand_heat(self, mock_sshutils, mock_heat):
@@ -211,6 +211,70 @@ class LoadProfileChartTestCase(test.TestCase):
             chart.add_iteration({"timestamp": ts, "duration": duration})
         self.assertEqual(expected, chart.render())
 
+    def test_add_iteration_and_render_phases(self):
+        chart = charts.LoadProfileChart(
+            {"iterations_count": 3, "tstamp_start": 0.0,
+             "load_duration": 4.0}, scale=4)
+        for ts, duration, phase in ((0.0, 2.0, 0), (1.0, 1.0, 0),
+                                    (2.0, 2.0, 1)):
+            chart.add_iteration({"timestamp": ts, "duration": duration,
+                                 "phase": phase})
+        self.assertEqual(
+            [("parallel iterations (phase 1)",
+              [(0.0, 0), (1.5, 1.3333333333333333),
+               (3.0, 0.6666666666666666), (4.5, 0), (6.0, 0)]),
+             ("parallel iterations (phase 2)",
+              [(0.0, 0), (1.5, 0), (3.0, 0.6666666666666666),
+               (4.5, 0.6666666666666666), (6.0, 0)])],
+            chart.render())
+
+
+class ScheduleRateChartTestCase(test.TestCase):
+
+    def test_add_iteration_and_render(self):
+        chart = charts.ScheduleRateChart(
+            {"iterations_count": 5, "tstamp_start": 10.0,
+             "load_duration": 4.0}, scale=4)
+        self.assertIsInstance(chart, charts.Chart)
+        for scheduled_at, timestamp in ((10.0, 10.0), (10.5, 10.6),
+                                        (11.0, 12.5), (11.5, 12.7),
+                                        (12.0, 13.9)):
+            chart.add_iteration({"scheduled_at": scheduled_at,
+                                 "timestamp": timestamp})
+        chart.add_iteration({"timestamp": 11.0})
+        self.assertEqual(
+            [("requested rate", [(0.0, 2.0), (1.0, 2.0), (2.0, 1.0),
+                                 (3.0, 0.0)]),
+             ("achieved rate", [(0.0, 2.0), (1.0, 0.0), (2.0, 2.0),
+                                (3.0, 1.0)])],
+            chart.render())
+
+    def test_render_not_scheduled(self):
+        chart = charts.ScheduleRateChart(
+            {"iterations_count": 1, "tstamp_start": 10.0,
+             "load_duration": 0.0})
+        chart.add_iteration({"timestamp": 10.0})
+        self.assertEqual([], chart.render())
+
+
+class ScheduleLagChartTestCase(test.TestCase):
+
+    def test_add_iteration_and_render(self):
+        chart = charts.ScheduleLagChart({"iterations_count": 3})
+        self.assertIsInstance(chart, charts.Chart)
+        for scheduled_at, timestamp in ((1.0, 1.5), (2.0, 2.0), (3.0, 2.9)):
+            chart.add_iteration({"scheduled_at": scheduled_at,
+                                 "timestamp": timestamp, "duration": 4.0})
+        self.assertEqual(
+            [("duration", [[1, 4.0], [2, 4.0], [3, 4.0]]),
+             ("schedule lag", [[1, 0.5], [2, 0], [3, 0]])],
+            chart.render())
+
+    def test_render_not_scheduled(self):
+        chart = charts.ScheduleLagChart({"iterations_count": 1})
+        chart.add_iteration({"timestamp": 1.0, "duration": 4.0})
+        self.assertEqual([], chart.render())
+
 
 @ddt.ddt
 class HistogramChartTestCase(test.TestCase):
@@ -398,6 +462,20 @@ class TableTestCase(test.TestCase):
             [["foo", 1.2, 3.2, 3.2], ["bar", 3.456, 5.456, 5.46]],
             table.get_rows())
 
+    def test_merge(self):
+        table = self.Table({"iterations_count": 4})
+        other = self.Table({"iterations_count": 4})
+        table.add_iteration({"foo": 2.5, "bar": 4.2})
+        other.add_iteration({"foo": 1.2, "bar": 5.456})
+        other._data["spam"] = [[charts.streaming.MinComputation(), None]] * 3
+        other._data["spam"][0][0].add(7)
+
+        table.merge(other)
+        self.assertEqual(
+            [["foo", 1.2, 2.5, 2.5], ["bar", 4.2, 5.456, 5.46],
+             ["spam", 7.0, 7.0, 7.0]],
+            table.get_rows())
+
     def test_render(self):
         table = self.Table({"iterations_count": 42})
         table.get_rows = lambda: "rows data"
@@ -0,0 +1,138 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import copy
+import random
+
+import ddt
+import testtools
+
+from rally.task.processing import charts
+from rally.task.processing import columnar
+from rally.task.processing import utils
+from tests.unit import test
+
+if columnar.is_available():
+    import numpy as np
+
+
+CHARTS = collections.OrderedDict([
+    ("main_area", charts.MainStackedAreaChart),
+    ("main_hist", charts.MainHistogramChart),
+    ("main_stat", charts.MainStatsTable),
+    ("load_profile", charts.LoadProfileChart),
+    ("schedule_rate", charts.ScheduleRateChart),
+    ("schedule_lag", charts.ScheduleLagChart),
+    ("atomic_pie", charts.AtomicAvgChart),
+    ("atomic_area", charts.AtomicStackedAreaChart),
+    ("atomic_hist", charts.AtomicHistogramChart)])
+
+
+def make_workload(count, failed=0.1, scheduled=False, phases=False):
+    rnd = random.Random(count)
+    iterations = []
+    for i in range(count):
+        actions = collections.OrderedDict()
+        # some atomic actions are missed in some iterations
+        if rnd.random() > 0.2:
+            actions["foo"] = rnd.random()
+        actions["bar"] = rnd.random() * 2
+        iteration = {"timestamp": 100 + rnd.random() * 50,
+                     "duration": rnd.random() * 5,
+                     "idle_duration": rnd.random(),
+                     "error": ["E", "msg", "trace"]
+                     if rnd.random() < failed else [],
+                     "output": {"additive": [], "complete": []},
+                     "atomic_actions": actions}
+        if scheduled:
+            iteration["scheduled_at"] = (iteration["timestamp"]
+                                         - rnd.random())
+        if phases:
+            iteration["phase"] = rnd.randint(0, 2)
+        iterations.append(iteration)
+    durations = [i["duration"] for i in iterations] or [0]
+    info = {"iterations_count": count,
+            "iterations_failed": sum(bool(i["error"]) for i in iterations),
+            "min_duration": min(durations),
+            "max_duration": max(durations),
+            "tstamp_start": 100, "load_duration": 56.0,
+            "atomic": collections.OrderedDict(
+                (name, {"min_duration": 0, "max_duration": 2})
+                for name in ("foo", "bar"))}
+    return info, iterations
+
+
+@ddt.ddt
+@testtools.skipIf(not columnar.is_available(), "NumPy is not installed")
+class ColumnarTestCase(test.TestCase):
+
+    def assertAlmostEqualData(self, expected, observed):
+        if isinstance(expected, dict):
+            self.assertEqual(sorted(expected), sorted(observed))
+            for key in expected:
+                self.assertAlmostEqualData(expected[key], observed[key])
+        elif isinstance(expected, (list, tuple)):
+            self.assertEqual(len(expected), len(observed))
+            for exp, obs in zip(expected, observed):
+                self.assertAlmostEqualData(exp, obs)
+        elif isinstance(expected, float) or isinstance(observed, float):
+            self.assertAlmostEqual(expected, observed, places=9)
+        else:
+            self.assertEqual(expected, observed)
+
+    @ddt.data({"count": 0},
+              {"count": 1},
+              {"count": 10, "failed": 0},
+              {"count": 1000, "scheduled": True},
+              {"count": 1500, "failed": 1},
+              {"count": 2345, "scheduled": True},
+              {"count": 3000, "phases": True})
+    @ddt.unpack
+    def test_render(self, count, **kwargs):
+        info, iterations = make_workload(count, **kwargs)
+        rendered = columnar.render(info, copy.deepcopy(iterations))
+
+        main_charts = dict((name, cls(info)) for name, cls in CHARTS.items())
+        for iteration in iterations:
+            for name in CHARTS:
+                main_charts[name].add_iteration(iteration)
+
+        self.assertEqual(set(CHARTS), set(rendered))
+        for name, chart in main_charts.items():
+            self.assertAlmostEqualData(chart.render(), rendered[name])
+
+    @ddt.data((10, 1000, 10), (2000, 1000, 2000), (2345, 1000, 2345),
+              (2345, 1000, 1200), (1000001, 1000, 1000001))
+    @ddt.unpack
+    def test_zip_graph(self, base_size, zipped_size, count):
+        values = [(i % 7) * 0.5 for i in range(count)]
+        zipper = utils.GraphZipper(base_size, zipped_size)
+        for value in values:
+            zipper.add_point(value)
+
+        self.assertAlmostEqualData(
+            zipper.get_zipped_graph(),
+            columnar.zip_graph(np.array(values), base_size, zipped_size))
+
+    def test_main_stats_table_percentiles_are_exact(self):
+        info, iterations = make_workload(20000, failed=0)
+        durations = sorted(i["duration"] for i in iterations)
+
+        rows = columnar.render(info, iterations)["main_stat"]["rows"]
+
+        self.assertEqual("total", rows[-1][0])
+        self.assertEqual(round(durations[9999] * 0.5001
+                               + durations[10000] * 0.4999, 3),
+                         rows[-1][2])
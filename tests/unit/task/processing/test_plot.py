@@ -14,10 +14,12 @@
 #    under the License.
 
 import json
+import types
 
 import ddt
 import mock
 
+from rally.common import objects
 from rally.task.processing import plot
 from tests.unit import test
 
@@ -36,6 +38,8 @@ class PlotTestCase(test.TestCase):
                 (mock_charts.OutputStackedAreaDeprecatedChart,
                  "output_stacked"),
                 (mock_charts.LoadProfileChart, "load_profile"),
+                (mock_charts.ScheduleRateChart, "schedule_rate"),
+                (mock_charts.ScheduleLagChart, "schedule_lag"),
                 (mock_charts.MainHistogramChart, "main_histogram"),
                 (mock_charts.AtomicHistogramChart, "atomic_histogram"),
                 (mock_charts.AtomicAvgChart, "atomic_avg")]:
@@ -71,11 +75,103 @@ class PlotTestCase(test.TestCase):
                                "pie": [("success", 10), ("errors", 0)]},
                 "iterations_count": 10, "errors": [],
                 "load_profile": "load_profile",
+                "schedule": {"rate": "schedule_rate", "lag": "schedule_lag"},
                 "additive_output": [],
                 "complete_output": [[], [], [], [], [], [], [], [], [], []],
                 "output_errors": [],
                 "sla": [], "sla_success": True, "table": "main_stats"})
 
+    @mock.patch(PLOT + "columnar")
+    @mock.patch(PLOT + "charts")
+    def test__process_scenario_vectorized(self, mock_charts, mock_columnar):
+        mock_columnar.render.return_value = dict(
+            (name, name) for name in ("main_area", "main_hist", "main_stat",
+                                      "load_profile", "schedule_rate",
+                                      "schedule_lag", "atomic_pie",
+                                      "atomic_area", "atomic_hist"))
+        iterations = [
+            {"timestamp": i + 2, "error": ["E", "msg", "trace"] if i else [],
+             "duration": i + 5, "idle_duration": i,
+             "output": {"additive": [], "complete": []},
+             "atomic_actions": {}} for i in range(3)]
+        data = {"iterations": iterations, "sla": [],
+                "key": {"kw": {"runner": {"type": "constant"}},
+                        "name": "Foo.bar", "pos": 0},
+                "info": {"atomic": {}, "full_duration": 40,
+                         "load_duration": 32, "iterations_count": 3,
+                         "output_names": []}}
+
+        task_data = plot._process_scenario(data, 0, vectorized=True)
+
+        mock_columnar.render.assert_called_once_with(data["info"],
+                                                     iterations)
+        self.assertFalse(mock_charts.MainStackedAreaChart.called)
+        self.assertEqual({"histogram": "main_hist", "iter": "main_area",
+                          "pie": [("success", 1), ("errors", 2)]},
+                         task_data["iterations"])
+        self.assertEqual({"histogram": "atomic_hist", "iter": "atomic_area",
+                          "pie": "atomic_pie"}, task_data["atomic"])
+        self.assertEqual({"rate": "schedule_rate", "lag": "schedule_lag"},
+                         task_data["schedule"])
+        self.assertEqual("load_profile", task_data["load_profile"])
+        self.assertEqual("main_stat", task_data["table"])
+        self.assertEqual(2, len(task_data["errors"]))
+
+    @mock.patch(PLOT + "columnar")
+    @mock.patch(PLOT + "charts")
+    def test__process_scenario_vectorized_by_size(self, mock_charts,
+                                                  mock_columnar):
+        data = {"iterations": [], "sla": [],
+                "key": {"kw": {"runner": {"type": "constant"}},
+                        "name": "Foo.bar", "pos": 0},
+                "info": {"atomic": {}, "iterations_count": 0,
+                         "full_duration": 0, "load_duration": 0,
+                         "output_names": []}}
+        with mock.patch(PLOT + "VECTORIZED_MIN_ITERATIONS", 0):
+            plot._process_scenario(data, 0)
+        mock_columnar.render.assert_called_once_with(data["info"], [])
+
+        mock_columnar.render.reset_mock()
+        mock_columnar.is_available.return_value = False
+        with mock.patch(PLOT + "VECTORIZED_MIN_ITERATIONS", 0):
+            plot._process_scenario(data, 0)
+        self.assertFalse(mock_columnar.render.called)
+        self.assertTrue(mock_charts.MainStackedAreaChart.called)
+
+    @mock.patch(PLOT + "columnar.is_available", return_value=True)
+    @mock.patch(PLOT + "columnar.render")
+    def test__process_scenario_extended_results(self, mock_render,
+                                                mock_is_available):
+        mock_render.return_value = dict(
+            (name, name) for name in ("main_area", "main_hist", "main_stat",
+                                      "load_profile", "schedule_rate",
+                                      "schedule_lag", "atomic_pie",
+                                      "atomic_area", "atomic_hist"))
+        iterations = [
+            {"timestamp": 3 - i, "error": ["E", "msg", "trace"] if i else [],
+             "duration": i + 5, "idle_duration": i,
+             "output": {"additive": [], "complete": []},
+             "atomic_actions": {"foo": i + 1}} for i in range(3)]
+        result = {"key": {"kw": {"runner": {"type": "constant"}},
+                          "name": "Foo.bar", "pos": 0},
+                  "data": {"raw": iterations, "sla": [],
+                           "full_duration": 40, "load_duration": 32},
+                  "created_at": None, "updated_at": None,
+                  "task_uuid": "uuid", "id": 1}
+        data = objects.Task.extend_results([result])[0]
+        self.assertIsInstance(data["iterations"], types.GeneratorType)
+
+        with mock.patch(PLOT + "VECTORIZED_MIN_ITERATIONS", 3):
+            task_data = plot._process_scenario(data, 0)
+
+        mock_render.assert_called_once_with(
+            data["info"], sorted(iterations, key=lambda i: i["timestamp"]))
+        self.assertEqual([("success", 1), ("errors", 2)],
+                         task_data["iterations"]["pie"])
+        # iterations are ordered by timestamp, the failed ones go first
+        self.assertEqual([1, 2],
+                         [e["iteration"] for e in task_data["errors"]])
+
     @mock.patch(PLOT + "_process_scenario")
     @mock.patch(PLOT + "json.dumps", return_value="json_data")
     def test__process_tasks(self, mock_json_dumps, mock__process_scenario):
@@ -135,13 +231,17 @@ class PlotTestCase(test.TestCase):
              "full_duration": "%s_full_duration" % k,
              "load_duration": "%s_load_duration" % k,
              "result": "%s_result" % k} for k in ("foo", "bar", "spam")]
+        tasks_results[1]["aggregate"] = "bar_aggregate"
         generic_results = [
             {"id": None, "created_at": None, "updated_at": None,
              "task_uuid": None, "key": "%s_key" % k,
              "data": {"raw": "%s_result" % k,
                       "full_duration": "%s_full_duration" % k,
                       "load_duration": "%s_load_duration" % k,
-                      "sla": "%s_sla" % k}} for k in ("foo", "bar", "spam")]
+                      "sla": "%s_sla" % k},
+             "aggregate": aggregate}
+            for k, aggregate in (("foo", None), ("bar", "bar_aggregate"),
+                                 ("spam", None))]
         results = plot._extend_results(tasks_results)
         self.assertEqual([mock.call([r]) for r in generic_results],
                          mock_task_extend_results.mock_calls)
@@ -0,0 +1,206 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime as dt
+import threading
+
+import mock
+
+from rally.common import objects
+from rally import exceptions
+from rally.plugins.common.scenarios.dummy import dummy
+from rally.task import agent
+from tests.unit import test
+
+
+AGENT = "rally.task.agent"
+
+
+class AgentFunctionsTestCase(test.TestCase):
+
+    @mock.patch("%s.CONF" % AGENT, agent_authkey=None)
+    def test__get_authkey_not_set(self, mock_conf):
+        self.assertRaises(exceptions.RallyException, agent._get_authkey)
+
+    @mock.patch("%s.CONF" % AGENT, agent_authkey="secret")
+    def test__get_authkey(self, mock_conf):
+        self.assertEqual(b"secret", agent._get_authkey())
+
+    def test__parse_address(self):
+        self.assertEqual(("example.com", 1234),
+                         agent._parse_address("example.com:1234"))
+
+    @mock.patch("%s.timeutils.utcnow" % AGENT,
+                return_value=dt.datetime(2016, 1, 1, 0, 1, 0))
+    @mock.patch("%s.db.list_workers" % AGENT)
+    @mock.patch("%s.CONF" % AGENT, agent_heartbeat_timeout=30)
+    def test_list_agents(self, mock_conf, mock_list_workers, mock_utcnow):
+        old = dt.datetime(2016, 1, 1, 0, 0, 0)
+        new = dt.datetime(2016, 1, 1, 0, 0, 59)
+        mock_list_workers.return_value = [
+            {"hostname": "a:1", "updated_at": old},
+            {"hostname": "b:1", "updated_at": new}]
+
+        self.assertEqual(
+            [{"address": "a:1", "updated_at": old, "alive": False},
+             {"address": "b:1", "updated_at": new, "alive": True}],
+            agent.list_agents())
+        mock_list_workers.assert_called_once_with()
+
+    @mock.patch("%s.timeutils.utcnow" % AGENT,
+                return_value=dt.datetime(2016, 1, 1, 0, 1, 0))
+    @mock.patch("%s.db.list_workers" % AGENT,
+                return_value=[{"hostname": "b:1"}])
+    @mock.patch("%s.CONF" % AGENT, agent_heartbeat_timeout=30)
+    def test_get_alive_agents(self, mock_conf, mock_list_workers,
+                              mock_utcnow):
+        self.assertEqual(["b:1"], agent.get_alive_agents())
+        mock_list_workers.assert_called_once_with(
+            updated_after=dt.datetime(2016, 1, 1, 0, 0, 30))
+
+
+class AgentTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AgentTestCase, self).setUp()
+        self.mock_conf = mock.patch("%s.CONF" % AGENT,
+                                    agent_authkey="secret",
+                                    agent_heartbeat_interval=0.05,
+                                    agent_heartbeat_timeout=5).start()
+        self.mock_db = mock.patch("%s.db" % AGENT).start()
+        self.agent = agent.Agent("127.0.0.1", 0)
+        self.thread = threading.Thread(target=self.agent.serve)
+        self.thread.start()
+        self.addCleanup(self.thread.join)
+        self.addCleanup(self.agent.stop)
+
+    def _make_job(self, runner_config, **kwargs):
+        job = {"cls": dummy.Dummy, "method_name": "run",
+               "context": {"task": objects.Task(task={"uuid": "uuid"},
+                                                temporary=True),
+                           "config": {}},
+               "args": {"sleep": 0}, "runner": runner_config}
+        job.update(kwargs)
+        return job
+
+    def test_init(self):
+        self.assertEqual("127.0.0.1:%d" % self.agent.listener.address[1],
+                         self.agent.address)
+
+    @mock.patch("%s.socket.getfqdn" % AGENT, return_value="example.com")
+    def test_init_public_host(self, mock_getfqdn):
+        agent_obj = agent.Agent("0.0.0.0", 0)
+        self.addCleanup(agent_obj.listener.close)
+        self.assertEqual(
+            "example.com:%d" % agent_obj.listener.address[1],
+            agent_obj.address)
+
+        agent_obj = agent.Agent("0.0.0.0", 0, public_host="10.0.0.1")
+        self.addCleanup(agent_obj.listener.close)
+        self.assertEqual("10.0.0.1:%d" % agent_obj.listener.address[1],
+                         agent_obj.address)
+
+    def test_serve_and_stop(self):
+        self.agent.stop()
+        self.thread.join()
+
+        self.mock_db.register_worker.assert_called_once_with(
+            {"hostname": self.agent.address})
+        self.mock_db.unregister_worker.assert_called_once_with(
+            self.agent.address)
+
+    def test_heartbeats(self):
+        called = threading.Event()
+        self.mock_db.update_worker.side_effect = lambda h: called.set()
+        self.assertTrue(called.wait(5))
+        self.mock_db.update_worker.assert_called_with(self.agent.address)
+
+    def test_run(self):
+        client = agent.AgentClient(self.agent.address)
+        results = []
+
+        client.run(self._make_job({"type": "serial", "times": 5}),
+                   threading.Event(), results.extend)
+
+        self.assertEqual("finished", client.status)
+        self.assertIsNone(client.error)
+        self.assertEqual(5, client.results)
+        self.assertEqual(5, len(results))
+        for result in results:
+            self.assertEqual([], result["error"])
+            self.assertIn("timestamp", result)
+
+    def test_run_several_jobs(self):
+        for i in range(2):
+            client = agent.AgentClient(self.agent.address)
+            client.run(self._make_job({"type": "serial", "times": 2}),
+                       threading.Event(), lambda results: None)
+            self.assertEqual("finished", client.status)
+            self.assertEqual(2, client.results)
+
+    def test_run_aborted(self):
+        aborted = threading.Event()
+        results = []
+
+        def store_results(batch):
+            results.extend(batch)
+            aborted.set()
+
+        client = agent.AgentClient(self.agent.address)
+        client.run(self._make_job({"type": "serial", "times": 100000},
+                                  args={"sleep": 0.001}),
+                   aborted, store_results)
+
+        self.assertEqual("finished", client.status)
+        self.assertLess(client.results, 100000)
+        self.assertEqual(client.results, len(results))
+
+    def test_run_failed(self):
+        client = agent.AgentClient(self.agent.address)
+        client.run(self._make_job({"type": "non_existing"}),
+                   threading.Event(), lambda results: None)
+
+        self.assertEqual("failed", client.status)
+        self.assertIn("non_existing", client.error)
+        self.assertEqual(0, client.results)
+
+    def test_run_unreachable(self):
+        agent_obj = agent.Agent("127.0.0.1", 0)
+        agent_obj.listener.close()
+        client = agent.AgentClient(agent_obj.address)
+
+        client.run(self._make_job({"type": "serial"}), threading.Event(),
+                   lambda results: None)
+
+        self.assertEqual("unreachable", client.status)
+        self.assertIsNotNone(client.error)
+
+    def test_run_wrong_authkey(self):
+        client = agent.AgentClient(self.agent.address)
+        self.mock_conf.agent_authkey = "wrong"
+        self.addCleanup(setattr, self.mock_conf, "agent_authkey", "secret")
+
+        client.run(self._make_job({"type": "serial"}), threading.Event(),
+                   lambda results: None)
+
+        self.assertEqual("unreachable", client.status)
+
+    def test_run_not_picklable(self):
+        client = agent.AgentClient(self.agent.address)
+
+        client.run(self._make_job({"type": "serial"},
+                                  args={"sleep": lambda: 0}),
+                   threading.Event(), lambda results: None)
+
+        self.assertEqual("failed", client.status)
@@ -14,8 +14,10 @@
 #    under the License.
 
 import collections
+import types
 
 import mock
+import testtools
 
 from rally.task import atomic
 from tests.unit import test
@@ -30,6 +32,11 @@ class ActionTimerMixinTestCase(test.TestCase):
 
 class AtomicActionTestCase(test.TestCase):
 
+    def setUp(self):
+        super(AtomicActionTestCase, self).setUp()
+        atomic.reset_history()
+        self.addCleanup(atomic.reset_history)
+
     @mock.patch("time.time", side_effect=[1, 3, 6, 10, 15, 21])
     def test_action_timer_context(self, mock_time):
         inst = atomic.ActionTimerMixin()
@@ -124,3 +131,172 @@ class AtomicActionTestCase(test.TestCase):
         self.assertEqual(5, inst.other_func(2, 3, foo=True))
         self.assertEqual(collections.OrderedDict({"some": 2}),
                          inst.atomic_actions())
+
+    @mock.patch("time.time", side_effect=[1, 3, 5, 8, 10, 11, 20, 30])
+    def test_action_timer_history(self, mock_time):
+        inst = atomic.ActionTimerMixin()
+
+        self.assertIsNone(atomic.get_expected_duration("test"))
+        for _ in range(3):
+            with atomic.ActionTimer(inst, "test"):
+                pass
+        try:
+            with atomic.ActionTimer(inst, "test"):
+                raise ValueError()
+        except ValueError:
+            pass
+
+        # durations of the failed actions are not taken into account
+        self.assertEqual(2, atomic.get_expected_duration("test"))
+        atomic.reset_history()
+        self.assertIsNone(atomic.get_expected_duration("test"))
+
+    @mock.patch("time.time", side_effect=[1, 2, 3, 4])
+    def test_action_timer_uncertainty(self, mock_time):
+        inst = atomic.ActionTimerMixin()
+
+        self.assertEqual([], atomic.get_active_timers())
+        with atomic.ActionTimer(inst, "outer") as outer:
+            with atomic.ActionTimer(inst, "inner") as inner:
+                self.assertEqual([outer, inner], atomic.get_active_timers())
+                inner.add_uncertainty(0.5)
+                outer.add_uncertainty(0.5)
+            outer.add_uncertainty(0.25)
+        self.assertEqual([], atomic.get_active_timers())
+
+        self.assertEqual(collections.OrderedDict([("inner", 0.5),
+                                                  ("outer", 0.75)]),
+                         inst.atomic_actions_uncertainty())
+
+
+@testtools.skipIf(atomic.asyncio is None, "asyncio is not available")
+class CoroutineActionTimerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CoroutineActionTimerTestCase, self).setUp()
+        self.loop = atomic.asyncio.new_event_loop()
+        atomic.asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.addCleanup(atomic.asyncio.set_event_loop, None)
+
+    def test_is_awaitable(self):
+        coro = atomic.asyncio.sleep(0)
+        self.assertTrue(atomic.is_awaitable(coro))
+        self.loop.run_until_complete(coro)
+        self.assertTrue(atomic.is_awaitable(atomic.asyncio.Future()))
+        self.assertFalse(atomic.is_awaitable(None))
+        self.assertFalse(atomic.is_awaitable(lambda: None))
+
+    def test_get_future_exc_info(self):
+        future = atomic.asyncio.Future()
+        future.set_result(1)
+        self.assertEqual((None, None, None),
+                         atomic.get_future_exc_info(future))
+
+        exc = ValueError()
+        future = atomic.asyncio.Future()
+        future.set_exception(exc)
+        self.assertEqual((ValueError, exc, None),
+                         atomic.get_future_exc_info(future))
+
+        future = atomic.asyncio.Future()
+        future.cancel()
+        self.assertEqual(atomic.asyncio.CancelledError,
+                         atomic.get_future_exc_info(future)[0])
+
+    def test_action_timer_decorator(self):
+
+        class Some(atomic.ActionTimerMixin):
+
+            @atomic.action_timer("some")
+            def some_func(self, delay):
+                return atomic.asyncio.sleep(delay, result=delay)
+
+            @atomic.optional_action_timer("optional")
+            def optional_func(self, delay):
+                return atomic.asyncio.sleep(delay)
+
+        inst = Some()
+        atomic.reset_history()
+        future = inst.some_func(0.05)
+        self.assertIsInstance(future, atomic.asyncio.Future)
+        self.assertEqual({"some": None}, inst.atomic_actions())
+
+        self.assertEqual(0.05, self.loop.run_until_complete(future))
+        # the callback which stops the timer is called after the future
+        self.loop.run_until_complete(atomic.asyncio.sleep(0))
+        self.assertGreaterEqual(inst.atomic_actions()["some"], 0.05)
+        self.assertEqual(inst.atomic_actions()["some"],
+                         atomic.get_expected_duration("some"))
+
+        self.loop.run_until_complete(inst.optional_func(0))
+        self.loop.run_until_complete(
+            inst.optional_func(0, atomic_action=False))
+        self.loop.run_until_complete(atomic.asyncio.sleep(0))
+        self.assertEqual(["some", "optional"],
+                         list(inst.atomic_actions()))
+        self.assertEqual([], atomic.get_active_timers())
+
+    def test_action_timer_decorator_overlapping_iterations(self):
+        asyncio = atomic.asyncio
+
+        class Some(atomic.ActionTimerMixin):
+
+            def __init__(self):
+                super(Some, self).__init__()
+                self.seen = []
+
+            @atomic.action_timer("iteration")
+            def iteration(self, delay):
+                with atomic.ActionTimer(self, "prepare"):
+                    return self._wait(delay)
+
+            @types.coroutine
+            def _wait(self, delay):
+                self.seen.append(atomic.get_active_timers())
+                # the same as "await asyncio.sleep(delay)"
+                for value in asyncio.ensure_future(asyncio.sleep(delay)):
+                    yield value
+                self.seen.append(atomic.get_active_timers())
+
+        first, second = Some(), Some()
+        futures = [first.iteration(0.02), second.iteration(0.01)]
+        self.assertEqual([], atomic.get_active_timers())
+        self.loop.run_until_complete(asyncio.gather(*futures))
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        for inst in (first, second):
+            # the coroutine sees only the timer of its own iteration, since
+            # the synchronous "prepare" action is finished before it starts
+            self.assertEqual(2, len(inst.seen))
+            for timers in inst.seen:
+                self.assertEqual(["iteration"],
+                                 [timer.name for timer in timers])
+                self.assertIs(inst, timers[0].instance)
+            self.assertEqual(["iteration", "prepare"],
+                             list(inst.atomic_actions()))
+            self.assertIsNotNone(inst.atomic_actions()["iteration"])
+        self.assertEqual([], atomic.get_active_timers())
+
+    def test_action_timer_decorator_with_exception(self):
+
+        class TestException(Exception):
+            pass
+
+        class TestTimer(atomic.ActionTimerMixin):
+
+            @atomic.action_timer("test")
+            def some_func(self):
+                future = atomic.asyncio.Future()
+                future.set_exception(TestException())
+                return future
+
+        inst = TestTimer()
+        atomic.reset_history()
+        self.assertRaises(TestException, self.loop.run_until_complete,
+                          inst.some_func())
+        self.loop.run_until_complete(atomic.asyncio.sleep(0))
+
+        self.assertIsNotNone(inst.atomic_actions()["test"])
+        self.assertIsNone(atomic.get_expected_duration("test"))
+        self.assertEqual([], atomic.get_active_timers())
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 import ddt
 import jsonschema
 import mock
@@ -142,8 +144,159 @@ class BaseContextTestCase(test.TestCase):
         self.assertTrue(FakeOtherContext(ctx) == FakeOtherContext(ctx))
 
 
+@ddt.ddt
+class DependsOnTestCase(test.TestCase):
+
+    def _make_context(self, reads, writes):
+        @context.configure(name="depends_on_%d" % id(reads), order=1,
+                           reads=reads, writes=writes)
+        class FooContext(fakes.FakeContext):
+            pass
+
+        self.addCleanup(FooContext.unregister)
+        return FooContext
+
+    @ddt.data(
+        {"first": (None, None), "second": (["users"], ["tenants.a"]),
+         "expected": True},
+        {"first": (["users"], ["tenants.a"]), "second": (["users"], None),
+         "expected": True},
+        {"first": (["users"], ["tenants.a"]), "second": (["users"], []),
+         "expected": False},
+        {"first": (["users"], ["tenants.a"]),
+         "second": (["users"], ["tenants.b"]), "expected": False},
+        {"first": (["users"], ["tenants.a"]),
+         "second": (["tenants.a"], ["tenants.b"]), "expected": True},
+        {"first": (["users"], ["tenants.a"]),
+         "second": (["tenants"], ["tenants.b"]), "expected": True},
+        {"first": (["users"], ["tenants"]),
+         "second": (["users"], ["tenants.b"]), "expected": True},
+        {"first": (["users"], ["tenants.ab"]),
+         "second": (["tenants.a"], ["tenants.b"]), "expected": False},
+        {"first": (["tenants.b"], ["tenants.a"]),
+         "second": (["users"], ["tenants.b"]), "expected": True})
+    @ddt.unpack
+    def test_depends_on(self, first, second, expected):
+        first = self._make_context(*first)
+        second = self._make_context(*second)
+        self.assertEqual(expected, second.depends_on(first))
+
+
 class ContextManagerTestCase(test.TestCase):
 
+    def _make_contexts(self, calls):
+        contexts = []
+        for name, order, reads, writes in (
+                ("barrier", 1, None, None),
+                ("first", 2, ["users"], ["tenants.first"]),
+                ("second", 3, ["users"], ["tenants.second"]),
+                ("last", 4, ["tenants.first"], ["tenants.last"])):
+
+            @context.configure(name="test_groups_" + name, order=order,
+                               reads=reads, writes=writes)
+            class FooContext(context.Context):
+                def setup(self):
+                    calls.append(("setup", self.get_name()))
+
+                def cleanup(self):
+                    calls.append(("cleanup", self.get_name()))
+
+            self.addCleanup(FooContext.unregister)
+            contexts.append(FooContext)
+        return contexts
+
+    def test__get_groups(self):
+        contexts = [cls({}) for cls in self._make_contexts([])]
+        self.assertEqual(
+            [contexts[:1], contexts[1:3], contexts[3:]],
+            context.ContextManager._get_groups(contexts))
+
+    def test_setup_and_cleanup_concurrently(self):
+        calls = []
+        contexts = self._make_contexts(calls)
+        second_started = threading.Event()
+
+        def setup_first(ctx):
+            # waits for the context of the same group
+            self.assertTrue(second_started.wait(5))
+            calls.append(("setup", ctx.get_name()))
+
+        def setup_second(ctx):
+            second_started.set()
+            calls.append(("setup", ctx.get_name()))
+
+        contexts[1].setup = setup_first
+        contexts[2].setup = setup_second
+        ctx_object = {"config": {cls.get_name(): {} for cls in contexts}}
+
+        manager = context.ContextManager(ctx_object)
+        manager.setup()
+        manager.cleanup()
+
+        self.assertEqual(
+            [("setup", "test_groups_barrier"),
+             ("setup", "test_groups_second"),
+             ("setup", "test_groups_first"),
+             ("setup", "test_groups_last"),
+             ("cleanup", "test_groups_last")],
+            calls[:5])
+        self.assertEqual(
+            set([("cleanup", "test_groups_first"),
+                 ("cleanup", "test_groups_second")]), set(calls[5:7]))
+        self.assertEqual(("cleanup", "test_groups_barrier"), calls[7])
+
+        durations = manager.get_durations()
+        self.assertEqual(
+            ["test_groups_barrier", "test_groups_first",
+             "test_groups_second", "test_groups_last"],
+            [d["name"] for d in durations])
+        for d in durations:
+            self.assertEqual(set(["name", "setup", "cleanup"]), set(d))
+
+    def test_setup_fails(self):
+        calls = []
+        contexts = self._make_contexts(calls)
+        contexts[2].setup = mock.Mock(side_effect=ValueError)
+        ctx_object = {"config": {cls.get_name(): {} for cls in contexts}}
+
+        manager = context.ContextManager(ctx_object)
+        self.assertRaises(ValueError, manager.setup)
+
+        # the rest of the group is set up, the next groups are not
+        self.assertEqual([("setup", "test_groups_barrier"),
+                          ("setup", "test_groups_first")], calls)
+        self.assertEqual(["test_groups_barrier", "test_groups_first",
+                          "test_groups_second"],
+                         [ctx.get_name() for ctx in manager._visited])
+        self.assertEqual(["test_groups_barrier", "test_groups_first",
+                          "test_groups_second"],
+                         [d["name"] for d in manager.get_durations()])
+
+    def test_setup_and_cleanup_with_shared(self):
+        calls = []
+        contexts = self._make_contexts(calls)
+        shared_obj = {"config": {contexts[0].get_name(): {},
+                                 contexts[1].get_name(): {}},
+                      "users": ["u1"],
+                      "tenants": {"t1": {"first": "f1"}}}
+        shared = context.ContextManager(shared_obj)
+        ctx_object = {"config": {cls.get_name(): {} for cls in contexts}}
+
+        manager = context.ContextManager(ctx_object, shared=shared)
+        manager.setup()
+        manager.cleanup()
+
+        self.assertEqual([("setup", "test_groups_second"),
+                          ("setup", "test_groups_last"),
+                          ("cleanup", "test_groups_last"),
+                          ("cleanup", "test_groups_second")], calls)
+        self.assertIs(shared_obj["users"], ctx_object["users"])
+        # the workload gets its own copy of the tenants
+        self.assertEqual(shared_obj["tenants"], ctx_object["tenants"])
+        self.assertIsNot(shared_obj["tenants"]["t1"],
+                         ctx_object["tenants"]["t1"])
+        self.assertEqual(4, len(manager._get_sorted_context_lst()))
+
     @mock.patch("rally.task.context.Context.get")
     def test_validate(self, mock_context_get):
         config = {
@@ -198,6 +351,49 @@ class ContextManagerTestCase(test.TestCase):
         mock_context.return_value.assert_has_calls(
             [mock.call.setup(), mock.call.setup()], any_order=True)
 
+    def test_map_for_scenario(self):
+
+        @context.configure(name="test_map_for_scenario", order=1)
+        class FooContext(context.Context):
+            def setup(self):
+                pass
+
+            def cleanup(self):
+                pass
+
+            def map_for_scenario(self, context_obj):
+                context_obj["user"] = context_obj["users"][
+                    context_obj["iteration"] % 2]
+                return context_obj
+
+        self.addCleanup(FooContext.unregister)
+
+        ctx_object = {"config": {"test_map_for_scenario": {}},
+                      "task": {"uuid": "task_uuid"},
+                      "users": [{"id": "u1", "tenants": ["t1"]},
+                                {"id": "u2", "tenants": ["t2"]}]}
+        manager = context.ContextManager(ctx_object)
+
+        first = manager.map_for_scenario(iteration=1)
+        second = manager.map_for_scenario(iteration=2)
+
+        self.assertEqual(1, first["iteration"])
+        self.assertEqual("u2", first["user"]["id"])
+        self.assertEqual(2, second["iteration"])
+        self.assertEqual("u1", second["user"]["id"])
+        self.assertNotIn("iteration", ctx_object)
+        self.assertNotIn("user", ctx_object)
+
+        # shared part of the context is built once and is read-only
+        self.assertIs(first["users"], second["users"])
+        self.assertIs(first["users"][1], first["user"])
+        self.assertRaises(RuntimeError, first["user"].__setitem__, "a", 1)
+        self.assertIsInstance(first["user"]["tenants"], tuple)
+
+        # top-level items of scenario context are owned by the iteration
+        first["foo"] = "bar"
+        self.assertNotIn("foo", second)
+
     @mock.patch("rally.task.context.Context.get")
     def test_cleanup(self, mock_context_get):
         mock_context = mock.MagicMock()
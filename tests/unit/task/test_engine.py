@@ -231,7 +231,7 @@ class TaskEngineTestCase(test.TestCase):
         mock_scenario_validate.assert_called_once_with(
             "name", {"runner": "runner", "args": "args"},
             admin="admin", users=["user"],
-            deployment=deployment)
+            deployment=deployment, per_user_only=False)
 
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.scenario.Scenario.validate",
@@ -264,18 +264,26 @@ class TaskEngineTestCase(test.TestCase):
         self.assertEqual(mock_existing_users.return_value, result)
 
     @mock.patch("rally.task.engine.TaskConfig")
-    @mock.patch("rally.task.engine.osclients.Clients")
+    @mock.patch("rally.task.engine.validation.ValidationClients")
     @mock.patch("rally.task.engine.users_ctx")
     @mock.patch("rally.task.engine.TaskEngine"
                 "._validate_config_semantic_helper")
     @mock.patch("rally.task.engine.objects.Deployment.get",
                 return_value="FakeDeployment")
+    @mock.patch("rally.task.engine.TaskEngine._check_cloud")
     def test__validate_config_semantic(
-            self, mock_deployment_get,
+            self, mock_task_engine__check_cloud, mock_deployment_get,
             mock__validate_config_semantic_helper,
-            mock_users_ctx, mock_clients, mock_task_config):
-        mock_users_ctx.UserGenerator = fakes.FakeUserContext
-        mock_clients.return_value = mock.MagicMock()
+            mock_users_ctx, mock_validation_clients, mock_task_config):
+        users = [fakes.FakeUserContext.user, {"credential": "credential2"}]
+
+        def fake_user_context(ctx):
+            ctx["users"] = users
+            return fakes.FakeUserContext(ctx)
+
+        mock_users_ctx.UserGenerator = fake_user_context
+        admin, user1, user2 = mock_validation_clients.side_effect = [
+            mock.MagicMock(), mock.MagicMock(), mock.MagicMock()]
 
         mock_task_instance = mock.MagicMock()
         mock_subtask1 = mock.MagicMock()
@@ -295,23 +303,64 @@ class TaskEngineTestCase(test.TestCase):
 
         eng._validate_config_semantic(mock_task_instance)
 
-        expected_calls = [
-            mock.call("admin"),
-            mock.call(fakes.FakeUserContext.user["credential"])
-        ]
-        mock_clients.assert_has_calls(expected_calls)
+        lookups = mock_validation_clients.call_args_list[0][0][1]
+        self.assertIsInstance(lookups, engine.validation.Lookups)
+        self.assertEqual(
+            [mock.call("admin", lookups),
+             mock.call(fakes.FakeUserContext.user["credential"], lookups),
+             mock.call("credential2", lookups)],
+            mock_validation_clients.call_args_list)
 
         mock_deployment_get.assert_called_once_with(fake_task["uuid"])
 
-        admin = user = mock_clients.return_value
         fake_deployment = mock_deployment_get.return_value
         expected_calls = [
-            mock.call(admin, user, wconf1, 0, fake_deployment),
-            mock.call(admin, user, wconf2, 1, fake_deployment),
-            mock.call(admin, user, wconf3, 0, fake_deployment)
+            mock.call(admin, user1, wconf1, 0, fake_deployment,
+                      per_user_only=False),
+            mock.call(admin, user1, wconf2, 1, fake_deployment,
+                      per_user_only=False),
+            mock.call(admin, user1, wconf3, 0, fake_deployment,
+                      per_user_only=False),
+            mock.call(None, user2, wconf1, 0, fake_deployment,
+                      per_user_only=True),
+            mock.call(None, user2, wconf2, 1, fake_deployment,
+                      per_user_only=True),
+            mock.call(None, user2, wconf3, 0, fake_deployment,
+                      per_user_only=True)
         ]
         mock__validate_config_semantic_helper.assert_has_calls(
             expected_calls, any_order=True)
+        self.assertEqual(
+            6, mock__validate_config_semantic_helper.call_count)
+
+    @mock.patch("rally.task.engine.TaskConfig")
+    @mock.patch("rally.task.engine.validation.ValidationClients")
+    @mock.patch("rally.task.engine.users_ctx")
+    @mock.patch("rally.task.engine.TaskEngine"
+                "._validate_config_semantic_helper")
+    @mock.patch("rally.task.engine.objects.Deployment.get")
+    @mock.patch("rally.task.engine.TaskEngine._check_cloud")
+    def test__validate_config_semantic_reports_first_error(
+            self, mock_task_engine__check_cloud, mock_deployment_get,
+            mock__validate_config_semantic_helper,
+            mock_users_ctx, mock_validation_clients, mock_task_config):
+        mock_users_ctx.UserGenerator = fakes.FakeUserContext
+        workloads = [engine.Workload({"name": "a"}) for i in range(20)]
+
+        def validate(admin, user, workload, pos, deployment, **kwargs):
+            if pos in (7, 11):
+                raise exceptions.InvalidTaskConfig(
+                    name="a", pos=pos, config="", reason="")
+
+        mock__validate_config_semantic_helper.side_effect = validate
+        mock_task_instance = mock.MagicMock(
+            subtasks=[mock.MagicMock(workloads=workloads)])
+        eng = engine.TaskEngine(mock_task_instance, mock.MagicMock())
+
+        e = self.assertRaises(exceptions.InvalidTaskConfig,
+                              eng._validate_config_semantic,
+                              mock_task_instance)
+        self.assertIn("a[7]", "%s" % e)
 
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.TaskConfig")
@@ -422,6 +471,82 @@ class TaskEngineTestCase(test.TestCase):
         self.assertEqual(mock.call(consts.TaskStatus.ABORTED),
                          task.update_status.mock_calls[-1])
 
+    @staticmethod
+    def _make_subtask(name, ctx=None, shared=None):
+        subtask = {"title": name,
+                   "workloads": [{"name": name, "runner": {"type": "serial"},
+                                  "context": ctx or {}}]}
+        if shared:
+            subtask["context"] = shared
+        return subtask
+
+    @mock.patch("rally.task.engine.scenario.Scenario.get")
+    def test__plan_shared_contexts(self, mock_scenario_get):
+        default_contexts = {"a.task": {}, "b.task": {"users": {"n": 2}},
+                            "c.task": {"users": {"n": 1}}}
+        mock_scenario_get.side_effect = lambda name: mock.Mock(
+            _meta_get=mock.Mock(return_value=default_contexts[name]))
+        config = {
+            "version": 2,
+            "title": "t",
+            "context": {"users": {"n": 1}},
+            "subtasks": [
+                self._make_subtask("a.task", {"foo": {}}),
+                self._make_subtask("b.task"),
+                self._make_subtask("c.task"),
+                self._make_subtask("a.task", shared={"foo": {"bar": 1}}),
+                self._make_subtask("c.task", {"foo": {"bar": 2}},
+                                   shared={"foo": {"bar": 1}})]}
+        eng = engine.TaskEngine(config, mock.MagicMock())
+
+        plan = eng._plan_shared_contexts()
+
+        workloads = [s.workloads[0] for s in eng.config.subtasks]
+        self.assertEqual(set([workloads[0], workloads[2], workloads[3]]),
+                         set(plan))
+        self.assertIs(plan[workloads[0]], plan[workloads[2]])
+        self.assertEqual(2, plan[workloads[0]].consumers)
+        self.assertEqual({"users": {"n": 1}},
+                         plan[workloads[0]].manager.context_obj["config"])
+        self.assertEqual(1, plan[workloads[3]].consumers)
+        self.assertEqual({"users": {"n": 1}, "foo": {"bar": 1}},
+                         plan[workloads[3]].manager.context_obj["config"])
+
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer")
+    @mock.patch("rally.task.engine.context.ContextManager.cleanup")
+    @mock.patch("rally.task.engine.context.ContextManager.setup")
+    @mock.patch("rally.task.engine.scenario.Scenario")
+    @mock.patch("rally.task.engine.runner.ScenarioRunner")
+    def test_run_with_shared_contexts(
+            self, mock_scenario_runner, mock_scenario,
+            mock_context_manager_setup, mock_context_manager_cleanup,
+            mock_result_consumer, mock_task_get_status):
+        mock_result_consumer.is_task_in_aborting_status.return_value = False
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        mock_scenario.get.return_value._meta_get.return_value = {}
+        config = {
+            "version": 2,
+            "title": "t",
+            "context": {"users": {"n": 1}},
+            "subtasks": [self._make_subtask("a.task"),
+                         self._make_subtask("b.task")]}
+        eng = engine.TaskEngine(config, mock.MagicMock())
+
+        eng.run()
+
+        # the shared contexts and the own ones of the both workloads
+        self.assertEqual(3, mock_context_manager_setup.call_count)
+        self.assertEqual(3, mock_context_manager_cleanup.call_count)
+        shared = [c[1]["shared_context"]
+                  for c in mock_result_consumer.call_args_list]
+        self.assertIsNotNone(shared[0])
+        self.assertIs(shared[0], shared[1])
+        self.assertEqual(0, shared[0].consumers)
+        fake_runner = mock_scenario_runner.get.return_value.return_value
+        context_obj = fake_runner.run.call_args[0][1]
+        self.assertEqual({"users": {"n": 1}}, context_obj["config"])
+
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.scenario.Scenario.get")
     def test__prepare_context(self, mock_scenario_get, mock_task_config):
@@ -480,6 +605,49 @@ class TaskEngineTestCase(test.TestCase):
             "default_context")
 
 
+class SharedContextTestCase(test.TestCase):
+
+    @mock.patch("rally.task.engine.context.ContextManager")
+    def test_acquire_and_release(self, mock_context_manager):
+        manager = mock_context_manager.return_value
+        manager.get_durations.return_value = [{"name": "users", "setup": 1}]
+        shared = engine.SharedContext({"config": {"users": {}}}, consumers=2)
+
+        shared.acquire()
+        shared.acquire()
+        manager.setup.assert_called_once_with()
+
+        shared.release()
+        self.assertFalse(manager.cleanup.called)
+        shared.release()
+        shared.cleanup()
+        manager.cleanup.assert_called_once_with()
+        self.assertEqual({"uuid": shared.uuid,
+                          "contexts": [{"name": "users", "setup": 1}]},
+                         shared.to_dict())
+
+    @mock.patch("rally.task.engine.context.ContextManager")
+    def test_acquire_fails(self, mock_context_manager):
+        manager = mock_context_manager.return_value
+        manager.setup.side_effect = TestException
+        shared = engine.SharedContext({"config": {"users": {}}}, consumers=2)
+
+        self.assertRaises(TestException, shared.acquire)
+        manager.cleanup.assert_called_once_with()
+        # the contexts are not set up again by the next workload
+        self.assertRaises(TestException, shared.acquire)
+        manager.setup.assert_called_once_with()
+        shared.release()
+        shared.release()
+        manager.cleanup.assert_called_once_with()
+
+    @mock.patch("rally.task.engine.context.ContextManager")
+    def test_cleanup_not_acquired(self, mock_context_manager):
+        shared = engine.SharedContext({"config": {"users": {}}}, consumers=1)
+        shared.cleanup()
+        self.assertFalse(mock_context_manager.return_value.cleanup.called)
+
+
 class ResultConsumerTestCase(test.TestCase):
 
     @mock.patch("rally.common.objects.Task.get_status")
@@ -493,6 +661,7 @@ class ResultConsumerTestCase(test.TestCase):
         mock_task_get_status.return_value = consts.TaskStatus.RUNNING
         key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
         task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
         runner = mock.MagicMock()
 
         results = [
@@ -509,9 +678,79 @@ class ResultConsumerTestCase(test.TestCase):
             mock.call({"duration": 1, "timestamp": 3}),
             mock.call({"duration": 2, "timestamp": 2})])
 
-        self.assertEqual([{"duration": 2, "timestamp": 2},
-                          {"duration": 1, "timestamp": 3}],
-                         consumer_obj.results)
+        task.append_iterations.assert_called_once_with(
+            42, [{"duration": 1, "timestamp": 3},
+                 {"duration": 2, "timestamp": 2}])
+        self.assertEqual(2, consumer_obj.iterations_count)
+        self.assertEqual([], consumer_obj.pending)
+        data = task.update_results.call_args[0][1]
+        self.assertEqual(42, task.update_results.call_args[0][0])
+        self.assertNotIn("partial", data)
+        self.assertEqual(2, data["load_duration"])
+        self.assertNotIn("contexts", data)
+        task.aggregate_results.assert_called_once_with(42, data)
+
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    def test_consume_results_aggregation_fails(
+            self, mock_result_consumer_wait_and_abort, mock_task_get_status,
+            mock_log):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        task.aggregate_results.side_effect = RuntimeError("DB is gone")
+        runner = mock.MagicMock(result_queue=collections.deque())
+
+        with engine.ResultConsumer(key, task, runner, False):
+            pass
+
+        self.assertTrue(task.update_results.called)
+        task.aggregate_results.assert_called_once_with(42, mock.ANY)
+        mock_log.exception.assert_called_once_with(
+            "Failed to save aggregated results of fake.")
+
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    def test_consume_results_contexts_durations(
+            self, mock_result_consumer_wait_and_abort, mock_task_get_status):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        runner = mock.MagicMock(result_queue=collections.deque())
+        ctx_manager = mock.Mock()
+        ctx_manager.get_durations.return_value = [
+            {"name": "users", "setup": 2.0, "cleanup": 1.0}]
+
+        with engine.ResultConsumer(key, task, runner, False,
+                                   ctx_manager=ctx_manager):
+            pass
+
+        data = task.update_results.call_args[0][1]
+        self.assertEqual(ctx_manager.get_durations.return_value,
+                         data["contexts"])
+
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    def test_consume_results_shared_context(
+            self, mock_result_consumer_wait_and_abort, mock_task_get_status):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        runner = mock.MagicMock(result_queue=collections.deque())
+        shared = mock.Mock()
+        shared.to_dict.return_value = {"uuid": "uuid", "contexts": []}
+
+        with engine.ResultConsumer(key, task, runner, False,
+                                   shared_context=shared):
+            pass
+
+        data = task.update_results.call_args[0][1]
+        self.assertEqual({"uuid": "uuid", "contexts": []},
+                         data["shared_context"])
 
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.engine.time.time")
@@ -521,7 +760,7 @@ class ResultConsumerTestCase(test.TestCase):
     def test_consume_results_no_iteration(
             self, mock_sla_checker, mock_result_consumer_wait_and_abort,
             mock_task_get_status, mock_time, mock_log):
-        mock_time.side_effect = [0, 1]
+        mock_time.side_effect = [0, 0, 1]
         mock_sla_instance = mock.MagicMock()
         mock_sla_results = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
@@ -529,6 +768,7 @@ class ResultConsumerTestCase(test.TestCase):
         mock_task_get_status.return_value = consts.TaskStatus.RUNNING
         key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
         task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
         runner = mock.MagicMock()
 
         results = []
@@ -536,14 +776,208 @@ class ResultConsumerTestCase(test.TestCase):
         with engine.ResultConsumer(
                 key, task, runner, False):
             pass
-        task.append_results.assert_has_calls([mock.call(
+        task.append_results.assert_called_once_with(
             key, {
+                "raw": [],
+                "full_duration": 0,
+                "sla": mock_sla_results,
+                "load_duration": 0,
+                "partial": True
+            })
+        self.assertFalse(task.append_iterations.called)
+        task.update_results.assert_called_once_with(
+            42, {
                 "raw": [],
                 "full_duration": 1,
                 "sla": mock_sla_results,
                 "load_duration": 0
-            }
-        )], any_order=True)
+            })
+
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_flush_by_size(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": i}] for i in range(5)])
+
+        with engine.ResultConsumer(key, task, runner, False,
+                                   flush_size=2, flush_interval=1000):
+            pass
+
+        self.assertEqual(
+            [mock.call(42, [{"duration": 1, "timestamp": 0},
+                            {"duration": 1, "timestamp": 1}]),
+             mock.call(42, [{"duration": 1, "timestamp": 2},
+                            {"duration": 1, "timestamp": 3}]),
+             mock.call(42, [{"duration": 1, "timestamp": 4}])],
+            task.append_iterations.call_args_list)
+        # partial results are updated after each flush
+        self.assertEqual(4, task.update_results.call_count)
+        for call in task.update_results.call_args_list[:-1]:
+            self.assertTrue(call[0][1]["partial"])
+        self.assertNotIn("partial", task.update_results.call_args[0][1])
+
+    @mock.patch("rally.task.engine.time.time")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_flush_by_interval(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_time):
+        mock_time.return_value = 10
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque()
+
+        consumer = engine.ResultConsumer(key, task, runner, False,
+                                         flush_size=1000, flush_interval=5)
+        consumer.start = consumer.flushed_at = 10
+        consumer.result_id = 42
+        consumer.is_done.set()
+
+        runner.result_queue.append([{"duration": 1, "timestamp": 1}])
+        runner.result_queue.append([{"duration": 1, "timestamp": 2}])
+        # the first batch is kept, the second one triggers the flush
+        mock_time.side_effect = [12, 16, 16, 16]
+        consumer._consume_results()
+
+        task.append_iterations.assert_called_once_with(
+            42, [{"duration": 1, "timestamp": 1},
+                 {"duration": 1, "timestamp": 2}])
+        self.assertEqual(16, consumer.flushed_at)
+
+    @mock.patch("rally.task.engine.time.time")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_waits_for_runner(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_time):
+        mock_time.return_value = 12
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque()
+
+        consumer = engine.ResultConsumer(key, task, runner, False,
+                                         flush_size=1000, flush_interval=5)
+        consumer.start = consumer.flushed_at = 10
+        consumer.result_id = 42
+
+        def wait_for_results(timeout, done):
+            if runner.wait_for_results.call_count == 1:
+                runner.result_queue.append([{"duration": 1, "timestamp": 1}])
+            else:
+                done.set()
+            return bool(runner.result_queue)
+
+        runner.wait_for_results.side_effect = wait_for_results
+        consumer._consume_results()
+
+        self.assertEqual(
+            [mock.call(timeout=5, done=consumer.is_done),
+             # waits only till the next flush of pending results
+             mock.call(timeout=3, done=consumer.is_done)],
+            runner.wait_for_results.call_args_list)
+        task.append_iterations.assert_called_once_with(
+            42, [{"duration": 1, "timestamp": 1}])
+
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_flush_fails(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_log):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        task.append_iterations.side_effect = [Exception("DB is down"), None,
+                                              None]
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": i}] for i in range(3)])
+
+        with engine.ResultConsumer(key, task, runner, False,
+                                   flush_size=2) as consumer_obj:
+            pass
+
+        self.assertTrue(mock_log.exception.called)
+        self.assertEqual(
+            [mock.call(42, [{"duration": 1, "timestamp": i}
+                            for i in range(j)]) for j in (2, 3)],
+            task.append_iterations.call_args_list)
+        self.assertEqual(3, consumer_obj.iterations_count)
+
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_flush_fails_repeatedly(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_log):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        task.append_iterations.side_effect = Exception("DB is down")
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": i}] for i in range(5)])
+
+        with engine.ResultConsumer(key, task, runner, False, flush_size=1,
+                                   max_flush_attempts=2) as consumer_obj:
+            pass
+
+        # results are dropped after the second failure in a row
+        self.assertEqual(
+            [mock.call(42, [{"duration": 1, "timestamp": i}
+                            for i in range(j)]) for j in (1, 2)],
+            task.append_iterations.call_args_list)
+        self.assertEqual([], consumer_obj.pending)
+        self.assertEqual(0, consumer_obj.iterations_count)
+        runner.abort.assert_called_once_with()
+        self.assertIn("Failed to save results of 2 iterations to DB 2 times",
+                      consumer_obj.flush_error)
+        mock_sla_checker.return_value.set_unexpected_failure.assert_has_calls(
+            [mock.call(consumer_obj.flush_error)])
+        # the summary of the workload is still saved
+        self.assertNotIn("partial", task.update_results.call_args[0][1])
+
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_last_flush_fails(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_log):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        task.append_results.return_value = {"id": 42}
+        task.append_iterations.side_effect = Exception("DB is down")
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": 1}]])
+
+        with engine.ResultConsumer(key, task, runner, False) as consumer_obj:
+            pass
+
+        self.assertEqual(2, task.append_iterations.call_count)
+        self.assertEqual([], consumer_obj.pending)
+        self.assertIsNotNone(consumer_obj.flush_error)
+        self.assertNotIn("partial", task.update_results.call_args[0][1])
 
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
@@ -767,8 +1201,8 @@ class TaskTestCase(test.TestCase):
         config = {"subtasks": [subtask_conf1, subtask_conf2]}
         self.assertEqual(2, len(engine.TaskConfig(config).subtasks))
         mock_sub_task.assert_has_calls([
-            mock.call(subtask_conf1),
-            mock.call(subtask_conf2)])
+            mock.call(subtask_conf1, task_context=None),
+            mock.call(subtask_conf2, task_context=None)])
 
 
 class WorkloadTestCase(test.TestCase):
@@ -15,13 +15,20 @@
 
 import collections
 import multiprocessing
+import threading
 
 import ddt
 import mock
+from six import moves
+import testtools
 
+from rally import exceptions
 from rally.plugins.common.runners import serial
+from rally.task import atomic
+from rally.task import context as task_context
 from rally.task import runner
 from rally.task import scenario
+from rally.task import transport
 from tests.unit import fakes
 from tests.unit import test
 
@@ -47,24 +54,21 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
                          expected)
         mock_format_exc.assert_called_once_with(mock_exc)
 
-    @mock.patch(BASE + "context.ContextManager")
-    def test_get_scenario_context(self, mock_context_manager):
-        mock_context_obj = {}
-        mock_map_for_scenario = (
-            mock_context_manager.return_value.map_for_scenario)
+    def test_get_scenario_context(self):
+        mock_context_manager = mock.Mock()
 
-        result = runner._get_scenario_context(13, mock_context_obj)
+        result = runner._get_scenario_context(13, mock_context_manager)
         self.assertEqual(
-            mock_map_for_scenario.return_value,
+            mock_context_manager.map_for_scenario.return_value,
             result
         )
 
-        mock_context_manager.assert_called_once_with({"iteration": 14})
-        mock_map_for_scenario.assert_called_once_with()
+        mock_context_manager.map_for_scenario.assert_called_once_with(
+            iteration=14)
 
     def test_run_scenario_once_internal_logic(self):
         context = runner._get_scenario_context(
-            12, fakes.FakeContext({}).context)
+            12, task_context.ContextManager(fakes.FakeContext({}).context))
         scenario_cls = mock.MagicMock()
 
         runner._run_scenario_once(scenario_cls, "test", context, {})
@@ -115,6 +119,21 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
         }
         self.assertEqual(expected_result, result)
 
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    def test_run_scenario_once_with_atomic_actions_uncertainty(
+            self, mock_timer):
+
+        class FakeWaitingScenario(fakes.FakeScenario):
+            def wait(self):
+                with atomic.ActionTimer(self, "wait") as timer:
+                    timer.add_uncertainty(0.5)
+
+        result = runner._run_scenario_once(
+            FakeWaitingScenario, "wait", mock.MagicMock(), {})
+
+        self.assertEqual(["wait"], list(result["atomic_actions"]))
+        self.assertEqual({"wait": 0.5}, result["atomic_actions_uncertainty"])
+
     @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
     def test_run_scenario_once_exception(self, mock_timer):
         result = runner._run_scenario_once(
@@ -132,6 +151,380 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
                          ["Exception", "Something went wrong"])
 
 
+class WorkerThreadPoolTestCase(test.TestCase):
+
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_submit_and_join(self, mock__get_scenario_context,
+                             mock__run_scenario_once):
+        mock__get_scenario_context.side_effect = lambda i, ctx: i
+        mock__run_scenario_once.side_effect = (
+            lambda cls, method, ctx, args: {"iteration": ctx})
+        result_queue = moves.queue.Queue()
+        pool = runner.WorkerThreadPool(result_queue, "cls", "method",
+                                       {"foo": "bar"}, {"a": 1}, 3)
+
+        for i in range(10):
+            pool.submit(i)
+        pool.join()
+
+        results = [result_queue.get() for i in range(10)]
+        self.assertEqual(list(range(10)),
+                         sorted(r["iteration"] for r in results))
+        self.assertLessEqual(len(pool._threads), 3)
+        for thread in pool._threads:
+            self.assertFalse(thread.is_alive())
+        mock__get_scenario_context.assert_has_calls(
+            [mock.call(i, pool.context_manager) for i in range(10)],
+            any_order=True)
+        self.assertEqual({"foo": "bar"}, pool.context_manager.context_obj)
+        mock__run_scenario_once.assert_has_calls(
+            [mock.call("cls", "method", i, {"a": 1}) for i in range(10)],
+            any_order=True)
+
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_submit_scheduled(self, mock__get_scenario_context,
+                              mock__run_scenario_once):
+        mock__run_scenario_once.side_effect = (
+            lambda cls, method, ctx, args: {"timestamp": 2.0})
+        result_queue = moves.queue.Queue()
+        pool = runner.WorkerThreadPool(result_queue, "cls", "method",
+                                       {}, {}, 2)
+
+        pool.submit(0, scheduled_at=1.5)
+        pool.submit(1)
+        pool.join()
+
+        results = sorted([result_queue.get(), result_queue.get()],
+                         key=len)
+        self.assertEqual([{"timestamp": 2.0},
+                          {"timestamp": 2.0, "scheduled_at": 1.5}], results)
+
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_submit_with_phase(self, mock__get_scenario_context,
+                               mock__run_scenario_once):
+        mock__run_scenario_once.side_effect = (
+            lambda cls, method, ctx, args: {"timestamp": 2.0})
+        result_queue = moves.queue.Queue()
+        pool = runner.WorkerThreadPool(result_queue, "cls", "method",
+                                       {}, {}, 2)
+
+        pool.submit(0, scheduled_at=1.5, phase=2)
+        pool.join()
+
+        self.assertEqual({"timestamp": 2.0, "scheduled_at": 1.5,
+                          "phase": 2}, result_queue.get())
+
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_wait_for_free_slot(self, mock__get_scenario_context,
+                                mock__run_scenario_once):
+        release = threading.Event()
+        mock__run_scenario_once.side_effect = (
+            lambda cls, method, ctx, args: release.wait())
+        pool = runner.WorkerThreadPool(moves.queue.Queue(), "cls", "method",
+                                       {}, {}, 3)
+        self.assertTrue(pool.wait_for_free_slot(1))
+
+        pool.submit(0)
+        pool.submit(1)
+        self.assertTrue(pool.wait_for_free_slot(3))
+        self.assertFalse(pool.wait_for_free_slot(2, timeout=0.01))
+
+        waiter = threading.Thread(target=pool.wait_for_free_slot, args=(1,))
+        waiter.start()
+        release.set()
+        waiter.join(10)
+        self.assertFalse(waiter.is_alive())
+        pool.join()
+
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_submit_limits_concurrency(self, mock__get_scenario_context,
+                                       mock__run_scenario_once):
+        release = threading.Event()
+        running = []
+
+        def run_scenario_once(cls, method, ctx, args):
+            running.append(ctx)
+            release.wait()
+            return {}
+
+        mock__run_scenario_once.side_effect = run_scenario_once
+        pool = runner.WorkerThreadPool(moves.queue.Queue(), "cls", "method",
+                                       {}, {}, 2)
+        pool.submit(0)
+        pool.submit(1)
+
+        submitter = threading.Thread(target=pool.submit, args=(2,))
+        submitter.start()
+        submitter.join(0.1)
+        self.assertTrue(submitter.is_alive())
+
+        release.set()
+        submitter.join()
+        pool.join()
+        self.assertEqual(2, len(pool._threads))
+        self.assertEqual(3, len(running))
+
+    @mock.patch(BASE + "rutils.get_timeout_watchdog")
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_timeout(self, mock__get_scenario_context,
+                     mock__run_scenario_once, mock_get_timeout_watchdog):
+        mock_watchdog = mock_get_timeout_watchdog.return_value
+        mock_watchdog.cancel.side_effect = [False, True]
+        mock_watchdog.watch.return_value.delay = 0.5
+        mock__run_scenario_once.side_effect = [{"error": []},
+                                               {"error": ["Timeout"]}]
+        result_queue = moves.queue.Queue()
+        pool = runner.WorkerThreadPool(result_queue, "cls", "method",
+                                       {}, {}, 1, timeout=10)
+        pool.submit(0)
+        pool.submit(1)
+        pool.join()
+
+        self.assertEqual([mock.call(10), mock.call(10)],
+                         mock_watchdog.watch.call_args_list)
+        self.assertEqual([mock.call(mock_watchdog.watch.return_value)] * 2,
+                         mock_watchdog.cancel.call_args_list)
+        self.assertEqual({"error": []}, result_queue.get_nowait())
+        self.assertEqual({"error": ["Timeout"], "termination_delay": 0.5},
+                         result_queue.get_nowait())
+        self.assertEqual(1, pool.terminated)
+        self.assertEqual(0.5, pool.total_termination_delay)
+        self.assertEqual(0.5, pool.max_termination_delay)
+
+    @mock.patch(BASE + "rutils.get_timeout_watchdog")
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_timeout_after_scenario(self, mock__get_scenario_context,
+                                    mock__run_scenario_once,
+                                    mock_get_timeout_watchdog):
+        mock_watchdog = mock_get_timeout_watchdog.return_value
+        # the exception is raised before the deadline is cancelled
+        mock_watchdog.cancel.side_effect = [
+            exceptions.ThreadTimeoutException(), True]
+        mock_watchdog.watch.return_value.delay = 0.5
+        result_queue = moves.queue.Queue()
+        pool = runner.WorkerThreadPool(result_queue, "cls", "method",
+                                       {}, {}, 1, timeout=10)
+        pool.submit(0, scheduled_at=1.0)
+        pool.join()
+
+        result = result_queue.get_nowait()
+        self.assertEqual(10, result["duration"])
+        self.assertEqual("ThreadTimeoutException", result["error"][0])
+        self.assertEqual(0.5, result["termination_delay"])
+        self.assertEqual(1.0, result["scheduled_at"])
+        self.assertIn("timestamp", result)
+        self.assertEqual(1, pool.terminated)
+
+    @mock.patch(BASE + "rutils.get_timeout_watchdog")
+    @mock.patch(BASE + "_run_scenario_once")
+    @mock.patch(BASE + "_get_scenario_context")
+    def test_no_timeout(self, mock__get_scenario_context,
+                        mock__run_scenario_once, mock_get_timeout_watchdog):
+        pool = runner.WorkerThreadPool(moves.queue.Queue(), "cls", "method",
+                                       {}, {}, 1)
+        pool.submit(0)
+        pool.join()
+
+        self.assertFalse(mock_get_timeout_watchdog.called)
+
+
+@ddt.ddt
+@testtools.skipIf(atomic.asyncio is None, "asyncio is not available")
+class RunScenarioOnceAsyncTestCase(test.TestCase):
+
+    def setUp(self):
+        super(RunScenarioOnceAsyncTestCase, self).setUp()
+        self.loop = atomic.asyncio.new_event_loop()
+        atomic.asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.addCleanup(atomic.asyncio.set_event_loop, None)
+        self.context = {"task": {"uuid": "uuid"}, "iteration": 1}
+
+    def _run(self, method_name, timeout=0, **kwargs):
+        return self.loop.run_until_complete(
+            runner._run_scenario_once_async(
+                fakes.FakeCoroutineScenario, method_name, self.context, kwargs,
+                timeout=timeout))
+
+    @ddt.data("do_it", "sleep", "action")
+    def test_run(self, method_name):
+        result = self._run(method_name)
+
+        self.assertEqual([], result["error"])
+        self.assertTrue(runner._result_has_valid_schema(result, "uuid"))
+
+    def test_run_duration(self):
+        result = self._run("sleep", delay=0.05)
+
+        self.assertGreaterEqual(result["duration"], 0.05)
+
+    def test_run_atomic_actions(self):
+        result = self._run("action")
+
+        self.assertEqual(["action"], list(result["atomic_actions"]))
+        self.assertIsNotNone(result["atomic_actions"]["action"])
+
+    @ddt.data("something_went_wrong", "fail")
+    def test_run_failed(self, method_name):
+        result = self._run(method_name)
+
+        self.assertIn(result["error"][0], ("Exception", "ValueError"))
+        self.assertTrue(runner._result_has_valid_schema(result, "uuid"))
+
+    def test_run_timeout(self):
+        result = self._run("sleep", timeout=0.05, delay=10)
+
+        self.assertEqual("ThreadTimeoutException", result["error"][0])
+        self.assertGreaterEqual(result["duration"], 0.05)
+        self.assertLess(result["duration"], 10)
+
+    @ddt.data("sleep", "fail")
+    def test_run_in_thread(self, method_name):
+        result = runner._run_scenario_once(
+            fakes.FakeCoroutineScenario, method_name, self.context, {})
+
+        self.assertEqual("RallyException", result["error"][0])
+        self.assertIn("FakeCoroutineScenario returned a coroutine",
+                      result["error"][1])
+        self.assertTrue(runner._result_has_valid_schema(result, "uuid"))
+
+    def test_run_args_are_copied(self):
+        args = {"delay": [0]}
+        self.loop.run_until_complete(runner._run_scenario_once_async(
+            fakes.FakeScenario, "do_it", self.context, args))
+        self.assertEqual({"delay": [0]}, args)
+
+
+@testtools.skipIf(atomic.asyncio is None, "asyncio is not available")
+class AsyncIterationPoolTestCase(test.TestCase):
+
+    def _get_pool(self, method_name="sleep", args=None, timeout=0):
+        return runner.AsyncIterationPool(
+            moves.queue.Queue(), fakes.FakeCoroutineScenario, method_name,
+            fakes.FakeContext({"task": {"uuid": "uuid"}}).context,
+            args or {}, timeout)
+
+    def _get_results(self, pool):
+        results = []
+        while not pool.result_queue.empty():
+            results.append(pool.result_queue.get())
+        return results
+
+    def test_run(self):
+        pool = self._get_pool(args={"delay": 0.01})
+        iterations = iter(range(10))
+        running = []
+
+        def feed():
+            running.append(pool.running)
+            while pool.running < 3:
+                iteration = next(iterations, None)
+                if iteration is None:
+                    pool.stop_feeding()
+                    return
+                pool.start(iteration, scheduled_at=float(iteration),
+                           phase=1)
+
+        pool.run(feed, multiprocessing.Event())
+
+        results = self._get_results(pool)
+        self.assertEqual(10, len(results))
+        self.assertEqual(list(range(10)),
+                         sorted(int(r["scheduled_at"]) for r in results))
+        for result in results:
+            self.assertEqual([], result["error"])
+            self.assertEqual(1, result["phase"])
+        self.assertEqual(0, pool.running)
+        self.assertLessEqual(max(running), 3)
+        self.assertTrue(pool.loop.is_closed())
+
+    def test_run_aborted(self):
+        pool = self._get_pool(args={"delay": 0.05})
+        aborted = multiprocessing.Event()
+        started = []
+
+        def feed():
+            while pool.feeding and not pool.running:
+                if len(started) == 3:
+                    aborted.set()
+                started.append(True)
+                pool.start(len(started))
+
+        pool.run(feed, aborted)
+
+        self.assertLess(len(started), 10)
+        self.assertEqual(len(started), len(self._get_results(pool)))
+
+    def test_run_timeout(self):
+        pool = self._get_pool(args={"delay": 10}, timeout=0.01)
+
+        def feed():
+            pool.start(0)
+            pool.stop_feeding()
+
+        pool.run(feed, multiprocessing.Event())
+
+        results = self._get_results(pool)
+        self.assertEqual("ThreadTimeoutException", results[0]["error"][0])
+
+    def test_init_without_asyncio(self):
+        with mock.patch("rally.task.atomic.asyncio", None):
+            self.assertRaises(exceptions.RallyException, self._get_pool)
+
+
+class ResultsSenderTestCase(test.TestCase):
+
+    def _make_result(self, timestamp):
+        return {"timestamp": timestamp, "duration": 1.0,
+                "idle_duration": 0.0, "error": [],
+                "output": {"additive": [], "complete": []},
+                "atomic_actions": {"foo": 0.5}}
+
+    def test_put_and_close(self):
+        result_queue = moves.queue.Queue()
+        sender = runner.ResultsSender(result_queue, "task_uuid")
+        results = [self._make_result(float(i)) for i in range(10)]
+        for result in results:
+            sender.put(result)
+        sender.close()
+
+        self.assertFalse(sender._thread.is_alive())
+        decoder = transport.ResultsDecoder()
+        received = []
+        while not result_queue.empty():
+            message = result_queue.get()
+            self.assertTrue(decoder.is_encoded(message))
+            received.extend(decoder.decode(message))
+        self.assertEqual(results, received)
+
+    @mock.patch(BASE + "LOG")
+    def test_put_invalid(self, mock_log):
+        result_queue = moves.queue.Queue()
+        sender = runner.ResultsSender(result_queue, "task_uuid")
+        result = self._make_result(1.0)
+        result["duration"] = "foo"
+        sender.put(result)
+        sender.close()
+
+        self.assertTrue(mock_log.warning.called)
+        self.assertTrue(result_queue.empty())
+
+    def test_close_without_results(self):
+        result_queue = moves.queue.Queue()
+        sender = runner.ResultsSender(result_queue, "task_uuid")
+        sender.close()
+
+        self.assertFalse(sender._thread.is_alive())
+        self.assertTrue(result_queue.empty())
+
+
 @ddt.ddt
 class ScenarioRunnerTestCase(test.TestCase):
 
@@ -224,7 +617,8 @@ class ScenarioRunnerTestCase(test.TestCase):
         processes = 10
         process_pool = collections.deque([process] * processes)
         mock_result_queue = mock.MagicMock(
-            empty=mock.MagicMock(return_value=True))
+            get=mock.MagicMock(side_effect=moves.queue.Empty),
+            get_nowait=mock.MagicMock(side_effect=moves.queue.Empty))
 
         runner_obj = serial.SerialScenarioRunner(
             mock.MagicMock(),
@@ -233,8 +627,106 @@ class ScenarioRunnerTestCase(test.TestCase):
         runner_obj._join_processes(process_pool, mock_result_queue)
 
         self.assertEqual(processes, process.join.call_count)
+        mock_result_queue.get.assert_called_once_with(timeout=0.1)
+        self.assertFalse(mock_scenario_runner__send_result.called)
         mock_result_queue.close.assert_called_once_with()
 
+    @mock.patch(BASE + "ScenarioRunner._send_result")
+    def test__join_processes_drains_results(self,
+                                            mock_scenario_runner__send_result):
+        process = mock.MagicMock(is_alive=mock.MagicMock(
+            side_effect=[True, False]))
+        process_pool = collections.deque([process])
+        result_queue = moves.queue.Queue()
+        for i in range(3):
+            result_queue.put({"i": i})
+        result_queue.close = mock.MagicMock()
+
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+
+        runner_obj._join_processes(process_pool, result_queue)
+
+        self.assertEqual(
+            [mock.call({"i": 0}), mock.call({"i": 1}), mock.call({"i": 2})],
+            mock_scenario_runner__send_result.mock_calls)
+        process.join.assert_called_once_with()
+        result_queue.close.assert_called_once_with()
+
+    @mock.patch(BASE + "ScenarioRunner._send_result")
+    @mock.patch(BASE + "ScenarioRunner._store_result")
+    def test__join_processes_encoded_results(
+            self, mock_scenario_runner__store_result,
+            mock_scenario_runner__send_result):
+        process_pool = collections.deque()
+        results = [{"timestamp": float(i), "duration": 1.0,
+                    "idle_duration": 0.0, "error": [],
+                    "output": {"additive": [], "complete": []},
+                    "atomic_actions": {}} for i in range(3)]
+        result_queue = moves.queue.Queue()
+        result_queue.put(transport.ResultsEncoder().encode(results[:2]))
+        result_queue.put(results[2])
+        result_queue.close = mock.MagicMock()
+
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+
+        runner_obj._join_processes(process_pool, result_queue)
+
+        # encoded results are validated by workers
+        self.assertEqual([mock.call(r) for r in results[:2]],
+                         mock_scenario_runner__store_result.mock_calls)
+        mock_scenario_runner__send_result.assert_called_once_with(
+            results[2])
+
+    def test_wait_for_results(self):
+        runner_obj = serial.SerialScenarioRunner(mock.MagicMock(),
+                                                 mock.MagicMock())
+        self.assertFalse(runner_obj.wait_for_results(timeout=0))
+
+        runner_obj.result_queue.append([{"timestamp": 1}])
+        self.assertTrue(runner_obj.wait_for_results())
+
+    def test_wait_for_results_done(self):
+        runner_obj = serial.SerialScenarioRunner(mock.MagicMock(),
+                                                 mock.MagicMock())
+        done = threading.Event()
+        done.set()
+        # must not block even without a timeout
+        self.assertFalse(runner_obj.wait_for_results(done=done))
+
+    def test_wait_for_results_is_notified(self):
+        runner_obj = serial.SerialScenarioRunner(mock.MagicMock(),
+                                                 mock.MagicMock())
+        waited = []
+        waiter = threading.Thread(
+            target=lambda: waited.append(runner_obj.wait_for_results(60)))
+        with runner_obj._results_cond:
+            waiter.start()
+            # the waiter can't check the queue until the lock is released
+            runner_obj._put_results_batch([{"timestamp": 1}])
+        waiter.join(10)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual([True], waited)
+
+    def test_notify_results_waiters(self):
+        runner_obj = serial.SerialScenarioRunner(mock.MagicMock(),
+                                                 mock.MagicMock())
+        done = threading.Event()
+        waited = []
+        waiter = threading.Thread(target=lambda: waited.append(
+            runner_obj.wait_for_results(60, done=done)))
+        waiter.start()
+        done.set()
+        runner_obj.notify_results_waiters()
+        waiter.join(10)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual([False], waited)
+
     def _get_runner(self, task="mock_me", config="mock_me", batch_size=0):
         class ScenarioRunner(runner.ScenarioRunner):
             def _run_scenario(self, *args, **kwargs):
@@ -269,6 +761,20 @@ class ScenarioRunnerTestCase(test.TestCase):
                                           "complete": ["c1", "c2"]},
                   "atomic_actions": {"foo": 4.2}},
          "validate_output_return_value": "validation error message"},
+        {"data": {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
+                  "error": [], "output": {"additive": [], "complete": []},
+                  "atomic_actions": {}, "scheduled_at": 0.5},
+         "expected": True},
+        {"data": {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
+                  "error": [], "output": {"additive": [], "complete": []},
+                  "atomic_actions": {}, "scheduled_at": None}},
+        {"data": {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
+                  "error": [], "output": {"additive": [], "complete": []},
+                  "atomic_actions": {}, "phase": 1},
+         "expected": True},
+        {"data": {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
+                  "error": [], "output": {"additive": [], "complete": []},
+                  "atomic_actions": {}, "phase": "1"}},
         {"data": {"duration": 1.0, "timestamp": 1.0, "idle_duration": 1.0,
                   "error": [42], "output": {"additive": [], "complete": []},
                   "atomic_actions": {"foo": 4.2}}},
@@ -342,6 +848,18 @@ class ScenarioRunnerTestCase(test.TestCase):
         self.assertEqual([], runner_.result_batch)
         self.assertEqual(collections.deque([[result]]), runner_.result_queue)
 
+    def test__send_result_batches_are_sorted(self):
+        runner_ = self._get_runner(task={"uuid": "foo_uuid"}, batch_size=2)
+        runner_._result_has_valid_schema = mock.Mock(return_value=True)
+        results = [{"timestamp": ts} for ts in (3, 1, 2)]
+        for result in results:
+            runner_._send_result(result)
+        runner_._flush_results()
+        self.assertEqual(
+            collections.deque([[{"timestamp": 1}, {"timestamp": 3}],
+                               [{"timestamp": 2}]]),
+            runner_.result_queue)
+
     @mock.patch("rally.task.runner.LOG")
     def test__send_result_with_invalid_schema(self, mock_log):
         runner_ = self._get_runner(task={"uuid": "foo_uuid"})
@@ -169,6 +169,7 @@ class ScenarioTestCase(test.TestCase):
         validators = [mock.MagicMock(), mock.MagicMock()]
         for validator in validators:
             validator.permission = consts.EndpointPermission.USER
+            validator.user_independent = False
 
         Testing.validate_user_validators._meta_set("validators", validators)
         args = {"a": 1, "b": 2}
@@ -182,6 +183,47 @@ class ScenarioTestCase(test.TestCase):
 
         Testing.validate_user_validators.unregister()
 
+    @mock.patch("rally.task.scenario.Scenario._validate_scenario_args")
+    @mock.patch("rally.task.scenario.Scenario._validate_helper")
+    def test_validate_user_independent_validators(
+            self, mock_scenario__validate_helper,
+            mock_scenario__validate_scenario_args):
+
+        class Testing(fakes.FakeScenario):
+
+            @scenario.configure()
+            def validate_user_independent_validators(self):
+                pass
+
+        validators = [mock.MagicMock(), mock.MagicMock(), mock.MagicMock()]
+        for validator in validators:
+            validator.permission = consts.EndpointPermission.USER
+        validators[0].user_independent = True
+        validators[1].user_independent = False
+        validators[2].permission = consts.EndpointPermission.ADMIN
+        name = "Testing.validate_user_independent_validators"
+        Testing.validate_user_independent_validators._meta_set(
+            "validators", validators)
+        args = {"a": 1, "b": 2}
+
+        scenario.Scenario.validate(name, args, admin="admin",
+                                   users=["u1", "u2"])
+        self.assertEqual(
+            [mock.call(validators[2:], "admin", args, None),
+             mock.call(validators[:2], "u1", args, None),
+             mock.call(validators[1:2], "u2", args, None)],
+            mock_scenario__validate_helper.mock_calls)
+        self.assertEqual(1, mock_scenario__validate_scenario_args.call_count)
+
+        mock_scenario__validate_helper.reset_mock()
+        scenario.Scenario.validate(name, args, admin="admin", users=["u3"],
+                                   per_user_only=True)
+        mock_scenario__validate_helper.assert_called_once_with(
+            validators[1:2], "u3", args, None)
+        self.assertEqual(1, mock_scenario__validate_scenario_args.call_count)
+
+        Testing.validate_user_independent_validators.unregister()
+
     def test__validate_scenario_args(self):
 
         class Testing(fakes.FakeScenario):
@@ -260,6 +302,29 @@ class ScenarioTestCase(test.TestCase):
         self.assertEqual(scenario_inst.idle_duration(),
                          mock_uniform.return_value)
 
+    @mock.patch("rally.task.atomic.asyncio")
+    @mock.patch("rally.task.scenario.random.uniform", return_value=1.5)
+    def test_async_sleep_between(self, mock_uniform, mock_asyncio):
+        scenario_inst = scenario.Scenario()
+
+        future = scenario_inst.async_sleep_between(1, 2)
+
+        self.assertEqual(mock_asyncio.ensure_future.return_value, future)
+        mock_asyncio.sleep.assert_called_once_with(1.5)
+        mock_asyncio.ensure_future.assert_called_once_with(
+            mock_asyncio.sleep.return_value)
+        # the idle duration is added when the sleep is done
+        self.assertEqual(0, scenario_inst.idle_duration())
+        add_idle_duration = future.add_done_callback.call_args[0][0]
+        add_idle_duration(mock.Mock(cancelled=mock.Mock(return_value=True)))
+        self.assertEqual(0, scenario_inst.idle_duration())
+        add_idle_duration(mock.Mock(cancelled=mock.Mock(return_value=False)))
+        self.assertEqual(1.5, scenario_inst.idle_duration())
+
+    def test_async_sleep_between_invalid_args(self):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          scenario.Scenario().async_sleep_between, 2, 1)
+
     def test_scenario_context_are_valid(self):
         for s in scenario.Scenario.get_all():
             try:
@@ -0,0 +1,111 @@
+# Copyright 2016: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import pickle
+
+from rally.task import transport
+from tests.unit import test
+
+
+def make_result(timestamp, actions=(), error=None, output=None):
+    return {"timestamp": timestamp,
+            "duration": timestamp / 2.0,
+            "idle_duration": 0.5,
+            "error": error or [],
+            "output": output or {"additive": [], "complete": []},
+            "atomic_actions": collections.OrderedDict(actions)}
+
+
+class ResultsTransportTestCase(test.TestCase):
+
+    def test_encode_decode(self):
+        encoder = transport.ResultsEncoder()
+        decoder = transport.ResultsDecoder()
+        output = {"additive": [{"title": "t", "description": "",
+                                "chart_plugin": "Lines",
+                                "data": [["a", 1]]}],
+                  "complete": []}
+        results = [
+            make_result(1.0, [("b", 0.2), ("a", 0.1)]),
+            make_result(2.0, error=["Exception", "msg", "trace"]),
+            make_result(3.0, [("a", 0.3), ("c", 0.4)], output=output)]
+
+        message = encoder.encode(results)
+        sender_id, new_names, payload, extras = message
+        self.assertEqual(["b", "a", "c"], new_names)
+        self.assertEqual({1: (["Exception", "msg", "trace"],
+                              results[1]["output"], None),
+                          2: ([], output, None)}, extras)
+
+        decoded = decoder.decode(pickle.loads(pickle.dumps(message)))
+        self.assertEqual(results, decoded)
+        self.assertEqual(["b", "a"], list(decoded[0]["atomic_actions"]))
+
+    def test_encode_decode_sends_names_once(self):
+        encoder = transport.ResultsEncoder()
+        decoder = transport.ResultsDecoder()
+
+        first = encoder.encode([make_result(1.0, [("a", 0.1)])])
+        second = encoder.encode([make_result(2.0, [("a", 0.2),
+                                                   ("b", 0.3)])])
+
+        self.assertEqual(["a"], first[1])
+        self.assertEqual(["b"], second[1])
+        self.assertEqual([make_result(1.0, [("a", 0.1)])],
+                         decoder.decode(first))
+        self.assertEqual([make_result(2.0, [("a", 0.2), ("b", 0.3)])],
+                         decoder.decode(second))
+
+    def test_decode_many_senders(self):
+        decoder = transport.ResultsDecoder()
+        encoder1 = transport.ResultsEncoder()
+        encoder2 = transport.ResultsEncoder()
+
+        message1 = encoder1.encode([make_result(1.0, [("a", 0.1)])])
+        message2 = encoder2.encode([make_result(2.0, [("b", 0.2)])])
+
+        self.assertEqual([make_result(2.0, [("b", 0.2)])],
+                         decoder.decode(message2))
+        self.assertEqual([make_result(1.0, [("a", 0.1)])],
+                         decoder.decode(message1))
+
+    def test_encode_decode_optional_fields(self):
+        encoder = transport.ResultsEncoder()
+        results = [dict(make_result(2.0), scheduled_at=1.5, phase=0),
+                   dict(make_result(2.5), phase=3),
+                   make_result(3.0),
+                   dict(make_result(3.5, [("a", 0.1), ("b", 0.2)]),
+                        atomic_actions_uncertainty={"b": 0.5}),
+                   dict(make_result(4.0), termination_delay=0.25)]
+
+        decoded = transport.ResultsDecoder().decode(encoder.encode(results))
+
+        self.assertEqual(results, decoded)
+        self.assertNotIn("scheduled_at", decoded[1])
+        self.assertNotIn("phase", decoded[2])
+        self.assertNotIn("atomic_actions_uncertainty", decoded[2])
+        self.assertNotIn("termination_delay", decoded[3])
+
+    def test_encode_empty(self):
+        encoder = transport.ResultsEncoder()
+        message = encoder.encode([])
+        self.assertEqual([], transport.ResultsDecoder().decode(message))
+
+    def test_is_encoded(self):
+        message = transport.ResultsEncoder().encode([make_result(1.0)])
+        self.assertTrue(transport.ResultsDecoder.is_encoded(message))
+        self.assertFalse(transport.ResultsDecoder.is_encoded(
+            make_result(1.0)))
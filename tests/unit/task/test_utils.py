@@ -14,11 +14,14 @@
 #    under the License.
 
 import datetime as dt
+import threading
 
+import ddt
 from jsonschema import exceptions as schema_exceptions
 import mock
 
 from rally import exceptions
+from rally.task import atomic
 from rally.task import utils
 from tests.unit import fakes
 from tests.unit import test
@@ -513,3 +516,195 @@ class WaitForStatusTestCase(test.TestCase):
                                     check_deletion=True,
                                     update_resource=upd)
         self.assertEqual(res, ret)
+
+
+def make_manager(cls_name="ServerManager", module="novaclient.v2.servers"):
+    manager_cls = type(cls_name, (object,), {"__module__": module})
+    manager = manager_cls()
+    manager.list = mock.Mock()
+    manager.get = mock.Mock()
+    return manager
+
+
+class BatchStatusPollerTestCase(test.TestCase):
+
+    def _make_resource(self, manager, id_, status):
+        return mock.Mock(manager=manager, id=id_, status=status)
+
+    def test_is_supported(self):
+        getter = utils.get_from_manager()
+        is_supported = utils.BatchStatusPoller.is_supported
+        for manager, expected in (
+                (make_manager(), True),
+                (make_manager("VolumeManager", "cinderclient.v2.volumes"),
+                 True),
+                (make_manager("ImageManager", "glanceclient.v2.images"),
+                 False),
+                (make_manager("ServerManager", "tests.unit.fakes"), False)):
+            self.assertEqual(
+                expected,
+                is_supported(self._make_resource(manager, "id", "A"), getter))
+        self.assertFalse(is_supported(
+            self._make_resource(make_manager(), "id", "A"), lambda r: r))
+
+    @mock.patch("rally.task.utils.time.sleep")
+    @mock.patch("rally.task.utils.threading")
+    def test_wait(self, mock_threading, mock_sleep):
+        manager = make_manager()
+        resources = [self._make_resource(manager, i, "BUILD")
+                     for i in range(3)]
+        registered = []
+        all_registered = threading.Event()
+
+        class Event(threading.Event):
+            # waiters wait for their events once they are registered
+            def wait(self, timeout=None):
+                registered.append(self)
+                if len(registered) == len(resources):
+                    all_registered.set()
+                return super(Event, self).wait(timeout)
+
+        mock_threading.Event = Event
+        mock_threading.Lock = threading.Lock
+        mock_threading.Thread = threading.Thread
+        # the first poll is made once all the waiters are registered
+        mock_sleep.side_effect = lambda interval: all_registered.wait(5)
+        listings = iter([
+            [self._make_resource(manager, 0, "ACTIVE"),
+             self._make_resource(manager, 1, "ERROR"),
+             self._make_resource(manager, 2, "ACTIVE")]])
+        # waiters which are not woken up by the first list time out with
+        # the unchanged status
+        manager.list.side_effect = lambda detailed: next(
+            listings, [self._make_resource(manager, i, "BUILD")
+                       for i in range(3)])
+        manager.get.side_effect = Exception
+        poller = utils.BatchStatusPoller()
+        results = {}
+
+        def wait(resource):
+            try:
+                results[resource.id] = poller.wait(
+                    resource, utils.get_from_manager(), interval=0.01,
+                    timeout=1)[0].status
+            except Exception as e:
+                results[resource.id] = e
+
+        threads = [threading.Thread(target=wait, args=(r,))
+                   for r in resources]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual("ACTIVE", results[0])
+        self.assertIsInstance(results[1], exceptions.GetResourceErrorStatus)
+        self.assertEqual("ACTIVE", results[2])
+        manager.list.assert_called_with(detailed=True)
+        self.assertFalse(manager.get.called)
+
+    def test_wait_not_listed(self):
+        manager = make_manager()
+        resource = self._make_resource(manager, "id", "DELETING")
+        manager.list.return_value = []
+        not_found = Exception("Not found")
+        not_found.code = 404
+        manager.get.side_effect = not_found
+        poller = utils.BatchStatusPoller()
+
+        self.assertRaises(exceptions.GetResourceNotFound, poller.wait,
+                          resource, utils.get_from_manager(), interval=0.01)
+        manager.get.assert_called_once_with("id")
+
+    def test_wait_timeout(self):
+        manager = make_manager()
+        resource = self._make_resource(manager, "id", "BUILD")
+        manager.list.return_value = [
+            self._make_resource(manager, "id", "BUILD")]
+        poller = utils.BatchStatusPoller()
+
+        result, unchanged_at = poller.wait(
+            resource, utils.get_from_manager(), interval=0.01, timeout=0.05)
+
+        self.assertEqual("BUILD", result.status)
+        self.assertIsNotNone(unchanged_at)
+        self.assertFalse(manager.get.called)
+
+    @mock.patch("rally.task.utils.BATCH_STATUS_POLLER")
+    def test_wait_for_status(self, mock_batch_status_poller):
+        manager = make_manager()
+        resource = self._make_resource(manager, "id", "BUILD")
+        manager.get.return_value = resource
+        mock_batch_status_poller.wait.return_value = (
+            self._make_resource(manager, "id", "ACTIVE"), None)
+        getter = utils.get_from_manager()
+
+        result = utils.wait_for_status(resource, ["ACTIVE"],
+                                       update_resource=getter,
+                                       check_interval=3, timeout=10)
+
+        self.assertEqual(mock_batch_status_poller.wait.return_value[0],
+                         result)
+        manager.get.assert_called_once_with("id")
+        mock_batch_status_poller.wait.assert_called_once_with(
+            resource, getter, status_attr="status", interval=3,
+            timeout=mock.ANY)
+
+
+@ddt.ddt
+class AdaptivePollingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AdaptivePollingTestCase, self).setUp()
+        atomic.reset_history()
+        self.addCleanup(atomic.reset_history)
+
+    @ddt.data(
+        # no history
+        {"now": 3, "history": [], "expected": 5},
+        # polls get denser towards the expected moment
+        {"now": 1, "history": [8, 9, 10], "expected": 4},
+        {"now": 8, "history": [8, 9, 10], "expected": 0.5},
+        {"now": 8.9, "history": [8, 9, 10], "expected": 0.2},
+        # and sparser after it
+        {"now": 12, "history": [8, 9, 10], "expected": 3},
+        {"now": 30, "history": [8, 9, 10], "expected": 5},
+        {"now": 100, "history": [8, 9, 10], "expected": 5})
+    @ddt.unpack
+    def test__get_poll_interval(self, now, history, expected):
+        inst = atomic.ActionTimerMixin()
+        for duration in history:
+            atomic._history["action"].append(duration)
+        timer = atomic.ActionTimer(inst, "action")
+        timer.start = 0
+        with mock.patch("rally.task.utils.time.time", return_value=now):
+            self.assertAlmostEqual(
+                expected, utils._get_poll_interval([timer], 5))
+
+    @mock.patch("rally.task.utils.CONF")
+    def test__get_poll_interval_disabled(self, mock_conf):
+        mock_conf.adaptive_status_polling = False
+        atomic._history["action"].append(10)
+        timer = atomic.ActionTimer(atomic.ActionTimerMixin(), "action")
+        timer.start = 0
+        self.assertEqual(5, utils._get_poll_interval([timer], 5))
+        self.assertEqual(5, utils._get_poll_interval([], 5))
+
+    @mock.patch("rally.task.utils.time")
+    def test_wait_for_status_uncertainty(self, mock_time):
+        mock_time.time.side_effect = [0, 2, 3, 4, 5, 6, 7]
+        inst = atomic.ActionTimerMixin()
+        upd = mock.MagicMock(side_effect=[{"status": "not_ready"},
+                                          {"status": "not_ready"},
+                                          {"status": "ready"}])
+
+        with mock.patch("rally.common.utils.time.time", side_effect=[0, 10]):
+            with atomic.ActionTimer(inst, "action"):
+                utils.wait_for_status({"status": "not_ready"},
+                                      ready_statuses=["ready"],
+                                      update_resource=upd, check_interval=3)
+
+        # the last negative poll is at 4, the positive one is at 7
+        self.assertEqual({"action": 3}, inst.atomic_actions_uncertainty())
+        self.assertEqual([mock.call(3), mock.call(3)],
+                         mock_time.sleep.call_args_list)
@@ -14,6 +14,7 @@
 #    under the License.
 
 import os
+import threading
 
 import ddt
 from glanceclient import exc as glance_exc
@@ -21,6 +22,7 @@ import mock
 from novaclient import exceptions as nova_exc
 import six
 
+from rally.common import objects
 from rally.common.plugin import plugin
 from rally import consts
 from rally import exceptions
@@ -54,6 +56,117 @@ class ValidationUtilsTestCase(test.TestCase):
         self.assertEqual(
             ("conf", "client", "deploy", "a", "b", "c", 1),
             scenario._meta_get("validators")[0]("conf", "client", "deploy"))
+        self.assertFalse(scenario._meta_get("validators")[0].user_independent)
+
+    def test_user_independent(self):
+
+        @plugin.from_func()
+        def scenario():
+            pass
+
+        scenario._meta_init()
+        validation.required_parameters("a")(scenario)
+        validation.image_exists("image")(scenario)
+
+        self.assertEqual(
+            [True, False],
+            [v.user_independent for v in scenario._meta_get("validators")])
+
+
+class LookupsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(LookupsTestCase, self).setUp()
+        self.credential = objects.Credential("url", "user", "pwd", "tenant")
+        self.lookups = validation.Lookups()
+
+    def test_get(self):
+        func = mock.Mock(return_value="images")
+
+        for i in range(3):
+            self.assertEqual(
+                "images",
+                self.lookups.get(self.credential, ("images",), func, 1, a=2))
+        func.assert_called_once_with(1, a=2)
+
+        other = objects.Credential("url", "other", "pwd", "tenant")
+        self.lookups.get(other, ("images",), func)
+        self.lookups.get(self.credential, ("flavors",), func)
+        self.assertEqual(3, func.call_count)
+
+    def test_get_failed(self):
+        func = mock.Mock(side_effect=exceptions.InvalidScenarioArgument)
+
+        for i in range(2):
+            self.assertRaises(exceptions.InvalidScenarioArgument,
+                              self.lookups.get, self.credential, ("image",),
+                              func)
+        func.assert_called_once_with()
+
+    def test_get_concurrent(self):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def lookup():
+            started.set()
+            release.wait()
+            return "networks"
+
+        func = mock.Mock(side_effect=lookup)
+        threads = [threading.Thread(
+            target=lambda: results.append(self.lookups.get(
+                self.credential, ("networks",), func)))
+            for i in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(["networks"] * 3, results)
+        func.assert_called_once_with()
+
+    @mock.patch(MODULE + "openstack_types.GlanceImage.transform",
+                return_value="image_id")
+    def test_image_exists_memoized(self, mock_glance_image_transform):
+        clients = validation.ValidationClients(self.credential, self.lookups)
+
+        @plugin.from_func()
+        def scenario():
+            pass
+
+        scenario._meta_init()
+        validation.image_exists(param_name="image")(scenario)
+        validator = scenario._meta_get("validators")[0]
+        config = {"args": {"image": {"name": "cirros"}}}
+
+        with mock.patch.object(rally.osclients.Glance,
+                               "create_client") as mock_create_client:
+            mock_create_client.return_value.images.get.return_value = (
+                mock.Mock(to_dict=mock.Mock(return_value={"size": 1})))
+            for i in range(3):
+                self.assertTrue(validator(config, clients, None).is_valid)
+
+        mock_glance_image_transform.assert_called_once_with(
+            clients=clients, resource_config={"name": "cirros"})
+        self.assertEqual(
+            1, mock_create_client.return_value.images.get.call_count)
+
+    def test_admin_clients(self):
+        clients = validation.ValidationClients(self.credential, self.lookups)
+        deployment = {"admin": {"auth_url": "url", "username": "admin",
+                                "password": "pwd"}}
+
+        admin = validation._admin_clients(clients, deployment)
+        self.assertIsInstance(admin, validation.ValidationClients)
+        self.assertEqual(self.lookups, admin.lookups)
+        self.assertEqual("admin", admin.credential.username)
+
+        admin = validation._admin_clients(mock.Mock(), deployment)
+        self.assertNotIsInstance(admin, validation.ValidationClients)
 
 
 @ddt.ddt
@@ -665,6 +778,21 @@ class ValidatorsTestCase(test.TestCase):
                            None, None)
         self.assertTrue(result.is_valid, result.msg)
 
+    def test_required_async_runner(self):
+        validator = self._unwrap_validator(validation.required_async_runner)
+
+        for runner_type in ("async_constant", "async_rps"):
+            result = validator({"runner": {"type": runner_type}}, None, None)
+            self.assertTrue(result.is_valid, result.msg)
+
+        result = validator({"runner": {"type": "constant"}}, None, None)
+        self.assertFalse(result.is_valid)
+        self.assertIn("'constant'", result.msg)
+
+        result = validator({}, None, None)
+        self.assertFalse(result.is_valid)
+        self.assertIn("'serial'", result.msg)
+
     def test_required_openstack_with_admin(self):
         validator = self._unwrap_validator(validation.required_openstack,
                                            admin=True)
@@ -22,6 +22,8 @@ from oslotest import base
 from oslotest import mockpatch
 
 from rally.common import db
+from rally.common import sshutils
+from rally import osclients
 from rally import plugins
 from tests.unit import fakes
 
@@ -43,7 +45,9 @@ class TestCase(base.BaseTestCase):
     def setUp(self):
         super(TestCase, self).setUp()
         self.addCleanup(mock.patch.stopall)
-        plugins.load()
+        self.addCleanup(osclients.CLIENTS_POOL.clear)
+        self.addCleanup(sshutils.CONNECTIONS_POOL.clear)
+        plugins.load(lazy=False)
 
     def _test_atomic_action_timer(self, atomic_actions, name):
         action_duration = atomic_actions.get(name)
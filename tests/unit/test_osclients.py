@@ -17,6 +17,7 @@ import ddt
 from keystoneclient import exceptions as keystone_exceptions
 import mock
 from oslo_config import cfg
+from oslo_config import fixture
 
 from rally.common import objects
 from rally import consts
@@ -121,6 +122,84 @@ class OSClientTestCase(test.TestCase, OSClientTestCaseUtils):
         mock_keystone_get_session.assert_called_once_with(version)
 
 
+class ClientsPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ClientsPoolTestCase, self).setUp()
+        self.pool = osclients.ClientsPool()
+        self.credential = objects.Credential(
+            "http://fake.example.org:5000/v2.0/", "user", "pass", "tenant")
+
+    def test_get(self):
+        cache = self.pool.get(self.credential, {})
+        self.assertEqual({}, cache)
+        self.assertIs(cache, self.pool.get(self.credential, {}))
+        self.assertIsNot(cache, self.pool.get(self.credential,
+                                              {"nova": {"version": 2}}))
+        other = objects.Credential("http://fake.example.org:5000/v2.0/",
+                                   "user2", "pass", "tenant")
+        self.assertIsNot(cache, self.pool.get(other, {}))
+        self.assertEqual(0, self.pool.auth_requests_saved)
+
+    def test_get_counts_saved_auth_requests(self):
+        cache = self.pool.get(self.credential, {})
+        cache["keystone_auth_ref"] = mock.MagicMock()
+        self.pool.get(self.credential, {})
+        self.pool.get(self.credential, {})
+        self.assertEqual(2, self.pool.auth_requests_saved)
+
+        self.pool.clear()
+        self.assertEqual(0, self.pool.auth_requests_saved)
+        self.assertIsNot(cache, self.pool.get(self.credential, {}))
+
+    def test_get_not_credential(self):
+        credential = mock.MagicMock()
+        self.assertIsNot(self.pool.get(credential, {}),
+                         self.pool.get(credential, {}))
+
+    def test_get_disabled(self):
+        self.useFixture(fixture.Config()).config(openstack_client_pool_size=0)
+        self.assertIsNot(self.pool.get(self.credential, {}),
+                         self.pool.get(self.credential, {}))
+
+    def test_get_evicts_least_recently_used(self):
+        self.useFixture(fixture.Config()).config(openstack_client_pool_size=2)
+        credentials = [
+            objects.Credential("http://fake.example.org:5000/v2.0/",
+                               "user%d" % i, "pass", "tenant")
+            for i in range(3)]
+        caches = [self.pool.get(c, {}) for c in credentials[:2]]
+        # use the first one, so the second one becomes least recently used
+        self.assertIs(caches[0], self.pool.get(credentials[0], {}))
+        self.pool.get(credentials[2], {})
+
+        self.assertIs(caches[0], self.pool.get(credentials[0], {}))
+        self.assertIsNot(caches[1], self.pool.get(credentials[1], {}))
+
+    @mock.patch("rally.osclients.os.getpid")
+    def test_get_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        pool = osclients.ClientsPool()
+        cache = pool.get(self.credential, {})
+        mock_getpid.return_value = 2
+        self.assertIsNot(cache, pool.get(self.credential, {}))
+
+    def test_remove(self):
+        cache = self.pool.get(self.credential, {})
+        self.pool.remove(self.credential, {})
+        self.assertIsNot(cache, self.pool.get(self.credential, {}))
+
+    def test_clients_share_cache(self):
+        clients = osclients.Clients(self.credential)
+        clients.cache["nova"] = "fake_nova"
+        self.assertIs(clients.cache,
+                      osclients.Clients(self.credential).cache)
+
+        clients.clear()
+        self.assertEqual({}, clients.cache)
+        self.assertEqual({}, osclients.Clients(self.credential).cache)
+
+
 class CachedTestCase(test.TestCase):
 
     def test_cached(self):
@@ -236,6 +315,8 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
     def test_auth_ref(self, mock_keystone_get_session):
         session = mock.MagicMock()
         auth_plugin = mock.MagicMock()
+        auth_plugin.get_access.return_value.will_expire_soon.return_value = (
+            False)
         mock_keystone_get_session.return_value = (session, auth_plugin)
         cache = {}
         keystone = osclients.Keystone(None, None, cache)
@@ -249,6 +330,22 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
         keystone.auth_ref
         mock_keystone_get_session.assert_called_once_with()
 
+    @mock.patch("rally.osclients.Keystone.get_session")
+    def test_auth_ref_expires_soon(self, mock_keystone_get_session):
+        session = mock.MagicMock()
+        auth_plugin = mock.MagicMock()
+        mock_keystone_get_session.return_value = (session, auth_plugin)
+        old_auth_ref = mock.MagicMock()
+        old_auth_ref.will_expire_soon.return_value = True
+        cache = {"keystone_auth_ref": old_auth_ref}
+        keystone = osclients.Keystone(None, None, cache)
+
+        self.assertEqual(auth_plugin.get_access.return_value,
+                         keystone.auth_ref)
+        old_auth_ref.will_expire_soon.assert_called_once_with(
+            cfg.CONF.openstack_client_token_stale_duration)
+        auth_plugin.get_access.assert_called_once_with(session)
+
 
 @ddt.ddt
 class OSClientsTestCase(test.TestCase):